@@ -3,4 +3,20 @@ Configuração do banco de dados - centralização de imports
 """
 from app.models.base import Base, SessionLocal, engine, get_db, TimestampMixin
 
-__all__ = ['Base', 'SessionLocal', 'engine', 'get_db', 'TimestampMixin']
+
+def create_schema(bind=None):
+    """
+    Cria as tabelas ausentes de todos os modelos registrados (não altera tabelas existentes)
+    
+    Passo explícito de migração (run_migrations.py); o servidor só o executa na
+    inicialização com DB_CREATE_SCHEMA_ON_STARTUP=true (desabilitado por padrão).
+    """
+    # Importar todos os modelos para garantir que estejam registrados
+    import app.models  # noqa: F401
+    import app.models.send_queue  # noqa: F401
+    import app.models.timecard  # noqa: F401
+    
+    Base.metadata.create_all(bind=bind or engine)
+
+
+__all__ = ['Base', 'SessionLocal', 'engine', 'get_db', 'TimestampMixin', 'create_schema']
@@ -0,0 +1,151 @@
+"""
+Fábrica única do engine SQLAlchemy
+Todos os módulos (models.base, main_legacy, workers em background) compartilham
+o mesmo engine e, portanto, um único pool de conexões com tamanho previsível
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .metrics import instrument_engine, metrics_enabled
+from .query_detector import get_query_detector, instrument_engine as instrument_detector
+
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+# Métricas do pool (atualizadas pelos eventos do SQLAlchemy)
+_metrics_lock = threading.Lock()
+_metrics = {
+    'connects': 0,
+    'checkouts': 0,
+    'checkins': 0,
+    'invalidations': 0,
+    'checked_out': 0,
+    'peak_checked_out': 0,
+    'max_hold_ms': 0.0,
+}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def resolve_database_url() -> str:
+    """
+    URL do banco: DATABASE_URL (ambiente/.env), ou montada a partir de DB_HOST/DB_USER/...
+    quando apenas as variáveis individuais estão definidas
+    """
+    url = os.getenv('DATABASE_URL')
+    if url:
+        return url
+
+    if any(os.getenv(name) for name in ('DB_HOST', 'DB_PORT', 'DB_NAME', 'DB_USER', 'DB_PASSWORD')):
+        db_user = os.getenv('DB_USER', settings.DB_USER)
+        db_password = os.getenv('DB_PASSWORD', settings.DB_PASSWORD)
+        db_host = os.getenv('DB_HOST', settings.DB_HOST)
+        db_port = os.getenv('DB_PORT', settings.DB_PORT)
+        db_name = os.getenv('DB_NAME', settings.DB_NAME)
+        return f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+
+    return settings.DATABASE_URL
+
+
+def _engine_options(database_url: str) -> Dict[str, Any]:
+    """Parâmetros do pool/conexão conforme o banco (configuráveis por variáveis de ambiente)"""
+    if database_url.startswith('sqlite'):
+        # SQLite (desenvolvimento): sem pool dimensionado, conexão compartilhada entre threads
+        return {'connect_args': {'check_same_thread': False}}
+
+    options = {
+        'pool_size': _env_int('DB_POOL_SIZE', 5),             # Conexões mantidas no pool
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),      # Extras quando o pool está cheio
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),      # Espera máxima por uma conexão
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 3600),    # Reciclar conexões a cada 1 hora
+        'pool_pre_ping': True,                                # Verificar conexão antes de usar
+    }
+
+    statement_timeout_ms = _env_int('DB_STATEMENT_TIMEOUT_MS', 120000)
+    if database_url.startswith('postgresql') and statement_timeout_ms > 0:
+        # Consultas presas não seguram conexões do pool indefinidamente
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout_ms}'}
+
+    return options
+
+
+def _register_pool_metrics(engine: Engine):
+    """Conta conexões abertas, checkouts e o pico de conexões em uso"""
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        with _metrics_lock:
+            _metrics['connects'] += 1
+
+    @event.listens_for(engine, 'checkout')
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checkout_at'] = time.perf_counter()
+        with _metrics_lock:
+            _metrics['checkouts'] += 1
+            _metrics['checked_out'] += 1
+            _metrics['peak_checked_out'] = max(_metrics['peak_checked_out'], _metrics['checked_out'])
+
+    @event.listens_for(engine, 'checkin')
+    def _on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop('checkout_at', None)
+        with _metrics_lock:
+            _metrics['checkins'] += 1
+            _metrics['checked_out'] = max(0, _metrics['checked_out'] - 1)
+            if started is not None:
+                held_ms = (time.perf_counter() - started) * 1000
+                _metrics['max_hold_ms'] = max(_metrics['max_hold_ms'], held_ms)
+
+    @event.listens_for(engine, 'invalidate')
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        with _metrics_lock:
+            _metrics['invalidations'] += 1
+
+
+def get_engine() -> Engine:
+    """Retorna o engine compartilhado (criado na primeira chamada; não conecta até o primeiro uso)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                database_url = resolve_database_url()
+                engine = create_engine(database_url, echo=False, **_engine_options(database_url))
+                _register_pool_metrics(engine)
+                if metrics_enabled():
+                    instrument_engine(engine)
+                detector = get_query_detector()
+                if detector.enabled:
+                    instrument_detector(engine, detector)
+                _engine = engine
+    return _engine
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Estado atual do pool e métricas acumuladas desde o início do processo"""
+    engine = get_engine()
+    pool = engine.pool
+    with _metrics_lock:
+        stats = dict(_metrics)
+    stats['max_hold_ms'] = round(stats['max_hold_ms'], 1)
+    stats['pool_class'] = type(pool).__name__
+    stats['dialect'] = engine.dialect.name
+
+    # QueuePool expõe dimensionamento; outros pools (SQLite) não
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[f'pool_{name}'] = method()
+    max_overflow = getattr(pool, '_max_overflow', None)
+    if max_overflow is not None and 'pool_size' in stats:
+        stats['max_connections'] = stats['pool_size'] + max_overflow
+    return stats
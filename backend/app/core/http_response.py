@@ -0,0 +1,114 @@
+"""
+Camada de resposta HTTP: compressão (gzip/deflate) e GET condicional (ETag / 304)
+Usada pelo EnviaFolhaHandler e pelos routers modulares para que respostas
+JSON grandes sejam comprimidas quando o cliente aceita, e para que dados
+inalterados sejam respondidos com 304 sem reenviar o corpo
+"""
+import gzip
+import hashlib
+import os
+import uuid
+import zlib
+from typing import Iterable, Iterator, Optional
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Corpos menores que isso não compensam o custo de comprimir
+COMPRESSION_MIN_BYTES = _env_int('HTTP_COMPRESSION_MIN_BYTES', 1024)
+# 1 (rápido) a 9 (menor); 5 já obtém quase toda a redução em JSON
+COMPRESSION_LEVEL = _env_int('HTTP_COMPRESSION_LEVEL', 5)
+
+# Corpos sem compressão maiores que isso são escritos no socket em blocos
+WRITE_CHUNK_BYTES = _env_int('HTTP_WRITE_CHUNK_BYTES', 64 * 1024)
+
+SUPPORTED_ENCODINGS = ('gzip', 'deflate')
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Escolhe a codificação a partir do header Accept-Encoding (respeita q=0).
+    Prefere gzip; retorna None se o cliente não aceita nenhuma suportada.
+    """
+    if not accept_encoding or COMPRESSION_LEVEL <= 0:
+        return None
+
+    accepted = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+
+def compress_body(body: bytes, encoding: Optional[str]) -> bytes:
+    """Comprime o corpo com a codificação escolhida (sem mtime: saída determinística)"""
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=COMPRESSION_LEVEL, mtime=0)
+    if encoding == 'deflate':
+        return zlib.compress(body, COMPRESSION_LEVEL)
+    return body
+
+
+def iter_body_chunks(body: bytes, chunk_size: int = WRITE_CHUNK_BYTES) -> Iterator[memoryview]:
+    """Fatias do corpo (memoryview, sem cópia) para escrita em blocos"""
+    view = memoryview(body)
+    chunk_size = max(chunk_size, 1)
+    for start in range(0, len(body), chunk_size):
+        yield view[start:start + chunk_size]
+
+
+def compressor_for(encoding: Optional[str]):
+    """Compressor incremental (compress/flush) para respostas geradas em blocos"""
+    if encoding == 'gzip':
+        return zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, 31)
+    if encoding == 'deflate':
+        return zlib.compressobj(COMPRESSION_LEVEL)
+    return None
+
+
+def should_compress(body: bytes, encoding: Optional[str]) -> bool:
+    return encoding is not None and len(body) >= COMPRESSION_MIN_BYTES
+
+
+# Identifica o processo atual: versões baseadas em contadores em memória (gerações
+# de caches) recomeçam a cada boot e diferem entre processos, então entram no ETag
+# junto com este nonce para que um ETag antigo nunca coincida por acaso
+BOOT_NONCE = uuid.uuid4().hex
+
+
+def make_etag(*parts) -> str:
+    """ETag fraco a partir de partes arbitrárias (versões, caminho, usuário)"""
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        digest.update(b'\x00')
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparação fraca do If-None-Match (lista separada por vírgulas ou '*')"""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    wanted = etag[2:] if etag.startswith('W/') else etag
+    candidates: Iterable[str] = (c.strip() for c in if_none_match.split(','))
+    return any((c[2:] if c.startswith('W/') else c) == wanted for c in candidates)
@@ -0,0 +1,117 @@
+"""
+Serialização JSON das respostas da API
+Backend plugável: orjson quando instalado (opcional), senão o encoder da
+biblioteca padrão reaproveitado entre requisições. Tipos comuns nos
+handlers (date, datetime, Decimal, UUID, Enum, set) são tratados sem
+conversões manuais.
+
+Seleção: JSON_SERIALIZER=auto|orjson|stdlib (padrão auto)
+"""
+import datetime as _dt
+import enum
+import json
+import os
+import uuid
+from decimal import Decimal
+from importlib.util import find_spec
+from typing import Any, Callable, Dict
+
+ORJSON_AVAILABLE = find_spec('orjson') is not None
+
+
+_ENCODERS: Dict[type, Callable[[Any], Any]] = {
+    _dt.datetime: _dt.datetime.isoformat,
+    _dt.date: _dt.date.isoformat,
+    _dt.time: _dt.time.isoformat,
+    Decimal: float,
+    uuid.UUID: str,
+    set: list,
+    frozenset: list,
+    bytes: lambda v: v.decode('utf-8', errors='replace'),
+}
+
+
+def register_encoder(value_type: type, encoder: Callable[[Any], Any]):
+    """Registra a conversão de um tipo adicional (ex.: modelos próprios)"""
+    _ENCODERS[value_type] = encoder
+
+
+def json_default(value: Any, _lookup=_ENCODERS.get, _type=type) -> Any:
+    """Conversão de tipos não nativos; desconhecidos viram str (como default=str)"""
+    # Chamado uma vez por valor (ex.: cada Decimal de uma estatística): o caso
+    # comum, tipo exato registrado, resolve com uma consulta ao dict
+    encoder = _lookup(_type(value))
+    if encoder is not None:
+        return encoder(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    for value_type, encoder in _ENCODERS.items():
+        if isinstance(value, value_type):
+            return encoder(value)
+    return str(value)
+
+
+class StdlibSerializer:
+    """json da biblioteca padrão com encoder único (sem recriar a cada chamada)"""
+
+    name = 'stdlib'
+
+    def __init__(self):
+        # check_circular=False: as respostas são árvores montadas pelos handlers, e o
+        # registro de id() por contêiner/valor convertido pesa nos payloads com muitos
+        # Decimal (um ciclo ainda falha, com RecursionError)
+        self._encoder = json.JSONEncoder(ensure_ascii=False, default=json_default,
+                                         separators=(',', ':'), check_circular=False)
+
+    def dumps(self, data: Any) -> bytes:
+        return self._encoder.encode(data).encode('utf-8')
+
+
+class OrjsonSerializer:
+    """orjson (datetime/date/UUID nativos; Decimal e demais via json_default)"""
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, data: Any) -> bytes:
+        return self._orjson.dumps(data, default=json_default, option=self._options)
+
+
+_SERIALIZERS = {
+    'stdlib': StdlibSerializer,
+    'orjson': OrjsonSerializer,
+}
+
+# Instância global (singleton)
+_serializer = None
+
+
+def get_serializer():
+    """Retorna o serializador configurado (JSON_SERIALIZER)"""
+    global _serializer
+    if _serializer is None:
+        choice = os.getenv('JSON_SERIALIZER', 'auto').lower()
+        if choice == 'auto':
+            choice = 'orjson' if ORJSON_AVAILABLE else 'stdlib'
+            if choice == 'stdlib':
+                print("ℹ️ orjson não instalado; respostas JSON com o json da biblioteca padrão")
+        if choice == 'orjson' and not ORJSON_AVAILABLE:
+            print("⚠️ JSON_SERIALIZER=orjson, mas orjson não está instalado; usando stdlib")
+            choice = 'stdlib'
+        _serializer = _SERIALIZERS.get(choice, StdlibSerializer)()
+    return _serializer
+
+
+def set_serializer(serializer):
+    """Substitui o serializador (ex.: benchmarks ou um backend próprio com dumps)"""
+    global _serializer
+    _serializer = serializer
+
+
+def dumps(data: Any) -> bytes:
+    """Serializa para bytes UTF-8 com o serializador configurado"""
+    return get_serializer().dumps(data)
@@ -0,0 +1,334 @@
+"""
+Instrumentação de requisições e consultas SQL
+Por rota (padrão da tabela de rotas, não o caminho com ids): contagem por
+status, histograma de latência, bytes de resposta e quantidade/tempo de
+comandos SQL executados durante a requisição (eventos do SQLAlchemy).
+Exposto em formato Prometheus (/api/v1/system/metrics) e como resumo JSON
+(/api/v1/system/metrics/summary, usado pela tela de Informações do Sistema).
+
+Desabilitar: METRICS_ENABLED=false
+Endpoint Prometheus: desligado até definir METRICS_PROMETHEUS_TOKEN (o coletor
+envia Authorization: Bearer <token>); o resumo JSON exige usuário autenticado.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500)
+
+UNMATCHED_ROUTE = 'unmatched'
+
+_local = threading.local()
+
+
+def metrics_enabled() -> bool:
+    return os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+
+def prometheus_token() -> Optional[str]:
+    """Token exigido pelo endpoint Prometheus (None = endpoint desabilitado)"""
+    return os.getenv('METRICS_PROMETHEUS_TOKEN') or None
+
+
+class RequestContext:
+    """Medições da requisição em andamento (uma por thread)"""
+
+    __slots__ = ('method', 'route', 'started', 'status', 'bytes_sent', 'sql_count', 'sql_seconds')
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        self.started = time.perf_counter()
+        self.status = None
+        self.bytes_sent = 0
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+
+
+def current_request() -> Optional[RequestContext]:
+    """Contexto da requisição desta thread (None fora de requisições, ex.: threads de background)"""
+    return getattr(_local, 'request', None)
+
+
+class _Histogram:
+    __slots__ = ('bounds', 'counts', 'total', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # último = +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        running = 0
+        result = []
+        for bound, count in zip(list(self.bounds) + ['+Inf'], self.counts):
+            running += count
+            result.append((str(bound), running))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Quantil aproximado (interpolação linear dentro do bucket)"""
+        if not self.count:
+            return None
+        target = q * self.count
+        running = 0
+        lower = 0.0
+        for index, count in enumerate(self.counts):
+            if running + count >= target and count:
+                upper = self.bounds[index] if index < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * ((target - running) / count)
+            running += count
+            lower = self.bounds[index] if index < len(self.bounds) else lower
+        return self.bounds[-1]
+
+
+class _RouteStats:
+    __slots__ = ('statuses', 'latency', 'sql_per_request', 'bytes_total', 'bytes_max',
+                 'sql_count', 'sql_seconds', 'sql_max', 'latency_max')
+
+    def __init__(self):
+        self.statuses: Dict[int, int] = {}
+        self.latency = _Histogram(LATENCY_BUCKETS)
+        self.sql_per_request = _Histogram(SQL_COUNT_BUCKETS)
+        self.bytes_total = 0
+        self.bytes_max = 0
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.sql_max = 0
+        self.latency_max = 0.0
+
+
+class MetricsRegistry:
+    """Agregados por (método, rota) desde o início do processo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], _RouteStats] = {}
+        self._background_sql_count = 0
+        self._background_sql_seconds = 0.0
+        self.started_at = time.time()
+
+    # --------------------------------------------------------------- coleta
+
+    def begin(self, method: str, route: Optional[str]) -> RequestContext:
+        context = RequestContext(method, route or UNMATCHED_ROUTE)
+        _local.request = context
+        return context
+
+    def end(self, context: RequestContext):
+        _local.request = None
+        elapsed = time.perf_counter() - context.started
+        key = (context.method, context.route)
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = _RouteStats()
+            status = context.status or 0
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.latency.observe(elapsed)
+            stats.latency_max = max(stats.latency_max, elapsed)
+            stats.bytes_total += context.bytes_sent
+            stats.bytes_max = max(stats.bytes_max, context.bytes_sent)
+            stats.sql_per_request.observe(context.sql_count)
+            stats.sql_count += context.sql_count
+            stats.sql_seconds += context.sql_seconds
+            stats.sql_max = max(stats.sql_max, context.sql_count)
+
+    def record_sql(self, seconds: float):
+        context = current_request()
+        if context is not None:
+            context.sql_count += 1
+            context.sql_seconds += seconds
+            return
+        with self._lock:
+            self._background_sql_count += 1
+            self._background_sql_seconds += seconds
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._background_sql_count = 0
+            self._background_sql_seconds = 0.0
+            self.started_at = time.time()
+
+    # -------------------------------------------------------------- saídas
+
+    def summary(self, top: int = 25) -> Dict[str, Any]:
+        """Resumo JSON: rotas ordenadas pelo tempo total gasto"""
+        with self._lock:
+            routes = []
+            for (method, route), stats in self._routes.items():
+                count = stats.latency.count
+                routes.append({
+                    'method': method,
+                    'route': route,
+                    'requests': count,
+                    'errors': sum(c for s, c in stats.statuses.items() if s >= 500 or s == 0),
+                    'statuses': {str(s): c for s, c in sorted(stats.statuses.items())},
+                    'total_ms': round(stats.latency.total * 1000, 1),
+                    'avg_ms': round(stats.latency.total / count * 1000, 1) if count else 0,
+                    'p50_ms': _ms(stats.latency.quantile(0.5), stats.latency_max),
+                    'p95_ms': _ms(stats.latency.quantile(0.95), stats.latency_max),
+                    'max_ms': round(stats.latency_max * 1000, 1),
+                    'avg_bytes': int(stats.bytes_total / count) if count else 0,
+                    'max_bytes': stats.bytes_max,
+                    'sql_per_request': round(stats.sql_count / count, 1) if count else 0,
+                    'sql_max_per_request': stats.sql_max,
+                    'sql_ms_per_request': round(stats.sql_seconds / count * 1000, 1) if count else 0,
+                })
+            background = {
+                'sql_statements': self._background_sql_count,
+                'sql_ms': round(self._background_sql_seconds * 1000, 1)
+            }
+            started_at = self.started_at
+
+        routes.sort(key=lambda r: r['total_ms'], reverse=True)
+        return {
+            'since': started_at,
+            'uptime_seconds': int(time.time() - started_at),
+            'total_requests': sum(r['requests'] for r in routes),
+            'routes': routes[:top],
+            'route_count': len(routes),
+            'background': background
+        }
+
+    def render_prometheus(self) -> str:
+        """Formato de exposição texto do Prometheus (0.0.4)"""
+        lines = [
+            '# HELP enviafolha_http_requests_total Requisições HTTP por rota e status',
+            '# TYPE enviafolha_http_requests_total counter',
+        ]
+        with self._lock:
+            items = sorted(self._routes.items())
+            for (method, route), stats in items:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'enviafolha_http_requests_total{_labels(method, route, status=status)} {count}')
+
+            lines += [
+                '# HELP enviafolha_http_request_duration_seconds Latência das requisições HTTP',
+                '# TYPE enviafolha_http_request_duration_seconds histogram',
+            ]
+            for (method, route), stats in items:
+                _histogram_lines(lines, 'enviafolha_http_request_duration_seconds', method, route, stats.latency)
+
+            lines += [
+                '# HELP enviafolha_http_response_bytes_total Bytes enviados nas respostas',
+                '# TYPE enviafolha_http_response_bytes_total counter',
+            ]
+            for (method, route), stats in items:
+                lines.append(f'enviafolha_http_response_bytes_total{_labels(method, route)} {stats.bytes_total}')
+
+            lines += [
+                '# HELP enviafolha_http_request_sql_statements Comandos SQL por requisição',
+                '# TYPE enviafolha_http_request_sql_statements histogram',
+            ]
+            for (method, route), stats in items:
+                _histogram_lines(lines, 'enviafolha_http_request_sql_statements', method, route, stats.sql_per_request)
+
+            lines += [
+                '# HELP enviafolha_http_request_sql_seconds_total Tempo em SQL durante requisições',
+                '# TYPE enviafolha_http_request_sql_seconds_total counter',
+            ]
+            for (method, route), stats in items:
+                lines.append(f'enviafolha_http_request_sql_seconds_total{_labels(method, route)} {stats.sql_seconds:.6f}')
+
+            lines += [
+                '# HELP enviafolha_background_sql_statements_total Comandos SQL fora de requisições',
+                '# TYPE enviafolha_background_sql_statements_total counter',
+                f'enviafolha_background_sql_statements_total {self._background_sql_count}',
+                '# HELP enviafolha_background_sql_seconds_total Tempo em SQL fora de requisições',
+                '# TYPE enviafolha_background_sql_seconds_total counter',
+                f'enviafolha_background_sql_seconds_total {self._background_sql_seconds:.6f}',
+            ]
+
+        lines += _pool_lines()
+        return '\n'.join(lines) + '\n'
+
+
+def _ms(seconds: Optional[float], ceiling: float) -> Optional[float]:
+    # Interpolação no bucket não passa do máximo observado
+    return round(min(seconds, ceiling) * 1000, 1) if seconds is not None else None
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(method: str, route: str, **extra) -> str:
+    pairs = [('method', method), ('route', route)] + list(extra.items())
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _histogram_lines(lines: List[str], name: str, method: str, route: str, histogram: _Histogram):
+    for bound, cumulative in histogram.cumulative():
+        lines.append(f'{name}_bucket{_labels(method, route, le=bound)} {cumulative}')
+    lines.append(f'{name}_sum{_labels(method, route)} {histogram.total:.6f}')
+    lines.append(f'{name}_count{_labels(method, route)} {histogram.count}')
+
+
+def _pool_lines() -> List[str]:
+    """Gauges do pool de conexões (quando o engine compartilhado existe)"""
+    try:
+        from app.core import db_engine
+        if db_engine._engine is None:
+            return []
+        stats = db_engine.pool_stats()
+    except Exception:
+        return []
+    lines = []
+    for key in ('checked_out', 'peak_checked_out', 'pool_size', 'pool_checkedin', 'pool_overflow', 'max_connections'):
+        if key in stats:
+            lines.append(f'# TYPE enviafolha_db_{key} gauge')
+            lines.append(f'enviafolha_db_{key} {stats[key]}')
+    for key in ('connects', 'checkouts', 'invalidations'):
+        if key in stats:
+            lines.append(f'# TYPE enviafolha_db_{key}_total counter')
+            lines.append(f'enviafolha_db_{key}_total {stats[key]}')
+    return lines
+
+
+def instrument_engine(engine):
+    """Conta comandos SQL e o tempo de cada um (atribuídos à requisição da thread atual)"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('metrics_query_start')
+        if starts:
+            get_metrics().record_sql(time.perf_counter() - starts.pop())
+
+
+class CountingWriter:
+    """Envolve o wfile do handler contando os bytes escritos na resposta"""
+
+    def __init__(self, raw, context: RequestContext):
+        self.raw = raw
+        self._context = context
+
+    def write(self, data):
+        self._context.bytes_sent += len(data)
+        return self.raw.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+# Instância global (singleton)
+_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    return _metrics
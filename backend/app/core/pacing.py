@@ -0,0 +1,93 @@
+"""
+Ritmo dos envios (delays anti-softban)
+As esperas do pipeline de envio (entre mensagens, pausas estratégicas,
+retries/429 da Evolution API e espera por reconexão) passam por aqui para
+poderem ser escaladas em benchmarks contra o simulador local.
+
+SEND_DELAY_SCALE=1 (padrão, produção) mantém os tempos originais;
+SEND_DELAY_SCALE=0.01 reduz todas as esperas 100x.
+"""
+import os
+import threading
+import time
+
+
+def _env_scale() -> float:
+    try:
+        return max(0.0, float(os.getenv('SEND_DELAY_SCALE', '1')))
+    except ValueError:
+        return 1.0
+
+
+_scale = _env_scale()
+_paused_lock = threading.Lock()
+_paused_seconds = 0.0
+_nominal_seconds = 0.0
+_marks = {}
+if _scale != 1.0:
+    print(f"⚠️ SEND_DELAY_SCALE={_scale:g}: delays anti-softban escalados (não usar em produção)")
+
+
+def delay_scale() -> float:
+    return _scale
+
+
+def set_delay_scale(scale: float):
+    """Altera a escala em tempo de execução (benchmarks)"""
+    global _scale
+    _scale = max(0.0, float(scale))
+
+
+def scaled(seconds: float) -> float:
+    """Duração real de uma espera nominal de `seconds`"""
+    return seconds * _scale
+
+
+def pause(seconds: float):
+    """Dorme a espera nominal `seconds` ajustada pela escala"""
+    global _paused_seconds, _nominal_seconds
+    if seconds <= 0:
+        return
+    real = scaled(seconds)
+    if real > 0:
+        time.sleep(real)
+    with _paused_lock:
+        _paused_seconds += real
+        _nominal_seconds += seconds
+
+
+def _nominal_extra() -> float:
+    """Quanto as esperas nominais excedem as reais (0 em produção)"""
+    with _paused_lock:
+        return _nominal_seconds - _paused_seconds
+
+
+def mark(key: str):
+    """Registra um envio por `key` (instância) para cooldown()"""
+    _marks[key] = _nominal_extra()
+
+
+def cooldown(key: str, elapsed: float, minimum: float) -> float:
+    """
+    Aguarda o que falta para `minimum` segundos nominais desde o último envio por `key`.
+
+    `elapsed` é o tempo real medido desde esse envio; as esperas feitas no
+    intervalo contam pelo valor nominal, então com a escala reduzida o cooldown
+    continua sendo contabilizado em nominal_seconds(). Retorna a espera nominal.
+    """
+    nominal_elapsed = elapsed + _nominal_extra() - _marks.get(key, _nominal_extra())
+    remaining = minimum - nominal_elapsed
+    pause(remaining)
+    return max(remaining, 0.0)
+
+
+def paused_seconds() -> float:
+    """Tempo real gasto em esperas do pipeline de envio desde o início do processo"""
+    with _paused_lock:
+        return _paused_seconds
+
+
+def nominal_seconds() -> float:
+    """Tempo que as mesmas esperas levariam sem escala (projeção para produção)"""
+    with _paused_lock:
+        return _nominal_seconds
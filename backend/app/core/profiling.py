@@ -0,0 +1,281 @@
+"""
+Profiling sob demanda (administradores)
+Profiler por amostragem (biblioteca padrão, via sys._current_frames) que pode
+ser armado para as próximas N requisições de uma rota ou apontado para uma
+thread em execução (ex.: envio em lote "bulk-send-<job_id>"). Cada perfil é
+gravado em PROFILES_DIR como pilhas colapsadas (.folded — flamegraph.pl,
+speedscope) mais um resumo .json com as funções mais quentes.
+
+Variáveis de ambiente:
+    PROFILES_DIR=profiles
+    PROFILE_SAMPLE_INTERVAL_MS=5
+    PROFILE_MAX_SECONDS=300    limite para perfis de threads em background
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+_BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PROFILE_NAME = re.compile(r'^[\w.-]+$')
+_MAX_DEPTH = 128
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_BACKEND_ROOT):
+        filename = os.path.relpath(filename, _BACKEND_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    """Pilha raiz→folha no formato colapsado (funções separadas por ';')"""
+    labels = []
+    while frame is not None and len(labels) < _MAX_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Amostra periodicamente a pilha de uma thread"""
+
+    def __init__(self, thread_id: int, interval: Optional[float] = None):
+        self.thread_id = thread_id
+        self.interval = interval or _env_float('PROFILE_SAMPLE_INTERVAL_MS', 5) / 1000
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+
+    def start(self) -> 'SamplingProfiler':
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break  # thread alvo terminou
+            self.stacks[_collapse(frame)] += 1
+            self.samples += 1
+        self.duration = time.perf_counter() - self._started
+
+    def wait(self, timeout: float):
+        """Bloqueia até a thread alvo terminar ou o tempo acabar"""
+        self._thread.join(timeout)
+
+    def stop(self) -> 'SamplingProfiler':
+        self._stop.set()
+        self._thread.join(timeout=2)
+        return self
+
+    def hottest(self, limit: int = 25) -> List[Dict[str, Any]]:
+        """Funções por amostras próprias (folha) e inclusivas"""
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for label in set(frames):
+                inclusive[label] += count
+        total = self.samples or 1
+        return [{
+            'function': label,
+            'self_samples': count,
+            'self_pct': round(count * 100 / total, 1),
+            'total_pct': round(inclusive[label] * 100 / total, 1)
+        } for label, count in own.most_common(limit)]
+
+
+class ProfileManager:
+    """Rotas armadas, perfis de threads em andamento e perfis gravados em disco"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv('PROFILES_DIR', 'profiles')
+        self.max_seconds = _env_float('PROFILE_MAX_SECONDS', 300)
+        self._lock = threading.Lock()
+        self._armed: Dict[tuple, Dict[str, Any]] = {}
+        self._running: Dict[int, Dict[str, Any]] = {}
+
+    # ------------------------------------------------------------ requisições
+
+    def arm_route(self, method: str, route: str, count: int, requested_by: str) -> Dict[str, Any]:
+        """Perfila as próximas `count` requisições de (método, padrão da rota)"""
+        entry = {
+            'method': method,
+            'route': route,
+            'remaining': max(1, min(count, 50)),
+            'requested_by': requested_by,
+            'armed_at': datetime.now().isoformat()
+        }
+        with self._lock:
+            self._armed[(method, route)] = entry
+        print(f"🔬 Profiling armado: {method} {route} (próximas {entry['remaining']} requisições, por {requested_by})")
+        return dict(entry)
+
+    def disarm_route(self, method: str, route: str) -> bool:
+        with self._lock:
+            return self._armed.pop((method, route), None) is not None
+
+    def request_started(self, method: str, route: Optional[str]) -> Optional[SamplingProfiler]:
+        """Inicia o profiler se a rota estiver armada (custo zero quando nada está armado)"""
+        if not self._armed or route is None:
+            return None
+        with self._lock:
+            entry = self._armed.get((method, route))
+            if entry is None:
+                return None
+            entry['remaining'] -= 1
+            if entry['remaining'] <= 0:
+                del self._armed[(method, route)]
+        return SamplingProfiler(threading.get_ident()).start()
+
+    def request_finished(self, profiler: SamplingProfiler, method: str, route: str, status: Optional[int]):
+        profiler.stop()
+        self._save(profiler, kind='request', target=f"{method} {route}", extra={'status': status})
+
+    # --------------------------------------------------------------- threads
+
+    def profile_thread(self, thread_name: str, seconds: float, requested_by: str) -> Dict[str, Any]:
+        """
+        Perfila uma thread em execução por até `seconds` (ou até ela terminar).
+        O perfil é gravado em background; ValueError se a thread não existe.
+        """
+        target = next((t for t in threading.enumerate()
+                       if t.name == thread_name and t.is_alive()), None)
+        if target is None:
+            raise ValueError(f"Thread não encontrada: {thread_name}")
+        seconds = max(1.0, min(float(seconds), self.max_seconds))
+
+        with self._lock:
+            if target.ident in self._running:
+                raise ValueError(f"Thread já está sendo perfilada: {thread_name}")
+            profiler = SamplingProfiler(target.ident).start()
+            self._running[target.ident] = {
+                'thread': thread_name,
+                'seconds': seconds,
+                'requested_by': requested_by,
+                'started_at': profiler.started_at.isoformat()
+            }
+
+        def _finish():
+            profiler.wait(seconds)
+            profiler.stop()
+            with self._lock:
+                self._running.pop(target.ident, None)
+            self._save(profiler, kind='thread', target=thread_name, extra={'requested_by': requested_by})
+
+        threading.Thread(target=_finish, name='profile-finisher', daemon=True).start()
+        print(f"🔬 Profiling da thread {thread_name} por até {seconds:g}s (por {requested_by})")
+        return {'thread': thread_name, 'seconds': seconds}
+
+    def profilable_threads(self) -> List[Dict[str, Any]]:
+        """Threads em execução que podem ser perfiladas (exceto as do próprio profiler)"""
+        with self._lock:
+            running = {info['thread'] for info in self._running.values()}
+        return [{
+            'name': thread.name,
+            'daemon': thread.daemon,
+            'profiling': thread.name in running
+        } for thread in threading.enumerate()
+            if thread.is_alive() and not thread.name.startswith('profile-')]
+
+    # ----------------------------------------------------------------- disco
+
+    def _save(self, profiler: SamplingProfiler, kind: str, target: str, extra: Dict[str, Any]):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            slug = re.sub(r'[^\w]+', '-', target).strip('-')[:60] or kind
+            name = f"{profiler.started_at:%Y%m%d-%H%M%S-%f}-{kind}-{slug}"
+            with open(os.path.join(self.directory, f"{name}.folded"), 'w', encoding='utf-8') as handle:
+                for stack, count in profiler.stacks.most_common():
+                    handle.write(f"{stack} {count}\n")
+            summary = {
+                'name': name,
+                'kind': kind,
+                'target': target,
+                'started_at': profiler.started_at.isoformat(),
+                'duration_ms': round(profiler.duration * 1000, 1),
+                'samples': profiler.samples,
+                'interval_ms': round(profiler.interval * 1000, 2),
+                'hottest': profiler.hottest(),
+                **extra
+            }
+            with open(os.path.join(self.directory, f"{name}.json"), 'w', encoding='utf-8') as handle:
+                json.dump(summary, handle, ensure_ascii=False, indent=2)
+            print(f"🔬 Perfil gravado: {name} ({profiler.samples} amostras, {summary['duration_ms']} ms)")
+        except Exception as e:
+            print(f"⚠️ Falha ao gravar perfil de {target}: {e}")
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Resumos dos perfis gravados (mais recentes primeiro, sem a lista de funções)"""
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for filename in sorted(os.listdir(self.directory), reverse=True):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename), encoding='utf-8') as handle:
+                    summary = json.load(handle)
+            except (OSError, ValueError):
+                continue
+            summary.pop('hottest', None)
+            profiles.append(summary)
+        return profiles
+
+    def profile_path(self, name: str, extension: str = 'folded') -> Optional[str]:
+        """Caminho de um perfil gravado (None se o nome é inválido ou não existe)"""
+        if not _PROFILE_NAME.match(name or '') or extension not in ('folded', 'json'):
+            return None
+        path = os.path.join(self.directory, f"{name}.{extension}")
+        return path if os.path.isfile(path) else None
+
+    def delete_profile(self, name: str) -> bool:
+        removed = False
+        for extension in ('folded', 'json'):
+            path = self.profile_path(name, extension)
+            if path:
+                os.remove(path)
+                removed = True
+        return removed
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'armed_routes': [dict(entry) for entry in self._armed.values()],
+                'running': list(self._running.values())
+            }
+
+
+# Instância global (singleton)
+_manager = None
+
+
+def get_profile_manager() -> ProfileManager:
+    global _manager
+    if _manager is None:
+        _manager = ProfileManager()
+    return _manager
@@ -0,0 +1,229 @@
+"""
+Detector de N+1 e consultas lentas (desenvolvimento / homologação)
+Opcional: agrupa os comandos SQL de cada requisição por "forma" (texto com
+literais e listas IN normalizados) e sinaliza formas repetidas acima do
+limite — o padrão N+1 de loops que consultam linha a linha. Consultas
+acima do tempo limite são registradas com o handler/linha de origem.
+O relatório acumulado por endpoint fica em /api/v1/system/query-report.
+
+Variáveis de ambiente:
+    QUERY_DETECTOR_ENABLED=true          (padrão false)
+    QUERY_DETECTOR_REPEAT_THRESHOLD=10   repetições da mesma forma por requisição
+    QUERY_DETECTOR_SLOW_MS=250           consulta lenta (ms)
+"""
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+_BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_THIS_FILE = os.path.abspath(__file__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*,?)+\)", re.IGNORECASE)
+_VALUES_ROWS = re.compile(r"(VALUES\s*\([^)]*\))(?:\s*,\s*\([^)]*\))+", re.IGNORECASE)
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+")
+_WHITESPACE = re.compile(r"\s+")
+
+# Cache de fingerprints (o mesmo texto de SQL se repete muito)
+_FINGERPRINT_CACHE_SIZE = 2048
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def fingerprint(statement: str) -> str:
+    """Forma da consulta: literais e parâmetros viram '?', listas IN/VALUES colapsadas"""
+    shape = _STRING_LITERAL.sub('?', statement)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _PLACEHOLDER.sub('?', shape)
+    shape = _IN_LIST.sub('IN (?...)', shape)
+    shape = _VALUES_ROWS.sub(r'\1, ...', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+def _origin() -> str:
+    """Primeiro frame do projeto (fora do SQLAlchemy e deste módulo) que disparou a consulta"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if (filename.startswith(_BACKEND_ROOT) and filename != _THIS_FILE
+                and 'site-packages' not in filename):
+            relative = os.path.relpath(filename, _BACKEND_ROOT)
+            return f"{relative}:{frame.f_lineno} em {frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'desconhecida'
+
+
+class _RequestQueries:
+    """Comandos da requisição em andamento, agrupados por forma"""
+
+    __slots__ = ('method', 'route', 'shapes', 'statements')
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        self.shapes: Dict[str, Dict[str, Any]] = {}
+        self.statements = 0
+
+
+class QueryDetector:
+    """Detector de formas repetidas (N+1) e consultas lentas por requisição"""
+
+    def __init__(self):
+        self.enabled = os.getenv('QUERY_DETECTOR_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+        self.repeat_threshold = _env_int('QUERY_DETECTOR_REPEAT_THRESHOLD', 10)
+        self.slow_ms = _env_int('QUERY_DETECTOR_SLOW_MS', 250)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._fingerprints: Dict[str, str] = {}
+        self._endpoints: Dict[tuple, Dict[str, Any]] = {}
+        self._slow_queries = deque(maxlen=100)
+
+    # --------------------------------------------------------------- coleta
+
+    def begin(self, method: str, route: Optional[str]):
+        self._local.request = _RequestQueries(method, route or 'unmatched')
+
+    def end(self):
+        """Fecha a requisição: sinaliza formas repetidas e acumula no relatório do endpoint"""
+        request = getattr(self._local, 'request', None)
+        self._local.request = None
+        if request is None:
+            return
+
+        flagged = {shape: info for shape, info in request.shapes.items()
+                   if info['count'] >= self.repeat_threshold}
+        for shape, info in flagged.items():
+            print(f"🔁 N+1 suspeito em {request.method} {request.route}: {info['count']}x "
+                  f"({info['seconds'] * 1000:.0f} ms) {shape[:160]} — origem {info['origin']}")
+
+        with self._lock:
+            endpoint = self._endpoints.setdefault((request.method, request.route), {
+                'requests': 0, 'flagged_requests': 0, 'max_statements': 0, 'patterns': {}
+            })
+            endpoint['requests'] += 1
+            endpoint['max_statements'] = max(endpoint['max_statements'], request.statements)
+            if flagged:
+                endpoint['flagged_requests'] += 1
+            for shape, info in flagged.items():
+                pattern = endpoint['patterns'].setdefault(shape, {
+                    'flagged_requests': 0, 'max_per_request': 0, 'total': 0,
+                    'total_ms': 0.0, 'origin': info['origin']
+                })
+                pattern['flagged_requests'] += 1
+                pattern['max_per_request'] = max(pattern['max_per_request'], info['count'])
+                pattern['total'] += info['count']
+                pattern['total_ms'] += info['seconds'] * 1000
+
+    def record(self, statement: str, seconds: float):
+        request = getattr(self._local, 'request', None)
+        shape = self._fingerprint(statement)
+        origin = None
+
+        if request is not None:
+            request.statements += 1
+            info = request.shapes.get(shape)
+            if info is None:
+                origin = _origin()
+                request.shapes[shape] = {'count': 1, 'seconds': seconds, 'origin': origin}
+            else:
+                info['count'] += 1
+                info['seconds'] += seconds
+
+        elapsed_ms = seconds * 1000
+        if elapsed_ms >= self.slow_ms:
+            origin = origin or _origin()
+            where = f"{request.method} {request.route}" if request else 'background'
+            print(f"🐢 Consulta lenta ({elapsed_ms:.0f} ms) em {where}: {shape[:160]} — origem {origin}")
+            with self._lock:
+                self._slow_queries.append({
+                    'at': datetime.now().isoformat(),
+                    'endpoint': where,
+                    'ms': round(elapsed_ms, 1),
+                    'fingerprint': shape,
+                    'origin': origin
+                })
+
+    def _fingerprint(self, statement: str) -> str:
+        shape = self._fingerprints.get(statement)
+        if shape is None:
+            shape = fingerprint(statement)
+            if len(self._fingerprints) >= _FINGERPRINT_CACHE_SIZE:
+                self._fingerprints.clear()
+            self._fingerprints[statement] = shape
+        return shape
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._slow_queries.clear()
+
+    # -------------------------------------------------------------- relatório
+
+    def report(self) -> Dict[str, Any]:
+        """Endpoints com formas repetidas (piores primeiro) e as consultas lentas recentes"""
+        with self._lock:
+            endpoints = []
+            for (method, route), endpoint in self._endpoints.items():
+                if not endpoint['patterns']:
+                    continue
+                patterns = sorted(
+                    ({'fingerprint': shape, **{k: (round(v, 1) if k == 'total_ms' else v)
+                                               for k, v in pattern.items()}}
+                     for shape, pattern in endpoint['patterns'].items()),
+                    key=lambda p: p['max_per_request'], reverse=True
+                )
+                endpoints.append({
+                    'method': method,
+                    'route': route,
+                    'requests': endpoint['requests'],
+                    'flagged_requests': endpoint['flagged_requests'],
+                    'max_statements': endpoint['max_statements'],
+                    'patterns': patterns
+                })
+            slow_queries = list(self._slow_queries)
+
+        endpoints.sort(key=lambda e: e['patterns'][0]['max_per_request'], reverse=True)
+        return {
+            'enabled': self.enabled,
+            'repeat_threshold': self.repeat_threshold,
+            'slow_query_ms': self.slow_ms,
+            'endpoints': endpoints,
+            'slow_queries': slow_queries[::-1]
+        }
+
+
+def instrument_engine(engine, detector: 'QueryDetector'):
+    """Registra o detector nos eventos de cursor do engine"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('detector_query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('detector_query_start')
+        if starts:
+            detector.record(statement, time.perf_counter() - starts.pop())
+
+
+# Instância global (singleton)
+_detector = None
+
+
+def get_query_detector() -> QueryDetector:
+    global _detector
+    if _detector is None:
+        _detector = QueryDetector()
+    return _detector
@@ -0,0 +1,229 @@
+"""
+Tabela de rotas compilada para o servidor HTTP (http.server)
+Cada rota associa método + padrão de caminho a um handler. Caminhos sem
+parâmetros são resolvidos por um único acesso a dicionário; os demais
+percorrem uma árvore de segmentos (custo proporcional à profundidade do
+caminho, não ao número de rotas cadastradas).
+
+Padrões:
+    /api/v1/employees/{employee_id}               -> str
+    /api/v1/users/{user_id:int}                   -> int (segmento só com dígitos)
+    /api/v1/employees/{employee_id}/leaves/{leave_id:int}
+"""
+import importlib
+import urllib.parse
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class RouteParamError(ValueError):
+    """Parâmetro de query string com valor inválido para o tipo esperado"""
+
+
+def _convert_int(value: str):
+    return int(value) if value.isdigit() else None
+
+
+def _convert_str(value: str):
+    return value or None
+
+
+CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    'str': _convert_str,
+    'int': _convert_int,
+}
+
+
+class RouterTarget:
+    """
+    Método de um router modular (app/routes), importado apenas na primeira
+    requisição que o utiliza e reaproveitado nas seguintes
+    """
+
+    def __init__(self, module: str, class_name: str, method: str):
+        self.module = module
+        self.class_name = class_name
+        self.method = method
+        self._router_class = None
+
+    def __call__(self, handler, **kwargs):
+        if self._router_class is None:
+            self._router_class = getattr(importlib.import_module(self.module), self.class_name)
+        return getattr(self._router_class(handler), self.method)(**kwargs)
+
+    def __repr__(self):
+        return f"{self.class_name}.{self.method}"
+
+
+def mount(module: str, class_name: str, method: str) -> RouterTarget:
+    """Atalho para registrar um método de router modular na tabela"""
+    return RouterTarget(module, class_name, method)
+
+
+class Route:
+    """Rota compilada: alvo + parâmetros de caminho e de query string"""
+
+    __slots__ = ('method', 'pattern', 'target', 'query')
+
+    def __init__(self, method: str, pattern: str, target, query: Optional[Dict[str, Any]] = None):
+        self.method = method
+        self.pattern = pattern
+        self.target = target
+        # nome -> valor padrão (o tipo do padrão define a conversão)
+        self.query = query or {}
+
+    def query_args(self, query_string: str) -> Dict[str, Any]:
+        if not self.query:
+            return {}
+        values = urllib.parse.parse_qs(query_string)
+        args = {}
+        for name, default in self.query.items():
+            raw = values.get(name)
+            if not raw:
+                args[name] = default
+                continue
+            try:
+                args[name] = type(default)(raw[0]) if default is not None else raw[0]
+            except (TypeError, ValueError):
+                raise RouteParamError(f"Parâmetro inválido: {name}")
+        return args
+
+    def invoke(self, handler, params: Dict[str, Any], query_string: str = ''):
+        kwargs = dict(params)
+        kwargs.update(self.query_args(query_string))
+        if isinstance(self.target, str):
+            return getattr(handler, self.target)(**kwargs)
+        return self.target(handler, **kwargs)
+
+    def __repr__(self):
+        return f"<Route {self.method} {self.pattern} -> {self.target!r}>"
+
+
+class _Node:
+    __slots__ = ('literals', 'params', 'routes')
+
+    def __init__(self):
+        self.literals: Dict[str, '_Node'] = {}
+        self.params: List[Tuple[str, Callable[[str], Any], '_Node']] = []
+        self.routes: Dict[str, Route] = {}
+
+
+def _split(path: str) -> List[str]:
+    return path.strip('/').split('/') if path.strip('/') else []
+
+
+class RouteTable:
+    """Tabela método + caminho -> rota, montada uma vez na inicialização"""
+
+    def __init__(self):
+        self._static: Dict[Tuple[str, str], Route] = {}
+        self._root = _Node()
+        self._count = 0
+
+    def add(self, method: str, pattern: str, target, query: Optional[Dict[str, Any]] = None) -> Route:
+        """
+        Registra uma rota.
+
+        Args:
+            method: GET, POST, PUT, DELETE, PATCH
+            pattern: caminho com parâmetros opcionais ({nome} ou {nome:int})
+            target: nome do método do handler ou mount(...) de um router modular
+            query: parâmetros da query string repassados ao alvo (nome -> padrão)
+        """
+        method = method.upper()
+        route = Route(method, pattern, target, query)
+        segments = _split(pattern)
+
+        if not any(s.startswith('{') for s in segments):
+            key = (method, '/' + '/'.join(segments))
+            if key in self._static:
+                raise ValueError(f"Rota duplicada: {method} {pattern}")
+            self._static[key] = route
+            self._count += 1
+            return route
+
+        node = self._root
+        for segment in segments:
+            if segment.startswith('{') and segment.endswith('}'):
+                name, _, kind = segment[1:-1].partition(':')
+                converter = CONVERTERS[kind or 'str']
+                for param_name, param_converter, child in node.params:
+                    if param_name == name and param_converter is converter:
+                        node = child
+                        break
+                else:
+                    child = _Node()
+                    node.params.append((name, converter, child))
+                    node = child
+            else:
+                node = node.literals.setdefault(segment, _Node())
+
+        if method in node.routes:
+            raise ValueError(f"Rota duplicada: {method} {pattern}")
+        node.routes[method] = route
+        self._count += 1
+        return route
+
+    def get(self, pattern, target, query=None):
+        return self.add('GET', pattern, target, query)
+
+    def post(self, pattern, target, query=None):
+        return self.add('POST', pattern, target, query)
+
+    def put(self, pattern, target, query=None):
+        return self.add('PUT', pattern, target, query)
+
+    def delete(self, pattern, target, query=None):
+        return self.add('DELETE', pattern, target, query)
+
+    def patch(self, pattern, target, query=None):
+        return self.add('PATCH', pattern, target, query)
+
+    def match(self, method: str, path: str) -> Optional[Tuple[Route, Dict[str, Any]]]:
+        """Retorna (rota, parâmetros do caminho) ou None se nada casar"""
+        segments = _split(path)
+        route = self._static.get((method, '/' + '/'.join(segments)))
+        if route is not None:
+            return route, {}
+
+        params: Dict[str, Any] = {}
+        route = self._walk(self._root, segments, 0, method, params)
+        if route is None:
+            return None
+        return route, params
+
+    def _walk(self, node: _Node, segments: List[str], index: int, method: str, params: Dict[str, Any]) -> Optional[Route]:
+        if index == len(segments):
+            return node.routes.get(method)
+
+        segment = segments[index]
+        # Segmentos literais têm prioridade sobre parâmetros
+        child = node.literals.get(segment)
+        if child is not None:
+            route = self._walk(child, segments, index + 1, method, params)
+            if route is not None:
+                return route
+
+        for name, converter, child in node.params:
+            value = converter(urllib.parse.unquote(segment))
+            if value is None:
+                continue
+            params[name] = value
+            route = self._walk(child, segments, index + 1, method, params)
+            if route is not None:
+                return route
+            del params[name]
+        return None
+
+    def routes(self) -> List[Route]:
+        """Todas as rotas cadastradas (diagnóstico)"""
+        found = list(self._static.values())
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            found.extend(node.routes.values())
+            stack.extend(node.literals.values())
+            stack.extend(child for _, _, child in node.params)
+        return found
+
+    def __len__(self):
+        return self._count
@@ -0,0 +1,72 @@
+"""
+Senhas e tokens JWT - sem dependência do FastAPI
+Usado pelo servidor HTTP (main_legacy) e pelos modelos; app.core.auth reexporta
+estas funções junto com as dependências do FastAPI
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+from jose import JWTError, jwt
+import bcrypt
+from .config import settings
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verifica se a senha está correta"""
+    try:
+        # Truncar senha para 72 bytes (limite do bcrypt)
+        password_bytes = plain_password.encode('utf-8')
+        if len(password_bytes) > 72:
+            password_bytes = password_bytes[:72]
+        
+        # bcrypt.checkpw espera bytes
+        hash_bytes = hashed_password.encode('utf-8') if isinstance(hashed_password, str) else hashed_password
+        return bcrypt.checkpw(password_bytes, hash_bytes)
+    except Exception as e:
+        print(f"⚠️ Erro ao verificar senha: {e}")
+        return False
+
+def get_password_hash(password: str) -> str:
+    """Gera hash da senha (trunca para 72 bytes se necessário)"""
+    try:
+        # Truncar senha para 72 bytes (limite do bcrypt)
+        password_bytes = password.encode('utf-8')
+        if len(password_bytes) > 72:
+            password_bytes = password_bytes[:72]
+        
+        # Gerar hash com bcrypt
+        salt = bcrypt.gensalt()
+        hashed = bcrypt.hashpw(password_bytes, salt)
+        return hashed.decode('utf-8')
+    except Exception as e:
+        print(f"⚠️ Erro ao gerar hash: {e}")
+        raise ValueError(f"Erro ao gerar hash da senha: {str(e)}")
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    """Cria token JWT"""
+    to_encode = data.copy()
+    if expires_delta:
+        expire = datetime.utcnow() + expires_delta
+    else:
+        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    
+    to_encode.update({"exp": expire})
+    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return encoded_jwt
+
+def verify_token(token: str) -> Optional[dict]:
+    """Verifica e decodifica token JWT"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        return payload
+    except JWTError:
+        return None
+
+def decode_token(token: str) -> dict:
+    """
+    Decodifica token JWT e retorna payload
+    Alias para verify_token mas lança exceção se inválido
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        return payload
+    except JWTError as e:
+        raise ValueError(f"Token JWT inválido: {str(e)}")
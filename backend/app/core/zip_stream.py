@@ -0,0 +1,61 @@
+"""
+ZIP gerado em blocos, para respostas em streaming
+
+O zipfile escreve num destino sem seek (data descriptor após cada arquivo);
+os bytes produzidos são devolvidos assim que saem, então a memória fica
+limitada a um bloco de leitura, qualquer que seja o tamanho do lote.
+"""
+import zipfile
+from typing import Iterable, Iterator, Tuple
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkSink:
+    """Destino write-only do ZipFile: acumula até o próximo drain()"""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def iter_zip(files: Iterable[Tuple[str, str]], compression: int = zipfile.ZIP_STORED,
+             chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Blocos de um ZIP com os arquivos (caminho, nome no ZIP)
+
+    ZIP_STORED por padrão: PDFs já são comprimidos (e os holerites, criptografados),
+    recomprimir custa CPU sem reduzir o tamanho.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=compression) as archive:
+        for path, arcname in files:
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            info.compress_type = compression
+            with open(path, 'rb') as source, archive.open(info, 'w') as target:
+                while True:
+                    block = source.read(chunk_size)
+                    if not block:
+                        break
+                    target.write(block)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    # Diretório central
+    data = sink.drain()
+    if data:
+        yield data
@@ -44,7 +44,7 @@ class AuthHandler:
                 
                 if user and user.is_active and user.verify_password(password):
                     # Atualizar último acesso
-                    from app.core.auth import create_access_token
+                    from app.core.security import create_access_token
                     
                     brazil_tz = timezone(timedelta(hours=-3))
                     user.last_login = datetime.now(brazil_tz)
@@ -13,6 +13,8 @@ from .communication_send import CommunicationSend
 from .communication_recipient import CommunicationRecipient
 from .send_queue import SendQueue, SendQueueItem
 from .hr_indicators import HRIndicatorSnapshot
+from .cache_version import CacheVersion
+from .processed_payroll import ProcessedPayrollFile, ProcessedPayrollFolder
 
 # keep older payroll-related imports if they exist elsewhere; import safe names
 try:
@@ -49,7 +51,10 @@ __all__ = [
     "CommunicationRecipient",
     "SendQueue",
     "SendQueueItem",
-    "HRIndicatorSnapshot"
+    "HRIndicatorSnapshot",
+    "CacheVersion",
+    "ProcessedPayrollFile",
+    "ProcessedPayrollFolder"
     # "AuditLog",
     # "SystemSetting"
 ]
\ No newline at end of file
@@ -1,12 +1,17 @@
-from sqlalchemy import create_engine, Column, Integer, DateTime, String
+from sqlalchemy import Column, Integer, DateTime, String
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql import func
-from ..core.config import settings
+from ..core.db_engine import get_engine
 
-# Configuração específica para PostgreSQL
-engine = create_engine(settings.DATABASE_URL, echo=False)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Engine único do processo (pool compartilhado com main_legacy e workers)
+engine = get_engine()
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    expire_on_commit=False  # Evita queries extras depois do commit
+)
 
 Base = declarative_base()
 
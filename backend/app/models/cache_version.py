@@ -0,0 +1,22 @@
+"""Modelo de versões de cache compartilhadas entre processos"""
+from sqlalchemy import Column, String, BigInteger, DateTime, JSON
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class CacheVersion(Base):
+    """
+    Contador de versão por namespace de cache ('employees', 'indicators', ...).
+
+    Cada processo incrementa a versão ao alterar dados e acompanha as versões
+    dos demais para invalidar seus caches em memória.
+    """
+    __tablename__ = "cache_versions"
+
+    namespace = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    payload = Column(JSON, nullable=True)  # Escopo da última alteração (empresa, período, tipos)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<CacheVersion(namespace='{self.namespace}', version={self.version})>"
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .base import Base
 
 class CommunicationRecipient(Base):
     __tablename__ = "communication_recipients"
+    __table_args__ = (
+        # Feed de atividades recentes (keyset por sent_at, id) com e sem filtro de status
+        Index('ix_communication_recipients_sent_at_id', 'sent_at', 'id'),
+        Index('ix_communication_recipients_status_sent_at', 'status', 'sent_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     communication_send_id = Column(Integer, ForeignKey("communication_sends.id"), nullable=False)
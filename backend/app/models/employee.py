@@ -1,10 +1,20 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text, Date
+from sqlalchemy import Column, Integer, SmallInteger, String, Boolean, ForeignKey, Text, Date, Index, event
 from sqlalchemy.orm import relationship
 from .base import Base, TimestampMixin
 
 
+def month_day_key(value):
+    """Chave MMDD (15/03/1990 → 315) para buscas por dia do ano sem extract()"""
+    return value.month * 100 + value.day if value else None
+
+
 class Employee(Base, TimestampMixin):
     __tablename__ = "employees"
+    __table_args__ = (
+        # Aniversariantes (nascimento e empresa): range scan por MMDD entre os ativos
+        Index('ix_employees_active_birth_month_day', 'is_active', 'birth_month_day'),
+        Index('ix_employees_active_admission_month_day', 'is_active', 'admission_month_day'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     unique_id = Column(String(50), unique=True, index=True, nullable=False)
@@ -27,6 +37,9 @@ class Employee(Base, TimestampMixin):
     marital_status = Column(String(50), nullable=True)
     admission_date = Column(Date, nullable=True)
     contract_type = Column(String(50), nullable=True)
+    # MMDD de birth_date/admission_date, mantidos pelos eventos abaixo
+    birth_month_day = Column(SmallInteger, nullable=True)
+    admission_month_day = Column(SmallInteger, nullable=True)
     
     # Status detalhado
     employment_status = Column(String(50), nullable=True)  # Ativo, Afastado, Desligado, Férias
@@ -52,3 +65,11 @@ class Employee(Base, TimestampMixin):
 
     def __repr__(self):
         return f"<Employee(unique_id='{self.unique_id}', name='{self.name}')>"
+
+
+@event.listens_for(Employee, 'before_insert')
+@event.listens_for(Employee, 'before_update')
+def _sync_month_day_keys(mapper, connection, target):
+    """Recalcula as chaves MMDD a cada escrita pelo ORM"""
+    target.birth_month_day = month_day_key(target.birth_date)
+    target.admission_month_day = month_day_key(target.admission_date)
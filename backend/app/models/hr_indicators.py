@@ -1,5 +1,5 @@
 """Modelo para cache de indicadores de RH"""
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Date, Index
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Date, Index, UniqueConstraint
 from datetime import datetime
 from .base import Base, TimestampMixin
 
@@ -11,6 +11,9 @@ class HRIndicatorSnapshot(Base, TimestampMixin):
     """
     __tablename__ = "hr_indicator_snapshots"
     
+    # Um snapshot por tipo + período (alvo do upsert em HRIndicatorsService._save_to_cache)
+    PERIOD_CONSTRAINT = 'uq_hr_indicator_snapshots_type_period'
+    
     id = Column(Integer, primary_key=True, index=True)
     
     # Identificação do snapshot
@@ -31,6 +34,9 @@ class HRIndicatorSnapshot(Base, TimestampMixin):
     __table_args__ = (
         Index('idx_type_date', 'indicator_type', 'calculation_date'),
         Index('idx_type_period', 'indicator_type', 'period_start', 'period_end'),
+        # NULLS NOT DISTINCT (PostgreSQL 15+): snapshots sem período também são únicos por tipo
+        UniqueConstraint('indicator_type', 'period_start', 'period_end', name=PERIOD_CONSTRAINT,
+                         postgresql_nulls_not_distinct=True),
     )
     
     def __repr__(self):
@@ -1,3 +1,4 @@
+from datetime import datetime
 from sqlalchemy import Column, Integer, String, Date, DateTime, Float, ForeignKey
 from sqlalchemy.orm import relationship
 from app.models.base import Base
@@ -15,5 +16,6 @@ class LeaveRecord(Base):
     days = Column(Float, nullable=True)
     notes = Column(String, nullable=True)
     created_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True, onupdate=datetime.now)  # Versão dos relatórios (report_cache)
 
     employee = relationship('Employee', back_populates='leaves')
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .base import Base, TimestampMixin
 
 class PayrollSend(Base, TimestampMixin):
     __tablename__ = "payroll_sends"
+    __table_args__ = (
+        # Feed de atividades recentes (keyset por sent_at, id) com e sem filtro de status
+        Index('ix_payroll_sends_sent_at_id', 'sent_at', 'id'),
+        Index('ix_payroll_sends_status_sent_at', 'status', 'sent_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
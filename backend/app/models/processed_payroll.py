@@ -0,0 +1,46 @@
+"""Manifesto dos holerites individuais gerados (processed/ e pasta legada)"""
+from sqlalchemy import Column, Integer, String, BigInteger, DateTime, Index
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class ProcessedPayrollFile(Base):
+    """
+    Um PDF de holerite individual pronto para envio.
+
+    Gravado por quem gera os arquivos (PayrollFormatter, split_pdf_by_employee)
+    e reconciliado com o disco pelas pastas cujo mtime mudou, para que a
+    listagem não precise varrer e dar stat em todos os PDFs a cada requisição.
+    """
+    __tablename__ = "processed_payroll_files"
+    __table_args__ = (
+        # Listagem paginada (mais recentes primeiro), com e sem filtro de competência
+        Index('ix_processed_payroll_files_created', 'created_at', 'id'),
+        Index('ix_processed_payroll_files_month_created', 'month_year', 'created_at'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    path = Column(String(500), nullable=False, unique=True)
+    filename = Column(String(255), nullable=False)
+    folder = Column(String(255), nullable=False, index=True)  # Ex: Mensal_11_2025
+    unique_id = Column(String(20), nullable=False, index=True)  # Matrícula completa (005900169)
+    month_year = Column(String(20), nullable=False)  # YYYY-MM ou 'desconhecido'
+    payroll_type = Column(String(10), nullable=True)
+    size = Column(BigInteger, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)  # ctime do arquivo
+    employee_id = Column(Integer, nullable=True, index=True)  # Colaborador ativo associado (NULL = órfão)
+
+    def __repr__(self):
+        return f"<ProcessedPayrollFile(filename='{self.filename}', unique_id='{self.unique_id}')>"
+
+
+class ProcessedPayrollFolder(Base):
+    """mtime de cada pasta já reconciliada com o manifesto"""
+    __tablename__ = "processed_payroll_folders"
+
+    path = Column(String(500), primary_key=True)
+    mtime_ns = Column(BigInteger, nullable=False)
+    scanned_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<ProcessedPayrollFolder(path='{self.path}', mtime_ns={self.mtime_ns})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Index
 from sqlalchemy.sql import func
 from .base import Base
 import enum
@@ -29,6 +29,13 @@ class SystemLog(Base):
     Armazena eventos, erros, ações de usuários e atividades do sistema.
     """
     __tablename__ = "system_logs"
+    __table_args__ = (
+        # Paginação keyset (created_at, id) e filtros da tela de logs
+        Index('ix_system_logs_created_id', 'created_at', 'id'),
+        Index('ix_system_logs_level_created', 'level', 'created_at', 'id'),
+        Index('ix_system_logs_category_created', 'category', 'created_at', 'id'),
+        Index('ix_system_logs_user_created', 'user_id', 'created_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
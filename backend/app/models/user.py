@@ -26,7 +26,7 @@ class User(Base, TimestampMixin):
     
     def verify_password(self, password):
         """Verifica se a senha fornecida corresponde ao hash armazenado"""
-        from app.core.auth import verify_password
+        from app.core.security import verify_password
         return verify_password(password, self.password_hash)
     
     def can_access_page(self, page_name):
@@ -52,7 +52,7 @@ class User(Base, TimestampMixin):
     @staticmethod
     def hash_password(password):
         """Gera hash da senha"""
-        from app.core.auth import get_password_hash
+        from app.core.security import get_password_hash
         return get_password_hash(password)
     
     def __repr__(self):
@@ -37,7 +37,7 @@ class AuthRouter(BaseRouter):
                 try:
                     from app.models import User
                     from datetime import datetime, timezone, timedelta
-                    from app.core.auth import create_access_token
+                    from app.core.security import create_access_token
                     
                     db = SessionLocal()
                     user = db.query(User).filter(User.username == username).first()
@@ -16,17 +16,9 @@ class BaseRouter:
         self.handler = handler
     
     def send_json_response(self, data: Dict[str, Any], status_code: int = 200):
-        """Enviar resposta JSON"""
+        """Enviar resposta JSON (serialização, compressão e ETag aplicados pelo handler)"""
         try:
-            self.handler.send_response(status_code)
-            self.handler.send_header('Content-type', 'application/json')
-            self.handler.send_header('Access-Control-Allow-Origin', '*')
-            self.handler.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-            self.handler.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-            self.handler.end_headers()
-            
-            response = json.dumps(data, ensure_ascii=False, default=str)
-            self.handler.wfile.write(response.encode('utf-8'))
+            self.handler.send_json_response(data, status_code)
         except Exception as e:
             print(f"❌ Erro ao enviar resposta JSON: {e}")
     
@@ -4,17 +4,16 @@ Routes para relatórios e atividades recentes
 import json
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import desc, or_, func
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import or_, func
+from sqlalchemy.orm import Session
 
 from .base import BaseRouter
-from ..core.auth import get_current_user
 from ..models.employee import Employee
 from ..models.payroll_send import PayrollSend
-from ..models.communication_send import CommunicationSend
 from ..models.communication_recipient import CommunicationRecipient
 from ..models.user import User
 from ..models.base import get_db
+from ..services.send_activity import SendActivityFeed
 
 
 class ReportsRouter(BaseRouter):
@@ -31,7 +30,8 @@ class ReportsRouter(BaseRouter):
         GET /api/v1/reports/recent
         Retorna as últimas atividades de envio (holerites e comunicados)
         Query params:
-        - page: número da página (padrão: 1)
+        - cursor: cursor keyset retornado em pagination.next_cursor (próxima página)
+        - page: número da página (padrão: 1; sem cursor, usado como offset)
         - limit: número de resultados por página (padrão: 20, máximo: 100)
         - date_from: data inicial para filtro (formato: YYYY-MM-DD)
         - date_to: data final para filtro (formato: YYYY-MM-DD)
@@ -43,119 +43,42 @@ class ReportsRouter(BaseRouter):
             query_params = self.parse_query_params()
             page = max(int(query_params.get('page', ['1'])[0]), 1)
             limit = int(query_params.get('limit', ['20'])[0])
-            limit = min(limit, 100)  # Máximo 100 registros por página
+            limit = min(max(limit, 1), 100)  # Máximo 100 registros por página
+            cursor = query_params.get('cursor', [None])[0]
             
-            date_from = query_params.get('date_from', [None])[0]
-            date_to = query_params.get('date_to', [None])[0]
-            send_type = query_params.get('send_type', ['all'])[0]
-            status_filter = query_params.get('status', ['all'])[0]
+            filters = {
+                'date_from': query_params.get('date_from', [None])[0],
+                'date_to': query_params.get('date_to', [None])[0],
+                'send_type': query_params.get('send_type', ['all'])[0],
+                'status': query_params.get('status', ['all'])[0],
+            }
             
             db = next(get_db())
             
             try:
-                activities = []
-                
-                # Filtrar holerites se solicitado
-                if send_type in ['all', 'payrolls']:
-                    # Construir query para holerites
-                    payroll_query = db.query(PayrollSend).options(
-                        joinedload(PayrollSend.employee),
-                        joinedload(PayrollSend.user)
-                    ).filter(PayrollSend.sent_at.isnot(None))
-                    
-                    # Aplicar filtros de data
-                    if date_from:
-                        payroll_query = payroll_query.filter(
-                            func.date(PayrollSend.sent_at) >= date_from
-                        )
-                    if date_to:
-                        payroll_query = payroll_query.filter(
-                            func.date(PayrollSend.sent_at) <= date_to
-                        )
-                    
-                    # Aplicar filtro de status
-                    if status_filter == 'success':
-                        payroll_query = payroll_query.filter(PayrollSend.status == 'sent')
-                    elif status_filter == 'failed':
-                        payroll_query = payroll_query.filter(PayrollSend.status == 'failed')
-                    
-                    payroll_sends = payroll_query.order_by(desc(PayrollSend.sent_at)).all()
-                    
-                    # Adicionar holerites à lista
-                    for send in payroll_sends:
-                        activities.append({
-                            'id': f'payroll_{send.id}',
-                            'type': 'payroll',
-                            'employee_name': send.employee.name if send.employee else 'Desconhecido',
-                            'employee_id': send.employee_id,
-                            'sent_by_user': send.user.username if send.user else 'Sistema',
-                            'status': send.status,
-                            'sent_at': send.sent_at.isoformat() if send.sent_at else None,
-                            'month': send.month,
-                            'error_message': send.error_message
-                        })
-                
-                # Filtrar comunicados se solicitado
-                if send_type in ['all', 'communications']:
-                    # Construir query para comunicados
-                    comm_query = db.query(CommunicationRecipient).options(
-                        joinedload(CommunicationRecipient.employee),
-                        joinedload(CommunicationRecipient.communication_send).joinedload(CommunicationSend.user)
-                    ).filter(CommunicationRecipient.sent_at.isnot(None))
-                    
-                    # Aplicar filtros de data
-                    if date_from:
-                        comm_query = comm_query.filter(
-                            func.date(CommunicationRecipient.sent_at) >= date_from
-                        )
-                    if date_to:
-                        comm_query = comm_query.filter(
-                            func.date(CommunicationRecipient.sent_at) <= date_to
-                        )
-                    
-                    # Aplicar filtro de status
-                    if status_filter == 'success':
-                        comm_query = comm_query.filter(CommunicationRecipient.status == 'sent')
-                    elif status_filter == 'failed':
-                        comm_query = comm_query.filter(CommunicationRecipient.status == 'failed')
-                    
-                    communication_recipients = comm_query.order_by(desc(CommunicationRecipient.sent_at)).all()
-                    
-                    # Adicionar comunicados à lista
-                    for recipient in communication_recipients:
-                        activities.append({
-                            'id': f'communication_{recipient.id}',
-                            'type': 'communication',
-                            'employee_name': recipient.employee.name if recipient.employee else 'Desconhecido',
-                            'employee_id': recipient.employee_id,
-                            'sent_by_user': recipient.communication_send.user.username if recipient.communication_send and recipient.communication_send.user else 'Sistema',
-                            'status': recipient.status,
-                            'sent_at': recipient.sent_at.isoformat() if recipient.sent_at else None,
-                            'title': recipient.communication_send.title if recipient.communication_send else None,
-                            'error_message': recipient.error_message
-                        })
-                
-                # Ordenar por data de envio (mais recente primeiro)
-                activities.sort(key=lambda x: x['sent_at'] or '', reverse=True)
-                
-                # Calcular paginação
-                total = len(activities)
+                feed = SendActivityFeed(db)
+                # Com cursor: keyset; sem cursor: página por offset (compatibilidade)
+                result = feed.page(
+                    limit=limit,
+                    cursor=cursor,
+                    offset=0 if cursor else (page - 1) * limit,
+                    **filters
+                )
+                total, total_is_estimate = feed.count(**filters)
                 total_pages = (total + limit - 1) // limit  # Arredondar para cima
-                offset = (page - 1) * limit
-                
-                # Aplicar paginação
-                paginated_activities = activities[offset:offset + limit]
                 
                 # Retornar resposta com metadados de paginação
                 response = {
-                    'data': paginated_activities,
+                    'data': result['data'],
                     'pagination': {
                         'page': page,
                         'limit': limit,
                         'total': total,
+                        'total_is_estimate': total_is_estimate,
                         'total_pages': total_pages,
                         'has_prev': page > 1,
-                        'has_next': page < total_pages
+                        'has_next': result['has_more'],
+                        'next_cursor': result['next_cursor']
                     }
                 }
                 
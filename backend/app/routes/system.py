@@ -1,6 +1,7 @@
 """
 System Routes - Sistema, Health Checks e Logs
 """
+import hmac
 import os
 import urllib.parse
 from datetime import datetime
@@ -65,11 +66,14 @@ class SystemRouter(BaseRouter):
                     result = db.execute(text("SELECT version();"))
                     version = result.fetchone()[0]
                     
+                    from app.core.db_engine import pool_stats
+                    
                     self.send_json_response({
                         "connected": True,
                         "type": "PostgreSQL",
                         "version": version,
-                        "status": "online"
+                        "status": "online",
+                        "pool": pool_stats()
                     })
                 except Exception as e:
                     self.send_json_response({
@@ -264,7 +268,7 @@ class SystemRouter(BaseRouter):
         """
         GET /api/v1/system/logs
         Lista logs do sistema com filtros opcionais
-        Query params: level, category, user_id, limit, offset
+        Query params: level, category, user_id, limit, cursor
         """
         from main_legacy import SessionLocal
         
@@ -286,20 +290,35 @@ class SystemRouter(BaseRouter):
             level = query_params.get('level', [None])[0]
             category = query_params.get('category', [None])[0]
             user_id = query_params.get('user_id', [None])[0]
-            limit = int(query_params.get('limit', [100])[0])
-            offset = int(query_params.get('offset', [0])[0])
+            try:
+                limit = int(query_params.get('limit', [100])[0])
+            except ValueError:
+                self.send_json_response({"error": "limit deve ser um inteiro"}, 400)
+                return
+            limit = min(max(limit, 1), 500)  # Máximo 500 registros por página
+            cursor = query_params.get('cursor', [None])[0]
             
-            # Buscar logs usando a mesma sessão
+            # Buscar logs usando a mesma sessão (paginação keyset por cursor)
             logger = LoggingService(db)
-            logs_data = logger.get_logs(
-                level=level,
-                category=category,
-                user_id=int(user_id) if user_id else None,
-                limit=limit,
-                offset=offset
-            )
+            try:
+                page = logger.get_logs_page(
+                    level=level,
+                    category=category,
+                    user_id=int(user_id) if user_id else None,
+                    limit=limit,
+                    cursor=cursor
+                )
+            except ValueError as cursor_error:
+                self.send_json_response({"error": str(cursor_error)}, 400)
+                return
             
-            self.send_json_response(logs_data)
+            self.send_json_response({
+                "logs": page['logs'],
+                "count": len(page['logs']),  # Registros nesta página (não é o total)
+                "limit": limit,
+                "next_cursor": page['next_cursor'],
+                "has_more": page['has_more']
+            })
             
         except Exception as e:
             print(f"❌ Erro ao buscar logs: {e}")
@@ -310,3 +329,181 @@ class SystemRouter(BaseRouter):
             }, 500)
         finally:
             db.close()
+    
+    def handle_metrics(self):
+        """
+        GET /api/v1/system/metrics
+        Métricas por rota (latência, status, bytes, SQL) no formato texto do Prometheus
+        Opt-in: exige METRICS_PROMETHEUS_TOKEN e Authorization: Bearer <token>
+        """
+        from app.core.metrics import get_metrics, prometheus_token
+        
+        token = prometheus_token()
+        if not token:
+            self.send_json_response({"error": "Endpoint Prometheus desabilitado (METRICS_PROMETHEUS_TOKEN)"}, 404)
+            return
+        supplied = self.handler.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode('utf-8'), f"Bearer {token}".encode('utf-8')):
+            self.send_json_response({"error": "Token de métricas inválido"}, 401)
+            return
+        
+        body = get_metrics().render_prometheus().encode('utf-8')
+        self.handler.send_body(body, 'text/plain; version=0.0.4; charset=utf-8')
+    
+    def handle_metrics_summary(self, top=25):
+        """
+        GET /api/v1/system/metrics/summary
+        Resumo JSON das rotas mais custosas (tempo total), com p50/p95 e SQL por requisição
+        Query params: top
+        """
+        from main_legacy import SessionLocal
+        from app.core.metrics import get_metrics, metrics_enabled
+        
+        db = SessionLocal()
+        try:
+            authenticated_user = self.handler.get_authenticated_user(db)
+        finally:
+            db.close()
+        if not authenticated_user:
+            self.send_json_response({"error": "Usuário não autenticado"}, 401)
+            return
+        
+        summary = get_metrics().summary(top=max(1, min(top, 200)))
+        summary['enabled'] = metrics_enabled()
+        self.send_json_response(summary)
+    
+    def handle_query_report(self):
+        """
+        GET /api/v1/system/query-report
+        Relatório do detector de N+1 / consultas lentas (QUERY_DETECTOR_ENABLED)
+        Query params: reset=true zera o relatório após retorná-lo
+        """
+        from main_legacy import SessionLocal
+        from app.core.query_detector import get_query_detector
+        
+        db = SessionLocal()
+        try:
+            authenticated_user = self.handler.get_authenticated_user(db)
+        finally:
+            db.close()
+        if not authenticated_user:
+            self.send_json_response({"error": "Usuário não autenticado"}, 401)
+            return
+        
+        detector = get_query_detector()
+        report = detector.report()
+        query_params = urllib.parse.parse_qs(urllib.parse.urlparse(self.handler.path).query)
+        if query_params.get('reset', ['false'])[0].lower() == 'true':
+            detector.reset()
+        self.send_json_response(report)
+    
+    def _require_admin(self):
+        """Usuário autenticado e administrador; responde 401/403 e retorna None caso contrário"""
+        from main_legacy import SessionLocal
+        
+        db = SessionLocal()
+        try:
+            user = self.handler.get_authenticated_user(db)
+            if not user:
+                self.send_json_response({"error": "Autenticação necessária"}, 401)
+                return None
+            if not user.is_admin:
+                self.send_json_response({"error": "Apenas administradores podem gerenciar perfis"}, 403)
+                return None
+            return user
+        finally:
+            db.close()
+    
+    def handle_profiles_list(self):
+        """
+        GET /api/v1/system/profiles
+        Perfis gravados, rotas armadas, perfis em andamento e threads perfiláveis (admin)
+        """
+        from app.core.profiling import get_profile_manager
+        
+        if not self._require_admin():
+            return
+        manager = get_profile_manager()
+        self.send_json_response({
+            "profiles": manager.list_profiles(),
+            "threads": manager.profilable_threads(),
+            **manager.status()
+        })
+    
+    def handle_profiles_create(self):
+        """
+        POST /api/v1/system/profiles
+        Arma o profiling (admin):
+          {"method": "GET", "path": "/api/v1/...", "count": 3}  próximas N requisições da rota
+          {"thread": "bulk-send-<job_id>", "seconds": 60}       thread em execução
+        """
+        from app.core.profiling import get_profile_manager
+        
+        user = self._require_admin()
+        if not user:
+            return
+        data = self.get_request_data()
+        manager = get_profile_manager()
+        
+        try:
+            if data.get('thread'):
+                result = manager.profile_thread(data['thread'], float(data.get('seconds', 30)), user.username)
+                self.send_json_response({"success": True, **result})
+                return
+            
+            method = str(data.get('method', 'GET')).upper()
+            path = data.get('path') or data.get('route')
+            if not path:
+                self.send_json_response({"error": "Informe 'path' (rota) ou 'thread'"}, 400)
+                return
+            # Aceita tanto o caminho concreto quanto o padrão da rota
+            match = self.handler.ROUTES.match(method, urllib.parse.urlparse(path).path)
+            if match is None:
+                self.send_json_response({"error": f"Rota não encontrada: {method} {path}"}, 404)
+                return
+            entry = manager.arm_route(method, match[0].pattern, int(data.get('count', 1)), user.username)
+            self.send_json_response({"success": True, **entry})
+        except ValueError as e:
+            self.send_json_response({"error": str(e)}, 400)
+    
+    def handle_profile_download(self, name):
+        """
+        GET /api/v1/system/profiles/{name}
+        Baixa o perfil em pilhas colapsadas (.folded) ou o resumo (?format=json) (admin)
+        """
+        from app.core.profiling import get_profile_manager
+        
+        if not self._require_admin():
+            return
+        query_params = urllib.parse.parse_qs(urllib.parse.urlparse(self.handler.path).query)
+        extension = 'json' if query_params.get('format', ['folded'])[0] == 'json' else 'folded'
+        path = get_profile_manager().profile_path(name, extension)
+        if not path:
+            self.send_json_response({"error": "Perfil não encontrado"}, 404)
+            return
+        
+        with open(path, 'rb') as handle:
+            body = handle.read()
+        content_type = 'application/json' if extension == 'json' else 'text/plain; charset=utf-8'
+        self.handler.send_response(200)
+        self.handler.send_header('Content-Type', content_type)
+        self.handler.send_header('Content-Disposition', f'attachment; filename="{name}.{extension}"')
+        self.handler.send_header('Content-Length', str(len(body)))
+        self.handler.send_header('Access-Control-Allow-Origin', '*')
+        self.handler.send_header('Access-Control-Expose-Headers', 'Content-Disposition')
+        self.handler.end_headers()
+        self.handler.wfile.write(body)
+    
+    def handle_profile_delete(self, name):
+        """
+        DELETE /api/v1/system/profiles/{name}
+        Remove um perfil gravado (admin)
+        """
+        from app.core.profiling import get_profile_manager
+        
+        if not self._require_admin():
+            return
+        if get_profile_manager().delete_profile(name):
+            self.send_json_response({"success": True})
+        else:
+            self.send_json_response({"error": "Perfil não encontrado"}, 404)
@@ -0,0 +1,194 @@
+"""
+Cache de resolução do usuário autenticado
+Token JWT → snapshot do usuário/role por poucos segundos, para que endpoints
+consultados em polling autentiquem sem decodificar o token nem consultar o banco
+"""
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class RoleSnapshot:
+    """Cópia somente leitura do role (mesma interface de consulta do modelo Role)"""
+
+    def __init__(self, role):
+        self.id = role.id
+        self.name = role.name
+        self.description = role.description
+        self.is_active = role.is_active
+        self._allowed_pages = role.get_allowed_pages()
+
+    def get_allowed_pages(self) -> List[str]:
+        return list(self._allowed_pages)
+
+    def can_access_page(self, page_name: str) -> bool:
+        return page_name in self._allowed_pages or 'all' in self._allowed_pages
+
+    def __repr__(self):
+        return f"<Role(name='{self.name}')>"
+
+
+class AuthenticatedUser:
+    """
+    Snapshot do usuário autenticado, desacoplado da sessão do banco.
+
+    Expõe os atributos e métodos de consulta usados pelos handlers
+    (id, username, is_admin, role, can_access_page...). Não deve ser
+    usado para alterar o usuário: para isso, buscar o modelo User pelo id.
+    """
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.full_name = user.full_name
+        self.email = user.email
+        self.is_active = user.is_active
+        self.is_admin = user.is_admin
+        self.role_id = user.role_id
+        self.last_login = user.last_login
+        self.role = RoleSnapshot(user.role) if user.role else None
+
+    def can_access_page(self, page_name: str) -> bool:
+        if self.is_admin:
+            return True
+        return self.role.can_access_page(page_name) if self.role else False
+
+    def get_allowed_pages(self) -> List[str]:
+        if self.is_admin:
+            return ['dashboard', 'employees', 'payroll', 'communications', 'reports', 'users', 'settings']
+        return self.role.get_allowed_pages() if self.role else []
+
+    def __repr__(self):
+        return f"<User(username='{self.username}', email='{self.email}')>"
+
+
+def _token_key(token: str) -> str:
+    """Chave do cache: hash do token (o token em si não fica em memória)"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class AuthUserCache:
+    """
+    Cache token → AuthenticatedUser com TTL curto.
+
+    A entrada nunca vive além do 'exp' do token. Alterações de usuário/role
+    via UserManagementService invalidam as entradas afetadas.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, maxsize: int = 1024):
+        ttl = ttl if ttl is not None else float(os.getenv('AUTH_CACHE_TTL_SECONDS', '30'))
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl, name='auth_users')
+
+    def resolve(self, token: str, session_factory: Callable[[], Any], db=None) -> Optional[AuthenticatedUser]:
+        """
+        Retorna o snapshot do usuário do token (None se token inválido ou usuário inexistente).
+
+        Args:
+            token: Token JWT (sem o prefixo 'Bearer ')
+            session_factory: Cria sessão quando db não é informado (só em cache miss)
+            db: Sessão existente do chamador (opcional)
+        """
+        key = _token_key(token)
+        snapshot = self._cache.get(key)
+        if snapshot is not None:
+            return snapshot
+
+        from app.core.security import verify_token
+        from app.models.user import User
+
+        payload = verify_token(token)
+        if not payload:
+            return None
+        username = payload.get('sub')
+        if not username:
+            return None
+
+        close_db = False
+        if db is None:
+            db = session_factory()
+            close_db = True
+        try:
+            user = db.query(User).filter(User.username == username).first()
+            if not user:
+                return None
+            snapshot = AuthenticatedUser(user)
+        finally:
+            if close_db:
+                db.close()
+
+        ttl = self._cache.ttl
+        exp = payload.get('exp')
+        if exp:
+            remaining = float(exp) - time.time()
+            if remaining <= 0:
+                return snapshot
+            ttl = min(ttl, remaining) if ttl else remaining
+        self._cache.set(key, snapshot, ttl=ttl)
+        return snapshot
+
+    def invalidate_user(self, user_id: Optional[int] = None, username: Optional[str] = None) -> int:
+        """Remove as entradas de um usuário (por id ou username); retorna quantas removeu"""
+        return self._cache.delete_values_where(
+            lambda snapshot: (user_id is not None and snapshot.id == user_id)
+            or (bool(username) and snapshot.username == username)
+        )
+
+    def invalidate_role(self, role_id: int) -> int:
+        """Remove as entradas dos usuários de um role"""
+        return self._cache.delete_values_where(lambda snapshot: snapshot.role_id == role_id)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+# Instância global (singleton)
+_auth_user_cache = None
+
+
+def get_auth_user_cache() -> AuthUserCache:
+    """Retorna o cache singleton de usuários autenticados"""
+    global _auth_user_cache
+    if _auth_user_cache is None:
+        _auth_user_cache = AuthUserCache()
+    return _auth_user_cache
+
+
+def invalidate_auth_user(user_id: Optional[int] = None, username: Optional[str] = None, role_id: Optional[int] = None):
+    """
+    Invalida usuários autenticados em cache após alterações de usuário/role.
+
+    Sem argumentos descarta tudo. Propaga para os demais processos pelo
+    barramento de versões (quando ativo).
+    """
+    cache = get_auth_user_cache()
+    if user_id is None and username is None and role_id is None:
+        cache.clear()
+    else:
+        if user_id is not None or username:
+            cache.invalidate_user(user_id=user_id, username=username)
+        if role_id is not None:
+            cache.invalidate_role(role_id)
+
+    from app.services.cache_versions import broadcast, AUTH
+    broadcast(AUTH, {'user_id': user_id, 'username': username, 'role_id': role_id})
+
+
+def apply_remote_auth_change(payload: Optional[dict]):
+    """Callback do barramento de versões: aplica invalidação feita em outro processo"""
+    cache = get_auth_user_cache()
+    if not payload or all(payload.get(k) is None for k in ('user_id', 'username', 'role_id')):
+        cache.clear()
+        return
+    if payload.get('user_id') is not None or payload.get('username'):
+        cache.invalidate_user(user_id=payload.get('user_id'), username=payload.get('username'))
+    if payload.get('role_id') is not None:
+        cache.invalidate_role(payload['role_id'])
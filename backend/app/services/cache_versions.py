@@ -0,0 +1,176 @@
+"""
+Invalidação de caches entre processos via versões no banco
+Cada alteração incrementa o contador do namespace (tabela cache_versions);
+os demais processos consultam os contadores periodicamente e invalidam
+apenas os caches em memória inscritos naquele namespace
+"""
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from app.models.cache_version import CacheVersion
+
+logger = logging.getLogger(__name__)
+
+# Namespaces conhecidos
+EMPLOYEES = 'employees'
+INDICATORS = 'indicators'
+AUTH = 'auth'
+
+
+class CacheVersionBus:
+    """
+    Barramento de versões de cache.
+
+    Callbacks recebem o payload da alteração, ou None quando o escopo é
+    desconhecido (várias versões perdidas entre duas consultas) e o cache
+    deve ser invalidado por completo.
+    """
+
+    def __init__(self, session_factory: Callable[[], Any], poll_seconds: Optional[float] = None):
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds if poll_seconds is not None else float(os.getenv('CACHE_VERSION_POLL_SECONDS', '2'))
+        self._subscribers: Dict[str, List[Callable[[Optional[dict]], None]]] = {}
+        self._seen: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.remote_changes = 0
+
+    def subscribe(self, namespace: str, callback: Callable[[Optional[dict]], None]):
+        """Inscreve um cache para alterações feitas por outros processos"""
+        self._subscribers.setdefault(namespace, []).append(callback)
+
+    def bump(self, namespace: str, payload: Optional[dict] = None) -> Optional[int]:
+        """
+        Publica uma alteração local (o chamador já invalidou o próprio cache).
+
+        Returns:
+            Nova versão do namespace (None se falhar; a falha não interrompe o fluxo)
+        """
+        db = self.session_factory()
+        try:
+            version = db.execute(
+                update(CacheVersion)
+                .where(CacheVersion.namespace == namespace)
+                .values(version=CacheVersion.version + 1, payload=payload)
+                .returning(CacheVersion.version)
+            ).scalar()
+
+            if version is None:
+                try:
+                    db.add(CacheVersion(namespace=namespace, version=1, payload=payload))
+                    db.flush()
+                    version = 1
+                except IntegrityError:
+                    # Outro processo criou a linha ao mesmo tempo
+                    db.rollback()
+                    return self.bump(namespace, payload)
+            db.commit()
+
+            with self._lock:
+                # Só avança a marca local se não houver versões de outros processos pendentes
+                if self._seen.get(namespace, version - 1) == version - 1:
+                    self._seen[namespace] = version
+            return version
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Falha ao publicar versão de cache '{namespace}': {e}")
+            return None
+        finally:
+            db.close()
+
+    def poll(self) -> int:
+        """Consulta as versões e dispara os callbacks das alterações remotas; retorna quantas aplicou"""
+        db = self.session_factory()
+        try:
+            rows = db.query(CacheVersion.namespace, CacheVersion.version, CacheVersion.payload).all()
+        finally:
+            db.close()
+
+        applied = 0
+        for namespace, version, payload in rows:
+            with self._lock:
+                seen = self._seen.get(namespace)
+                if seen is None:
+                    # Primeira observação: caches deste processo foram montados depois dela
+                    self._seen[namespace] = version
+                    continue
+                if version <= seen:
+                    continue
+                self._seen[namespace] = version
+
+            scope = payload if version == seen + 1 else None
+            for callback in self._subscribers.get(namespace, []):
+                try:
+                    callback(scope)
+                except Exception as e:
+                    logger.warning(f"Callback de cache '{namespace}' falhou: {e}")
+            applied += 1
+
+        self.remote_changes += applied
+        return applied
+
+    def start(self):
+        """Inicia a thread de consulta (idempotente)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='cache-version-bus', daemon=True)
+        self._thread.start()
+        print(f"🔁 Sincronização de caches entre processos ativa (a cada {self.poll_seconds:g}s)")
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning(f"Falha ao consultar versões de cache: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'running': bool(self._thread and self._thread.is_alive()),
+                'poll_seconds': self.poll_seconds,
+                'versions': dict(self._seen),
+                'remote_changes': self.remote_changes
+            }
+
+
+# Instância global (singleton)
+_cache_version_bus = None
+
+
+def get_cache_version_bus() -> Optional[CacheVersionBus]:
+    """Retorna o barramento iniciado (None se não configurado, ex.: scripts avulsos)"""
+    return _cache_version_bus
+
+
+def start_cache_version_bus(session_factory) -> Optional[CacheVersionBus]:
+    """Cria e inicia o barramento (desabilitado com CACHE_VERSION_SYNC_ENABLED=false)"""
+    global _cache_version_bus
+    if os.getenv('CACHE_VERSION_SYNC_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+        return None
+    if _cache_version_bus is None:
+        _cache_version_bus = CacheVersionBus(session_factory)
+    # Registrar as versões atuais antes de atender requisições
+    try:
+        _cache_version_bus.poll()
+    except Exception as e:
+        logger.warning(f"Falha ao ler versões de cache iniciais: {e}")
+    _cache_version_bus.start()
+    return _cache_version_bus
+
+
+def broadcast(namespace: str, payload: Optional[dict] = None):
+    """Publica alteração para os outros processos (no-op se o barramento não estiver ativo)"""
+    bus = get_cache_version_bus()
+    if bus is not None:
+        bus.bump(namespace, payload)
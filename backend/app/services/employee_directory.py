@@ -0,0 +1,309 @@
+"""
+Diretório em memória de colaboradores ativos
+Substitui o cache de lista (employees_cache) por linhas indexadas por id,
+unique_id (com e sem zeros à esquerda), CPF e telefone normalizados,
+com atualização incremental via updated_at
+"""
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func
+
+from app.models.employee import Employee
+
+logger = logging.getLogger(__name__)
+
+_NON_DIGITS = re.compile(r'\D')
+
+# Colunas projetadas (evita hidratar objetos ORM completos)
+_COLUMNS = (
+    Employee.id, Employee.unique_id, Employee.name, Employee.cpf, Employee.phone,
+    Employee.email, Employee.department, Employee.position, Employee.birth_date,
+    Employee.sex, Employee.marital_status, Employee.admission_date, Employee.contract_type,
+    Employee.employment_status, Employee.termination_date, Employee.leave_start_date,
+    Employee.leave_end_date, Employee.status_reason, Employee.is_active,
+    func.coalesce(Employee.updated_at, Employee.created_at)
+)
+
+
+def _iso(value) -> str:
+    return value.isoformat() if value else ""
+
+
+def strip_leading_zeros(unique_id: Any) -> str:
+    """005900169 → 5900169 (matrículas não numéricas são mantidas)"""
+    value = str(unique_id or '').strip()
+    return value.lstrip('0') or value if value.isdigit() else value
+
+
+def cpf_key(cpf: Any) -> str:
+    """CPF só com dígitos (aceita com ou sem máscara)"""
+    return _NON_DIGITS.sub('', str(cpf or ''))
+
+
+def phone_key(phone: Any) -> str:
+    """Telefone só com dígitos, sem código do país (DDD + número)"""
+    digits = _NON_DIGITS.sub('', str(phone or ''))
+    if len(digits) > 11 and digits.startswith('55'):
+        digits = digits[2:]
+    return digits
+
+
+def _row_to_dict(row) -> Dict[str, Any]:
+    """Linha projetada → formato de colaborador usado pela API/frontend"""
+    return {
+        "id": row[0],
+        "unique_id": row[1],
+        "full_name": row[2],
+        "cpf": row[3] or "",
+        "phone_number": row[4] or "",
+        "email": row[5] or "",
+        "department": row[6] or "",
+        "position": row[7] or "",
+        "birth_date": _iso(row[8]),
+        "sex": row[9] or "",
+        "marital_status": row[10] or "",
+        "admission_date": _iso(row[11]),
+        "contract_type": row[12] or "",
+        "employment_status": row[13] or "Ativo",
+        "termination_date": _iso(row[14]),
+        "leave_start_date": _iso(row[15]),
+        "leave_end_date": _iso(row[16]),
+        "status_reason": row[17] or "",
+        "is_active": row[18]
+    }
+
+
+class EmployeeDirectory:
+    """
+    Colaboradores ativos indexados para buscas O(1).
+
+    - Primeira carga: query única projetada (sem ORM)
+    - Depois: apenas linhas com updated_at/created_at >= última marca são relidas
+    - Recarga completa periódica (ou quando a contagem diverge) cobre exclusões físicas
+      e alterações feitas fora do ORM
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        refresh_seconds: Optional[float] = None,
+        full_reload_seconds: Optional[float] = None
+    ):
+        self.session_factory = session_factory
+        self.refresh_seconds = refresh_seconds if refresh_seconds is not None else float(os.getenv('EMPLOYEE_DIRECTORY_REFRESH_SECONDS', '30'))
+        self.full_reload_seconds = full_reload_seconds if full_reload_seconds is not None else float(os.getenv('EMPLOYEE_DIRECTORY_FULL_RELOAD_SECONDS', '1800'))
+
+        self._lock = threading.RLock()
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._by_unique_id: Dict[str, int] = {}
+        self._by_unique_id_nz: Dict[str, int] = {}
+        self._by_cpf: Dict[str, int] = {}
+        self._by_phone: Dict[str, int] = {}
+        self._list: Optional[List[Dict[str, Any]]] = None
+
+        self._watermark = None
+        self._loaded = False
+        self._stale = True
+        self._last_refresh = 0.0
+        self._last_full_load = 0.0
+        # Incrementado a cada alteração do conteúdo (ETag das respostas que dependem do diretório)
+        self.generation = 0
+        self.full_loads = 0
+        self.incremental_refreshes = 0
+
+    # ----------------------------------------------------------------- índices
+
+    def _index(self, emp: Dict[str, Any]):
+        emp_id = emp['id']
+        self._rows[emp_id] = emp
+        if emp['unique_id']:
+            self._by_unique_id[str(emp['unique_id'])] = emp_id
+            self._by_unique_id_nz[strip_leading_zeros(emp['unique_id'])] = emp_id
+        if cpf_key(emp['cpf']):
+            self._by_cpf[cpf_key(emp['cpf'])] = emp_id
+        if phone_key(emp['phone_number']):
+            self._by_phone[phone_key(emp['phone_number'])] = emp_id
+
+    def _unindex(self, emp_id: int):
+        emp = self._rows.pop(emp_id, None)
+        if not emp:
+            return
+        for index, key in (
+            (self._by_unique_id, str(emp['unique_id'] or '')),
+            (self._by_unique_id_nz, strip_leading_zeros(emp['unique_id'])),
+            (self._by_cpf, cpf_key(emp['cpf'])),
+            (self._by_phone, phone_key(emp['phone_number'])),
+        ):
+            if index.get(key) == emp_id:
+                del index[key]
+
+    # ------------------------------------------------------------- atualização
+
+    def _full_load(self, db):
+        rows = db.query(*_COLUMNS).filter(Employee.is_active == True).all()
+
+        self._rows, self._by_unique_id, self._by_unique_id_nz = {}, {}, {}
+        self._by_cpf, self._by_phone = {}, {}
+        watermark = None
+        for row in rows:
+            self._index(_row_to_dict(row))
+            if row[-1] and (watermark is None or row[-1] > watermark):
+                watermark = row[-1]
+
+        self._watermark = watermark
+        self._list = None
+        self.generation += 1
+        self._loaded = True
+        self._last_full_load = time.time()
+        self.full_loads += 1
+        print(f"👥 Diretório de colaboradores carregado: {len(self._rows)} ativos")
+
+    def _incremental(self, db):
+        changed_at = func.coalesce(Employee.updated_at, Employee.created_at)
+        query = db.query(*_COLUMNS)
+        if self._watermark is not None:
+            # >= para não perder alterações com o mesmo timestamp da marca (reaplicar é idempotente)
+            query = query.filter(changed_at >= self._watermark)
+        rows = query.all()
+
+        for row in rows:
+            self._unindex(row[0])
+            if row[18]:
+                self._index(_row_to_dict(row))
+            if row[-1] and (self._watermark is None or row[-1] > self._watermark):
+                self._watermark = row[-1]
+
+        if rows:
+            self._list = None
+            self.generation += 1
+        self.incremental_refreshes += 1
+
+        # Exclusões físicas não aparecem no delta: contagem divergente força recarga
+        active = db.query(func.count(Employee.id)).filter(Employee.is_active == True).scalar() or 0
+        if active != len(self._rows):
+            print(f"⚠️ Diretório divergente ({len(self._rows)} vs {active} ativos), recarregando")
+            self._full_load(db)
+
+    def refresh(self, force_full: bool = False):
+        """Atualiza o diretório (incremental, ou completo quando necessário)"""
+        with self._lock:
+            db = self.session_factory()
+            try:
+                full_due = time.time() - self._last_full_load >= self.full_reload_seconds
+                if force_full or not self._loaded or full_due:
+                    self._full_load(db)
+                else:
+                    self._incremental(db)
+                self._stale = False
+                self._last_refresh = time.time()
+            finally:
+                db.close()
+
+    def _ensure_fresh(self):
+        if self._stale or not self._loaded or time.time() - self._last_refresh >= self.refresh_seconds:
+            self.refresh()
+
+    def invalidate(self, full: bool = False):
+        """Marca o diretório para atualização no próximo acesso (full=True força recarga completa)"""
+        with self._lock:
+            self._stale = True
+            if full:
+                self._last_full_load = 0.0
+
+    # ------------------------------------------------------------------ buscas
+
+    def employees(self) -> List[Dict[str, Any]]:
+        """Lista de colaboradores ativos (reconstruída só quando há alterações)"""
+        with self._lock:
+            self._ensure_fresh()
+            if self._list is None:
+                self._list = list(self._rows.values())
+            return self._list
+
+    def version(self) -> int:
+        """Geração atual do diretório (atualizado se necessário, sem copiar a lista)"""
+        with self._lock:
+            self._ensure_fresh()
+            return self.generation
+
+    def get(self, employee_id: Any) -> Optional[Dict[str, Any]]:
+        """Busca por id numérico"""
+        try:
+            emp_id = int(employee_id)
+        except (TypeError, ValueError):
+            return None
+        with self._lock:
+            self._ensure_fresh()
+            return self._rows.get(emp_id)
+
+    def by_unique_id(self, unique_id: Any, exact: bool = False) -> Optional[Dict[str, Any]]:
+        """Busca por matrícula, com ou sem zeros à esquerda (exact=True exige a matrícula idêntica)"""
+        if not unique_id:
+            return None
+        with self._lock:
+            self._ensure_fresh()
+            emp_id = self._by_unique_id.get(str(unique_id))
+            if emp_id is None and not exact:
+                emp_id = self._by_unique_id_nz.get(strip_leading_zeros(unique_id))
+            return self._rows.get(emp_id) if emp_id is not None else None
+
+    def by_cpf(self, cpf: Any) -> Optional[Dict[str, Any]]:
+        key = cpf_key(cpf)
+        if not key:
+            return None
+        with self._lock:
+            self._ensure_fresh()
+            emp_id = self._by_cpf.get(key)
+            return self._rows.get(emp_id) if emp_id is not None else None
+
+    def by_phone(self, phone: Any) -> Optional[Dict[str, Any]]:
+        key = phone_key(phone)
+        if not key:
+            return None
+        with self._lock:
+            self._ensure_fresh()
+            emp_id = self._by_phone.get(key)
+            return self._rows.get(emp_id) if emp_id is not None else None
+
+    def resolve(self, key: Any) -> Optional[Dict[str, Any]]:
+        """Busca por id numérico e, se não encontrar, por matrícula"""
+        return self.get(key) or self.by_unique_id(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'employee_count': len(self._rows),
+                'loaded': self._loaded,
+                'stale': self._stale,
+                'last_refresh': self._last_refresh,
+                'last_full_load': self._last_full_load,
+                'refresh_seconds': self.refresh_seconds,
+                'full_reload_seconds': self.full_reload_seconds,
+                'generation': self.generation,
+                'full_loads': self.full_loads,
+                'incremental_refreshes': self.incremental_refreshes,
+                'indexes': {
+                    'unique_id': len(self._by_unique_id),
+                    'cpf': len(self._by_cpf),
+                    'phone': len(self._by_phone)
+                }
+            }
+
+
+# Instância global (singleton)
+_employee_directory = None
+
+
+def get_employee_directory(session_factory: Optional[Callable[[], Any]] = None) -> EmployeeDirectory:
+    """Retorna o diretório singleton (session_factory é obrigatório na primeira chamada)"""
+    global _employee_directory
+    if _employee_directory is None:
+        if session_factory is None:
+            from app.models.base import SessionLocal as session_factory
+        _employee_directory = EmployeeDirectory(session_factory)
+    return _employee_directory
@@ -2,13 +2,14 @@
 Serviço de Endomarketing - Indicadores de RH
 """
 
+import calendar
 import logging
-from typing import Dict, Any, List
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, Tuple
+from datetime import date, datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import extract, func, and_, or_
+from sqlalchemy import case, or_
 
-from app.models.employee import Employee
+from app.models.employee import Employee, month_day_key
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,45 @@ class EndomarketingService:
     def __init__(self, db: Session):
         self.db = db
     
+    @staticmethod
+    def _month_day_window(period: str, today: datetime) -> Tuple[int, int]:
+        """
+        Intervalo de chaves MMDD do período: 'week' = hoje + 7 dias, senão o mês atual.
+        Na virada de ano (ex.: 1228 → 104) o início fica maior que o fim.
+        """
+        if period == 'week':
+            end_date = today + timedelta(days=7)
+            return month_day_key(today), month_day_key(end_date)
+        return today.month * 100 + 1, today.month * 100 + 31
+    
+    @staticmethod
+    def _days_until(value, today: datetime, period: str) -> int:
+        """
+        Dias até a data no ano corrente (negativo se já passou). 29/02 cai em
+        28/02 nos anos não bissextos; na semana que atravessa o ano, janeiro
+        conta no ano seguinte.
+        """
+        def occurrence(year):
+            if value.month == 2 and value.day == 29 and not calendar.isleap(year):
+                return date(year, 2, 28)
+            return value.replace(year=year)
+        
+        days = (occurrence(today.year) - today.date()).days
+        if period == 'week' and days < 0:
+            days = (occurrence(today.year + 1) - today.date()).days
+        return days
+    
+    def _employees_by_month_day(self, key_column, period: str, today: datetime) -> List[Employee]:
+        """Ativos com chave MMDD no período (range scan no índice is_active + chave)"""
+        start, end = self._month_day_window(period, today)
+        query = self.db.query(Employee).filter(Employee.is_active == True)
+        if start <= end:
+            return query.filter(key_column.between(start, end)).order_by(key_column).all()
+        # Janela atravessa o ano: fim de dezembro primeiro, depois início de janeiro
+        return query.filter(or_(key_column >= start, key_column <= end)).order_by(
+            case((key_column >= start, 0), else_=1), key_column
+        ).all()
+    
     def get_birthday_employees(self, period: str = 'month') -> Dict[str, Any]:
         """
         Retorna colaboradores aniversariantes.
@@ -32,49 +72,7 @@ class EndomarketingService:
         logger.info(f"Buscando aniversariantes do período: {period}")
         
         today = datetime.now()
-        current_month = today.month
-        
-        if period == 'week':
-            # Próximos 7 dias
-            start_day = today.day
-            end_date = today + timedelta(days=7)
-            
-            # Buscar aniversariantes na semana
-            if end_date.month == current_month:
-                # Mesma semana no mesmo mês
-                employees = self.db.query(Employee).filter(
-                    Employee.is_active == True,
-                    Employee.birth_date.isnot(None),
-                    extract('month', Employee.birth_date) == current_month,
-                    extract('day', Employee.birth_date) >= start_day,
-                    extract('day', Employee.birth_date) <= end_date.day
-                ).order_by(extract('day', Employee.birth_date)).all()
-            else:
-                # Semana atravessa virada de mês
-                employees = self.db.query(Employee).filter(
-                    Employee.is_active == True,
-                    Employee.birth_date.isnot(None),
-                    or_(
-                        and_(
-                            extract('month', Employee.birth_date) == current_month,
-                            extract('day', Employee.birth_date) >= start_day
-                        ),
-                        and_(
-                            extract('month', Employee.birth_date) == end_date.month,
-                            extract('day', Employee.birth_date) <= end_date.day
-                        )
-                    )
-                ).order_by(
-                    extract('month', Employee.birth_date),
-                    extract('day', Employee.birth_date)
-                ).all()
-        else:
-            # Mês inteiro
-            employees = self.db.query(Employee).filter(
-                Employee.is_active == True,
-                Employee.birth_date.isnot(None),
-                extract('month', Employee.birth_date) == current_month
-            ).order_by(extract('day', Employee.birth_date)).all()
+        employees = self._employees_by_month_day(Employee.birth_month_day, period, today)
         
         # Formatar resposta
         birthdays = []
@@ -90,8 +88,7 @@ class EndomarketingService:
                 # Calcular dias até aniversário
                 # Se a data já passou este ano, calcular quantos dias passaram (negativo)
                 # Se ainda vai acontecer este ano, calcular quantos dias faltam (positivo)
-                birthday_this_year = emp.birth_date.replace(year=today.year)
-                days_until = (birthday_this_year - today.date()).days
+                days_until = self._days_until(emp.birth_date, today, period)
                 
                 birthdays.append({
                     'id': emp.id,
@@ -127,45 +124,7 @@ class EndomarketingService:
         logger.info(f"Buscando aniversariantes de empresa do período: {period}")
         
         today = datetime.now()
-        current_month = today.month
-        
-        if period == 'week':
-            start_day = today.day
-            end_date = today + timedelta(days=7)
-            
-            if end_date.month == current_month:
-                employees = self.db.query(Employee).filter(
-                    Employee.is_active == True,
-                    Employee.admission_date.isnot(None),
-                    extract('month', Employee.admission_date) == current_month,
-                    extract('day', Employee.admission_date) >= start_day,
-                    extract('day', Employee.admission_date) <= end_date.day
-                ).order_by(extract('day', Employee.admission_date)).all()
-            else:
-                employees = self.db.query(Employee).filter(
-                    Employee.is_active == True,
-                    Employee.admission_date.isnot(None),
-                    or_(
-                        and_(
-                            extract('month', Employee.admission_date) == current_month,
-                            extract('day', Employee.admission_date) >= start_day
-                        ),
-                        and_(
-                            extract('month', Employee.admission_date) == end_date.month,
-                            extract('day', Employee.admission_date) <= end_date.day
-                        )
-                    )
-                ).order_by(
-                    extract('month', Employee.admission_date),
-                    extract('day', Employee.admission_date)
-                ).all()
-        else:
-            # Mês inteiro
-            employees = self.db.query(Employee).filter(
-                Employee.is_active == True,
-                Employee.admission_date.isnot(None),
-                extract('month', Employee.admission_date) == current_month
-            ).order_by(extract('day', Employee.admission_date)).all()
+        employees = self._employees_by_month_day(Employee.admission_month_day, period, today)
         
         # Filtrar apenas quem completa 1 ano ou mais
         anniversaries = []
@@ -185,8 +144,7 @@ class EndomarketingService:
                     # Calcular dias até aniversário de empresa
                     # Se a data já passou este ano, calcular quantos dias passaram (negativo)
                     # Se ainda vai acontecer este ano, calcular quantos dias faltam (positivo)
-                    anniversary_this_year = emp.admission_date.replace(year=today.year)
-                    days_until = (anniversary_this_year - today.date()).days
+                    days_until = self._days_until(emp.admission_date, today, period)
                     
                     anniversaries.append({
                         'id': emp.id,
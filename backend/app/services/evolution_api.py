@@ -2,11 +2,11 @@ import requests
 import base64
 import mimetypes
 import os
-import time
 import random
 import logging
 from typing import Optional, Dict, Any
 from ..core.config import settings
+from ..core.pacing import pause
 from .phone_validator import PhoneValidator
 
 logger = logging.getLogger(__name__)
@@ -36,7 +36,7 @@ class EvolutionAPIService:
         """Adiciona delay aleatório entre envios"""
         delay = base_delay + random.uniform(-variation, variation)
         logger.info(f"Aguardando {delay:.1f} segundos...")
-        time.sleep(delay)
+        pause(delay)
     
     def _file_to_base64(self, file_path: str) -> Optional[str]:
         """Converte arquivo para base64"""
@@ -244,7 +244,7 @@ class EvolutionAPIService:
                     
                     if status_code == 429:  # Rate limit
                         logger.warning(f"⚠️  Rate limit atingido. Aguardando 60s...")
-                        time.sleep(60)
+                        pause(60)
                         continue
                     elif status_code in [401, 403]:
                         error_msg = f"Erro de autenticação ({status_code}). Verifique API key"
@@ -257,7 +257,7 @@ class EvolutionAPIService:
                     else:
                         if attempt < max_retries - 1:
                             logger.warning(f"⏳ Aguardando 30s antes de tentar novamente...")
-                            time.sleep(30)
+                            pause(30)
                             continue
                         return {"success": False, "message": f"Erro HTTP: {status_code}"}
                         
@@ -265,7 +265,7 @@ class EvolutionAPIService:
                     logger.error(f"⏱️  Timeout na tentativa {attempt + 1}")
                     if attempt < max_retries - 1:
                         logger.warning(f"⏳ Aguardando 20s antes de tentar novamente...")
-                        time.sleep(20)
+                        pause(20)
                         continue
                     return {"success": False, "message": "Timeout: servidor não respondeu a tempo"}
                     
@@ -273,7 +273,7 @@ class EvolutionAPIService:
                     logger.error(f"❌ Erro inesperado na tentativa {attempt + 1}: {str(e)}")
                     if attempt < max_retries - 1:
                         logger.warning(f"⏳ Aguardando 30s antes de tentar novamente...")
-                        time.sleep(30)
+                        pause(30)
                         continue
                     return {"success": False, "message": f"Erro inesperado: {str(e)}"}
             
@@ -1,19 +1,50 @@
 """Service para cálculo e cache de indicadores de RH"""
 import time
 from datetime import datetime, date, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import func, extract, and_, or_, case
+from app.core.cache import LRUCache
 from app.models.employee import Employee
 from app.models.hr_indicators import HRIndicatorSnapshot
 
+# Cache em memória compartilhado por todas as instâncias do serviço (1º nível)
+_memory_cache = LRUCache(maxsize=256, name='hr_indicators')
+
+
+def _month_end(reference_date: date) -> date:
+    return (reference_date.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+def invalidate_memory_cache(indicator_type: Optional[str] = None, reference_date: Optional[date] = None):
+    """
+    Invalida apenas o 1º nível (memória deste processo).
+    
+    Usado diretamente quando outro processo já invalidou os snapshots no banco.
+    """
+    if not indicator_type and not reference_date:
+        _memory_cache.clear()
+        return
+    
+    month_end = _month_end(reference_date) if reference_date else None
+    
+    def affected(key) -> bool:
+        k_type, k_start, k_end = key
+        if indicator_type and k_type != indicator_type:
+            return False
+        if reference_date and k_start and k_end:
+            return k_start <= month_end and k_end >= reference_date
+        return True
+    
+    _memory_cache.delete_where(affected)
+
 
 class HRIndicatorsService:
     """
     Serviço otimizado para indicadores de RH com cache inteligente.
     
     Estratégia de otimização:
-    1. Cache em tabela de snapshots (reduz queries complexas)
+    1. Cache em dois níveis: LRU em memória + tabela de snapshots (upsert)
     2. TTL configurável por tipo de indicador
     3. Queries otimizadas com aggregations no PostgreSQL
     4. Invalidação seletiva de cache
@@ -29,23 +60,47 @@ class HRIndicatorsService:
         'trends': 24,  # Atualiza diariamente
     }
     
+    # Intervalo mínimo entre limpezas da tabela de snapshots (segundos)
+    PRUNE_INTERVAL = 3600
+    _last_prune = 0.0
+    
     def __init__(self, db: Session):
         self.db = db
     
+    @staticmethod
+    def _memory_key(
+        indicator_type: str,
+        period_start: Optional[date] = None,
+        period_end: Optional[date] = None
+    ) -> Tuple[str, Optional[date], Optional[date]]:
+        """Chave do cache em memória (mesma identidade do snapshot no banco)"""
+        return (indicator_type, period_start, period_end)
+    
     def _get_cached_indicator(
         self, 
         indicator_type: str,
         period_start: Optional[date] = None,
         period_end: Optional[date] = None
     ) -> Optional[Dict[str, Any]]:
-        """Recupera indicador do cache se ainda válido"""
+        """
+        Recupera indicador do cache se ainda válido.
+        
+        1º nível: LRU em memória do processo (sem acesso ao banco)
+        2º nível: tabela hr_indicator_snapshots
+        """
+        key = self._memory_key(indicator_type, period_start, period_end)
+        cached = _memory_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+        
         ttl_hours = self.CACHE_TTL.get(indicator_type, 24)
         cutoff_time = datetime.now() - timedelta(hours=ttl_hours)
+        refreshed_at = func.coalesce(HRIndicatorSnapshot.updated_at, HRIndicatorSnapshot.created_at)
         
         query = self.db.query(HRIndicatorSnapshot).filter(
             HRIndicatorSnapshot.indicator_type == indicator_type,
             HRIndicatorSnapshot.is_valid == 1,
-            HRIndicatorSnapshot.created_at >= cutoff_time
+            refreshed_at >= cutoff_time
         )
         
         # Filtro adicional por período se fornecido
@@ -54,15 +109,23 @@ class HRIndicatorsService:
         if period_end:
             query = query.filter(HRIndicatorSnapshot.period_end == period_end)
         
-        snapshot = query.order_by(HRIndicatorSnapshot.created_at.desc()).first()
+        snapshot = query.order_by(refreshed_at.desc()).first()
         
         if snapshot:
-            return {
+            cached_at = snapshot.updated_at or snapshot.created_at
+            result = {
                 'metrics': snapshot.metrics,
                 'cached': True,
-                'cached_at': snapshot.created_at.isoformat(),
+                'cached_at': cached_at.isoformat(),
                 'total_records': snapshot.total_records
             }
+            
+            # Promover para memória apenas pelo tempo de vida restante do snapshot
+            age = (datetime.now(cached_at.tzinfo) - cached_at).total_seconds()
+            remaining = ttl_hours * 3600 - age
+            if remaining > 0:
+                _memory_cache.set(key, result, ttl=remaining)
+            return dict(result)
         
         return None
     
@@ -75,9 +138,8 @@ class HRIndicatorsService:
         period_start: Optional[date] = None,
         period_end: Optional[date] = None
     ):
-        """Salva indicador calculado no cache"""
+        """Salva indicador calculado no cache (upsert por tipo + período)"""
         # Converter Decimals para float para serialização JSON
-        import json
         from decimal import Decimal
         
         def decimal_to_float(obj):
@@ -91,30 +153,153 @@ class HRIndicatorsService:
         
         metrics_clean = decimal_to_float(metrics)
         
-        snapshot = HRIndicatorSnapshot(
-            indicator_type=indicator_type,
-            calculation_date=date.today(),
-            period_start=period_start,
-            period_end=period_end,
-            metrics=metrics_clean,
-            total_records=total_records,
-            calculation_time_ms=calculation_time_ms,
-            is_valid=1
+        if self.db.get_bind().dialect.name == 'postgresql':
+            # Upsert atômico na constraint única (tipo, início, fim): requisições
+            # concorrentes não geram duplicatas nem IntegrityError
+            from sqlalchemy.dialects.postgresql import insert
+            
+            statement = insert(HRIndicatorSnapshot).values(
+                indicator_type=indicator_type,
+                calculation_date=date.today(),
+                period_start=period_start,
+                period_end=period_end,
+                metrics=metrics_clean,
+                total_records=total_records,
+                calculation_time_ms=calculation_time_ms,
+                is_valid=1
+            )
+            self.db.execute(statement.on_conflict_do_update(
+                constraint=HRIndicatorSnapshot.PERIOD_CONSTRAINT,
+                set_={
+                    'calculation_date': statement.excluded.calculation_date,
+                    'metrics': statement.excluded.metrics,
+                    'total_records': statement.excluded.total_records,
+                    'calculation_time_ms': statement.excluded.calculation_time_ms,
+                    'is_valid': 1,
+                    'updated_at': func.now()
+                }
+            ))
+        else:
+            self._save_snapshot_row(indicator_type, metrics_clean, total_records, calculation_time_ms,
+                                    period_start, period_end)
+        
+        self.db.commit()
+        
+        _memory_cache.set(
+            self._memory_key(indicator_type, period_start, period_end),
+            {
+                'metrics': metrics_clean,
+                'cached': True,
+                'cached_at': datetime.now().isoformat(),
+                'total_records': total_records
+            },
+            ttl=self.CACHE_TTL.get(indicator_type, 24) * 3600
         )
         
-        self.db.add(snapshot)
+        self._maybe_prune()
+    
+    def _save_snapshot_row(self, indicator_type, metrics_clean, total_records, calculation_time_ms,
+                           period_start, period_end):
+        """Upsert por SELECT + UPDATE/INSERT (SQLite, sem ON CONFLICT na constraint)"""
+        existing = self.db.query(HRIndicatorSnapshot).filter(
+            HRIndicatorSnapshot.indicator_type == indicator_type,
+            HRIndicatorSnapshot.period_start == period_start if period_start else HRIndicatorSnapshot.period_start.is_(None),
+            HRIndicatorSnapshot.period_end == period_end if period_end else HRIndicatorSnapshot.period_end.is_(None)
+        ).order_by(HRIndicatorSnapshot.id.desc()).all()
+        
+        if existing:
+            snapshot = existing[0]
+            # Duplicatas antigas (gravadas antes do upsert) são descartadas
+            for duplicate in existing[1:]:
+                self.db.delete(duplicate)
+            snapshot.calculation_date = date.today()
+            snapshot.metrics = metrics_clean
+            snapshot.total_records = total_records
+            snapshot.calculation_time_ms = calculation_time_ms
+            snapshot.is_valid = 1
+            snapshot.updated_at = datetime.now()
+        else:
+            snapshot = HRIndicatorSnapshot(
+                indicator_type=indicator_type,
+                calculation_date=date.today(),
+                period_start=period_start,
+                period_end=period_end,
+                metrics=metrics_clean,
+                total_records=total_records,
+                calculation_time_ms=calculation_time_ms,
+                is_valid=1
+            )
+            self.db.add(snapshot)
+    
+    def _maybe_prune(self):
+        """Executa prune_snapshots no máximo uma vez por PRUNE_INTERVAL"""
+        now = time.time()
+        if now - HRIndicatorsService._last_prune < self.PRUNE_INTERVAL:
+            return
+        HRIndicatorsService._last_prune = now
+        try:
+            self.prune_snapshots()
+        except Exception as e:
+            self.db.rollback()
+            print(f"⚠️ Erro ao limpar snapshots de indicadores: {e}")
+    
+    def prune_snapshots(self) -> int:
+        """Remove snapshots invalidados ou expirados; retorna quantidade removida"""
+        refreshed_at = func.coalesce(HRIndicatorSnapshot.updated_at, HRIndicatorSnapshot.created_at)
+        
+        conditions = [HRIndicatorSnapshot.is_valid == 0]
+        for indicator_type, ttl_hours in self.CACHE_TTL.items():
+            conditions.append(and_(
+                HRIndicatorSnapshot.indicator_type == indicator_type,
+                refreshed_at < datetime.now() - timedelta(hours=ttl_hours)
+            ))
+        # Tipos sem TTL configurado usam o padrão de 24h
+        conditions.append(and_(
+            HRIndicatorSnapshot.indicator_type.notin_(list(self.CACHE_TTL)),
+            refreshed_at < datetime.now() - timedelta(hours=24)
+        ))
+        
+        removed = self.db.query(HRIndicatorSnapshot).filter(
+            or_(*conditions)
+        ).delete(synchronize_session=False)
         self.db.commit()
+        
+        if removed:
+            print(f"🧹 {removed} snapshots de indicadores removidos")
+        return removed
     
-    def invalidate_cache(self, indicator_type: Optional[str] = None):
-        """Invalida cache de indicadores (todos ou de um tipo específico)"""
+    def invalidate_cache(self, indicator_type: Optional[str] = None, reference_date: Optional[date] = None):
+        """
+        Invalida cache de indicadores (todos ou de um tipo específico) nos dois níveis.
+        
+        Com reference_date (1º dia do mês alterado), snapshots de período só são
+        invalidados se o período cruzar aquele mês; snapshots sem período (estado
+        atual) sempre são invalidados.
+        """
+        invalidate_memory_cache(indicator_type, reference_date)
+        
         query = self.db.query(HRIndicatorSnapshot)
         
         if indicator_type:
             query = query.filter(HRIndicatorSnapshot.indicator_type == indicator_type)
-        
-        query.update({'is_valid': 0})
+        if reference_date:
+            query = query.filter(or_(
+                HRIndicatorSnapshot.period_start.is_(None),
+                HRIndicatorSnapshot.period_end.is_(None),
+                and_(
+                    HRIndicatorSnapshot.period_start <= _month_end(reference_date),
+                    HRIndicatorSnapshot.period_end >= reference_date
+                )
+            ))
+        
+        query.update({'is_valid': 0}, synchronize_session=False)
         self.db.commit()
     
+    @staticmethod
+    def cache_stats() -> Dict[str, Any]:
+        """Estatísticas do cache em memória de indicadores"""
+        return _memory_cache.stats()
+    
     # ========== HEADCOUNT ==========
     
     def get_headcount_metrics(self, use_cache: bool = True) -> Dict[str, Any]:
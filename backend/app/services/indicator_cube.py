@@ -0,0 +1,217 @@
+"""
+Cubo de indicadores de RH em memória
+Células (tipo, empresa, setor, ano, mês) calculadas pelos helpers de período e
+invalidadas seletivamente pelos eventos de importação e edição de colaboradores
+"""
+import logging
+import os
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from app.core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+INDICATOR_TYPES = ('overview', 'headcount', 'turnover', 'demographics', 'tenure', 'leaves')
+
+# Tipos afetados por cada origem de alteração
+PAYROLL_INDICATORS = ('overview', 'headcount', 'turnover', 'demographics', 'tenure')
+LEAVE_INDICATORS = ('leaves',)
+
+# Tipos cuja célula do mês M usa o headcount do mês anterior (variação / headcount médio)
+_DEPENDS_ON_PREVIOUS_MONTH = {'overview', 'headcount', 'turnover'}
+
+
+def _next_month(year: int, month: int) -> Tuple[int, int]:
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+class IndicatorCube:
+    """
+    Cache das métricas por período usadas pelas telas de indicadores e relatórios.
+
+    A chave de cada célula é (tipo, empresa, setor, ano, mês, variante); a
+    variante distingue parâmetros extras (ex.: tipo de afastamento).
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        max_entries = max_entries or int(os.getenv('INDICATOR_CUBE_MAX_ENTRIES', '5000'))
+        # TTL apenas como rede de segurança: a invalidação normal vem dos eventos
+        ttl_seconds = ttl_seconds or int(os.getenv('INDICATOR_CUBE_TTL_SECONDS', str(6 * 3600)))
+        self.cells = LRUCache(maxsize=max_entries, ttl=ttl_seconds, name='indicator_cube')
+        # Incrementado a cada invalidação (ETag das rotas de indicadores)
+        self.generation = 0
+
+    @staticmethod
+    def make_key(indicator_type: str, company: Optional[str], division: Optional[str],
+                 year: int, month: int, variant: Hashable = None) -> Tuple:
+        return (indicator_type, company or 'all', division or 'all', int(year), int(month), variant)
+
+    def get_or_compute(self, indicator_type: str, company: Optional[str], division: Optional[str],
+                       year: int, month: int, compute: Callable[[], Dict[str, Any]],
+                       variant: Hashable = None) -> Dict[str, Any]:
+        """Retorna a célula em cache ou calcula via compute() e armazena"""
+        key = self.make_key(indicator_type, company, division, year, month, variant)
+        return self.cells.get_or_set(key, compute)
+
+    def invalidate(self, company: Optional[str] = None, year: Optional[int] = None,
+                   month: Optional[int] = None, indicator_types: Optional[Iterable[str]] = None) -> int:
+        """
+        Remove as células afetadas por uma alteração.
+
+        Args:
+            company: Empresa alterada (None = todas). Células consolidadas ('all') sempre são afetadas
+            year/month: Período alterado (None = todos). O mês seguinte também é removido
+                para tipos que comparam com o mês anterior
+            indicator_types: Tipos afetados (None = todos)
+
+        Returns:
+            Quantidade de células removidas
+        """
+        types = set(indicator_types) if indicator_types else None
+        following = _next_month(year, month) if year and month else None
+
+        def affected(key) -> bool:
+            k_type, k_company, _, k_year, k_month, _ = key
+            if types is not None and k_type not in types:
+                return False
+            if company and k_company not in ('all', company):
+                return False
+            if not year:
+                return True
+            if not month:
+                return k_year == year or (
+                    k_type in _DEPENDS_ON_PREVIOUS_MONTH and (k_year, k_month) == (year + 1, 1)
+                )
+            if (k_year, k_month) == (year, month):
+                return True
+            return k_type in _DEPENDS_ON_PREVIOUS_MONTH and (k_year, k_month) == following
+
+        self.generation += 1
+        return self.cells.delete_where(affected)
+
+    def clear(self):
+        self.generation += 1
+        self.cells.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.cells.stats()
+        stats['generation'] = self.generation
+        return stats
+
+
+# Instância global (singleton)
+_indicator_cube = None
+
+# Callbacks notificados após cada alteração (ex.: pré-aquecimento do cache)
+_change_listeners: List[Callable[..., None]] = []
+
+
+def get_indicator_cube() -> IndicatorCube:
+    """Retorna instância singleton do cubo de indicadores"""
+    global _indicator_cube
+    if _indicator_cube is None:
+        _indicator_cube = IndicatorCube()
+    return _indicator_cube
+
+
+def add_change_listener(callback: Callable[..., None]):
+    """Registra callback(source, company, year, month, indicator_types) chamado após cada alteração"""
+    if callback not in _change_listeners:
+        _change_listeners.append(callback)
+
+
+def publish_indicator_change(
+    source: str,
+    company: Optional[str] = None,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    indicator_types: Optional[Iterable[str]] = None,
+    db=None
+) -> int:
+    """
+    Evento de alteração de dados de RH.
+
+    Invalida apenas as células do cubo e os snapshots do HRIndicatorsService
+    dos tipos afetados, em vez de descartar todo o cache.
+
+    Args:
+        source: Origem do evento (para log), ex.: 'payroll_import', 'employee_update'
+        company: Empresa afetada (None = todas)
+        year/month: Período afetado (None = todos)
+        indicator_types: Tipos afetados (None = todos)
+        db: Sessão para invalidar os snapshots; se omitida, abre uma sessão própria
+
+    Returns:
+        Quantidade de células do cubo removidas
+    """
+    types = tuple(indicator_types) if indicator_types else INDICATOR_TYPES
+    removed = get_indicator_cube().invalidate(company, year, month, types)
+
+    reference_date = date(int(year), int(month), 1) if year and month else None
+    own_session = db is None
+    try:
+        from app.services.hr_indicators import HRIndicatorsService
+        if own_session:
+            from app.models.base import SessionLocal
+            db = SessionLocal()
+        service = HRIndicatorsService(db)
+        for indicator_type in types:
+            service.invalidate_cache(indicator_type=indicator_type, reference_date=reference_date)
+    except Exception as e:
+        logger.warning(f"Falha ao invalidar snapshots de indicadores: {e}")
+    finally:
+        if own_session and db is not None:
+            db.close()
+
+    scope = f"empresa={company or 'todas'}, período={f'{month:02d}/{year}' if year and month else (year or 'todos')}"
+    print(f"🔄 Indicadores invalidados ({source}): {', '.join(types)} | {scope} | {removed} células")
+
+    # Outros processos invalidam apenas seus caches em memória (o banco já foi tratado aqui)
+    from app.services.cache_versions import broadcast, INDICATORS
+    broadcast(INDICATORS, {
+        'source': source,
+        'company': company,
+        'year': year,
+        'month': month,
+        'indicator_types': list(types)
+    })
+
+    _notify_listeners(source, company, year, month, types)
+    return removed
+
+
+def _notify_listeners(source, company, year, month, types):
+    for listener in list(_change_listeners):
+        try:
+            listener(source, company, year, month, types)
+        except Exception as e:
+            logger.warning(f"Listener de indicadores falhou: {e}")
+
+
+def apply_remote_change(payload: Optional[dict]):
+    """
+    Aplica alteração publicada por outro processo (inscrito no barramento de versões).
+
+    Invalida só os caches em memória deste processo; payload None = escopo
+    desconhecido, descarta tudo.
+    """
+    from app.services.hr_indicators import invalidate_memory_cache
+
+    if not payload:
+        get_indicator_cube().clear()
+        invalidate_memory_cache()
+        print("🔁 Indicadores invalidados por outro processo (completo)")
+        _notify_listeners('remote', None, None, None, INDICATOR_TYPES)
+        return
+
+    company, year, month = payload.get('company'), payload.get('year'), payload.get('month')
+    types = tuple(payload.get('indicator_types') or INDICATOR_TYPES)
+    removed = get_indicator_cube().invalidate(company, year, month, types)
+
+    reference_date = date(int(year), int(month), 1) if year and month else None
+    for indicator_type in types:
+        invalidate_memory_cache(indicator_type, reference_date)
+
+    print(f"🔁 Indicadores invalidados por outro processo ({payload.get('source')}): {removed} células")
+    _notify_listeners(payload.get('source') or 'remote', company, year, month, types)
@@ -0,0 +1,646 @@
+"""
+Indicadores de RH por período (empresa/setor/mês)
+
+Cada get_*_for_period devolve a célula do cubo de indicadores, calculando-a
+com o compute_* correspondente na primeira consulta. Usado pelas rotas de
+indicadores, pelos relatórios e pelo pré-aquecimento em background.
+"""
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import and_, func
+
+from app.models.employee import Employee
+from app.models.leave import LeaveRecord
+from app.models.payroll import PayrollData, PayrollPeriod
+from app.services.indicator_cube import get_indicator_cube
+
+
+def get_overview_for_period(db, year, month, company='all', division='all'):
+    """Visão geral de um período específico (célula do cubo de indicadores)"""
+    return get_indicator_cube().get_or_compute(
+        'overview', company, division, year, month,
+        lambda: compute_overview_for_period(db, year, month, company, division)
+    )
+
+
+def compute_overview_for_period(db, year, month, company='all', division='all'):
+    """Calcula a visão geral do período (None se não houver folha no mês)"""
+    # Buscar todos os períodos do mês/ano especificado (mensal e 13º)
+    # FILTRAR POR EMPRESA AQUI - usando payroll_periods.company
+    period_query = db.query(PayrollPeriod).filter(
+        PayrollPeriod.year == year,
+        PayrollPeriod.month == month
+    )
+
+    # Filtrar por empresa no período (NÃO no employee, pois company_code pode ser NULL)
+    if company != 'all':
+        period_query = period_query.filter(PayrollPeriod.company == company)
+        print(f"🔍 Filtrando períodos por empresa: '{company}'")
+
+    periods = period_query.all()
+
+    if not periods:
+        return None
+
+    period_ids = [p.id for p in periods]
+    print(f"📊 Períodos encontrados: {[(p.id, p.company, p.period_name) for p in periods]}")
+
+    # Buscar dados de folha dos períodos
+    payroll_query = db.query(PayrollData).filter(
+        PayrollData.period_id.in_(period_ids)
+    )
+
+    payroll_records = payroll_query.all()
+    print(f"📊 Payroll records encontrados: {len(payroll_records)}")
+
+    # Obter employee_ids dos registros de folha
+    unique_employee_ids = set([r.employee_id for r in payroll_records])
+    print(f"📊 Unique employee IDs em payroll: {len(unique_employee_ids)}")
+
+    # Buscar dados dos employees para filtro por departamento
+    employee_map = {}
+    if unique_employee_ids:
+        employees = db.query(Employee).filter(
+            Employee.id.in_(unique_employee_ids)
+        ).all()
+        employee_map = {e.id: e for e in employees}
+        print(f"📊 Employees encontrados: {len(employees)}")
+
+    # Filtrar por departamento/setor se especificado
+    if division != 'all':
+        print(f"🔍 Filtrando por departamento: '{division}'")
+        # Filtrar payroll_records apenas para employees do departamento
+        dept_employee_ids = [e.id for e in employee_map.values() if e.department == division]
+        payroll_records = [r for r in payroll_records if r.employee_id in dept_employee_ids]
+        unique_employee_ids = set([r.employee_id for r in payroll_records])
+        print(f"📊 Após filtro de departamento: {len(payroll_records)} records, {len(unique_employee_ids)} employees")
+
+    # Calcular métricas principais
+    total_employees = len(unique_employee_ids)
+    total_cost = sum([Decimal(str(r.net_salary or 0)) for r in payroll_records])
+
+    # Buscar mês anterior para calcular variação
+    if month == 1:
+        prev_year = year - 1
+        prev_month = 12
+    else:
+        prev_year = year
+        prev_month = month - 1
+
+    prev_period_query = db.query(PayrollPeriod).filter(
+        PayrollPeriod.year == prev_year,
+        PayrollPeriod.month == prev_month
+    )
+    if company != 'all':
+        prev_period_query = prev_period_query.filter(PayrollPeriod.company == company)
+
+    prev_periods = prev_period_query.all()
+
+    employee_variation = None
+    cost_variation = None
+
+    if prev_periods:
+        prev_period_ids = [p.id for p in prev_periods]
+        prev_records = db.query(PayrollData).filter(
+            PayrollData.period_id.in_(prev_period_ids)
+        ).all()
+
+        # Aplicar filtro de departamento se necessário
+        if division != 'all':
+            dept_employee_ids = [e.id for e in employee_map.values() if e.department == division]
+            prev_records = [r for r in prev_records if r.employee_id in dept_employee_ids]
+
+        prev_employees = len(set([r.employee_id for r in prev_records]))
+        prev_cost = sum([Decimal(str(r.net_salary or 0)) for r in prev_records])
+
+        if prev_employees > 0:
+            employee_variation = ((total_employees - prev_employees) / prev_employees) * 100
+        if prev_cost > 0:
+            cost_variation = ((total_cost - prev_cost) / prev_cost) * 100
+
+    # Distribuição por empresa (só faz sentido quando company='all')
+    by_company = []
+    if company == 'all':
+        # Agrupar por company do período
+        periods_by_company = {}
+        for p in periods:
+            if p.company not in periods_by_company:
+                periods_by_company[p.company] = []
+            periods_by_company[p.company].append(p.id)
+
+        for comp_code, comp_period_ids in periods_by_company.items():
+            comp_records = [r for r in payroll_records if r.period_id in comp_period_ids]
+            comp_count = len(set([r.employee_id for r in comp_records]))
+            comp_cost = sum([Decimal(str(r.net_salary or 0)) for r in comp_records])
+            by_company.append({
+                'company': comp_code,
+                'count': comp_count,
+                'total_cost': float(comp_cost)
+            })
+
+    # Top 5 setores
+    employees_by_division = {}
+    for emp_id in unique_employee_ids:
+        emp = employee_map.get(emp_id)
+        if emp:
+            div = emp.department or 'Não informado'
+            if div not in employees_by_division:
+                employees_by_division[div] = set()
+            employees_by_division[div].add(emp_id)
+
+    top_divisions = sorted(
+        [{'division': k, 'count': len(v)} for k, v in employees_by_division.items()],
+        key=lambda x: x['count'],
+        reverse=True
+    )[:5]
+
+    # Contar admissões e desligamentos no mês
+    period_start = date(year, month, 1)
+    if month == 12:
+        period_end = date(year + 1, 1, 1)
+    else:
+        period_end = date(year, month + 1, 1)
+
+    # Contar admissões e desligamentos - restringir aos employees que estão no payroll
+    admissions_query = db.query(Employee).filter(
+        Employee.admission_date >= period_start,
+        Employee.admission_date < period_end,
+        Employee.id.in_(unique_employee_ids) if unique_employee_ids else False
+    )
+    terminations_query = db.query(Employee).filter(
+        Employee.termination_date >= period_start,
+        Employee.termination_date < period_end,
+        Employee.id.in_(unique_employee_ids) if unique_employee_ids else False
+    )
+
+    # Filtro por departamento se aplicável
+    if division != 'all':
+        admissions_query = admissions_query.filter(Employee.department == division)
+        terminations_query = terminations_query.filter(Employee.department == division)
+
+    admissions = admissions_query.count()
+    terminations = terminations_query.count()
+
+    return {
+        'filters': {
+            'year': year,
+            'month': month,
+            'company': company,
+            'division': division
+        },
+        'total_employees': total_employees,
+        'total_payroll_cost': float(total_cost),
+        'employee_variation': float(employee_variation) if employee_variation is not None else None,
+        'cost_variation': float(cost_variation) if cost_variation is not None else None,
+        'admissions': admissions,
+        'terminations': terminations,
+        'by_company': by_company,
+        'top_divisions': top_divisions
+    }
+
+
+def get_headcount_for_period(db, year, month, company='all', division='all'):
+    """Headcount de um período específico (célula do cubo de indicadores)"""
+    return get_indicator_cube().get_or_compute(
+        'headcount', company, division, year, month,
+        lambda: compute_headcount_for_period(db, year, month, company, division)
+    )
+
+
+def compute_headcount_for_period(db, year, month, company='all', division='all'):
+    """Helper para calcular headcount de um período específico"""
+    # Buscar períodos do mês/ano filtrado por empresa
+    period_query = db.query(PayrollPeriod).filter(
+        PayrollPeriod.year == year,
+        PayrollPeriod.month == month
+    )
+
+    if company != 'all':
+        period_query = period_query.filter(PayrollPeriod.company == company)
+
+    periods = period_query.all()
+
+    if not periods:
+        return {
+            'headcount': 0,
+            'total_cost': 0.0,
+            'avg_cost_per_employee': 0.0,
+            'variation_vs_previous': None,
+            'by_company': [],
+            'top_divisions': []
+        }
+
+    period_ids = [p.id for p in periods]
+
+    # Buscar dados de folha
+    payroll_records = db.query(PayrollData).filter(
+        PayrollData.period_id.in_(period_ids)
+    ).all()
+
+    unique_employee_ids = set([r.employee_id for r in payroll_records])
+
+    # Buscar dados dos employees
+    employee_map = {}
+    if unique_employee_ids:
+        employees = db.query(Employee).filter(
+            Employee.id.in_(unique_employee_ids)
+        ).all()
+        employee_map = {e.id: e for e in employees}
+
+    # Filtrar por departamento se especificado
+    if division != 'all':
+        dept_employee_ids = [e.id for e in employee_map.values() if e.department == division]
+        payroll_records = [r for r in payroll_records if r.employee_id in dept_employee_ids]
+        unique_employee_ids = set([r.employee_id for r in payroll_records])
+
+    headcount = len(unique_employee_ids)
+    total_cost = sum([Decimal(str(r.net_salary or 0)) for r in payroll_records])
+    avg_cost = float(total_cost / headcount) if headcount > 0 else 0.0
+
+    # Calcular variação vs mês anterior
+    if month == 1:
+        prev_year = year - 1
+        prev_month = 12
+    else:
+        prev_year = year
+        prev_month = month - 1
+
+    prev_metrics = get_headcount_for_period(db, prev_year, prev_month, company, division)
+    prev_headcount = prev_metrics['headcount']
+    variation = None
+    if prev_headcount > 0:
+        variation = ((headcount - prev_headcount) / prev_headcount) * 100
+
+    # Distribuição por empresa
+    by_company = []
+    if company == 'all':
+        periods_by_company = {}
+        for p in periods:
+            if p.company not in periods_by_company:
+                periods_by_company[p.company] = []
+            periods_by_company[p.company].append(p.id)
+
+        for comp_code, comp_period_ids in periods_by_company.items():
+            comp_records = [r for r in payroll_records if r.period_id in comp_period_ids]
+            comp_count = len(set([r.employee_id for r in comp_records]))
+            comp_cost = sum([Decimal(str(r.net_salary or 0)) for r in comp_records])
+            by_company.append({
+                'company': comp_code,
+                'headcount': comp_count,
+                'total_cost': float(comp_cost)
+            })
+
+    # Top setores
+    employees_by_division = {}
+    for emp_id in unique_employee_ids:
+        emp = employee_map.get(emp_id)
+        if emp:
+            div = emp.department or 'Não informado'
+            if div not in employees_by_division:
+                employees_by_division[div] = set()
+            employees_by_division[div].add(emp_id)
+
+    top_divisions = sorted(
+        [{'division': k, 'count': len(v)} for k, v in employees_by_division.items()],
+        key=lambda x: x['count'],
+        reverse=True
+    )
+
+    return {
+        'headcount': headcount,
+        'total_cost': float(total_cost),
+        'avg_cost_per_employee': avg_cost,
+        'variation_vs_previous': float(variation) if variation is not None else None,
+        'by_company': by_company,
+        'top_divisions': top_divisions
+    }
+
+
+def get_turnover_for_period(db, year, month, company='all', division='all'):
+    """Turnover de um período específico (célula do cubo de indicadores)"""
+    return get_indicator_cube().get_or_compute(
+        'turnover', company, division, year, month,
+        lambda: compute_turnover_for_period(db, year, month, company, division)
+    )
+
+
+def compute_turnover_for_period(db, year, month, company='all', division='all'):
+    """Helper OTIMIZADO para calcular turnover de um período específico"""
+    # Calcular datas do período
+    period_start = date(year, month, 1)
+    if month == 12:
+        period_end = date(year + 1, 1, 1)
+    else:
+        period_end = date(year, month + 1, 1)
+
+    # Mês anterior
+    if month == 1:
+        prev_year, prev_month = year - 1, 12
+    else:
+        prev_year, prev_month = year, month - 1
+
+    prev_start = date(prev_year, prev_month, 1)
+
+    # Query única para headcount atual e anterior
+    periods_query = db.query(PayrollPeriod).filter(
+        ((PayrollPeriod.year == year) & (PayrollPeriod.month == month)) |
+        ((PayrollPeriod.year == prev_year) & (PayrollPeriod.month == prev_month))
+    )
+
+    if company != 'all':
+        periods_query = periods_query.filter(PayrollPeriod.company == company)
+
+    periods = periods_query.all()
+
+    current_period_ids = [p.id for p in periods if p.year == year and p.month == month]
+    prev_period_ids = [p.id for p in periods if p.year == prev_year and p.month == prev_month]
+
+    # Contar headcount de cada período
+    current_headcount = 0
+    prev_headcount = 0
+    employee_ids_current = set()
+
+    if current_period_ids:
+        hc_query = db.query(func.count(func.distinct(PayrollData.employee_id))).filter(
+            PayrollData.period_id.in_(current_period_ids)
+        )
+        if division != 'all':
+            hc_query = hc_query.join(Employee).filter(Employee.department == division)
+        current_headcount = hc_query.scalar() or 0
+
+        # IDs dos funcionários no período atual
+        emp_query = db.query(PayrollData.employee_id).filter(
+            PayrollData.period_id.in_(current_period_ids)
+        ).distinct()
+        employee_ids_current = set([r[0] for r in emp_query.all()])
+
+    if prev_period_ids:
+        hc_query = db.query(func.count(func.distinct(PayrollData.employee_id))).filter(
+            PayrollData.period_id.in_(prev_period_ids)
+        )
+        if division != 'all':
+            hc_query = hc_query.join(Employee).filter(Employee.department == division)
+        prev_headcount = hc_query.scalar() or 0
+
+    avg_headcount = (current_headcount + prev_headcount) / 2 if (current_headcount + prev_headcount) > 0 else 0
+
+    # Contar admissões e desligamentos
+    admissions_query = db.query(func.count(Employee.id)).filter(
+        Employee.admission_date >= period_start,
+        Employee.admission_date < period_end
+    )
+    terminations_query = db.query(func.count(Employee.id)).filter(
+        Employee.termination_date >= period_start,
+        Employee.termination_date < period_end
+    )
+
+    if division != 'all':
+        admissions_query = admissions_query.filter(Employee.department == division)
+        terminations_query = terminations_query.filter(Employee.department == division)
+
+    if employee_ids_current:
+        admissions_query = admissions_query.filter(Employee.id.in_(employee_ids_current))
+        terminations_query = terminations_query.filter(Employee.id.in_(employee_ids_current))
+
+    admissions = admissions_query.scalar() or 0
+    terminations = terminations_query.scalar() or 0
+
+    # Taxa de turnover
+    turnover_rate = 0.0
+    if avg_headcount > 0:
+        turnover_rate = ((admissions + terminations) / 2) / avg_headcount * 100
+
+    return {
+        'turnover_rate': round(turnover_rate, 2),
+        'admissions': admissions,
+        'terminations': terminations,
+        'avg_headcount': round(avg_headcount, 1),
+        'by_company': [],
+        'top_divisions_turnover': []
+    }
+
+
+def get_demographics_for_period(db, year, month, company='all', division='all'):
+    """Métricas demográficas de um período específico (célula do cubo de indicadores)"""
+    return get_indicator_cube().get_or_compute(
+        'demographics', company, division, year, month,
+        lambda: compute_demographics_for_period(db, year, month, company, division)
+    )
+
+
+def compute_demographics_for_period(db, year, month, company='all', division='all'):
+    """Helper para calcular métricas demográficas de um período específico"""
+    from app.services.workforce_metrics import load_workforce_profile, demographics_metrics
+
+    # Projeção colunar da população do mês (sem hidratar objetos Employee)
+    profile = load_workforce_profile(db, year, month, company, division)
+    return demographics_metrics(profile)
+
+
+def get_tenure_for_period(db, year, month, company='all', division='all'):
+    """Tempo de casa de um período específico (célula do cubo de indicadores)"""
+    return get_indicator_cube().get_or_compute(
+        'tenure', company, division, year, month,
+        lambda: compute_tenure_for_period(db, year, month, company, division)
+    )
+
+
+def compute_tenure_for_period(db, year, month, company='all', division='all'):
+    """Helper para calcular métricas de tempo de casa de um período específico"""
+    from app.services.workforce_metrics import load_workforce_profile, tenure_metrics
+
+    # Projeção colunar da população do mês (sem hidratar objetos Employee)
+    profile = load_workforce_profile(db, year, month, company, division)
+    return tenure_metrics(profile, date(year, month, 1))
+
+
+def get_leaves_for_period(db, reference_date, company=None, division=None, leave_type=None):
+    """Afastamentos de um período específico (célula do cubo de indicadores)"""
+    return get_indicator_cube().get_or_compute(
+        'leaves', company, division, reference_date.year, reference_date.month,
+        lambda: compute_leaves_for_period(db, reference_date, company, division, leave_type),
+        # Filtros crus na variante: aqui None (sem filtro) difere do valor literal 'all'
+        variant=(leave_type, reference_date.day, company, division)
+    )
+
+
+def compute_leaves_for_period(db, reference_date, company=None, division=None, leave_type=None):
+    """Calcula métricas de afastamentos para um período específico usando LeaveRecord"""
+    from dateutil.relativedelta import relativedelta
+
+    # Último dia do mês
+    if reference_date.month == 12:
+        last_day = reference_date.replace(day=31)
+    else:
+        last_day = (reference_date.replace(day=1) + relativedelta(months=1)) - relativedelta(days=1)
+
+    # Total de colaboradores ativos
+    employees_query = db.query(Employee).filter(Employee.is_active == True)
+    if company:
+        employees_query = employees_query.filter(Employee.company_code == company)
+    if division:
+        employees_query = employees_query.filter(Employee.department == division)
+
+    total_employees = employees_query.count()
+
+    # Query base de afastamentos no período
+    # (afastamento começa antes ou durante o mês E termina depois ou durante o mês)
+    leaves_query = db.query(LeaveRecord).join(Employee).filter(
+        and_(
+            Employee.is_active == True,
+            LeaveRecord.start_date <= last_day,
+            LeaveRecord.end_date >= reference_date
+        )
+    )
+
+    # Aplicar filtros
+    if company:
+        leaves_query = leaves_query.filter(Employee.company_code == company)
+    if division:
+        leaves_query = leaves_query.filter(Employee.department == division)
+    if leave_type:
+        leaves_query = leaves_query.filter(LeaveRecord.leave_type == leave_type)
+
+    # Contar afastamentos únicos por colaborador no período
+    total_on_leave = db.query(func.count(func.distinct(LeaveRecord.employee_id))).join(Employee).filter(
+        and_(
+            Employee.is_active == True,
+            LeaveRecord.start_date <= last_day,
+            LeaveRecord.end_date >= reference_date
+        )
+    )
+
+    if company:
+        total_on_leave = total_on_leave.filter(Employee.company_code == company)
+    if division:
+        total_on_leave = total_on_leave.filter(Employee.department == division)
+    if leave_type:
+        total_on_leave = total_on_leave.filter(LeaveRecord.leave_type == leave_type)
+
+    total_on_leave = total_on_leave.scalar() or 0
+
+    # Taxa de absenteísmo
+    absenteeism_rate = (total_on_leave / total_employees * 100) if total_employees > 0 else 0
+
+    # Afastamentos por tipo
+    by_type_query = db.query(
+        LeaveRecord.leave_type,
+        func.count(LeaveRecord.id).label('count')
+    ).join(Employee).filter(
+        and_(
+            Employee.is_active == True,
+            LeaveRecord.start_date <= last_day,
+            LeaveRecord.end_date >= reference_date
+        )
+    )
+
+    if company:
+        by_type_query = by_type_query.filter(Employee.company_code == company)
+    if division:
+        by_type_query = by_type_query.filter(Employee.department == division)
+
+    by_type = by_type_query.group_by(LeaveRecord.leave_type).all()
+
+    total_leaves = sum(count for _, count in by_type)
+    by_type_results = []
+    for type_name, count in by_type:
+        by_type_results.append({
+            'type': type_name if type_name else 'Não especificado',
+            'count': count,
+            'percentage': round((count / total_leaves * 100), 1) if total_leaves > 0 else 0
+        })
+
+    # Duração média dos afastamentos (em dias) - usando campo days se disponível
+    avg_duration_query = db.query(
+        func.avg(LeaveRecord.days)
+    ).join(Employee).filter(
+        and_(
+            Employee.is_active == True,
+            LeaveRecord.start_date <= last_day,
+            LeaveRecord.end_date >= reference_date,
+            LeaveRecord.days.isnot(None)
+        )
+    )
+
+    if company:
+        avg_duration_query = avg_duration_query.filter(Employee.company_code == company)
+    if division:
+        avg_duration_query = avg_duration_query.filter(Employee.department == division)
+    if leave_type:
+        avg_duration_query = avg_duration_query.filter(LeaveRecord.leave_type == leave_type)
+
+    avg_duration = avg_duration_query.scalar()
+
+    # Se days não estiver preenchido, calcular pela diferença de datas
+    if avg_duration is None:
+        avg_duration_query = db.query(
+            func.avg(LeaveRecord.end_date - LeaveRecord.start_date)
+        ).join(Employee).filter(
+            and_(
+                Employee.is_active == True,
+                LeaveRecord.start_date <= last_day,
+                LeaveRecord.end_date >= reference_date
+            )
+        )
+
+        if company:
+            avg_duration_query = avg_duration_query.filter(Employee.company_code == company)
+        if division:
+            avg_duration_query = avg_duration_query.filter(Employee.department == division)
+        if leave_type:
+            avg_duration_query = avg_duration_query.filter(LeaveRecord.leave_type == leave_type)
+
+        avg_duration = avg_duration_query.scalar()
+
+    # Afastamentos por departamento
+    by_department_query = db.query(
+        Employee.department,
+        func.count(LeaveRecord.id).label('count')
+    ).join(Employee).filter(
+        and_(
+            Employee.is_active == True,
+            LeaveRecord.start_date <= last_day,
+            LeaveRecord.end_date >= reference_date
+        )
+    )
+
+    if company:
+        by_department_query = by_department_query.filter(Employee.company_code == company)
+    if division:
+        by_department_query = by_department_query.filter(Employee.department == division)
+    if leave_type:
+        by_department_query = by_department_query.filter(LeaveRecord.leave_type == leave_type)
+
+    by_department = by_department_query.group_by(Employee.department).all()
+
+    by_department_results = []
+    for dept, count in by_department:
+        by_department_results.append({
+            'department': dept if dept else 'Não especificado',
+            'count': count,
+            'percentage': round((count / total_leaves * 100), 1) if total_leaves > 0 else 0
+        })
+
+    return {
+        'year': reference_date.year,
+        'month': reference_date.month,
+        'total_employees': total_employees,
+        'total_on_leave': total_on_leave,
+        'total_leave_records': total_leaves,
+        'absenteeism_rate': round(absenteeism_rate, 2),
+        'average_duration_days': round(float(avg_duration), 1) if avg_duration else 0,
+        'by_type': by_type_results,
+        'by_department': by_department_results
+    }
+
+
+def warm_indicator_period(db, company, year, month):
+    """Calcula as células do cubo de indicadores de uma empresa/mês (usado pelo pré-aquecimento)"""
+    get_overview_for_period(db, year, month, company, 'all')
+    get_headcount_for_period(db, year, month, company, 'all')
+    get_turnover_for_period(db, year, month, company, 'all')
+    get_demographics_for_period(db, year, month, company, 'all')
+    get_tenure_for_period(db, year, month, company, 'all')
+    # Tela de afastamentos usa None (sem filtro) em vez de 'all'
+    get_leaves_for_period(db, date(year, month, 1), None if company == 'all' else company)
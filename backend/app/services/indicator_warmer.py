@@ -0,0 +1,235 @@
+"""
+Pré-aquecimento do cubo de indicadores em background
+Recalcula as células dos últimos meses após importações e periodicamente,
+para que o primeiro acesso às telas de indicadores já encontre o cache pronto
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import distinct
+
+from app.models.payroll import PayrollPeriod
+
+logger = logging.getLogger(__name__)
+
+# Origens de alteração que disparam o pré-aquecimento
+WARMUP_SOURCES = ('payroll_import', 'employee_import')
+
+
+class IndicatorWarmer:
+    """
+    Worker de baixa prioridade que preenche o cubo de indicadores.
+
+    O cálculo de cada período é delegado a warm_period(db, company, year, month),
+    fornecido por quem conhece os helpers de indicadores (main_legacy).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        warm_period: Callable[[Any, str, int, int], None],
+        months: Optional[int] = None,
+        interval_minutes: Optional[int] = None,
+        delay_seconds: Optional[float] = None,
+        throttle_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            session_factory: Cria sessões do banco (SessionLocal)
+            warm_period: Calcula e armazena as células de uma empresa/mês
+            months: Quantidade de meses (a partir do mais recente) a pré-aquecer
+            interval_minutes: Intervalo do aquecimento agendado (0 = desabilitado)
+            delay_seconds: Espera após um evento, agrupando importações em sequência
+            throttle_seconds: Pausa entre períodos para não disputar CPU com requisições
+        """
+        self.session_factory = session_factory
+        self.warm_period = warm_period
+        self.months = months or int(os.getenv('INDICATOR_WARMUP_MONTHS', '12'))
+        self.interval = (interval_minutes if interval_minutes is not None
+                         else int(os.getenv('INDICATOR_WARMUP_INTERVAL_MINUTES', '30'))) * 60
+        self.delay = delay_seconds if delay_seconds is not None else float(os.getenv('INDICATOR_WARMUP_DELAY_SECONDS', '5'))
+        self.throttle = throttle_seconds if throttle_seconds is not None else float(os.getenv('INDICATOR_WARMUP_THROTTLE_SECONDS', '0.05'))
+
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._pending_companies: Optional[set] = None  # None = nenhum pedido; set vazio = todas
+        self._pending_reason = None
+        self._thread: Optional[threading.Thread] = None
+
+        self.runs = 0
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    # ---------------------------------------------------------------- controle
+
+    def start(self):
+        """Inicia a thread do worker (idempotente)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='indicator-warmer', daemon=True)
+        self._thread.start()
+        print(f"🔥 Pré-aquecimento de indicadores ativo ({self.months} meses, a cada {self.interval // 60 or '-'} min)")
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def request(self, reason: str, company: Optional[str] = None):
+        """Agenda um aquecimento (pedidos próximos são agrupados numa única execução)"""
+        with self._lock:
+            if self._pending_companies is None:
+                self._pending_companies = set()
+                self._pending_reason = reason
+            if company is None:
+                # Pedido sem empresa cobre todas as empresas
+                self._pending_companies.add(None)
+            else:
+                self._pending_companies.add(company)
+        self._wakeup.set()
+
+    def on_indicator_change(self, source, company, year, month, indicator_types):
+        """Listener de publish_indicator_change: aquece após importações"""
+        if source in WARMUP_SOURCES:
+            self.request(source, company)
+
+    # ------------------------------------------------------------------ worker
+
+    def _run(self):
+        self._lower_priority()
+        next_scheduled = time.time() + self.interval if self.interval else None
+
+        while not self._stop.is_set():
+            timeout = max(0.0, next_scheduled - time.time()) if next_scheduled else None
+            self._wakeup.wait(timeout)
+            if self._stop.is_set():
+                break
+
+            if self._wakeup.is_set():
+                # Debounce: aguardar importações em sequência terminarem
+                self._wakeup.clear()
+                time.sleep(self.delay)
+                with self._lock:
+                    companies, reason = self._pending_companies, self._pending_reason
+                    self._pending_companies, self._pending_reason = None, None
+                if companies is None:
+                    continue
+                self.run_once(reason, companies=None if None in companies else sorted(companies))
+            else:
+                self.run_once('scheduled')
+
+            if self.interval:
+                next_scheduled = time.time() + self.interval
+
+    @staticmethod
+    def _lower_priority():
+        """Reduz a prioridade da thread no SO (Linux aplica nice por thread)"""
+        try:
+            if hasattr(os, 'setpriority') and hasattr(threading, 'get_native_id'):
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+        except Exception:
+            pass
+
+    def _target_periods(self, db) -> List[Tuple[int, int]]:
+        """Últimos N meses a partir do período de folha mais recente"""
+        latest = db.query(PayrollPeriod.year, PayrollPeriod.month).order_by(
+            PayrollPeriod.year.desc(),
+            PayrollPeriod.month.desc()
+        ).first()
+        if not latest:
+            return []
+
+        year, month = latest
+        periods = []
+        for _ in range(self.months):
+            periods.append((year, month))
+            year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+        return periods
+
+    def _companies(self, db) -> List[str]:
+        return [c for (c,) in db.query(distinct(PayrollPeriod.company)).all() if c]
+
+    def run_once(self, reason: str = 'manual', companies: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Executa um aquecimento completo (consolidado 'all' + cada empresa).
+
+        Células já em cache são acertos no cubo, então a execução agendada só
+        recalcula o que foi invalidado ou expirou.
+        """
+        started = time.time()
+        warmed = 0
+        errors = 0
+
+        db = self.session_factory()
+        try:
+            periods = self._target_periods(db)
+            scopes = ['all'] + (companies if companies is not None else self._companies(db))
+
+            for year, month in periods:
+                for company in scopes:
+                    if self._stop.is_set():
+                        break
+                    try:
+                        self.warm_period(db, company, year, month)
+                        warmed += 1
+                    except Exception as e:
+                        errors += 1
+                        db.rollback()
+                        logger.warning(f"Falha ao pré-aquecer {company} {month:02d}/{year}: {e}")
+                    if self.throttle:
+                        time.sleep(self.throttle)
+        except Exception as e:
+            errors += 1
+            logger.warning(f"Falha no pré-aquecimento de indicadores: {e}")
+        finally:
+            db.close()
+
+        self.runs += 1
+        self.last_run = {
+            'reason': reason,
+            'finished_at': datetime.now().isoformat(),
+            'duration_ms': int((time.time() - started) * 1000),
+            'periods_warmed': warmed,
+            'errors': errors
+        }
+        print(f"🔥 Indicadores pré-aquecidos ({reason}): {warmed} períodos em {self.last_run['duration_ms']}ms")
+        return self.last_run
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'months': self.months,
+            'interval_minutes': self.interval // 60,
+            'runs': self.runs,
+            'last_run': self.last_run
+        }
+
+
+# Instância global (singleton)
+_indicator_warmer = None
+
+
+def get_indicator_warmer() -> Optional[IndicatorWarmer]:
+    """Retorna o warmer iniciado (None se ainda não configurado)"""
+    return _indicator_warmer
+
+
+def start_indicator_warmer(session_factory, warm_period) -> Optional[IndicatorWarmer]:
+    """Cria, registra no cubo e inicia o warmer (desabilitado com INDICATOR_WARMUP_ENABLED=false)"""
+    global _indicator_warmer
+    if os.getenv('INDICATOR_WARMUP_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+        return None
+
+    if _indicator_warmer is None:
+        from app.services.indicator_cube import add_change_listener
+        _indicator_warmer = IndicatorWarmer(session_factory, warm_period)
+        add_change_listener(_indicator_warmer.on_indicator_change)
+
+    _indicator_warmer.start()
+    # Aquecimento inicial: o primeiro acesso após o boot também vira acerto de cache
+    _indicator_warmer.request('startup')
+    return _indicator_warmer
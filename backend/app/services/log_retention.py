@@ -0,0 +1,236 @@
+"""
+Manutenção da tabela system_logs
+Cria as partições mensais dos próximos meses e aplica a retenção configurada:
+em PostgreSQL particionado, partições antigas inteiras são removidas (DROP,
+sem varrer linhas); nos demais casos, DELETE em lotes por created_at
+"""
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_PREFIX = 'system_logs_y'
+
+
+def _add_months(d: date, months: int) -> date:
+    month_index = d.year * 12 + (d.month - 1) + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _partition_name(month_start: date) -> str:
+    return f"{_PARTITION_PREFIX}{month_start.year}m{month_start.month:02d}"
+
+
+def is_partitioned(db) -> bool:
+    """system_logs é uma tabela particionada (PostgreSQL)?"""
+    if db.bind.dialect.name != 'postgresql':
+        return False
+    return bool(db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'system_logs'"
+    )).scalar())
+
+
+def list_partitions(db) -> List[str]:
+    """Partições mensais existentes (ordem cronológica)"""
+    rows = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'system_logs' AND c.relname LIKE :prefix"
+    ), {'prefix': f"{_PARTITION_PREFIX}%"}).fetchall()
+    return sorted(r[0] for r in rows)
+
+
+def ensure_log_partitions(db, months_ahead: int = 3) -> List[str]:
+    """
+    Cria as partições do mês atual e dos próximos meses (idempotente).
+
+    Linhas que caíram na partição default para o intervalo são movidas
+    para a nova partição (o PostgreSQL não permite criá-la com elas lá).
+    """
+    if not is_partitioned(db):
+        return []
+
+    existing = set(list_partitions(db))
+    today = date.today()
+    created = []
+    for offset in range(months_ahead + 1):
+        start = _add_months(date(today.year, today.month, 1), offset)
+        name = _partition_name(start)
+        if name in existing:
+            continue
+        end = _add_months(start, 1)
+        bounds = {'start': start, 'end': end}
+
+        has_default_rows = db.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM system_logs_default WHERE created_at >= :start AND created_at < :end)"
+        ), bounds).scalar()
+
+        if has_default_rows:
+            db.execute(text("ALTER TABLE system_logs DETACH PARTITION system_logs_default"))
+            db.execute(text(
+                f"CREATE TABLE {name} PARTITION OF system_logs "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
+            db.execute(text(
+                "INSERT INTO system_logs SELECT * FROM system_logs_default "
+                "WHERE created_at >= :start AND created_at < :end"
+            ), bounds)
+            db.execute(text(
+                "DELETE FROM system_logs_default WHERE created_at >= :start AND created_at < :end"
+            ), bounds)
+            db.execute(text("ALTER TABLE system_logs ATTACH PARTITION system_logs_default DEFAULT"))
+        else:
+            db.execute(text(
+                f"CREATE TABLE {name} PARTITION OF system_logs "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
+        db.commit()
+        created.append(name)
+
+    if created:
+        print(f"🗂️ Partições de logs criadas: {', '.join(created)}")
+    return created
+
+
+def prune_system_logs(db, retention_days: int, batch_size: int = 5000) -> Dict[str, Any]:
+    """
+    Remove logs mais antigos que retention_days.
+
+    Particionado: DROP das partições cujo mês inteiro é anterior ao corte
+    (a retenção efetiva arredonda para o mês) e DELETE em lotes na partição
+    default (meses sem partição própria). Não particionado: DELETE em lotes.
+    """
+    cutoff = datetime.now() - timedelta(days=retention_days)
+
+    if is_partitioned(db):
+        cutoff_month = date(cutoff.year, cutoff.month, 1)
+        dropped = []
+        for name in list_partitions(db):
+            try:
+                year, month = int(name[len(_PARTITION_PREFIX):][:4]), int(name[-2:])
+            except ValueError:
+                continue
+            # Mês da partição termina antes do mês do corte
+            if _add_months(date(year, month, 1), 1) <= cutoff_month:
+                db.execute(text(f"ALTER TABLE system_logs DETACH PARTITION {name}"))
+                db.execute(text(f"DROP TABLE {name}"))
+                db.commit()
+                dropped.append(name)
+
+        deleted = 0
+        while True:
+            removed = db.execute(text(
+                "DELETE FROM system_logs_default WHERE ctid IN ("
+                "SELECT ctid FROM system_logs_default WHERE created_at < :cutoff LIMIT :batch)"
+            ), {'cutoff': cutoff, 'batch': batch_size}).rowcount
+            db.commit()
+            if not removed:
+                break
+            deleted += removed
+        return {'mode': 'partitions', 'dropped_partitions': dropped, 'deleted_rows': deleted,
+                'cutoff': cutoff.isoformat()}
+
+    from app.models.system_log import SystemLog
+
+    deleted = 0
+    while True:
+        ids = [row[0] for row in db.query(SystemLog.id).filter(
+            SystemLog.created_at < cutoff
+        ).limit(batch_size).all()]
+        if not ids:
+            break
+        deleted += db.query(SystemLog).filter(SystemLog.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+    return {'mode': 'delete', 'deleted_rows': deleted, 'cutoff': cutoff.isoformat()}
+
+
+class LogMaintenance:
+    """Thread que cria partições futuras e aplica a retenção periodicamente"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        retention_days: Optional[int] = None,
+        interval_hours: Optional[float] = None
+    ):
+        self.session_factory = session_factory
+        self.retention_days = retention_days if retention_days is not None else int(os.getenv('SYSTEM_LOG_RETENTION_DAYS', '365'))
+        self.interval = (interval_hours if interval_hours is not None else float(os.getenv('SYSTEM_LOG_MAINTENANCE_HOURS', '24'))) * 3600
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def run_once(self) -> Dict[str, Any]:
+        """Executa a manutenção (partições + retenção)"""
+        db = self.session_factory()
+        try:
+            created = ensure_log_partitions(db)
+            pruned = prune_system_logs(db, self.retention_days) if self.retention_days > 0 else None
+            self.last_run = {
+                'finished_at': datetime.now().isoformat(),
+                'created_partitions': created,
+                'retention': pruned
+            }
+            if pruned and (pruned.get('dropped_partitions') or pruned.get('deleted_rows')):
+                print(f"🧹 Retenção de logs aplicada ({self.retention_days} dias): {pruned}")
+            return self.last_run
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Falha na manutenção de system_logs: {e}")
+            self.last_run = {'finished_at': datetime.now().isoformat(), 'error': str(e)}
+            return self.last_run
+        finally:
+            db.close()
+
+    def start(self):
+        """Inicia a thread (idempotente); a primeira execução ocorre logo após o boot"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='log-maintenance', daemon=True)
+        self._thread.start()
+        print(f"🧹 Manutenção de logs ativa (retenção {self.retention_days or '∞'} dias)")
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_once()
+            if self._stop.wait(self.interval):
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'retention_days': self.retention_days,
+            'interval_hours': self.interval / 3600,
+            'last_run': self.last_run
+        }
+
+
+# Instância global (singleton)
+_log_maintenance = None
+
+
+def get_log_maintenance() -> Optional[LogMaintenance]:
+    """Retorna a manutenção iniciada (None se não configurada)"""
+    return _log_maintenance
+
+
+def start_log_maintenance(session_factory) -> Optional[LogMaintenance]:
+    """Cria e inicia a manutenção de logs (desabilitada com SYSTEM_LOG_MAINTENANCE_ENABLED=false)"""
+    global _log_maintenance
+    if os.getenv('SYSTEM_LOG_MAINTENANCE_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+        return None
+    if _log_maintenance is None:
+        _log_maintenance = LogMaintenance(session_factory)
+    _log_maintenance.start()
+    return _log_maintenance
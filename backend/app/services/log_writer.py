@@ -0,0 +1,221 @@
+"""
+Gravação assíncrona em lote de logs do sistema
+Eventos são enfileirados em memória e inseridos por uma thread de background
+em lotes (por tamanho ou tempo), para que handlers e loops de envio nunca
+esperem pelo commit de um log
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+logger = logging.getLogger(__name__)
+
+
+class SystemLogWriter:
+    """
+    Fila limitada de linhas de log (SystemLog) a inserir.
+
+    Política quando a fila está cheia:
+    - linhas comuns (DEBUG/INFO) são descartadas e contabilizadas em 'dropped'
+    - linhas importantes (WARNING+) descartam o log mais antigo da fila para abrir espaço
+    Nenhuma chamada de escrita bloqueia. Por ser descartável (fila cheia, queda do
+    processo), a fila não serve para registros de negócio: estes são gravados
+    de forma síncrona por quem os produz.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        max_queue: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_seconds: Optional[float] = None
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or int(os.getenv('SYSTEM_LOG_BATCH_SIZE', '200'))
+        self.flush_seconds = flush_seconds if flush_seconds is not None else float(os.getenv('SYSTEM_LOG_FLUSH_SECONDS', '1'))
+        self._queue: "queue.Queue[Tuple[Any, Dict[str, Any]]]" = queue.Queue(
+            maxsize=max_queue or int(os.getenv('SYSTEM_LOG_QUEUE_SIZE', '10000'))
+        )
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    # --------------------------------------------------------------- escrita
+
+    def write(self, model, values: Dict[str, Any], important: bool = False) -> bool:
+        """
+        Enfileira uma linha de log para inserção em background (apenas logs:
+        a linha pode ser descartada).
+
+        Returns:
+            False se a linha foi descartada (fila cheia)
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((model, values))
+        except queue.Full:
+            if not important:
+                self.dropped += 1
+                return False
+            # Linha importante: descartar a mais antiga para abrir espaço
+            try:
+                self._queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait((model, values))
+            except queue.Full:
+                self.dropped += 1
+                return False
+        self.enqueued += 1
+        return True
+
+    def log(self, level, category, message: str, details: Optional[str] = None, **context) -> bool:
+        """Enfileira um SystemLog (created_at é o momento do evento, não do flush)"""
+        from app.models.system_log import SystemLog, LogLevel
+
+        values = {
+            'level': level,
+            'category': category,
+            'message': message,
+            'details': details,
+            'created_at': datetime.now(),
+        }
+        values.update({k: v for k, v in context.items() if v is not None})
+        important = level not in (LogLevel.DEBUG, LogLevel.INFO)
+        return self.write(SystemLog, values, important=important)
+
+    # ----------------------------------------------------------------- flush
+
+    def _drain(self, limit: int) -> List[Tuple[Any, Dict[str, Any]]]:
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _insert(self, items: List[Tuple[Any, Dict[str, Any]]]):
+        """Insere o lote (um INSERT multi-linha por modelo); em erro, tenta linha a linha"""
+        by_model: Dict[Any, List[Dict[str, Any]]] = {}
+        for model, values in items:
+            by_model.setdefault(model, []).append(values)
+
+        db = self.session_factory()
+        try:
+            for model, rows in by_model.items():
+                # executemany exige as mesmas colunas em todas as linhas
+                by_columns: Dict[tuple, List[Dict[str, Any]]] = {}
+                for row in rows:
+                    by_columns.setdefault(tuple(sorted(row)), []).append(row)
+                for same_columns in by_columns.values():
+                    db.execute(insert(model), same_columns)
+            db.commit()
+            self.written += len(items)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Falha ao gravar lote de {len(items)} logs, tentando individualmente: {e}")
+            for model, values in items:
+                try:
+                    db.execute(insert(model), [values])
+                    db.commit()
+                    self.written += 1
+                except Exception as row_error:
+                    db.rollback()
+                    self.failed += 1
+                    print(f"⚠️ Erro ao registrar log no banco: {row_error}")
+        finally:
+            db.close()
+        self.batches += 1
+
+    def flush(self) -> int:
+        """Grava tudo o que está na fila (chamado pela thread, no encerramento ou em testes manuais)"""
+        total = 0
+        with self._flush_lock:
+            while True:
+                items = self._drain(self.batch_size)
+                if not items:
+                    break
+                self._insert(items)
+                total += len(items)
+        return total
+
+    # ---------------------------------------------------------------- thread
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stop.clear()
+                    self._thread = threading.Thread(target=self._run, name='system-log-writer', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Aguardar o lote encher ou o intervalo de flush vencer
+            deadline = time.time() + self.flush_seconds
+            while self._queue.qsize() < self.batch_size and not self._stop.is_set():
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._stop.wait(min(remaining, 0.1))
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Falha no flush de logs: {e}")
+
+    def stop(self, flush: bool = True):
+        """Para a thread e grava o que restou na fila"""
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        if flush:
+            self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'queued': self._queue.qsize(),
+            'max_queue': self._queue.maxsize,
+            'batch_size': self.batch_size,
+            'flush_seconds': self.flush_seconds,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'batches': self.batches
+        }
+
+
+# Instância global (singleton)
+_log_writer = None
+_log_writer_lock = threading.Lock()
+
+
+def get_log_writer(session_factory: Optional[Callable[[], Any]] = None) -> SystemLogWriter:
+    """Retorna o writer singleton (gravação garantida no encerramento do processo)"""
+    global _log_writer
+    if _log_writer is None:
+        with _log_writer_lock:
+            if _log_writer is None:
+                if session_factory is None:
+                    from app.models.base import SessionLocal as session_factory
+                _log_writer = SystemLogWriter(session_factory)
+                atexit.register(_log_writer.stop)
+    return _log_writer
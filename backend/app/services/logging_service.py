@@ -2,12 +2,31 @@
 Serviço de logging do sistema.
 Centraliza a gravação de logs no banco de dados para rastreabilidade.
 """
+import base64
 import json
-from typing import Optional, Dict, Any
+from datetime import datetime
+from typing import Optional, Dict, Any, Tuple
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 from app.models.system_log import SystemLog, LogLevel, LogCategory
 
 
+def encode_log_cursor(created_at: datetime, log_id: int) -> str:
+    """Cursor opaco da paginação keyset: posição (created_at, id) do último log da página"""
+    raw = f"{created_at.isoformat()}|{log_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_log_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decodifica o cursor (ValueError se inválido)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, log_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(log_id)
+    except Exception:
+        raise ValueError("Cursor de paginação inválido")
+
+
 class LoggingService:
     """Serviço para gerenciamento de logs do sistema"""
     
@@ -153,13 +172,36 @@ class LoggingService:
         """Log de integração WhatsApp"""
         return self.info(LogCategory.WHATSAPP, message, details=details, **kwargs)
     
+    def _logs_query(
+        self,
+        level: Optional[LogLevel] = None,
+        category: Optional[LogCategory] = None,
+        user_id: Optional[int] = None,
+        cursor: Optional[str] = None
+    ):
+        """Query filtrada e ordenada por (created_at, id) desc - coberta pelos índices compostos"""
+        query = self.db.query(SystemLog)
+        
+        if level:
+            query = query.filter(SystemLog.level == level)
+        if category:
+            query = query.filter(SystemLog.category == category)
+        if user_id:
+            query = query.filter(SystemLog.user_id == user_id)
+        if cursor:
+            created_at, log_id = decode_log_cursor(cursor)
+            query = query.filter(tuple_(SystemLog.created_at, SystemLog.id) < tuple_(created_at, log_id))
+        
+        return query.order_by(SystemLog.created_at.desc(), SystemLog.id.desc())
+    
     def get_logs(
         self,
         level: Optional[LogLevel] = None,
         category: Optional[LogCategory] = None,
         user_id: Optional[int] = None,
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> list:
         """
         Busca logs com filtros.
@@ -169,25 +211,43 @@ class LoggingService:
             category: Filtrar por categoria
             user_id: Filtrar por usuário
             limit: Quantidade máxima de registros
-            offset: Offset para paginação
+            offset: Offset para paginação (legado; prefira cursor)
+            cursor: Cursor keyset retornado por get_logs_page
         
         Returns:
             Lista de logs
         """
-        query = self.db.query(SystemLog)
+        query = self._logs_query(level, category, user_id, cursor)
+        if offset and not cursor:
+            query = query.offset(offset)
         
-        if level:
-            query = query.filter(SystemLog.level == level)
-        if category:
-            query = query.filter(SystemLog.category == category)
-        if user_id:
-            query = query.filter(SystemLog.user_id == user_id)
+        return [log.to_dict() for log in query.limit(limit).all()]
+    
+    def get_logs_page(
+        self,
+        level: Optional[LogLevel] = None,
+        category: Optional[LogCategory] = None,
+        user_id: Optional[int] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Página de logs com paginação keyset: custo constante em qualquer profundidade.
         
-        logs = query.order_by(SystemLog.created_at.desc()).limit(limit).offset(offset).all()
+        Returns:
+            {'logs': [...], 'next_cursor': str | None, 'has_more': bool}
+        """
+        rows = self._logs_query(level, category, user_id, cursor).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         
-        return [log.to_dict() for log in logs]
+        return {
+            'logs': [log.to_dict() for log in rows],
+            'next_cursor': encode_log_cursor(rows[-1].created_at, rows[-1].id) if has_more else None,
+            'has_more': has_more
+        }
     
     def get_recent_logs(self, limit: int = 50) -> list:
         """Retorna logs recentes"""
-        logs = self.db.query(SystemLog).order_by(SystemLog.created_at.desc()).limit(limit).all()
+        logs = self.db.query(SystemLog).order_by(SystemLog.created_at.desc(), SystemLog.id.desc()).limit(limit).all()
         return [log.to_dict() for log in logs]
@@ -6,7 +6,7 @@ Generates beautiful HTML reports that can be printed to PDF from browser
 import io
 import logging
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
@@ -63,21 +63,43 @@ class ModernReportGenerator:
         'custom': 'Relatório Customizado'
     }
     
-    def __init__(self, db: Session):
+    # Ambiente Jinja2 compartilhado entre instâncias (templates compilados ficam em cache)
+    _shared_jinja_env: Optional[Environment] = None
+    
+    def __init__(self, db: Session, cache=None):
+        """
+        Args:
+            db: Sessão do banco
+            cache: ReportCache opcional para reutilizar gráficos SVG entre relatórios
+        """
         self.db = db
-        
-        # Setup Jinja2 environment
-        template_dir = Path(__file__).parent.parent / 'templates'
-        self.jinja_env = Environment(
-            loader=FileSystemLoader(str(template_dir)),
-            autoescape=select_autoescape(['html', 'xml'])
-        )
-        
-        # Register custom filters
-        self.jinja_env.filters['currency'] = self._format_currency
-        self.jinja_env.filters['percentage'] = self._format_percentage
+        self.cache = cache
+        self.jinja_env = self._get_jinja_env()
+    
+    @classmethod
+    def _get_jinja_env(cls) -> Environment:
+        """Cria o ambiente Jinja2 uma única vez por processo"""
+        if cls._shared_jinja_env is None:
+            template_dir = Path(__file__).parent.parent / 'templates'
+            env = Environment(
+                loader=FileSystemLoader(str(template_dir)),
+                autoescape=select_autoescape(['html', 'xml'])
+            )
+            
+            # Register custom filters
+            env.filters['currency'] = cls._format_currency
+            env.filters['percentage'] = cls._format_percentage
+            cls._shared_jinja_env = env
+        return cls._shared_jinja_env
+    
+    def _cached_chart(self, kind: str, spec: Dict[str, Any], render) -> str:
+        """Renderiza gráfico reaproveitando SVG do cache quando disponível"""
+        if self.cache is None:
+            return render()
+        return self.cache.get_or_render_chart(kind, spec, render)
     
-    def _format_currency(self, value: float) -> str:
+    @staticmethod
+    def _format_currency(value: float) -> str:
         """Format number as Brazilian currency"""
         if value is None or value == '':
             return "R$ 0,00"
@@ -86,7 +108,8 @@ class ModernReportGenerator:
         except (ValueError, TypeError):
             return "R$ 0,00"
     
-    def _format_percentage(self, value: float, decimals: int = 2) -> str:
+    @staticmethod
+    def _format_percentage(value: float, decimals: int = 2) -> str:
         """Format value as percentage"""
         if value is None or value == '':
             return "0,00"
@@ -98,6 +121,14 @@ class ModernReportGenerator:
     def _create_pie_chart(self, data: List[Dict], value_key: str, label_key: str, 
                           title: str = '') -> str:
         """Create a Pygal pie chart and return as SVG string"""
+        spec = {'data': data, 'value_key': value_key, 'label_key': label_key, 'title': title}
+        return self._cached_chart(
+            'pie', spec,
+            lambda: self._render_pie_chart(data, value_key, label_key, title)
+        )
+    
+    def _render_pie_chart(self, data: List[Dict], value_key: str, label_key: str,
+                          title: str = '') -> str:
         pie_chart = pygal.Pie(
             style=self.NEXO_STYLE,
             title=title,
@@ -111,10 +142,10 @@ class ModernReportGenerator:
             inner_radius=0.4,  # Donut style
         )
         
+        total = sum(d.get(value_key, 0) for d in data)
         for item in data:
             label = item.get(label_key, 'N/A')
             value = item.get(value_key, 0)
-            total = sum(d.get(value_key, 0) for d in data)
             pct = (value / total * 100) if total > 0 else 0
             pie_chart.add(f'{label} ({pct:.1f}%)', value)
         
@@ -123,6 +154,15 @@ class ModernReportGenerator:
     def _create_bar_chart(self, data: List[Dict], value_key: str, label_key: str,
                           title: str = '', horizontal: bool = False) -> str:
         """Create a Pygal bar chart and return as SVG string"""
+        spec = {'data': data, 'value_key': value_key, 'label_key': label_key,
+                'title': title, 'horizontal': horizontal}
+        return self._cached_chart(
+            'bar', spec,
+            lambda: self._render_bar_chart(data, value_key, label_key, title, horizontal)
+        )
+    
+    def _render_bar_chart(self, data: List[Dict], value_key: str, label_key: str,
+                          title: str = '', horizontal: bool = False) -> str:
         ChartClass = pygal.HorizontalBar if horizontal else pygal.Bar
         
         bar_chart = ChartClass(
@@ -148,6 +188,16 @@ class ModernReportGenerator:
                            label_key: str, legend_labels: List[str] = None,
                            title: str = '') -> str:
         """Create a Pygal line chart and return as SVG string"""
+        spec = {'data': data, 'value_keys': value_keys, 'label_key': label_key,
+                'legend_labels': legend_labels, 'title': title}
+        return self._cached_chart(
+            'line', spec,
+            lambda: self._render_line_chart(data, value_keys, label_key, legend_labels, title)
+        )
+    
+    def _render_line_chart(self, data: List[Dict], value_keys: List[str],
+                           label_key: str, legend_labels: List[str] = None,
+                           title: str = '') -> str:
         line_chart = pygal.Line(
             style=self.NEXO_STYLE,
             title=title,
@@ -179,7 +229,8 @@ class ModernReportGenerator:
         company: Optional[str] = None,
         division: Optional[str] = None,
         data: Dict[str, Any] = None,
-        user_info: Optional[Dict] = None
+        user_info: Optional[Dict] = None,
+        generation_stamp: Optional[Tuple[str, str]] = None
     ) -> bytes:
         """
         Generate modern PDF report with specified sections
@@ -194,6 +245,8 @@ class ModernReportGenerator:
             division: Filter by division
             data: Pre-fetched data
             user_info: User who generated the report
+            generation_stamp: (date, time) shown as generation time; defaults to now
+                (the report cache passes placeholders and stamps each served copy)
         
         Returns:
             PDF file as bytes
@@ -206,6 +259,7 @@ class ModernReportGenerator:
         division_display = division if division else 'Todos os setores'
         
         now = datetime.now()
+        generation_date, generation_time = generation_stamp or (now.strftime('%d/%m/%Y'), now.strftime('%H:%M:%S'))
         
         context = {
             'title': self.REPORT_NAMES.get(report_type, 'Relatório de RH'),
@@ -215,8 +269,8 @@ class ModernReportGenerator:
             'year': year,
             'company_name': company_display,
             'division_name': division_display,
-            'generation_date': now.strftime('%d/%m/%Y'),
-            'generation_time': now.strftime('%H:%M:%S'),
+            'generation_date': generation_date,
+            'generation_time': generation_time,
             'user_name': user_info.get('name', 'Sistema Nexo RH') if user_info else 'Sistema Nexo RH',
             'user_email': user_info.get('email', '') if user_info else '',
             'sections': sections,
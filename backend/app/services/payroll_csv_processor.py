@@ -147,8 +147,8 @@ class PayrollCSVProcessor:
                 self.db.commit()
                 print(f"✅ Processamento concluído: {self.stats['processed']} registros")
                 
-                # 7. Invalidar cache de indicadores
-                self._invalidate_indicators_cache()
+                # 7. Invalidar cache de indicadores (apenas empresa/mês importados)
+                self._invalidate_indicators_cache(period)
                 
                 # 8. Log de processamento (com commit separado)
                 self._create_processing_log(
@@ -656,13 +656,18 @@ class PayrollCSVProcessor:
         
         return additional
     
-    def _invalidate_indicators_cache(self):
-        """Invalida cache de indicadores"""
+    def _invalidate_indicators_cache(self, period: PayrollPeriod):
+        """Invalida cache de indicadores da empresa/mês do período importado"""
         try:
-            from app.services.hr_indicators import HRIndicatorsService
-            indicators_service = HRIndicatorsService(self.db)
-            indicators_service.invalidate_cache()
-            print("🔄 Cache de indicadores invalidado")
+            from app.services.indicator_cube import publish_indicator_change
+            # A importação grava folha e afastamentos do mês, então todos os tipos são afetados
+            publish_indicator_change(
+                'payroll_import',
+                company=period.company,
+                year=period.year,
+                month=period.month,
+                db=self.db
+            )
         except Exception as e:
             print(f"⚠️ Erro ao invalidar cache: {e}")
     
@@ -246,6 +246,12 @@ class PayrollFormatter:
                 os.remove(temp_path)
             
             if success:
+                from app.services.payroll_manifest import record_generated_payroll
+                record_generated_payroll(
+                    final_path,
+                    month_year=f"{self.year}-{self.month:02d}",
+                    payroll_type=self.payroll_type
+                )
                 return {
                     "success": True,
                     "filename": filename,
@@ -349,6 +355,15 @@ def segment_pdf_by_employee(pdf_path: str,
             
             print(f"📄 PDF tem {total_pages} páginas")
             
+            # Índices de busca montados uma única vez (evita varrer a lista a cada página)
+            employees_by_matricula = {}
+            employees_by_cpf = {}
+            for emp in employees_data:
+                employees_by_matricula.setdefault(formatter.remove_leading_zeros(emp.get('unique_id', '')), emp)
+                emp_cpf = (emp.get('cpf') or '').replace('.', '').replace('-', '')
+                if emp_cpf:
+                    employees_by_cpf.setdefault(emp_cpf, emp)
+            
             # ========== FASE 1: ANALISAR TODAS AS PÁGINAS ==========
             page_info = []
             
@@ -367,19 +382,11 @@ def segment_pdf_by_employee(pdf_path: str,
                 
                 # Primeiro: tentar buscar pela matrícula extraída
                 if extracted_matricula:
-                    for emp in employees_data:
-                        emp_unique_id = emp.get('unique_id', '')
-                        if formatter.remove_leading_zeros(emp_unique_id) == formatter.remove_leading_zeros(extracted_matricula):
-                            employee = emp
-                            break
+                    employee = employees_by_matricula.get(formatter.remove_leading_zeros(extracted_matricula))
                 
                 # Segundo: se não encontrou, tentar por CPF
                 if not employee and cpf:
-                    for emp in employees_data:
-                        emp_cpf = emp.get('cpf', '').replace('.', '').replace('-', '')
-                        if emp_cpf == cpf:
-                            employee = emp
-                            break
+                    employee = employees_by_cpf.get(cpf)
                 
                 # Usar matrícula extraída do PDF ou fallback
                 matricula = extracted_matricula if extracted_matricula else (employee.get('unique_id') if employee else f'UNKNOWN_{page_num + 1}')
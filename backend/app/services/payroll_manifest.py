@@ -0,0 +1,485 @@
+"""
+Manifesto persistido dos holerites individuais gerados
+
+Substitui a varredura recursiva de processed/ (e da pasta legada) a cada
+listagem: os geradores gravam cada PDF ao criá-lo e a reconciliação só relê
+as pastas cujo mtime mudou desde a última passada (criação, remoção ou
+renomeação de arquivos, inclusive a movimentação para enviados/ após o envio).
+A listagem vira uma consulta com filtros e paginação.
+"""
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
+
+from app.models.processed_payroll import ProcessedPayrollFile, ProcessedPayrollFolder
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROCESSED_DIR = os.path.join(BACKEND_DIR, 'processed')
+LEGACY_DIR = os.path.join(BACKEND_DIR, 'holerites_formatados_final')
+
+MONTH_NAMES = {
+    'janeiro': '01', 'fevereiro': '02', 'marco': '03', 'março': '03', 'abril': '04',
+    'maio': '05', 'junho': '06', 'julho': '07', 'agosto': '08',
+    'setembro': '09', 'outubro': '10', 'novembro': '11', 'dezembro': '12'
+}
+
+STATUS_FILTERS = ('ready', 'orphan', 'associated')
+
+
+def parse_payroll_filename(filename: str) -> Tuple[str, str, Optional[str]]:
+    """
+    (unique_id, month_year, payroll_type) a partir do nome do arquivo
+
+    Novo formato: EN_MATRICULA_TIPO_MES_ANO.pdf (matrícula sem zeros à esquerda)
+    Formato antigo: XXXXXXXXX_holerite_mes_ano.pdf
+    """
+    if filename.startswith('EN_'):
+        parts = filename.replace('.pdf', '').split('_')
+        unique_id = parts[1] if len(parts) > 1 else 'unknown'
+        # Formato completo para busca: 5900169 → 005900169
+        if unique_id.isdigit() and len(unique_id) < 9:
+            unique_id = unique_id.zfill(9)
+        if len(parts) >= 5:
+            return unique_id, f"{parts[4]}-{parts[3].zfill(2)}", parts[2]
+        return unique_id, 'desconhecido', None
+
+    parts = filename.split('_')
+    unique_id = parts[0] if parts else 'unknown'
+    month_year = 'desconhecido'
+    if len(parts) >= 4:
+        month_num = MONTH_NAMES.get(parts[2].lower(), '00')
+        month_year = f"{parts[3].replace('.pdf', '')}-{month_num}"
+    return unique_id, month_year, None
+
+
+def _is_payroll_pdf(name: str) -> bool:
+    # temp_*: arquivo intermediário do PayrollFormatter antes da proteção com senha
+    return name.endswith('.pdf') and not name.startswith('temp_')
+
+
+def _phone_ready(employee: Optional[Dict[str, Any]]) -> bool:
+    phone = (employee or {}).get('phone_number', '').strip()
+    return bool(phone) and len(phone) >= 10
+
+
+class PayrollManifest:
+    """
+    Manifesto de processed/** (recursivo) e da pasta legada (só o primeiro nível)
+
+    - record(): chamado pelos geradores ao criar um PDF (uma linha, sem varredura)
+    - reconcile(): stat apenas nas pastas; pastas com mtime novo são relidas
+      com scandir, e só os arquivos ainda desconhecidos recebem stat. Devolve os
+      mtimes lidos, que servem de versão da listagem (ETag) sem nova varredura
+    - query(): filtros por competência, pasta, situação e busca, com paginação
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        processed_dir: str = PROCESSED_DIR,
+        legacy_dir: str = LEGACY_DIR
+    ):
+        self.session_factory = session_factory
+        self.roots = ((os.path.abspath(processed_dir), True), (os.path.abspath(legacy_dir), False))
+        self._lock = threading.Lock()
+        self._employees_version = None
+        self.folders_rescanned = 0
+
+    # ------------------------------------------------------------------ helpers
+
+    def _covers(self, path: str) -> bool:
+        directory = os.path.dirname(path)
+        for root, recursive in self.roots:
+            if directory == root or (recursive and directory.startswith(root + os.sep)):
+                return True
+        return False
+
+    def _folders(self) -> Iterable[Tuple[str, int]]:
+        """(pasta, mtime_ns) de cada pasta coberta pelo manifesto"""
+        for root, recursive in self.roots:
+            stack = [root]
+            while stack:
+                current = stack.pop()
+                try:
+                    mtime_ns = os.stat(current).st_mtime_ns
+                    if recursive:
+                        with os.scandir(current) as entries:
+                            stack.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+                except OSError:
+                    continue
+                yield current, mtime_ns
+
+    @staticmethod
+    def _rows_in(db, folder: str) -> List[ProcessedPayrollFile]:
+        """Linhas dos arquivos diretamente dentro da pasta (sem subpastas)"""
+        prefix = folder + os.sep
+        rows = db.query(ProcessedPayrollFile).filter(
+            ProcessedPayrollFile.folder == os.path.basename(folder),
+            ProcessedPayrollFile.path.startswith(prefix, autoescape=True)
+        ).all()
+        return [row for row in rows if os.path.dirname(row.path) == folder]
+
+    @staticmethod
+    def _employee_id(directory, unique_id: str) -> Optional[int]:
+        employee = directory.by_unique_id(unique_id) if directory is not None else None
+        return employee.get('id') if employee else None
+
+    def _build_row(self, path: str, stat_result, directory, unique_id=None, month_year=None, payroll_type=None) -> ProcessedPayrollFile:
+        filename = os.path.basename(path)
+        parsed_id, parsed_month, parsed_type = parse_payroll_filename(filename)
+        unique_id = str(unique_id or parsed_id)
+        return ProcessedPayrollFile(
+            path=path,
+            filename=filename,
+            folder=os.path.basename(os.path.dirname(path)),
+            unique_id=unique_id,
+            month_year=month_year or parsed_month,
+            payroll_type=payroll_type or parsed_type,
+            size=stat_result.st_size,
+            created_at=datetime.fromtimestamp(stat_result.st_ctime),
+            employee_id=self._employee_id(directory, unique_id)
+        )
+
+    # ------------------------------------------------------------------ escrita
+
+    def record(self, path: str, unique_id: Optional[str] = None, month_year: Optional[str] = None,
+               payroll_type: Optional[str] = None, directory=None) -> bool:
+        """Registra (ou atualiza) um PDF recém-gerado; False se estiver fora das pastas do manifesto"""
+        path = os.path.abspath(path)
+        if not self._covers(path) or not _is_payroll_pdf(os.path.basename(path)):
+            return False
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return False
+        if directory is None:
+            from app.services.employee_directory import get_employee_directory
+            directory = get_employee_directory(self.session_factory)
+
+        row = self._build_row(path, stat_result, directory, unique_id, month_year, payroll_type)
+        db = self.session_factory()
+        try:
+            existing = db.query(ProcessedPayrollFile).filter(ProcessedPayrollFile.path == path).first()
+            if existing:
+                for column in ('filename', 'folder', 'unique_id', 'month_year', 'payroll_type', 'size', 'created_at', 'employee_id'):
+                    setattr(existing, column, getattr(row, column))
+            else:
+                db.add(row)
+            db.commit()
+            return True
+        except IntegrityError:
+            # Outro processo registrou o mesmo caminho ao mesmo tempo
+            db.rollback()
+            return True
+        finally:
+            db.close()
+
+    def discard(self, path: str):
+        """Remove um arquivo do manifesto (excluído ou movido pela aplicação)"""
+        db = self.session_factory()
+        try:
+            db.query(ProcessedPayrollFile).filter(ProcessedPayrollFile.path == os.path.abspath(path)).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------ reconciliação
+
+    def _rescan(self, db, folder: str, directory) -> int:
+        current = {}
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if _is_payroll_pdf(entry.name) and entry.is_file(follow_symlinks=False):
+                        current[entry.path] = entry
+        except OSError:
+            pass
+
+        changes = 0
+        known = set()
+        for row in self._rows_in(db, folder):
+            if row.path in current:
+                known.add(row.path)
+            else:
+                db.delete(row)
+                changes += 1
+        for path, entry in current.items():
+            if path in known:
+                continue
+            try:
+                db.add(self._build_row(path, entry.stat(follow_symlinks=False), directory))
+                changes += 1
+            except OSError:
+                continue
+        return changes
+
+    def _associate(self, db, directory) -> int:
+        """Reassocia matrículas a colaboradores quando o diretório de colaboradores muda"""
+        changes = 0
+        pairs = db.query(ProcessedPayrollFile.unique_id, ProcessedPayrollFile.employee_id).distinct().all()
+        for unique_id, employee_id in pairs:
+            resolved = self._employee_id(directory, unique_id)
+            if resolved != employee_id:
+                changes += db.query(ProcessedPayrollFile).filter(
+                    ProcessedPayrollFile.unique_id == unique_id
+                ).update({ProcessedPayrollFile.employee_id: resolved}, synchronize_session=False)
+        return changes
+
+    def reconcile(self, directory=None) -> Dict[str, int]:
+        """Atualiza o manifesto com o disco; retorna o mtime_ns de cada pasta lida"""
+        if directory is None:
+            from app.services.employee_directory import get_employee_directory
+            directory = get_employee_directory(self.session_factory)
+
+        with self._lock:
+            db = self.session_factory()
+            try:
+                stored = {row.path: row for row in db.query(ProcessedPayrollFolder).all()}
+                changes = 0
+                seen = {}
+                for folder, mtime_ns in self._folders():
+                    seen[folder] = mtime_ns
+                    state = stored.get(folder)
+                    if state is not None and state.mtime_ns == mtime_ns:
+                        continue
+                    # mtime lido antes do scandir: alterações durante a leitura forçam nova passada
+                    changes += self._rescan(db, folder, directory)
+                    if state is None:
+                        db.add(ProcessedPayrollFolder(path=folder, mtime_ns=mtime_ns))
+                    else:
+                        state.mtime_ns = mtime_ns
+                    self.folders_rescanned += 1
+
+                for folder, state in stored.items():
+                    if folder not in seen:
+                        for row in self._rows_in(db, folder):
+                            db.delete(row)
+                            changes += 1
+                        db.delete(state)
+
+                employees_version = directory.version() if directory is not None else None
+                if employees_version != self._employees_version:
+                    db.flush()
+                    changes += self._associate(db, directory)
+
+                db.commit()
+                self._employees_version = employees_version
+                if changes:
+                    print(f"🗂️ Manifesto de holerites reconciliado: {changes} alteração(ões)")
+                return seen
+            except IntegrityError:
+                # Outro processo reconciliou as mesmas pastas; a próxima passada converge
+                db.rollback()
+                return seen
+            finally:
+                db.close()
+
+    # ------------------------------------------------------------------ leitura
+
+    def query(
+        self,
+        month: Optional[str] = None,
+        folder: Optional[str] = None,
+        status: Optional[str] = None,
+        search: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        directory=None
+    ) -> Dict[str, Any]:
+        """
+        Página de arquivos (mais recentes primeiro) no formato da API
+
+        Estatísticas e total consideram competência/pasta/busca; o filtro de
+        situação (ready, orphan, associated) restringe apenas a lista.
+        """
+        if directory is None:
+            from app.services.employee_directory import get_employee_directory
+            directory = get_employee_directory(self.session_factory)
+
+        db = self.session_factory()
+        try:
+            base = db.query(ProcessedPayrollFile)
+            if month:
+                base = base.filter(ProcessedPayrollFile.month_year == month)
+            if folder:
+                base = base.filter(ProcessedPayrollFile.folder == folder)
+            if search:
+                pattern = f"%{search.strip()}%"
+                base = base.filter(or_(
+                    ProcessedPayrollFile.filename.ilike(pattern),
+                    ProcessedPayrollFile.unique_id.ilike(pattern)
+                ))
+
+            # Estatísticas por colaborador (uma linha por employee_id)
+            counts = base.with_entities(
+                ProcessedPayrollFile.employee_id, func.count(ProcessedPayrollFile.id)
+            ).group_by(ProcessedPayrollFile.employee_id).all()
+            ready_ids = []
+            stats = {"total": 0, "ready": 0, "orphan": 0, "associated": 0}
+            for employee_id, count in counts:
+                stats["total"] += count
+                if employee_id is None:
+                    stats["orphan"] += count
+                    continue
+                stats["associated"] += count
+                if _phone_ready(directory.get(employee_id)):
+                    stats["ready"] += count
+                    ready_ids.append(employee_id)
+
+            listing = base
+            if status == 'ready':
+                listing = listing.filter(ProcessedPayrollFile.employee_id.in_(ready_ids or [-1]))
+            elif status == 'orphan':
+                listing = listing.filter(ProcessedPayrollFile.employee_id.is_(None))
+            elif status == 'associated':
+                listing = listing.filter(ProcessedPayrollFile.employee_id.isnot(None))
+            matched = listing.count() if status in STATUS_FILTERS else stats["total"]
+
+            listing = listing.order_by(ProcessedPayrollFile.created_at.desc(), ProcessedPayrollFile.id.desc())
+            if offset:
+                listing = listing.offset(offset)
+            if limit is not None:
+                listing = listing.limit(limit)
+            files = [self._to_dict(row, directory) for row in listing.all()] if limit != 0 else []
+
+            months = [value for (value,) in db.query(ProcessedPayrollFile.month_year).distinct().all()
+                      if value != 'desconhecido']
+            return {
+                "files": files,
+                "statistics": stats,
+                "available_months": sorted(months),
+                "pagination": {"total": matched, "limit": limit, "offset": offset}
+            }
+        finally:
+            db.close()
+
+    @staticmethod
+    def _to_dict(row: ProcessedPayrollFile, directory) -> Dict[str, Any]:
+        employee = directory.get(row.employee_id) if row.employee_id is not None else None
+        return _file_dict(row.filename, row.unique_id, row.month_year, row.folder, row.path,
+                          row.size, row.created_at, employee)
+
+
+def _file_dict(filename: str, unique_id: str, month_year: str, folder: str, path: str,
+               size: int, created_at: Optional[datetime], employee: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Arquivo no formato da API (associado ao colaborador, se houver)"""
+    file_info = {
+        "filename": filename,
+        "unique_id": unique_id,
+        "month_year": month_year,
+        "folder": folder,  # Pasta onde está (ex: Mensal_11_2025)
+        "filepath": path,  # Caminho completo para envio
+        "size": size,
+        "created_at": created_at.isoformat() if created_at else None,
+        "is_orphan": employee is None,
+        "can_send": _phone_ready(employee),
+        "associated_employee": None
+    }
+    if employee:
+        file_info["associated_employee"] = {
+            "id": employee.get('id'),
+            "unique_id": employee.get('unique_id'),
+            "full_name": employee.get('full_name'),
+            "phone_number": (employee.get('phone_number') or '').strip()
+        }
+    return file_info
+
+
+def scan_payroll_files(
+    employees: Iterable[Dict[str, Any]],
+    month: Optional[str] = None,
+    folder: Optional[str] = None,
+    status: Optional[str] = None,
+    search: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    processed_dir: str = PROCESSED_DIR,
+    legacy_dir: str = LEGACY_DIR
+) -> Dict[str, Any]:
+    """
+    Listagem sem banco (modo JSON): varre as pastas a cada chamada
+
+    Mesmos filtros e formato de PayrollManifest.query(), associando pela
+    matrícula aos colaboradores informados.
+    """
+    by_unique_id = {employee.get('unique_id'): employee for employee in employees}
+    needle = search.strip().lower() if search else None
+
+    entries = []
+    for root, recursive in ((processed_dir, True), (legacy_dir, False)):
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as items:
+                    for item in items:
+                        if item.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(item.path)
+                        elif _is_payroll_pdf(item.name) and item.is_file(follow_symlinks=False):
+                            unique_id, month_year, _ = parse_payroll_filename(item.name)
+                            stat_result = item.stat(follow_symlinks=False)
+                            entries.append((item.name, unique_id, month_year, os.path.basename(current),
+                                            item.path, stat_result.st_size,
+                                            datetime.fromtimestamp(stat_result.st_ctime)))
+            except OSError:
+                continue
+
+    months = sorted({entry[2] for entry in entries if entry[2] != 'desconhecido'})
+    matched = []
+    stats = {"total": 0, "ready": 0, "orphan": 0, "associated": 0}
+    for entry in entries:
+        filename, unique_id, month_year, entry_folder = entry[:4]
+        if (month and month_year != month) or (folder and entry_folder != folder):
+            continue
+        if needle and needle not in filename.lower() and needle not in unique_id.lower():
+            continue
+        employee = by_unique_id.get(unique_id)
+        ready = _phone_ready(employee)
+        stats["total"] += 1
+        stats["associated" if employee else "orphan"] += 1
+        stats["ready"] += 1 if ready else 0
+        if status == 'ready' and not ready:
+            continue
+        if (status == 'orphan' and employee) or (status == 'associated' and not employee):
+            continue
+        matched.append((entry, employee))
+
+    matched.sort(key=lambda pair: pair[0][6], reverse=True)
+    page = matched[offset:offset + limit] if limit is not None else matched[offset:]
+    return {
+        "files": [_file_dict(*entry, employee) for entry, employee in page],
+        "statistics": stats,
+        "available_months": months,
+        "pagination": {"total": len(matched), "limit": limit, "offset": offset}
+    }
+
+
+# Instância global (singleton)
+_payroll_manifest = None
+
+
+def get_payroll_manifest(session_factory: Optional[Callable[[], Any]] = None) -> PayrollManifest:
+    """Retorna o manifesto singleton (sem session_factory usa o SessionLocal de app.models.base)"""
+    global _payroll_manifest
+    if _payroll_manifest is None:
+        if session_factory is None:
+            from app.models.base import SessionLocal as session_factory
+        _payroll_manifest = PayrollManifest(session_factory)
+    return _payroll_manifest
+
+
+def record_generated_payroll(path: str, **fields) -> bool:
+    """Registra um PDF gerado sem interromper a geração se o banco estiver indisponível"""
+    try:
+        return get_payroll_manifest().record(path, **fields)
+    except Exception as e:
+        logger.warning("Manifesto de holerites: falha ao registrar %s: %s", path, e)
+        return False
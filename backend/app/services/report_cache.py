@@ -0,0 +1,127 @@
+"""
+Cache de relatórios HTML e gráficos SVG
+Evita re-renderizar Jinja2/Pygal quando parâmetros e dados não mudaram
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.models.employee import Employee
+from app.models.leave import LeaveRecord
+from app.models.payroll import PayrollData
+
+logger = logging.getLogger(__name__)
+
+# Marcadores da data/hora de geração no HTML em cache (preenchidos a cada entrega)
+GENERATION_DATE_TOKEN = '@@GENERATION_DATE@@'
+GENERATION_TIME_TOKEN = '@@GENERATION_TIME@@'
+GENERATION_STAMP = (GENERATION_DATE_TOKEN, GENERATION_TIME_TOKEN)
+
+
+def stamp_generation(html: str, when: datetime) -> str:
+    """Preenche a data/hora de geração de um relatório renderizado com GENERATION_STAMP"""
+    return html.replace(GENERATION_DATE_TOKEN, when.strftime('%d/%m/%Y')).replace(
+        GENERATION_TIME_TOKEN, when.strftime('%H:%M:%S')
+    )
+
+
+def _fingerprint(payload: Any) -> str:
+    """Hash estável (sha256) de uma estrutura serializável"""
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def compute_data_version(db: Session) -> str:
+    """
+    Versão dos dados usados nos relatórios.
+
+    Combina a última modificação e a contagem de folha, afastamentos e
+    colaboradores numa única query; a contagem captura exclusões que não
+    alteram o max(updated_at).
+    """
+    payroll_ts = func.coalesce(PayrollData.updated_at, PayrollData.created_at)
+    leave_ts = func.coalesce(LeaveRecord.updated_at, LeaveRecord.created_at)
+    employee_ts = func.coalesce(Employee.updated_at, Employee.created_at)
+
+    row = db.execute(select(
+        select(func.max(payroll_ts)).scalar_subquery(),
+        select(func.count(PayrollData.id)).scalar_subquery(),
+        select(func.max(leave_ts)).scalar_subquery(),
+        select(func.count(LeaveRecord.id)).scalar_subquery(),
+        select(func.max(employee_ts)).scalar_subquery(),
+        select(func.count(Employee.id)).scalar_subquery(),
+    )).one()
+
+    return '|'.join(str(v) for v in row)
+
+
+class ReportCache:
+    """
+    Cache em dois níveis para o gerador de relatórios:
+    - relatórios completos, chaveados por parâmetros + versão dos dados
+    - gráficos SVG individuais, chaveados pelo conteúdo (reutilizados entre relatórios)
+    """
+
+    def __init__(self, max_reports: Optional[int] = None, max_charts: Optional[int] = None):
+        max_reports = max_reports or int(os.getenv('REPORT_CACHE_MAX_ENTRIES', '20'))
+        max_charts = max_charts or int(os.getenv('REPORT_CHART_CACHE_MAX_ENTRIES', '200'))
+        self.reports = LRUCache(maxsize=max_reports, name='reports')
+        self.charts = LRUCache(maxsize=max_charts, name='report_charts')
+
+    def make_report_key(self, data_version: str, **params) -> str:
+        """
+        Chave do relatório: parâmetros da requisição + versão dos dados + dia
+        (idade, tempo de casa e outros números relativos à data atual)
+        """
+        return _fingerprint({'params': params, 'data_version': data_version, 'day': date.today().isoformat()})
+
+    def get_report(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.reports.get(key)
+
+    def set_report(self, key: str, entry: Dict[str, Any]):
+        self.reports.set(key, entry)
+
+    def get_or_render_chart(self, kind: str, spec: Dict[str, Any], render: Callable[[], str]) -> str:
+        """Retorna SVG em cache para (tipo de gráfico + dados) ou renderiza e armazena"""
+        key = _fingerprint({'kind': kind, 'spec': spec})
+        return self.charts.get_or_set(key, render)
+
+    def invalidate_reports(self, payload=None):
+        """
+        Descarta relatórios renderizados (gráficos são chaveados pelo conteúdo e continuam válidos).
+        
+        Inscrito no barramento de versões: a chave já inclui a versão dos dados,
+        então isto apenas libera memória de relatórios que não serão mais servidos.
+        """
+        self.reports.clear()
+
+    def clear(self):
+        """Descarta relatórios e gráficos em cache"""
+        self.reports.clear()
+        self.charts.clear()
+        logger.info("Cache de relatórios limpo")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'reports': self.reports.stats(),
+            'charts': self.charts.stats()
+        }
+
+
+# Instância global (singleton)
+_report_cache = None
+
+
+def get_report_cache() -> ReportCache:
+    """Retorna instância singleton do cache de relatórios"""
+    global _report_cache
+    if _report_cache is None:
+        _report_cache = ReportCache()
+    return _report_cache
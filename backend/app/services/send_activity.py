@@ -0,0 +1,258 @@
+"""
+Feed de atividades de envio (holerites + comunicados)
+Uma única consulta UNION ALL ordenada por (sent_at, tipo, id) no banco, com
+paginação keyset: cada ramo lê apenas as linhas da página pelo índice
+(sent_at, id), então o custo não cresce com o histórico de envios
+"""
+import base64
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import String, and_, func, literal, null, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.communication_recipient import CommunicationRecipient
+from app.models.communication_send import CommunicationSend
+from app.models.employee import Employee
+from app.models.payroll_send import PayrollSend
+from app.models.user import User
+
+PAYROLL = 'payroll'
+COMMUNICATION = 'communication'
+
+# Status da API -> status gravado
+_STATUS_FILTERS = {'success': 'sent', 'failed': 'failed'}
+
+# Acima disso o total é estimado pelo planejador (PostgreSQL) em vez de contado
+COUNT_CAP = 10000
+
+
+def encode_activity_cursor(sent_at: datetime, kind: str, row_id: int) -> str:
+    """Cursor opaco: posição (sent_at, tipo, id) do último item da página"""
+    raw = f"{sent_at.isoformat()}|{kind}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_activity_cursor(cursor: str) -> Tuple[datetime, str, int]:
+    """Decodifica o cursor (ValueError se inválido)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        sent_at, kind, row_id = raw.rsplit('|', 2)
+        if kind not in (PAYROLL, COMMUNICATION):
+            raise ValueError(kind)
+        return datetime.fromisoformat(sent_at), kind, int(row_id)
+    except Exception:
+        raise ValueError("Cursor de paginação inválido")
+
+
+def _parse_day(value: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(value) if value else None
+
+
+class SendActivityFeed:
+    """Consulta paginada das atividades de envio"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ------------------------------------------------------------- consultas
+
+    def _branches(
+        self,
+        send_type: str,
+        status: str,
+        date_from: Optional[str],
+        date_to: Optional[str],
+        cursor: Optional[Tuple[datetime, str, int]]
+    ) -> List[Tuple[str, Any, Any, Any]]:
+        """(tipo, select filtrado, coluna sent_at, coluna id) de cada ramo solicitado"""
+        day_from, day_to = _parse_day(date_from), _parse_day(date_to)
+        status_value = _STATUS_FILTERS.get(status)
+        branches = []
+
+        if send_type in ('all', 'payrolls'):
+            stmt = select(
+                literal(PAYROLL, String).label('kind'),
+                PayrollSend.id.label('id'),
+                PayrollSend.employee_id.label('employee_id'),
+                Employee.name.label('employee_name'),
+                User.username.label('sent_by_user'),
+                PayrollSend.status.label('status'),
+                PayrollSend.sent_at.label('sent_at'),
+                PayrollSend.month.label('month'),
+                null().cast(String).label('title'),
+                PayrollSend.error_message.label('error_message'),
+            ).select_from(PayrollSend).outerjoin(
+                Employee, Employee.id == PayrollSend.employee_id
+            ).outerjoin(
+                User, User.id == PayrollSend.user_id
+            )
+            branches.append((PAYROLL, stmt, PayrollSend.sent_at, PayrollSend.id, PayrollSend.status))
+
+        if send_type in ('all', 'communications'):
+            stmt = select(
+                literal(COMMUNICATION, String).label('kind'),
+                CommunicationRecipient.id.label('id'),
+                CommunicationRecipient.employee_id.label('employee_id'),
+                Employee.name.label('employee_name'),
+                User.username.label('sent_by_user'),
+                CommunicationRecipient.status.label('status'),
+                CommunicationRecipient.sent_at.label('sent_at'),
+                null().cast(String).label('month'),
+                CommunicationSend.title.label('title'),
+                CommunicationRecipient.error_message.label('error_message'),
+            ).select_from(CommunicationRecipient).outerjoin(
+                Employee, Employee.id == CommunicationRecipient.employee_id
+            ).outerjoin(
+                CommunicationSend, CommunicationSend.id == CommunicationRecipient.communication_send_id
+            ).outerjoin(
+                User, User.id == CommunicationSend.user_id
+            )
+            branches.append((COMMUNICATION, stmt, CommunicationRecipient.sent_at,
+                             CommunicationRecipient.id, CommunicationRecipient.status))
+
+        filtered = []
+        for kind, stmt, sent_at, row_id, status_col in branches:
+            # Filtros comparam a coluna diretamente (sem func.date) para usar o índice
+            conditions = [sent_at.isnot(None)]
+            if day_from:
+                conditions.append(sent_at >= datetime.combine(day_from, datetime.min.time()))
+            if day_to:
+                conditions.append(sent_at < datetime.combine(day_to + timedelta(days=1), datetime.min.time()))
+            if status_value:
+                conditions.append(status_col == status_value)
+            if cursor:
+                conditions.append(self._after_cursor(kind, sent_at, row_id, cursor))
+            filtered.append((kind, stmt.where(and_(*conditions)), sent_at, row_id))
+        return filtered
+
+    @staticmethod
+    def _after_cursor(kind, sent_at, row_id, cursor):
+        """Linhas depois do cursor na ordem (sent_at DESC, tipo DESC, id DESC)"""
+        cursor_at, cursor_kind, cursor_id = cursor
+        if kind < cursor_kind:
+            # Mesmo sent_at, tipo menor: vem depois do cursor
+            return sent_at <= cursor_at
+        if kind > cursor_kind:
+            return sent_at < cursor_at
+        return or_(sent_at < cursor_at, and_(sent_at == cursor_at, row_id < cursor_id))
+
+    def page(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        send_type: str = 'all',
+        status: str = 'all',
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Página do feed.
+
+        Args:
+            cursor: Cursor retornado pela página anterior (keyset)
+            offset: Deslocamento (legado, sem cursor); cada ramo lê offset + limit linhas
+
+        Returns:
+            {'data': [...], 'next_cursor': str | None, 'has_more': bool}
+        """
+        position = decode_activity_cursor(cursor) if cursor else None
+        if position:
+            offset = 0
+        branches = self._branches(send_type, status, date_from, date_to, position)
+        if not branches:
+            return {'data': [], 'next_cursor': None, 'has_more': False}
+
+        # Cada ramo traz só o necessário para a página (index scan em sent_at, id)
+        window = offset + limit + 1
+        parts = [
+            select(stmt.order_by(sent_at.desc(), row_id.desc()).limit(window).subquery())
+            for _, stmt, sent_at, row_id in branches
+        ]
+        merged = (union_all(*parts) if len(parts) > 1 else parts[0]).subquery('activity')
+        rows = self.db.execute(
+            select(merged)
+            .order_by(merged.c.sent_at.desc(), merged.c.kind.desc(), merged.c.id.desc())
+            .offset(offset)
+            .limit(limit + 1)
+        ).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        last = rows[-1] if rows else None
+        return {
+            'data': [self._to_dict(row) for row in rows],
+            'next_cursor': encode_activity_cursor(last.sent_at, last.kind, last.id) if has_more else None,
+            'has_more': has_more
+        }
+
+    def count(
+        self,
+        send_type: str = 'all',
+        status: str = 'all',
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        cap: int = COUNT_CAP
+    ) -> Tuple[int, bool]:
+        """
+        Total de atividades para os filtros.
+
+        Conta no máximo `cap` linhas por ramo; acima disso usa a estimativa
+        do planejador (PostgreSQL; nos demais bancos, contagem exata).
+
+        Returns:
+            (total, é_estimativa)
+        """
+        total = 0
+        estimated = False
+        for _, stmt, sent_at, row_id in self._branches(send_type, status, date_from, date_to, None):
+            bounded = stmt.with_only_columns(row_id).limit(cap + 1).subquery()
+            counted = self.db.execute(select(func.count()).select_from(bounded)).scalar() or 0
+            if counted <= cap:
+                total += counted
+                continue
+            unbounded = stmt.with_only_columns(row_id)
+            estimate = self._planner_estimate(unbounded)
+            if estimate is None:
+                # Sem planejador para consultar (SQLite): contagem exata
+                total += self.db.execute(select(func.count()).select_from(unbounded.subquery())).scalar() or 0
+                continue
+            total += max(estimate, counted)
+            estimated = True
+        return total, estimated
+
+    def _planner_estimate(self, stmt) -> Optional[int]:
+        """Linhas estimadas pelo EXPLAIN (None fora do PostgreSQL)"""
+        bind = self.db.get_bind()
+        if bind.dialect.name != 'postgresql':
+            return None
+        compiled = stmt.compile(dialect=bind.dialect)
+        plan = self.db.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+        ).scalar()
+        try:
+            return int(plan[0]['Plan']['Plan Rows'])
+        except (TypeError, KeyError, IndexError, ValueError):
+            return None
+
+    # ------------------------------------------------------------ formatação
+
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        item = {
+            'id': f'{row.kind}_{row.id}',
+            'type': row.kind,
+            'employee_name': row.employee_name or 'Desconhecido',
+            'employee_id': row.employee_id,
+            'sent_by_user': row.sent_by_user or 'Sistema',
+            'status': row.status,
+            'sent_at': row.sent_at.isoformat() if row.sent_at else None,
+            'error_message': row.error_message
+        }
+        # Mesmo formato de antes: month só em holerites, title só em comunicados
+        if row.kind == PAYROLL:
+            item['month'] = row.month
+        else:
+            item['title'] = row.title
+        return item
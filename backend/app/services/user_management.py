@@ -10,7 +10,8 @@ import logging
 # Imports dos modelos
 from app.models.user import User
 from app.models.permission import Permission, Role, RolePermission
-from app.core.auth import get_password_hash
+from app.core.security import get_password_hash
+from app.services.auth_cache import invalidate_auth_user
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -208,6 +209,7 @@ class UserManagementService:
                     user.permissions.append(permission)
             
             self.db.commit()
+            invalidate_auth_user(user_id=user_id)
             
             logger.info(f"Permissões do usuário {user.username} atualizadas")
             return {"success": True, "message": "Permissões atualizadas com sucesso"}
@@ -320,6 +322,7 @@ class UserManagementService:
                     setattr(user, field, value)
             
             self.db.commit()
+            invalidate_auth_user(user_id=user_id)
             
             return {
                 "success": True,
@@ -362,6 +365,7 @@ class UserManagementService:
             user.email = f"deleted_{user.id}_{user.email}"  # Prevenir conflitos futuros
             
             self.db.commit()
+            invalidate_auth_user(user_id=user_id)
             
             return {
                 "success": True,
@@ -11,6 +11,7 @@ import json
 # Imports dos modelos
 from app.models.user import User
 from app.models.role_simple import Role
+from app.services.auth_cache import invalidate_auth_user
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -154,6 +155,7 @@ class UserManagementServiceSimple:
             
             self.db.commit()
             self.db.refresh(user)
+            invalidate_auth_user(user_id=user.id)
             
             print(f"Usuário atualizado: {user.username}")
             return {
@@ -179,6 +181,7 @@ class UserManagementServiceSimple:
             # Soft delete - marca como inativo
             user.is_active = False
             self.db.commit()
+            invalidate_auth_user(user_id=user.id)
             
             print(f"Usuário deletado (inativo): {user.username}")
             return {"success": True, "message": "Usuário deletado com sucesso"}
@@ -0,0 +1,140 @@
+"""
+Métricas demográficas e de tempo de casa calculadas de forma vetorizada
+Busca apenas as colunas necessárias da população do mês (tuplas, sem ORM)
+e faz faixas/médias com numpy
+"""
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.employee import Employee
+from app.models.payroll import PayrollData, PayrollPeriod
+
+# Faixas usadas pelas telas de indicadores (limites superiores exclusivos)
+AGE_EDGES = [25, 35, 45, 55]
+AGE_LABELS = ['18-24', '25-34', '35-44', '45-54', '55+']
+TENURE_DAY_EDGES = [365, 1095, 1825, 3650]
+TENURE_LABELS = ['0-1 ano', '1-3 anos', '3-5 anos', '5-10 anos', '10+ anos']
+
+
+class WorkforceProfile:
+    """
+    Projeção colunar (sexo, nascimento, admissão, departamento) da população de um mês.
+
+    Datas ausentes ficam mascaradas (has_birth / has_admission).
+    """
+
+    def __init__(self, rows: Sequence[tuple]):
+        count = len(rows)
+        self.size = count
+        self.sex = np.array([r[0] for r in rows], dtype=object)
+        self.department = np.array([r[3] for r in rows], dtype=object)
+
+        # Nascimento como inteiro AAAAMMDD: idade exata = (ref - nasc) // 10000
+        self.birth_ymd = np.fromiter(
+            (r[1].year * 10000 + r[1].month * 100 + r[1].day if r[1] else 0 for r in rows),
+            dtype=np.int64, count=count
+        )
+        self.admission_ordinal = np.fromiter(
+            (r[2].toordinal() if r[2] else 0 for r in rows),
+            dtype=np.int64, count=count
+        )
+        self.has_birth = self.birth_ymd > 0
+        self.has_admission = self.admission_ordinal > 0
+
+    def ages(self, reference: date) -> np.ndarray:
+        """Idade em anos completos na data de referência (apenas quem tem nascimento)"""
+        ref_ymd = reference.year * 10000 + reference.month * 100 + reference.day
+        return (ref_ymd - self.birth_ymd[self.has_birth]) // 10000
+
+    def tenure_days(self, reference: date) -> np.ndarray:
+        """Dias de casa na data de referência (apenas quem tem admissão)"""
+        return reference.toordinal() - self.admission_ordinal[self.has_admission]
+
+
+def load_workforce_profile(
+    db: Session,
+    year: int,
+    month: int,
+    company: Optional[str] = 'all',
+    division: Optional[str] = 'all'
+) -> WorkforceProfile:
+    """Carrega a projeção dos colaboradores com folha no mês (uma única query)"""
+    population = select(PayrollData.employee_id).join(
+        PayrollPeriod, PayrollData.period_id == PayrollPeriod.id
+    ).where(
+        PayrollPeriod.year == year,
+        PayrollPeriod.month == month
+    )
+    if company and company != 'all':
+        population = population.where(PayrollPeriod.company == company)
+
+    query = db.query(
+        Employee.sex,
+        Employee.birth_date,
+        Employee.admission_date,
+        Employee.department
+    ).filter(Employee.id.in_(population))
+
+    if division and division != 'all':
+        query = query.filter(Employee.department == division)
+
+    return WorkforceProfile(query.all())
+
+
+def bucket_counts(values: np.ndarray, edges: List[float], labels: List[str]) -> List[tuple]:
+    """Conta valores por faixa ([edge[i-1], edge[i])); retorna apenas faixas não vazias, em ordem"""
+    if not len(values):
+        return []
+    counts = np.bincount(np.digitize(values, edges), minlength=len(labels))
+    return [(label, int(c)) for label, c in zip(labels, counts) if c]
+
+
+def demographics_metrics(profile: WorkforceProfile, today: Optional[date] = None) -> Dict[str, Any]:
+    """Idade média, distribuição por sexo e faixas etárias (formato das telas de indicadores)"""
+    today = today or date.today()
+
+    sexes = profile.sex[profile.sex != None]  # noqa: E711 - comparação elemento a elemento
+    sex_values, sex_counts = np.unique(sexes.astype(str), return_counts=True) if len(sexes) else ([], [])
+    by_sex = [(s, int(c)) for s, c in zip(sex_values, sex_counts)]
+
+    ages = profile.ages(today)
+    male_count = next((c for s, c in by_sex if s == 'M'), 0)
+    female_count = next((c for s, c in by_sex if s == 'F'), 0)
+
+    return {
+        'average_age': int(round(float(ages.mean()))) if len(ages) else 0,
+        'male_count': male_count,
+        'female_count': female_count,
+        'total_employees': male_count + female_count,
+        'by_sex': [{'sex': s or 'Não informado', 'count': c} for s, c in by_sex],
+        'age_ranges': [{'range': r, 'count': c} for r, c in bucket_counts(ages, AGE_EDGES, AGE_LABELS)]
+    }
+
+
+def tenure_metrics(profile: WorkforceProfile, reference_date: date) -> Dict[str, Any]:
+    """Tempo médio de casa, faixas e média por departamento (formato das telas de indicadores)"""
+    days = profile.tenure_days(reference_date)
+    average_days = float(days.mean()) if len(days) else 0.0
+
+    # Média por departamento: agrupamento por índice + somas ponderadas
+    departments = profile.department[profile.has_admission]
+    with_department = departments != None  # noqa: E711
+    by_department = []
+    if with_department.any():
+        names, inverse = np.unique(departments[with_department].astype(str), return_inverse=True)
+        sums = np.bincount(inverse, weights=days[with_department])
+        counts = np.bincount(inverse)
+        for name, total, count in zip(names, sums, counts):
+            by_department.append({'department': name, 'avg_months': int(round(total / count / 30.44))})
+
+    return {
+        'average_tenure_years': int(round(average_days / 365.25)),
+        'average_tenure_months': int(round(average_days / 30.44)),
+        'total_employees': int(len(days)),
+        'tenure_ranges': [{'range': r, 'count': c} for r, c in bucket_counts(days, TENURE_DAY_EDGES, TENURE_LABELS)],
+        'by_department': by_department
+    }
@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+Gerador de dados sintéticos (determinístico) para os benchmarks dos pipelines
+
+Produz, para N colaboradores ao longo de M meses (admissões, desligamentos,
+férias e afastamentos mês a mês):
+  - roster.csv                          cadastro de colaboradores (formato do banco)
+  - folha/<empresa>/MM-YYYY.CSV         folha mensal: colunas de CSV_COLUMN_MAPPING
+                                        + colunas do layout real lidas pelo
+                                        PayrollCSVProcessor (Situação, Salário Mensal...),
+                                        ';', latin-1, números no formato 1.234,56
+  - cartao_ponto/cartao_ponto_MM-YYYY.xlsx   layout do TimecardXLSXProcessor
+  - beneficios/<empresa>/beneficios_MM-YYYY.xlsx   layout do BenefitsXLSXProcessor
+  - holerites/<empresa>/holerites_MM-YYYY.pdf   PDF consolidado (1 página por
+                                        holerite, algumas com 2) no layout lido por
+                                        segment_pdf_by_employee
+
+Matrículas, CPFs e nomes são consistentes entre todos os arquivos e o roster,
+então os processadores encontram os colaboradores como em produção.
+
+Uso (a partir de backend/):
+    python benchmarks/dataset_generator.py --employees 1000 --months 36 --output /tmp/dataset
+    python benchmarks/dataset_generator.py --employees 50000 --months 36 --pdf-months 1 --output /tmp/grande
+
+Também importável (benchmarks/pipeline_benchmark.py):
+    dataset = SyntheticDataset(DatasetSpec(employees=1000, months=3))
+    dataset.write_payroll_csv(directory, 2026, 9, '0060')
+"""
+import argparse
+import calendar
+import csv
+import os
+import random
+import sys
+import time
+import unicodedata
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COMPANIES = {'0060': 'Empreendimentos', '0059': 'Infraestrutura'}
+FIRST_NAMES_F = ['Ana', 'Maria', 'Juliana', 'Fernanda', 'Patrícia', 'Camila', 'Letícia', 'Vitória',
+                 'Beatriz', 'Luana', 'Gabriela', 'Jéssica', 'Aline', 'Bruna', 'Débora', 'Sônia']
+FIRST_NAMES_M = ['João', 'José', 'Carlos', 'Lucas', 'Marcos', 'Rafael', 'Paulo', 'André',
+                 'Felipe', 'Gustavo', 'Rodrigo', 'Thiago', 'Anderson', 'Sérgio', 'Vinícius', 'Márcio']
+SURNAMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Pereira', 'Costa', 'Rodrigues', 'Almeida',
+            'Nascimento', 'Lima', 'Araújo', 'Fernandes', 'Carvalho', 'Gomes', 'Martins', 'Rocha',
+            'Ribeiro', 'Schmitt', 'Moreira', 'Conceição', 'Barbosa', 'Moraes', 'Vieira', 'Becker']
+DEPARTMENTS = ['Obras', 'Administrativo', 'Engenharia', 'Comercial', 'Manutenção', 'Suprimentos', 'RH']
+# (cargo, CBO, faixa salarial, periculosidade)
+POSITIONS = [
+    ('Servente de Obras', '717020', (1600, 2100), False),
+    ('Pedreiro', '715210', (2300, 3200), False),
+    ('Eletricista', '715615', (2800, 4200), True),
+    ('Operador de Máquinas', '715125', (3000, 4500), True),
+    ('Auxiliar Administrativo', '411005', (1900, 2700), False),
+    ('Analista Financeiro', '252525', (4200, 7500), False),
+    ('Engenheiro Civil', '214205', (9000, 16000), False),
+    ('Técnico de Segurança', '351605', (3800, 5500), True),
+    ('Vendedor', '521110', (2200, 3800), False),
+    ('Coordenador de Obras', '710205', (7000, 11000), False),
+]
+MARITAL_STATUS = ['Solteiro', 'Casado', 'Divorciado', 'União Estável', 'Viúvo']
+CONTRACT_TYPES = ['CLT'] * 18 + ['Estágio', 'Aprendiz']
+SITUATION_DESCRIPTIONS = {
+    1: 'Trabalhando',
+    2: 'Férias',
+    3: 'Auxílio Doença',
+    7: 'Demitido',
+    9: 'Licença Remunerada',
+    13: 'Licença Maternidade',
+    14: 'Auxílio Doença até 15 dias',
+    23: 'Auxílio Doença dentro de 60 dias',
+    31: 'Licença Paternidade',
+}
+# Colunas do layout real que o PayrollCSVProcessor lê além de CSV_COLUMN_MAPPING
+REAL_LAYOUT_COLUMNS = [
+    'Salário Mensal', 'Horas Extras 50% Diurnas', 'Horas Extras 100% Diurnas', 'Adicional Noturno',
+    'Periculosidade', 'Horas Faltas Diurnas', 'Atestado Médico', 'Situação', 'Descrição'
+]
+TIMECARD_COLUMNS = ['Nº Folha', 'Nome', 'Normais', 'Ex50%', 'Ex100%', 'EN50%', 'EN100%',
+                    'Not.', 'Faltas', 'DSR.Deb', 'Abono2']
+BENEFITS_COLUMNS = ['CPF', 'Nome', 'Refeicao', 'Alimentacao', 'Mobilidade', 'Livre']
+
+
+@dataclass
+class DatasetSpec:
+    employees: int = 1000
+    months: int = 36
+    end_year: int = 2026
+    end_month: int = 9
+    monthly_turnover: float = 0.02     # Fração desligada (e reposta) por mês
+    seed: int = 42
+
+
+def format_br_number(value: float) -> str:
+    """1234.5 → '1.234,50' (formato do CSV exportado pela folha)"""
+    return f"{value:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+def format_br_date(value: Optional[date]) -> str:
+    return value.strftime('%d/%m/%Y') if value else ''
+
+
+def make_cpf(index: int, seed: int) -> str:
+    """CPF válido (dígitos verificadores corretos) e único por índice"""
+    # 7919 é primo com 10**9: índices distintos geram bases distintas
+    base = [int(d) for d in f"{(index * 7919 + seed * 104729 + 100000000) % 10**9:09d}"]
+    for length in (9, 10):
+        total = sum(digit * weight for digit, weight in zip(base, range(length + 1, 1, -1)))
+        remainder = total * 10 % 11
+        base.append(0 if remainder == 10 else remainder)
+    digits = ''.join(map(str, base))
+    return f"{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+
+
+def _ascii(text: str) -> str:
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+
+
+def _month_end(year: int, month: int) -> date:
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+class SyntheticDataset:
+    """Roster e movimentação mensal sintéticos; gera os arquivos de cada pipeline"""
+
+    def __init__(self, spec: Optional[DatasetSpec] = None):
+        self.spec = spec or DatasetSpec()
+        self._periods = self._build_periods()
+        self.employees: List[Dict[str, Any]] = self._build_roster()
+
+    # ------------------------------------------------------------------ roster
+
+    def _build_periods(self) -> List[Tuple[int, int]]:
+        year, month = self.spec.end_year, self.spec.end_month
+        periods = []
+        for _ in range(self.spec.months):
+            periods.append((year, month))
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        return list(reversed(periods))
+
+    def periods(self) -> List[Tuple[int, int]]:
+        """(ano, mês) do mais antigo ao mais recente"""
+        return list(self._periods)
+
+    def _new_employee(self, rng: random.Random, index: int, cadastro: Dict[str, int],
+                      admission: date) -> Dict[str, Any]:
+        company = '0060' if rng.random() < 0.6 else '0059'
+        cadastro[company] += 1
+        sex = 'F' if rng.random() < 0.42 else 'M'
+        first = rng.choice(FIRST_NAMES_F if sex == 'F' else FIRST_NAMES_M)
+        name = f"{first} {rng.choice(SURNAMES)} {rng.choice(SURNAMES)}"
+        position, cbo, (low, high), hazard = rng.choice(POSITIONS)
+        birth = admission - timedelta(days=rng.randint(18 * 365, 55 * 365))
+        return {
+            'index': index,
+            'unique_id': f"{company}{cadastro[company]:05d}",
+            'cadastro': cadastro[company],
+            'company_code': company,
+            'name': name,
+            'cpf': make_cpf(index, self.spec.seed),
+            'phone': f"55{rng.choice(['47', '48', '41', '11'])}9{rng.randint(10000000, 99999999)}",
+            'email': f"{_ascii(first).lower()}.{index}@exemplo.com.br",
+            'sex': sex,
+            'birth_date': birth,
+            'marital_status': rng.choice(MARITAL_STATUS),
+            'admission_date': admission,
+            'termination_date': None,
+            'contract_type': rng.choice(CONTRACT_TYPES),
+            'department': rng.choice(DEPARTMENTS),
+            'position': position,
+            'cbo': cbo,
+            'sector': COMPANIES[company],
+            'salary': round(rng.uniform(low, high), 2),
+            'hazard': hazard,
+        }
+
+    def _build_roster(self) -> List[Dict[str, Any]]:
+        """Quadro inicial de `employees` pessoas + reposições dos desligamentos de cada mês"""
+        rng = random.Random(self.spec.seed)
+        first_year, first_month = self._periods[0]
+        start = date(first_year, first_month, 1)
+        cadastro = {company: 100 for company in COMPANIES}
+        roster = [self._new_employee(rng, i, cadastro, start - timedelta(days=rng.randint(30, 20 * 365)))
+                  for i in range(self.spec.employees)]
+
+        active = list(range(len(roster)))
+        for year, month in self._periods:
+            leaving = int(len(active) * self.spec.monthly_turnover)
+            for position in sorted(rng.sample(range(len(active)), leaving), reverse=True):
+                employee = roster[active.pop(position)]
+                employee['termination_date'] = date(year, month, rng.randint(1, 28))
+            for _ in range(leaving):
+                admission = date(year, month, rng.randint(1, 28))
+                roster.append(self._new_employee(rng, len(roster), cadastro, admission))
+                active.append(len(roster) - 1)
+        return roster
+
+    def employee_records(self) -> List[Dict[str, Any]]:
+        """Linhas para a tabela employees (bulk_insert_mappings)"""
+        fields = ('unique_id', 'name', 'cpf', 'phone', 'email', 'department', 'position', 'company_code',
+                  'sector', 'sex', 'birth_date', 'marital_status', 'admission_date', 'contract_type',
+                  'termination_date')
+        records = []
+        for employee in self.employees:
+            record = {field: employee[field] for field in fields}
+            record['registration_number'] = str(employee['cadastro'])
+            record['is_active'] = employee['termination_date'] is None
+            record['employment_status'] = 'Ativo' if record['is_active'] else 'Desligado'
+            # bulk_insert_mappings não dispara os eventos do modelo que mantêm as chaves MMDD
+            for field in ('birth', 'admission'):
+                value = record[f'{field}_date']
+                record[f'{field}_month_day'] = value.month * 100 + value.day if value else None
+            records.append(record)
+        return records
+
+    def employees_data(self, company: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Formato de employees_data esperado por segment_pdf_by_employee"""
+        return [{'unique_id': e['unique_id'], 'cpf': e['cpf'], 'full_name': e['name'],
+                 'phone_number': e['phone']}
+                for e in self.employees if company is None or e['company_code'] == company]
+
+    # ------------------------------------------------------------ mês a mês
+
+    def active(self, year: int, month: int, company: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Colaboradores com vínculo em algum dia do mês (desligados no mês inclusos)"""
+        first, last = date(year, month, 1), _month_end(year, month)
+        return [e for e in self.employees
+                if e['admission_date'] <= last
+                and (e['termination_date'] is None or e['termination_date'] >= first)
+                and (company is None or e['company_code'] == company)]
+
+    def _rng(self, year: int, month: int, kind: str) -> random.Random:
+        return random.Random(f"{self.spec.seed}-{kind}-{year}-{month:02d}")
+
+    def _situation(self, rng: random.Random, employee: Dict[str, Any], year: int, month: int) -> int:
+        termination = employee['termination_date']
+        if termination and (termination.year, termination.month) == (year, month):
+            return 7
+        roll = rng.random()
+        if roll < 0.08:
+            return 2
+        if roll < 0.095:
+            return rng.choice([3, 14, 23])
+        if roll < 0.098:
+            return 13 if employee['sex'] == 'F' else 31
+        if roll < 0.10:
+            return 9
+        return 1
+
+    def payroll_rows(self, year: int, month: int, company: str) -> Iterator[Dict[str, Any]]:
+        """Valores da folha mensal (números crus; a formatação BR fica em write_payroll_csv)"""
+        rng = self._rng(year, month, f"folha-{company}")
+        for employee in self.active(year, month, company):
+            situation = self._situation(rng, employee, year, month)
+            salary = employee['salary']
+            hour_rate = salary / 220
+            he50 = round(hour_rate * 1.5 * rng.choice([0, 0, 0, 4, 8, 12, 20]), 2)
+            he100 = round(hour_rate * 2 * rng.choice([0, 0, 0, 0, 4, 8]), 2)
+            night = round(hour_rate * 0.2 * rng.choice([0, 0, 0, 20, 40]), 2)
+            hazard = round(salary * 0.3, 2) if employee['hazard'] else 0.0
+            absences = rng.choice([0, 0, 0, 0, 0, 0, 8, 16])
+            sick_hours = rng.choice([0] * 12 + [8, 16, 24])
+            gross = round(salary + he50 + he100 + night + hazard - hour_rate * absences, 2)
+            inss = round(min(gross * 0.09, 908.85), 2)
+            irrf = round(max((gross - inss) * 0.15 - 381.44, 0.0), 2)
+            health_plan = round(rng.choice([0, 0, 180.0, 320.0]), 2)
+            deductions = round(inss + irrf + health_plan, 2)
+            yield {
+                'employee': employee,
+                'situation': situation,
+                'salary': salary,
+                'he50': he50,
+                'he100': he100,
+                'night': night,
+                'hazard': hazard,
+                'absence_hours': absences,
+                'sick_hours': sick_hours,
+                'gross': gross,
+                'inss': inss,
+                'irrf': irrf,
+                'fgts': round(gross * 0.08, 2),
+                'health_plan': health_plan,
+                'deductions': deductions,
+                'net': round(gross - deductions, 2),
+            }
+
+    # ---------------------------------------------------------------- arquivos
+
+    def write_payroll_csv(self, directory: str, year: int, month: int, company: str) -> str:
+        """folha/<empresa>/MM-YYYY.CSV (nome reconhecido por detect_payroll_type como mensal)"""
+        from app.utils.parsers import CSV_COLUMN_MAPPING
+
+        path = os.path.join(directory, 'folha', company, f"{month:02d}-{year}.CSV")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        header = list(CSV_COLUMN_MAPPING) + REAL_LAYOUT_COLUMNS
+        br = format_br_number
+        with open(path, 'w', encoding='latin-1', newline='') as handle:
+            writer = csv.DictWriter(handle, fieldnames=header, delimiter=';', restval='0,00')
+            writer.writeheader()
+            for row in self.payroll_rows(year, month, company):
+                employee = row['employee']
+                writer.writerow({
+                    'CODIGO_FUNC': str(employee['cadastro']),
+                    'NOME': employee['name'].upper(),
+                    'CPF': employee['cpf'],
+                    'SEXO': employee['sex'],
+                    'ESTADO_CIVIL': employee['marital_status'],
+                    'DT_NASCIMENTO': format_br_date(employee['birth_date']),
+                    'DT_ADMISSAO': format_br_date(employee['admission_date']),
+                    'DT_DEMISSAO': format_br_date(employee['termination_date']) if row['situation'] == 7 else '',
+                    'DEPARTAMENTO': employee['department'],
+                    'CARGO': employee['position'],
+                    'SETOR': employee['sector'],
+                    'TELEFONE': employee['phone'],
+                    'EMAIL': employee['email'],
+                    'SALARIO_BASE': br(row['salary']),
+                    'HORAS_EXTRAS_50': br(row['he50']),
+                    'HORAS_EXTRAS_100': br(row['he100']),
+                    'ADICIONAL_NOTURNO': br(row['night']),
+                    'INSS': br(row['inss']),
+                    'IRRF': br(row['irrf']),
+                    'FGTS': br(row['fgts']),
+                    'PLANO_SAUDE': br(row['health_plan']),
+                    'ADIC_PERICULOSIDADE': br(row['hazard']),
+                    'TOTAL_PROVENTOS': br(row['gross']),
+                    'TOTAL_DESCONTOS': br(row['deductions']),
+                    'LIQ_A_RECEBER': br(row['net']),
+                    'Salário Mensal': br(row['salary']),
+                    'Horas Extras 50% Diurnas': br(row['he50']),
+                    'Horas Extras 100% Diurnas': br(row['he100']),
+                    'Adicional Noturno': br(row['night']),
+                    'Periculosidade': br(row['hazard']),
+                    'Horas Faltas Diurnas': br(row['absence_hours']),
+                    'Atestado Médico': br(row['sick_hours']),
+                    'Situação': str(row['situation']),
+                    'Descrição': SITUATION_DESCRIPTIONS[row['situation']],
+                })
+        return path
+
+    def write_timecard_xlsx(self, directory: str, year: int, month: int) -> str:
+        """Cartão ponto tratado: headers na linha 1, horas como duração ([h]:mm:ss), sufixo E = 0060"""
+        import openpyxl
+        from openpyxl.cell import WriteOnlyCell
+
+        path = os.path.join(directory, 'cartao_ponto', f"cartao_ponto_{month:02d}-{year}.xlsx")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        rng = self._rng(year, month, 'ponto')
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet('Cartão Ponto')
+        sheet.append(TIMECARD_COLUMNS)
+
+        def hours(value: float) -> WriteOnlyCell:
+            # Formato de duração: o openpyxl devolve timedelta na leitura, como nos arquivos reais
+            cell = WriteOnlyCell(sheet, value=timedelta(minutes=round(value * 60)))
+            cell.number_format = '[h]:mm:ss'
+            return cell
+
+        for employee in self.active(year, month):
+            number = employee['unique_id'] + ('E' if employee['company_code'] == '0060' else '')
+            absences = rng.choice([0, 0, 0, 0, 8, 16])
+            sheet.append([
+                number,
+                employee['name'].upper(),
+                hours(220 - absences - rng.choice([0, 0, 4, 8])),
+                hours(rng.choice([0, 0, 2.5, 6, 11.75, 20])),
+                hours(rng.choice([0, 0, 0, 4, 8])),
+                hours(rng.choice([0, 0, 0, 1.5])),
+                hours(0),
+                hours(rng.choice([0, 0, 12, 35.5])),
+                hours(absences),
+                hours(rng.choice([0, 0, 0, 7.33])),
+                hours(rng.choice([0, 0, 0, 4])),
+            ])
+        workbook.save(path)
+        return path
+
+    def write_benefits_xlsx(self, directory: str, year: int, month: int, company: str) -> str:
+        """Benefícios iFood por empresa: CPF formatado + valores em reais"""
+        import openpyxl
+
+        path = os.path.join(directory, 'beneficios', company, f"beneficios_{month:02d}-{year}.xlsx")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        rng = self._rng(year, month, f"beneficios-{company}")
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet('Benefícios')
+        sheet.append(BENEFITS_COLUMNS)
+        for employee in self.active(year, month, company):
+            sheet.append([
+                employee['cpf'],
+                employee['name'],
+                round(rng.choice([0, 550.0, 660.0, 792.0]), 2),
+                round(rng.choice([0, 0, 300.0, 450.0]), 2),
+                round(rng.choice([0, 0, 0, 180.0, 240.0]), 2),
+                round(rng.choice([0, 0, 100.0]), 2),
+            ])
+        workbook.save(path)
+        return path
+
+    def write_payroll_pdf(self, directory: str, year: int, month: int, company: str,
+                          limit: Optional[int] = None) -> str:
+        """Holerites consolidados: 1 página por colaborador (≈3% com página de continuação)"""
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+
+        path = os.path.join(directory, 'holerites', company, f"holerites_{month:02d}-{year}.pdf")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        rng = self._rng(year, month, f"pdf-{company}")
+        pdf = canvas.Canvas(path, pagesize=A4)
+        rows = self.payroll_rows(year, month, company)
+        for count, row in enumerate(rows):
+            if limit is not None and count >= limit:
+                break
+            for page in range(2 if rng.random() < 0.03 else 1):
+                self._draw_payslip(pdf, row, year, month, company, page)
+                pdf.showPage()
+        pdf.save()
+        return path
+
+    @staticmethod
+    def _draw_payslip(pdf, row: Dict[str, Any], year: int, month: int, company: str, page: int):
+        employee = row['employee']
+        br = format_br_number
+        lines = [
+            f"{COMPANIES[company]} Ltda - Recibo de Pagamento de Salário",
+            f"Referência: {month:02d}/{year} - Folha Mensal" + (' (continuação)' if page else ''),
+            "Cadastro Nome do Funcionário CBO Empresa Local Departamento FL",
+            f"{employee['cadastro']} {employee['name'].upper()} {employee['cbo']} {int(company)} 1 000501",
+            f"CPF: {employee['cpf']}   Admissão: {format_br_date(employee['admission_date'])}",
+            f"Cargo: {employee['position']}",
+            "",
+            f"0001 Salário Mensal {br(row['salary'])}",
+            f"0150 Horas Extras 50% Diurnas {br(row['he50'])}",
+            f"0151 Horas Extras 100% Diurnas {br(row['he100'])}",
+            f"0170 Periculosidade {br(row['hazard'])}",
+            f"0903 INSS {br(row['inss'])}",
+            f"0904 IRRF {br(row['irrf'])}",
+            f"Total de Proventos {br(row['gross'])}   Total de Descontos {br(row['deductions'])}",
+            f"Líquido de Cálculo {br(row['net'])}   Base FGTS {br(row['gross'])}   FGTS do Mês {br(row['fgts'])}",
+        ]
+        y = 800
+        for line in lines:
+            pdf.drawString(40, y, line)
+            y -= 14
+
+    def write_roster_csv(self, directory: str) -> str:
+        path = os.path.join(directory, 'roster.csv')
+        os.makedirs(directory, exist_ok=True)
+        records = self.employee_records()
+        with open(path, 'w', encoding='utf-8', newline='') as handle:
+            writer = csv.DictWriter(handle, fieldnames=list(records[0]), delimiter=';')
+            writer.writeheader()
+            for record in records:
+                writer.writerow({key: format_br_date(value) if isinstance(value, date) else value
+                                 for key, value in record.items()})
+        return path
+
+    def write_all(self, directory: str, pdf_months: int = 1, pdf_limit: Optional[int] = None) -> Dict[str, List[str]]:
+        """Gera todos os arquivos; PDFs apenas dos últimos `pdf_months` meses (são os mais pesados)"""
+        written = {'roster': [self.write_roster_csv(directory)], 'folha': [], 'cartao_ponto': [],
+                   'beneficios': [], 'holerites': []}
+        pdf_periods = set(self._periods[-pdf_months:]) if pdf_months > 0 else set()
+        for year, month in self._periods:
+            written['cartao_ponto'].append(self.write_timecard_xlsx(directory, year, month))
+            for company in COMPANIES:
+                written['folha'].append(self.write_payroll_csv(directory, year, month, company))
+                written['beneficios'].append(self.write_benefits_xlsx(directory, year, month, company))
+                if (year, month) in pdf_periods:
+                    written['holerites'].append(self.write_payroll_pdf(directory, year, month, company, pdf_limit))
+        return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gerador de dados sintéticos para benchmarks')
+    parser.add_argument('--employees', type=int, default=1000, help='Quadro inicial (1k–50k)')
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--end', default='2026-09', help='Último mês (AAAA-MM)')
+    parser.add_argument('--turnover', type=float, default=0.02, help='Desligamentos por mês (fração)')
+    parser.add_argument('--pdf-months', type=int, default=1, help='Meses com PDF consolidado (0 = nenhum)')
+    parser.add_argument('--pdf-limit', type=int, default=None, help='Máximo de holerites por PDF')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    end_year, end_month = (int(part) for part in args.end.split('-'))
+    spec = DatasetSpec(employees=args.employees, months=args.months, end_year=end_year, end_month=end_month,
+                       monthly_turnover=args.turnover, seed=args.seed)
+    started = time.perf_counter()
+    dataset = SyntheticDataset(spec)
+    print(f"👥 {len(dataset.employees)} colaboradores em {args.months} meses "
+          f"({len(dataset.active(end_year, end_month))} ativos em {end_month:02d}/{end_year})")
+    written = dataset.write_all(args.output, args.pdf_months, args.pdf_limit)
+    for kind, paths in written.items():
+        size = sum(os.path.getsize(path) for path in paths)
+        print(f"   {kind:<13} {len(paths):>4} arquivo(s)  {size / 1024 / 1024:8.1f} MB")
+    print(f"✅ Dataset gravado em {args.output} ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
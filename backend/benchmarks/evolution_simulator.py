@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Simulador local da Evolution API (substituto de uma instância WhatsApp real)
+
+Implementa os endpoints usados pelo EvolutionAPIService:
+  GET  /instance/connectionState/{instance}
+  POST /message/sendMedia/{instance}
+  POST /message/sendText/{instance}
+  POST /chat/sendPresence/{instance}
+
+Com latência configurável (base + jitter), taxa de erros 5xx, respostas 429
+(rate limit) e desconexões de instância (temporárias, sorteadas a cada
+verificação de estado, ou forçadas). Controle e estatísticas:
+  GET  /simulator/stats     chamadas/status por endpoint e mensagens aceitas
+  POST /simulator/config    altera a configuração (JSON com os campos de SimulatorConfig)
+  POST /simulator/reset     zera as estatísticas
+
+Uso (a partir de backend/):
+    python benchmarks/evolution_simulator.py --port 8081 --latency-ms 150 --rate-limit-rate 0.05
+    # .env: EVOLUTION_SERVER_URL=http://127.0.0.1:8081  EVOLUTION_API_KEY=simulator
+    #       EVOLUTION_INSTANCE_NAME=sim-1
+
+Também importável (benchmarks/send_benchmark.py):
+    simulator = EvolutionSimulator(SimulatorConfig(latency_ms=50)).start()
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Set
+
+ENDPOINTS = {
+    ('GET', 'instance', 'connectionState'): 'connectionState',
+    ('POST', 'message', 'sendMedia'): 'sendMedia',
+    ('POST', 'message', 'sendText'): 'sendText',
+    ('POST', 'chat', 'sendPresence'): 'sendPresence',
+}
+MESSAGE_ENDPOINTS = ('sendMedia', 'sendText')
+
+
+@dataclass
+class SimulatorConfig:
+    latency_ms: float = 100.0          # Latência base de cada chamada
+    jitter_ms: float = 50.0            # Variação uniforme (+/-) sobre a latência
+    media_ms_per_mb: float = 200.0     # Latência extra de sendMedia por MB de payload
+    error_rate: float = 0.0            # Probabilidade de 500 nos envios
+    rate_limit_rate: float = 0.0       # Probabilidade de 429 nos envios
+    disconnect_rate: float = 0.0       # Probabilidade de a instância cair a cada connectionState
+    disconnect_seconds: float = 5.0    # Duração de uma queda sorteada
+    api_key: Optional[str] = None      # Exige o header apikey quando definido
+    instances: Set[str] = field(default_factory=set)  # Vazio = aceita qualquer instância
+    seed: Optional[int] = None
+
+
+class EvolutionSimulator:
+    """Servidor HTTP multi-thread com injeção de falhas e contadores"""
+
+    def __init__(self, config: Optional[SimulatorConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or SimulatorConfig()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._down_until: Dict[str, float] = {}
+        self._forced_down: Set[str] = set()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+        self.reset_stats()
+
+    # ------------------------------------------------------------- ciclo de vida
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'EvolutionSimulator':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='evolution-simulator', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ------------------------------------------------------------------ controle
+
+    def configure(self, **changes):
+        with self._lock:
+            for key, value in changes.items():
+                if key not in {f.name for f in fields(SimulatorConfig)}:
+                    raise ValueError(f"Campo desconhecido: {key}")
+                setattr(self.config, key, set(value) if key == 'instances' else value)
+
+    def set_connected(self, instance: str, connected: bool):
+        """Força a instância como desconectada (até ser reconectada)"""
+        with self._lock:
+            if connected:
+                self._forced_down.discard(instance)
+                self._down_until.pop(instance, None)
+            else:
+                self._forced_down.add(instance)
+
+    def reset_stats(self):
+        with self._lock:
+            self._calls = defaultdict(lambda: defaultdict(int))
+            self._messages = defaultdict(int)
+            self._bytes_received = 0
+            self._latency_total = 0.0
+            self._disconnects = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = {name: dict(statuses) for name, statuses in self._calls.items()}
+            total_calls = sum(sum(statuses.values()) for statuses in calls.values())
+            return {
+                'calls': calls,
+                'total_calls': total_calls,
+                'messages_accepted': dict(self._messages),
+                'bytes_received': self._bytes_received,
+                'avg_latency_ms': round(self._latency_total * 1000 / total_calls, 1) if total_calls else 0,
+                'disconnects': self._disconnects,
+                'config': {**asdict(self.config), 'instances': sorted(self.config.instances)}
+            }
+
+    # ---------------------------------------------------------------- simulação
+
+    def _is_connected(self, instance: str, roll_disconnect: bool) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if instance in self._forced_down or self._down_until.get(instance, 0) > now:
+                return False
+            if roll_disconnect and self._random.random() < self.config.disconnect_rate:
+                self._down_until[instance] = now + self.config.disconnect_seconds
+                self._disconnects += 1
+                return False
+            return True
+
+    def _latency(self, payload_bytes: int, endpoint: str) -> float:
+        config = self.config
+        with self._lock:
+            jitter = self._random.uniform(-config.jitter_ms, config.jitter_ms)
+        delay = max(0.0, config.latency_ms + jitter)
+        if endpoint == 'sendMedia':
+            delay += config.media_ms_per_mb * payload_bytes / (1024 * 1024)
+        return delay / 1000
+
+    def _fault(self) -> Optional[int]:
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.config.rate_limit_rate:
+            return 429
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            return 500
+        return None
+
+    def handle(self, method: str, path: str, headers, body: bytes):
+        """(status, resposta JSON) de uma chamada à API simulada"""
+        parts = [p for p in path.split('?')[0].split('/') if p]
+        if parts[:1] == ['simulator']:
+            return self._handle_control(method, parts[1:], body)
+
+        endpoint = ENDPOINTS.get((method, *parts[:2])) if len(parts) == 3 else None
+        if endpoint is None:
+            return 404, {'status': 404, 'error': 'Not Found', 'response': {'message': [f'Cannot {method} {path}']}}
+        instance = parts[2]
+
+        delay = self._latency(len(body), endpoint)
+        time.sleep(delay)
+        status, response = self._respond(endpoint, instance, headers, body)
+        with self._lock:
+            self._calls[endpoint][status] += 1
+            self._bytes_received += len(body)
+            self._latency_total += delay
+            if status < 300 and endpoint in MESSAGE_ENDPOINTS:
+                self._messages[instance] += 1
+        return status, response
+
+    def _respond(self, endpoint: str, instance: str, headers, body: bytes):
+        config = self.config
+        if config.api_key and headers.get('apikey') != config.api_key:
+            return 401, {'status': 401, 'error': 'Unauthorized'}
+        if config.instances and instance not in config.instances:
+            return 404, {'status': 404, 'error': 'Not Found',
+                         'response': {'message': [f'The "{instance}" instance does not exist']}}
+
+        if endpoint == 'connectionState':
+            state = 'open' if self._is_connected(instance, roll_disconnect=True) else 'close'
+            return 200, {'instance': {'instanceName': instance, 'state': state}}
+
+        if not self._is_connected(instance, roll_disconnect=False):
+            return 500, {'status': 500, 'error': 'Internal Server Error',
+                         'response': {'message': ['Connection Closed']}}
+        fault = self._fault()
+        if fault == 429:
+            return 429, {'status': 429, 'error': 'Too Many Requests'}
+        if fault == 500:
+            return 500, {'status': 500, 'error': 'Internal Server Error'}
+
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            return 400, {'status': 400, 'error': 'Bad Request'}
+        number = str(payload.get('number', ''))
+        if endpoint == 'sendPresence':
+            return 201, {}
+        remote_jid = number if '@' in number else f"{number}@s.whatsapp.net"
+        return 201, {
+            'key': {'remoteJid': remote_jid, 'fromMe': True, 'id': uuid.uuid4().hex[:20].upper()},
+            'status': 'PENDING',
+            'messageTimestamp': int(time.time())
+        }
+
+    def _handle_control(self, method: str, parts, body: bytes):
+        if method == 'GET' and parts == ['stats']:
+            return 200, self.stats()
+        if method == 'POST' and parts == ['reset']:
+            self.reset_stats()
+            return 200, {'success': True}
+        if method == 'POST' and parts == ['config']:
+            try:
+                self.configure(**json.loads(body or b'{}'))
+            except (ValueError, TypeError) as e:
+                return 400, {'error': str(e)}
+            return 200, self.stats()['config']
+        return 404, {'error': 'Not Found'}
+
+    def _handler_class(self):
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _dispatch(self, method):
+                length = int(self.headers.get('Content-Length', 0) or 0)
+                body = self.rfile.read(length) if length else b''
+                status, response = simulator.handle(method, self.path, self.headers, body)
+                data = json.dumps(response).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulador local da Evolution API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency-ms', type=float, default=100.0)
+    parser.add_argument('--jitter-ms', type=float, default=50.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--disconnect-rate', type=float, default=0.0)
+    parser.add_argument('--disconnect-seconds', type=float, default=5.0)
+    parser.add_argument('--api-key', default=None, help='Exigir este apikey (padrão: aceita qualquer)')
+    parser.add_argument('--instances', default='', help='Instâncias aceitas, separadas por vírgula (padrão: todas)')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    config = SimulatorConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        disconnect_rate=args.disconnect_rate,
+        disconnect_seconds=args.disconnect_seconds,
+        api_key=args.api_key,
+        instances={name.strip() for name in args.instances.split(',') if name.strip()},
+        seed=args.seed
+    )
+    simulator = EvolutionSimulator(config, args.host, args.port)
+    print(f"📡 Simulador da Evolution API em {simulator.url} (Ctrl+C para encerrar)")
+    print(f"   latência {config.latency_ms:g}±{config.jitter_ms:g} ms | erros {config.error_rate:.0%} | "
+          f"429 {config.rate_limit_rate:.0%} | quedas {config.disconnect_rate:.0%}")
+    try:
+        simulator._server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {json.dumps(simulator.stats(), indent=2, default=list)}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
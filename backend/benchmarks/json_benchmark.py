@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de serialização JSON das respostas
+
+Compara, sobre payloads sintéticos no formato das rotas reais:
+  - employees: lista de /api/v1/employees (N colaboradores, datas ISO)
+  - statistics: estatísticas de folha com Decimal/date/datetime/UUID nativos
+    (baseline = conversão manual um a um, como os handlers fazem, + json.dumps;
+    "baseline s/ conv" mede só o json.dumps sobre os valores já convertidos)
+
+Serializadores:
+  - baseline: json.dumps(..., ensure_ascii=False, default=str) + encode
+  - stdlib:   app.core.json_serializer.StdlibSerializer
+  - orjson:   app.core.json_serializer.OrjsonSerializer (se instalado)
+
+Uso (a partir de backend/):
+    python benchmarks/json_benchmark.py
+    python benchmarks/json_benchmark.py --employees 20000 --repeat 20
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.json_serializer import ORJSON_AVAILABLE, OrjsonSerializer, StdlibSerializer  # noqa: E402
+
+DEPARTMENTS = ['Administrativo', 'Produção', 'Logística', 'Comercial', 'Manutenção', 'RH']
+POSITIONS = ['Auxiliar', 'Analista', 'Operador', 'Supervisor', 'Técnico', 'Coordenador']
+
+
+def build_employees(count, seed=42):
+    """Mesmo formato de EmployeeDirectory (_row_to_dict)"""
+    rng = random.Random(seed)
+    employees = []
+    for i in range(count):
+        birth = date(1960, 1, 1) + timedelta(days=rng.randint(0, 16000))
+        admission = date(2005, 1, 1) + timedelta(days=rng.randint(0, 7000))
+        employees.append({
+            "id": i + 1,
+            "unique_id": f"{rng.randint(1, 999999999):09d}",
+            "full_name": f"Colaborador Ação {i:05d} da Silva",
+            "cpf": f"{rng.randint(0, 99999999999):011d}",
+            "phone_number": f"479{rng.randint(10000000, 99999999)}",
+            "email": f"colaborador{i}@empresa.com.br",
+            "department": rng.choice(DEPARTMENTS),
+            "position": rng.choice(POSITIONS),
+            "birth_date": birth.isoformat(),
+            "sex": rng.choice(['M', 'F']),
+            "marital_status": 'Solteiro',
+            "admission_date": admission.isoformat(),
+            "contract_type": 'CLT',
+            "employment_status": 'Ativo',
+            "termination_date": "",
+            "leave_start_date": "",
+            "leave_end_date": "",
+            "status_reason": "",
+            "is_active": True
+        })
+    return {"employees": employees, "total": count, "source": "PostgreSQL"}
+
+
+def build_statistics(periods, employees_per_period, seed=7):
+    """Estatísticas por período/colaborador com Decimal/date/datetime/UUID nativos"""
+    rng = random.Random(seed)
+
+    def money():
+        return Decimal(rng.randint(100000, 2000000)) / 100
+
+    result = {"periods": [], "generated_at": datetime(2026, 10, 19, 12, 30)}
+    for p in range(periods):
+        year, month = 2024 + p // 12, p % 12 + 1
+        rows = [{
+            "employee_id": e + 1,
+            "payroll_id": uuid.UUID(int=rng.getrandbits(128)),
+            "gross_salary": money(),
+            "net_salary": money(),
+            "inss": money(),
+            "irrf": money(),
+            "fgts": money(),
+            "overtime_hours": money(),
+            "reference_date": date(year, month, 1),
+        } for e in range(employees_per_period)]
+        result["periods"].append({
+            "year": year,
+            "month": month,
+            "total_gross": money(),
+            "total_net": money(),
+            "rows": rows
+        })
+    return result
+
+
+def baseline_dumps(data):
+    return json.dumps(data, ensure_ascii=False, default=str).encode('utf-8')
+
+
+def convert_like_handlers(data):
+    """Conversão manual linha a linha feita hoje pelos handlers antes do json.dumps"""
+    return {
+        "generated_at": data["generated_at"].isoformat(),
+        "periods": [{
+            "year": period["year"],
+            "month": period["month"],
+            "total_gross": float(period["total_gross"]) if period["total_gross"] else 0,
+            "total_net": float(period["total_net"]) if period["total_net"] else 0,
+            "rows": [{
+                "employee_id": row["employee_id"],
+                "payroll_id": str(row["payroll_id"]),
+                "gross_salary": float(row["gross_salary"]) if row["gross_salary"] else 0,
+                "net_salary": float(row["net_salary"]) if row["net_salary"] else 0,
+                "inss": float(row["inss"]) if row["inss"] else 0,
+                "irrf": float(row["irrf"]) if row["irrf"] else 0,
+                "fgts": float(row["fgts"]) if row["fgts"] else 0,
+                "overtime_hours": float(row["overtime_hours"]) if row["overtime_hours"] else 0,
+                "reference_date": row["reference_date"].isoformat(),
+            } for row in period["rows"]]
+        } for period in data["periods"]]
+    }
+
+
+def timed(func, data, repeat):
+    samples = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = func(data)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), min(samples), size
+
+
+def run_case(title, candidates, repeat):
+    print(f"\n📦 {title}")
+    baseline = None
+    for name, func, data in candidates:
+        median_ms, min_ms, size = timed(func, data, repeat)
+        baseline = baseline or median_ms
+        print(f"   {name:<16} mediana {median_ms:8.2f} ms | min {min_ms:8.2f} ms | "
+              f"{size / 1024:8.0f} KB | {baseline / median_ms:4.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmark de serialização JSON')
+    parser.add_argument('--employees', type=int, default=5000, help='Colaboradores no payload de employees')
+    parser.add_argument('--periods', type=int, default=12, help='Períodos no payload de estatísticas')
+    parser.add_argument('--rows', type=int, default=500, help='Colaboradores por período nas estatísticas')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    stdlib = StdlibSerializer()
+    serializers = [('stdlib', lambda d: len(stdlib.dumps(d)))]
+    if ORJSON_AVAILABLE:
+        orjson = OrjsonSerializer()
+        serializers.append(('orjson', lambda d: len(orjson.dumps(d))))
+    else:
+        print("ℹ️  orjson não instalado (pip install orjson para comparar)")
+
+    employees = build_employees(args.employees)
+    run_case(
+        f"employees ({args.employees} colaboradores)",
+        [('baseline', lambda d: len(baseline_dumps(d)), employees)]
+        + [(name, func, employees) for name, func in serializers],
+        args.repeat
+    )
+
+    native = build_statistics(args.periods, args.rows)
+    run_case(
+        f"statistics ({args.periods} períodos x {args.rows} linhas)",
+        [('baseline', lambda d: len(baseline_dumps(convert_like_handlers(d))), native),
+         ('baseline s/ conv', lambda d: len(baseline_dumps(d)), convert_like_handlers(native))]
+        + [(name, func, native) for name, func in serializers],
+        args.repeat
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Teste de carga HTTP reproduzindo o polling real do frontend
+
+Cada usuário de RH simulado mantém páginas abertas que consultam o servidor
+nos intervalos dos setInterval do frontend (ver PAGES), com fase inicial
+aleatória e sem esperar a resposta anterior, como o navegador faz. Em paralelo,
+um importador envia CSVs de folha (POST /api/v1/payroll/upload-csv) a cada
+--import-interval segundos. Relatório por rota: p50/p95/p99, máximo, vazão e
+taxa de erro (status >= 400 ou falha de conexão).
+
+Alvo:
+  - padrão: servidor em processo (EnviaFolhaHandler) sobre SQLite temporário
+    (ou --database-url; funções do PostgreSQL registradas como em
+    pipeline_benchmark.py), roster/CSVs de benchmarks/dataset_generator.py,
+    Evolution API simulada e um envio em lote "em andamento" para o polling
+    de status. --server tcp (como em produção: socketserver.TCPServer, uma
+    requisição por vez) ou --server threading (ThreadingHTTPServer).
+  - --url: servidor já em execução (--username/--password para o login). O
+    importador usa caminhos locais, então o servidor precisa estar na mesma
+    máquina (ou --import-interval 0).
+
+O gerador de carga roda no mesmo processo do servidor em processo (GIL
+compartilhado): para números absolutos, prefira --url.
+
+Uso (a partir de backend/):
+    python benchmarks/load_test.py --users 5 --duration 120
+    python benchmarks/load_test.py --users 10 --server threading --json carga.json
+    python benchmarks/load_test.py --url http://127.0.0.1:8002 --username admin --password ... --import-interval 0
+"""
+import argparse
+import contextlib
+import heapq
+import io
+import itertools
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dataset_generator import COMPANIES, DatasetSpec, SyntheticDataset  # noqa: E402
+from evolution_simulator import EvolutionSimulator, SimulatorConfig  # noqa: E402
+from pipeline_benchmark import register_sqlite_functions  # noqa: E402
+
+USERNAME = 'loadtest'
+PASSWORD = 'loadtest-senha'
+JOB_STATUS_ROUTE = '/api/v1/payrolls/bulk-send/{job_id}/status'
+IMPORT_ROUTE = '/api/v1/payroll/upload-csv'
+
+
+@dataclass
+class Poll:
+    interval: float                     # segundos entre disparos do setInterval
+    requests: List[str]                 # GETs feitos em sequência a cada disparo
+    auth: bool = True                   # axios (token) x fetch sem Authorization
+    needs_job: bool = False             # só com um envio em lote ativo
+
+
+# Polling extraído dos setInterval do frontend (frontend/src)
+PAGES: Dict[str, List[Poll]] = {
+    # components/Layout.jsx → DatabaseStatusIndicator → hooks/useDatabaseHealth.js (30s, toda página)
+    'Layout': [Poll(30, ['/api/v1/database/health'])],
+    'PayrollSender': [
+        Poll(5, ['/api/v1/queue/active']),                       # loadActiveQueues
+        Poll(2, [JOB_STATUS_ROUTE], needs_job=True),             # pollJobStatus (envio ativo)
+    ],
+    'QueueManagement': [Poll(5, ['/api/v1/queue/list'])],        # loadQueues
+    'SystemInfo': [                                              # checkSystemStatus (fetch)
+        Poll(30, [
+            '/api/v1/database/health',
+            '/api/v1/evolution/instances',
+            '/api/v1/system/status',
+        ], auth=False),
+        Poll(30, ['/api/v1/system/metrics/summary?top=15']),      # resumo de métricas exige token
+    ],
+}
+# Carregamento inicial de cada página (useEffect de montagem)
+ON_MOUNT = {
+    'PayrollSender': ['/api/v1/payrolls/processed'],
+}
+
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    errors: int = 0
+
+
+class Recorder:
+    """Latências e status por rota (amostras do aquecimento são descartadas)"""
+
+    def __init__(self, warmup_until: float):
+        self.warmup_until = warmup_until
+        self._lock = threading.Lock()
+        self.routes: Dict[str, RouteStats] = defaultdict(RouteStats)
+
+    def record(self, route: str, started: float, elapsed: float, status: int):
+        if started < self.warmup_until:
+            return
+        with self._lock:
+            stats = self.routes[route]
+            stats.latencies.append(elapsed)
+            stats.statuses[status] += 1
+            if status == 0 or status >= 400:
+                stats.errors += 1
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentil por posição (nearest-rank) de uma lista já ordenada"""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+class LoadClient:
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.token: Optional[str] = None
+
+    def request(self, method: str, path: str, body: Optional[dict] = None, auth: bool = True) -> Tuple[int, float]:
+        """(status, segundos); status 0 = falha de conexão/timeout"""
+        headers = {'Content-Type': 'application/json'}
+        if auth and self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            status = e.code
+        except OSError:
+            status = 0
+        return status, time.perf_counter() - started
+
+    def login(self, username: str, password: str):
+        req = urllib.request.Request(
+            f"{self.base_url}/api/v1/auth/login", method='POST',
+            data=json.dumps({'username': username, 'password': password}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(req, timeout=self.timeout) as response:
+            self.token = json.loads(response.read())['access_token']
+
+
+# ------------------------------------------------------- servidor em processo
+
+@contextlib.contextmanager
+def quiet(verbose):
+    """Silencia os prints e o log de acesso do servidor (a não ser com --verbose)"""
+    if verbose:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+class LocalServer:
+    """EnviaFolhaHandler + banco semeado + Evolution API simulada"""
+
+    def __init__(self, args):
+        self.args = args
+        self.workdir = tempfile.mkdtemp(prefix='load-test-')
+        self.simulator = EvolutionSimulator(SimulatorConfig(latency_ms=40, jitter_ms=20, seed=args.seed)).start()
+        os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(self.workdir, 'load.db')}"
+        os.environ['EVOLUTION_SERVER_URL'] = self.simulator.url
+        os.environ['EVOLUTION_API_KEY'] = 'loadtest'
+        os.environ['EVOLUTION_INSTANCE_NAME'] = 'sim-1'
+        os.environ['EVOLUTION_INSTANCE_NAME2'] = 'sim-2'
+        os.environ['EVOLUTION_INSTANCE_NAME3'] = ''
+        self.legacy = None
+        self.httpd = None
+        self.csv_files: List[Tuple[str, str]] = []
+        self.job_id: Optional[str] = None
+
+    def start(self) -> str:
+        import http.server
+        import socketserver
+
+        with quiet(self.args.verbose):
+            import main_legacy as legacy
+            self.legacy = legacy
+            register_sqlite_functions(legacy.db_engine)
+            self._seed()
+        server_class = http.server.ThreadingHTTPServer if self.args.server == 'threading' else socketserver.TCPServer
+        self.httpd = server_class(('127.0.0.1', 0), legacy.EnviaFolhaHandler)
+        threading.Thread(target=self.httpd.serve_forever, name='load-test-http', daemon=True).start()
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def _seed(self):
+        from app.core.database import create_schema
+        from app.models import Employee, User
+
+        legacy = self.legacy
+        create_schema(legacy.db_engine)
+        dataset = SyntheticDataset(DatasetSpec(employees=self.args.employees, months=self.args.import_months,
+                                               seed=self.args.seed))
+        db = legacy.SessionLocal()
+        try:
+            db.bulk_insert_mappings(Employee, dataset.employee_records())
+            db.add(User(username=USERNAME, email=f"{USERNAME}@exemplo.com.br", full_name='Teste de Carga',
+                        password_hash=User.hash_password(PASSWORD), is_active=True, is_admin=True))
+            db.commit()
+        finally:
+            db.close()
+
+        for year, month in dataset.periods():
+            for company in COMPANIES:
+                self.csv_files.append((dataset.write_payroll_csv(self.workdir, year, month, company), company))
+
+        # Envio em lote "em andamento": mantém o polling de status do PayrollSender ativo
+        self.job_id = f"loadtest-{random.Random(self.args.seed).getrandbits(32):08x}"
+        with legacy.jobs_lock:
+            legacy.bulk_send_jobs[self.job_id] = legacy.BulkSendJob(self.job_id, 100)
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+        self.simulator.stop()
+        if self.legacy:
+            from app.services.log_writer import get_log_writer
+            with quiet(self.args.verbose):
+                get_log_writer(self.legacy.SessionLocal).stop(flush=True)
+            self.legacy.db_engine.dispose()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+# ---------------------------------------------------------------- carga
+
+def build_pollers(args, job_id: Optional[str]) -> List[Tuple[str, Poll]]:
+    pages = [page.strip() for page in args.pages.split(',') if page.strip()]
+    pollers = []
+    for user in range(args.users):
+        for page in ['Layout'] + pages:
+            for poll in PAGES[page]:
+                if poll.needs_job and not job_id:
+                    continue
+                pollers.append((f"u{user}:{page}", poll))
+    return pollers
+
+
+def route_label(path: str) -> str:
+    return path.split('?')[0]
+
+
+def run_load(client: LoadClient, args, job_id: Optional[str], csv_files: List[Tuple[str, str]]):
+    rng = random.Random(args.seed)
+    pollers = build_pollers(args, job_id)
+    started = time.monotonic()
+    deadline = started + args.duration
+    recorder = Recorder(warmup_until=time.perf_counter() + args.warmup)
+    imports: List[Dict] = []
+
+    def fire(requests: List[str], auth: bool):
+        # Requisições de um disparo saem em sequência (await no frontend)
+        for path in requests:
+            real_path = path.replace('{job_id}', job_id) if job_id else path
+            begin = time.perf_counter()
+            status, elapsed = client.request('GET', real_path, auth=auth)
+            recorder.record(route_label(path), begin, elapsed, status)
+
+    def importer():
+        cycle = itertools.cycle(csv_files)
+        next_run = time.monotonic() + args.import_interval * rng.random()
+        while True:
+            if next_run >= deadline:
+                return
+            time.sleep(max(0.0, next_run - time.monotonic()))
+            path, company = next(cycle)
+            begin = time.perf_counter()
+            status, elapsed = client.request('POST', IMPORT_ROUTE, {'file_path': path, 'division_code': company})
+            recorder.record(IMPORT_ROUTE, begin, elapsed, status)
+            imports.append({'file': f"{company}/{os.path.basename(path)}", 'status': status,
+                            'seconds': round(elapsed, 3)})
+            next_run = max(next_run + args.import_interval, time.monotonic())
+
+    # Fila de disparos (setInterval não espera a resposta anterior)
+    schedule = []
+    sequence = itertools.count()
+    for name, poll in pollers:
+        interval = poll.interval * args.interval_scale
+        heapq.heappush(schedule, (started + rng.uniform(0, interval), next(sequence), interval, poll))
+
+    with ThreadPoolExecutor(max_workers=max(8, len(pollers) * 2), thread_name_prefix='load-user') as pool:
+        for user in range(args.users):
+            for page in args.pages.split(','):
+                for path in ON_MOUNT.get(page.strip(), []):
+                    pool.submit(fire, [path], True)
+        import_thread = None
+        if args.import_interval > 0 and csv_files:
+            import_thread = threading.Thread(target=importer, name='load-importer', daemon=True)
+            import_thread.start()
+
+        while schedule:
+            when, _, interval, poll = heapq.heappop(schedule)
+            if when >= deadline:
+                break
+            time.sleep(max(0.0, when - time.monotonic()))
+            pool.submit(fire, poll.requests, poll.auth)
+            heapq.heappush(schedule, (when + interval, next(sequence), interval, poll))
+        if import_thread:
+            import_thread.join()
+    return recorder, imports, time.monotonic() - started
+
+
+def summarize(recorder: Recorder, measured_seconds: float) -> Dict[str, Dict]:
+    routes = {}
+    for route, stats in sorted(recorder.routes.items()):
+        latencies = sorted(stats.latencies)
+        count = len(latencies)
+        routes[route] = {
+            'requests': count,
+            'rps': round(count / measured_seconds, 2) if measured_seconds else 0,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+            'max_ms': round(latencies[-1] * 1000, 1) if latencies else 0,
+            'error_rate': round(stats.errors / count, 4) if count else 0,
+            'statuses': {str(status): value for status, value in sorted(stats.statuses.items())}
+        }
+    return routes
+
+
+def print_report(routes: Dict[str, Dict], imports: List[Dict]):
+    print(f"\n{'rota':<42} {'req':>6} {'req/s':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'máx':>8} {'erros':>7}")
+    for route, values in routes.items():
+        print(f"{route:<42} {values['requests']:>6} {values['rps']:>6.2f} {values['p50_ms']:>6.1f}ms "
+              f"{values['p95_ms']:>6.1f}ms {values['p99_ms']:>6.1f}ms {values['max_ms']:>6.1f}ms "
+              f"{values['error_rate']:>7.1%}")
+        failing = {status: count for status, count in values['statuses'].items() if status == '0' or int(status) >= 400}
+        if failing:
+            print(f"{'':<42} status com erro: {failing}")
+    if imports:
+        ok = sum(1 for item in imports if item['status'] == 200)
+        print(f"\n📥 Importações de CSV: {ok}/{len(imports)} ok, "
+              f"{sum(item['seconds'] for item in imports):.1f}s no total")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga com o polling do frontend')
+    parser.add_argument('--users', type=int, default=5, help='Usuários de RH simultâneos')
+    parser.add_argument('--pages', default='PayrollSender,QueueManagement,SystemInfo',
+                        help=f"Páginas abertas por usuário ({', '.join(p for p in PAGES if p != 'Layout')})")
+    parser.add_argument('--duration', type=float, default=120, help='Segundos de carga')
+    parser.add_argument('--warmup', type=float, default=10, help='Segundos iniciais fora das estatísticas')
+    parser.add_argument('--interval-scale', type=float, default=1.0,
+                        help='Multiplica os intervalos de polling (0.5 = dobro da frequência)')
+    parser.add_argument('--import-interval', type=float, default=60, help='Segundos entre importações (0 = sem)')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--url', default=None, help='Servidor já em execução (padrão: servidor em processo)')
+    parser.add_argument('--username', default=USERNAME)
+    parser.add_argument('--password', default=PASSWORD)
+    parser.add_argument('--job-id', default=None, help='Envio em lote ativo para o polling de status (com --url)')
+    parser.add_argument('--server', choices=['tcp', 'threading'], default='tcp', help='Servidor em processo')
+    parser.add_argument('--employees', type=int, default=1000, help='Roster do servidor em processo')
+    parser.add_argument('--import-months', type=int, default=3, help='Meses de CSV para o importador')
+    parser.add_argument('--database-url', default=None, help='Servidor em processo (padrão: SQLite temporário)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', dest='json_path', default=None, help='Gravar resultados em JSON')
+    parser.add_argument('--verbose', action='store_true', help='Mostrar os logs do servidor')
+    args = parser.parse_args()
+
+    unknown = {p.strip() for p in args.pages.split(',') if p.strip()} - set(PAGES)
+    if unknown:
+        parser.error(f"Páginas desconhecidas: {', '.join(sorted(unknown))}")
+
+    local = None
+    csv_files: List[Tuple[str, str]] = []
+    job_id = args.job_id
+    if args.url:
+        base_url = args.url
+    else:
+        local = LocalServer(args)
+        base_url = local.start()
+        csv_files, job_id = local.csv_files, local.job_id
+
+    try:
+        client = LoadClient(base_url, args.timeout)
+        with quiet(args.verbose or local is None):
+            client.login(args.username, args.password)
+        pollers = build_pollers(args, job_id)
+        target = f"{base_url} ({args.server}, {local.legacy.db_engine.dialect.name})" if local else base_url
+        importing = f"importação a cada {args.import_interval:g}s" if args.import_interval > 0 else "sem importação"
+        print(f"🎯 {target} | {args.users} usuário(s) x [{args.pages}] | {len(pollers)} pollers | "
+              f"{args.duration:g}s (aquecimento {args.warmup:g}s) | {importing}")
+        with quiet(args.verbose or local is None):
+            recorder, imports, elapsed = run_load(client, args, job_id, csv_files)
+    finally:
+        if local:
+            local.stop()
+
+    routes = summarize(recorder, max(elapsed - args.warmup, 0.001))
+    print_report(routes, imports)
+    total = sum(values['requests'] for values in routes.values())
+    errors = sum(values['requests'] * values['error_rate'] for values in routes.values())
+    print(f"\n📊 {total} requisições medidas, {total / max(elapsed - args.warmup, 0.001):.1f} req/s, "
+          f"erros {errors / total if total else 0:.1%}")
+
+    if args.json_path:
+        report = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'target': args.url or f"local/{args.server}",
+                **{key: value for key, value in vars(args).items() if key not in ('password', 'json_path')}
+            },
+            'routes': routes,
+            'imports': imports
+        }
+        with open(args.json_path, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultados gravados em {args.json_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
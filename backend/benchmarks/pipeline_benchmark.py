@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos pipelines de importação e dos indicadores de RH sobre dados sintéticos
+
+Etapas (dados de benchmarks/dataset_generator.py, consistentes entre si):
+  - seed:       carga do roster na tabela employees
+  - payroll:    PayrollCSVProcessor.process_csv_file (mês a mês, por empresa)
+  - timecard:   TimecardXLSXProcessor.process_xlsx_file (mês a mês)
+  - benefits:   BenefitsXLSXProcessor.process_xlsx_file (mês a mês, por empresa)
+  - pdf:        segment_pdf_by_employee (holerites consolidados do último mês)
+  - indicators: todas as rotas GET handle_indicators_* do EnviaFolhaHandler,
+                frias (após POST /api/v1/indicators/cache/invalidate) e quentes
+
+Banco: SQLite temporário (padrão) ou --database-url. No SQLite é registrada
+equivalentes de regexp_replace (busca por CPF dos benefícios) e version()
+(health check) do PostgreSQL. Resultados em JSON (--json) para comparação com uma execução
+anterior (--baseline): tempos que pioraram acima de --tolerance são marcados.
+
+Uso (a partir de backend/):
+    python benchmarks/pipeline_benchmark.py
+    python benchmarks/pipeline_benchmark.py --employees 5000 --months 12 --json atual.json
+    python benchmarks/pipeline_benchmark.py --stages payroll,indicators --baseline atual.json --fail-on-regression
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dataset_generator import COMPANIES, DatasetSpec, SyntheticDataset  # noqa: E402
+
+STAGES = ['seed', 'payroll', 'timecard', 'benefits', 'pdf', 'indicators']
+
+
+def configure_environment(args, workdir):
+    """Precisa rodar antes de importar app.* (settings lidos na importação)"""
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.setdefault('METRICS_ENABLED', 'false')
+
+
+def register_sqlite_functions(engine):
+    """regexp_replace(valor, padrão, substituto, flags) e version() do PostgreSQL para o SQLite"""
+    import sqlite3
+    from sqlalchemy import event
+
+    if engine.dialect.name != 'sqlite':
+        return
+
+    def regexp_replace(value, pattern, replacement, flags=''):
+        if value is None:
+            return None
+        return re.sub(pattern, replacement, value, count=0 if 'g' in (flags or '') else 1)
+
+    @event.listens_for(engine, 'connect')
+    def _register(dbapi_connection, _record):
+        dbapi_connection.create_function('regexp_replace', 4, regexp_replace)
+        dbapi_connection.create_function('version', 0, lambda: f"SQLite {sqlite3.sqlite_version}")
+
+    engine.dispose()  # conexões já abertas não têm a função
+
+
+@contextlib.contextmanager
+def quiet(verbose):
+    """Silencia os prints dos processadores e o log de acesso HTTP (a não ser com --verbose)"""
+    if verbose:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def stage_summary(files, rows, seconds, **extra):
+    return {
+        'files': files,
+        'rows': rows,
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(rows / seconds, 1) if seconds else 0,
+        **extra
+    }
+
+
+# ------------------------------------------------------------------- etapas
+
+def run_seed(legacy, dataset):
+    from app.core.database import create_schema
+    from app.models.employee import Employee
+
+    create_schema(legacy.db_engine)
+    records = dataset.employee_records()
+    db = legacy.SessionLocal()
+    try:
+        _, seconds = timed(lambda: (db.bulk_insert_mappings(Employee, records), db.commit()))
+    finally:
+        db.close()
+    return stage_summary(1, len(records), seconds)
+
+
+def run_payroll(legacy, dataset, periods, workdir, args):
+    from app.services.payroll_csv_processor import PayrollCSVProcessor
+
+    per_file, total_rows, total_seconds, processed, skipped, errors = [], 0, 0.0, 0, 0, 0
+    for year, month in periods:
+        for company in COMPANIES:
+            path = dataset.write_payroll_csv(workdir, year, month, company)
+            db = legacy.SessionLocal()
+            try:
+                with quiet(args.verbose):
+                    result, seconds = timed(PayrollCSVProcessor(db).process_csv_file, path, division_code=company)
+            finally:
+                db.close()
+            stats = result.get('stats', {})
+            per_file.append({'file': f"{company}/{os.path.basename(path)}", 'rows': stats.get('total_rows', 0),
+                             'seconds': round(seconds, 3), 'success': result.get('success', False)})
+            total_rows += stats.get('total_rows', 0)
+            processed += stats.get('processed', 0)
+            skipped += stats.get('skipped', 0)
+            errors += stats.get('errors', 0) + (0 if result.get('success') else 1)
+            total_seconds += seconds
+    return stage_summary(len(per_file), total_rows, total_seconds, processed=processed, skipped=skipped,
+                         errors=errors, per_file=per_file)
+
+
+def run_timecard(legacy, dataset, periods, workdir, args):
+    from app.services.timecard_xlsx_processor import TimecardXLSXProcessor
+
+    per_file, total_rows, total_seconds, processed, errors = [], 0, 0.0, 0, 0
+    for year, month in periods:
+        path = dataset.write_timecard_xlsx(workdir, year, month)
+        db = legacy.SessionLocal()
+        try:
+            with quiet(args.verbose):
+                result, seconds = timed(TimecardXLSXProcessor(db).process_xlsx_file, path, year, month)
+        finally:
+            db.close()
+        per_file.append({'file': os.path.basename(path), 'rows': result.get('total_rows', 0),
+                         'seconds': round(seconds, 3), 'success': result.get('success', False)})
+        total_rows += result.get('total_rows', 0)
+        processed += result.get('processed_rows', 0)
+        errors += result.get('error_rows', 0) + (0 if result.get('success') else 1)
+        total_seconds += seconds
+    return stage_summary(len(per_file), total_rows, total_seconds, processed=processed, errors=errors,
+                         per_file=per_file)
+
+
+def run_benefits(legacy, dataset, periods, workdir, args):
+    from app.services.benefits_xlsx_processor import BenefitsXLSXProcessor
+
+    per_file, total_rows, total_seconds, processed, errors = [], 0, 0.0, 0, 0
+    for year, month in periods:
+        for company in COMPANIES:
+            path = dataset.write_benefits_xlsx(workdir, year, month, company)
+            db = legacy.SessionLocal()
+            try:
+                with quiet(args.verbose):
+                    result, seconds = timed(BenefitsXLSXProcessor(db).process_xlsx_file, path, year, month, company)
+            finally:
+                db.close()
+            per_file.append({'file': f"{company}/{os.path.basename(path)}", 'rows': result.get('total_rows', 0),
+                             'seconds': round(seconds, 3), 'success': result.get('success', False)})
+            total_rows += result.get('total_rows', 0)
+            processed += result.get('processed_rows', 0)
+            errors += result.get('error_rows', 0) + (0 if result.get('success') else 1)
+            total_seconds += seconds
+    return stage_summary(len(per_file), total_rows, total_seconds, processed=processed, errors=errors,
+                         per_file=per_file)
+
+
+def run_pdf(dataset, periods, workdir, args):
+    import PyPDF2
+    from app.services.payroll_formatter import segment_pdf_by_employee
+
+    year, month = periods[-1]
+    per_file, total_pages, total_seconds, generated, errors = [], 0, 0.0, 0, 0
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)  # PayrollFormatter grava em ./processed
+    try:
+        for company in COMPANIES:
+            path = dataset.write_payroll_pdf(workdir, year, month, company, limit=args.pdf_employees)
+            pages = len(PyPDF2.PdfReader(path).pages)
+            with quiet(args.verbose):
+                result, seconds = timed(segment_pdf_by_employee, path, dataset.employees_data(company),
+                                        '11', month, year)
+            per_file.append({'file': f"{company}/{os.path.basename(path)}", 'rows': pages,
+                             'seconds': round(seconds, 3), 'success': result.get('success', False)})
+            total_pages += pages
+            generated += result.get('processed_count', 0)
+            errors += len(result.get('errors', []))
+            total_seconds += seconds
+    finally:
+        os.chdir(previous_cwd)
+    return stage_summary(len(per_file), total_pages, total_seconds, payslips=generated, errors=errors,
+                         per_file=per_file)
+
+
+def indicator_routes(legacy):
+    return sorted(route.pattern for route in legacy.EnviaFolhaHandler.ROUTES.routes()
+                  if route.method == 'GET' and isinstance(route.target, str)
+                  and route.target.startswith('handle_indicators_'))
+
+
+def run_indicators(legacy, periods, args):
+    import http.server
+
+    server = http.server.HTTPServer(('127.0.0.1', 0), legacy.EnviaFolhaHandler)
+    threading.Thread(target=server.serve_forever, name='bench-http', daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    year, month = periods[-1]
+    variants = {'latest': '', 'company': f"?company=0060&year={year}&month={month}"}
+
+    def request(path, method='GET'):
+        req = urllib.request.Request(base + path, method=method, data=b'{}' if method == 'POST' else None,
+                                     headers={'Content-Type': 'application/json'})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=600) as response:
+                status, body = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, body = e.code, e.read()
+        return status, len(body), (time.perf_counter() - started) * 1000
+
+    results = {}
+    try:
+        with quiet(args.verbose):
+            for pattern in indicator_routes(legacy):
+                for variant, query in variants.items():
+                    request('/api/v1/indicators/cache/invalidate', 'POST')
+                    status, size, cold_ms = request(pattern + query)
+                    warm = [request(pattern + query)[2] for _ in range(args.repeat)]
+                    results[f"{pattern}{' [' + variant + ']' if variant != 'latest' else ''}"] = {
+                        'status': status,
+                        'bytes': size,
+                        'cold_ms': round(cold_ms, 2),
+                        'warm_p50_ms': round(statistics.median(warm), 2),
+                        'warm_p95_ms': round(sorted(warm)[max(0, int(len(warm) * 0.95) - 1)], 2)
+                    }
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+# ------------------------------------------------------- relatório/comparação
+
+def timing_metrics(stages):
+    """Métricas de tempo comparáveis entre execuções (quanto menor, melhor)"""
+    metrics = {}
+    for name, result in stages.items():
+        if name == 'indicators':
+            for route, values in result.items():
+                metrics[f"indicators {route} cold_ms"] = values['cold_ms']
+                metrics[f"indicators {route} warm_p50_ms"] = values['warm_p50_ms']
+        else:
+            metrics[f"{name} seconds"] = result['seconds']
+    return metrics
+
+
+def compare(current, baseline, tolerance):
+    """Imprime a comparação; retorna as métricas que pioraram além da tolerância"""
+    before = timing_metrics(baseline.get('stages', {}))
+    after = timing_metrics(current['stages'])
+    regressions = []
+    print(f"\n📈 Comparação com a baseline (tolerância {tolerance:.0%}):")
+    for metric in sorted(set(before) & set(after)):
+        old, new = before[metric], after[metric]
+        delta = (new - old) / old if old else 0.0
+        flag = ''
+        if delta > tolerance:
+            flag = ' ⚠️'
+            regressions.append(metric)
+        elif delta < -tolerance:
+            flag = ' 🚀'
+        print(f"   {metric:<62} {old:>10.2f} → {new:>10.2f} ({delta:+.0%}){flag}")
+    if baseline.get('meta', {}).get('employees') != current['meta']['employees']:
+        print("   ⚠️ Baseline gerada com outro número de colaboradores: compare com cautela")
+    return regressions
+
+
+def print_stage(name, result):
+    if name == 'indicators':
+        print(f"\n📊 indicators ({len(result)} consultas):")
+        for route, values in result.items():
+            print(f"   {route:<58} {values['status']} {values['bytes'] / 1024:7.1f} KB  "
+                  f"fria {values['cold_ms']:8.1f} ms  quente p50 {values['warm_p50_ms']:7.1f} ms")
+        return
+    extra = ', '.join(f"{key} {value}" for key, value in result.items()
+                      if key not in ('files', 'rows', 'seconds', 'rows_per_second', 'per_file'))
+    print(f"⏱️  {name:<9} {result['rows']:>8} linhas em {result['files']:>3} arquivo(s): "
+          f"{result['seconds']:8.2f}s ({result['rows_per_second']:.0f}/s){' | ' + extra if extra else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dos pipelines de importação e indicadores')
+    parser.add_argument('--employees', type=int, default=1000, help='Quadro inicial (1k–50k)')
+    parser.add_argument('--months', type=int, default=3, help='Meses importados (até 36)')
+    parser.add_argument('--end', default='2026-09', help='Último mês (AAAA-MM)')
+    parser.add_argument('--stages', default='all', help=f"Etapas separadas por vírgula: {','.join(STAGES)}")
+    parser.add_argument('--pdf-employees', type=int, default=200, help='Holerites por PDF consolidado')
+    parser.add_argument('--repeat', type=int, default=5, help='Requisições quentes por indicador')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', default=None, help='Padrão: SQLite temporário')
+    parser.add_argument('--json', dest='json_path', default=None, help='Gravar resultados em JSON')
+    parser.add_argument('--baseline', default=None, help='JSON de uma execução anterior para comparação')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Piora tolerada (0.2 = 20%%)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Código de saída 1 se houver piora')
+    parser.add_argument('--verbose', action='store_true', help='Mostrar os logs dos processadores')
+    args = parser.parse_args()
+
+    stages = STAGES if args.stages == 'all' else [s.strip() for s in args.stages.split(',') if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"Etapas desconhecidas: {', '.join(sorted(unknown))}")
+    if not args.verbose:
+        logging.getLogger('app').setLevel(logging.ERROR)
+
+    end_year, end_month = (int(part) for part in args.end.split('-'))
+    workdir = tempfile.mkdtemp(prefix='pipeline-benchmark-')
+    configure_environment(args, workdir)
+
+    with quiet(args.verbose):
+        import main_legacy as legacy
+    register_sqlite_functions(legacy.db_engine)
+
+    dataset, generation = timed(SyntheticDataset, DatasetSpec(
+        employees=args.employees, months=args.months, end_year=end_year, end_month=end_month, seed=args.seed))
+    periods = dataset.periods()
+    print(f"👥 {len(dataset.employees)} colaboradores, {len(periods)} meses "
+          f"({periods[0][1]:02d}/{periods[0][0]} a {end_month:02d}/{end_year}) | "
+          f"banco {legacy.db_engine.dialect.name} | etapas: {', '.join(stages)}\n")
+
+    results = {}
+    try:
+        # Sem o roster os processadores só geram avisos: a carga sempre roda
+        results['seed'] = run_seed(legacy, dataset)
+        print_stage('seed', results['seed'])
+        runners = {
+            'payroll': lambda: run_payroll(legacy, dataset, periods, workdir, args),
+            'timecard': lambda: run_timecard(legacy, dataset, periods, workdir, args),
+            'benefits': lambda: run_benefits(legacy, dataset, periods, workdir, args),
+            'pdf': lambda: run_pdf(dataset, periods, workdir, args),
+            'indicators': lambda: run_indicators(legacy, periods, args),
+        }
+        for name in STAGES[1:]:
+            if name in stages:
+                results[name] = runners[name]()
+                print_stage(name, results[name])
+    finally:
+        from app.services.log_writer import get_log_writer
+        with quiet(args.verbose):
+            get_log_writer(legacy.SessionLocal).stop(flush=True)
+        legacy.db_engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'employees': args.employees,
+            'roster_size': len(dataset.employees),
+            'months': args.months,
+            'end': args.end,
+            'seed': args.seed,
+            'pdf_employees': args.pdf_employees,
+            'repeat': args.repeat,
+            'database': legacy.db_engine.dialect.name,
+            'python': platform.python_version(),
+            'generation_seconds': round(generation, 3)
+        },
+        'stages': results
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as handle:
+            regressions = compare(report, json.load(handle), args.tolerance)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultados gravados em {args.json_path}")
+    if regressions and args.fail_on_regression:
+        print(f"\n❌ {len(regressions)} métrica(s) pioraram além de {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
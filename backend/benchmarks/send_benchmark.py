@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Benchmark ponta a ponta do pipeline de envio contra o simulador da Evolution API
+
+Cenários:
+  - payroll:        process_bulk_send_in_background (holerites em PDF, fila,
+                    round-robin de instâncias, registro no banco)
+  - communications: POST /api/v1/communications/send no EnviaFolhaHandler
+                    (comunicado de texto, síncrono na requisição)
+
+Os delays anti-softban são escalados por SEND_DELAY_SCALE (--delay-scale,
+padrão 0.001: 30s viram 30ms) e o tempo gasto neles é descontado para obter
+o overhead real por mensagem. Também mostra a projeção com os delays reais.
+
+Banco: SQLite temporário (padrão) ou --database-url. Nenhuma instância real
+de WhatsApp é usada.
+
+Uso (a partir de backend/):
+    python benchmarks/send_benchmark.py
+    python benchmarks/send_benchmark.py --messages 60 --instances 3 --rate-limit-rate 0.05
+    python benchmarks/send_benchmark.py --scenario payroll --json resultado.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from evolution_simulator import EvolutionSimulator, SimulatorConfig  # noqa: E402
+
+API_KEY = 'benchmark'
+INSTANCE_SETTINGS = ('EVOLUTION_INSTANCE_NAME', 'EVOLUTION_INSTANCE_NAME2', 'EVOLUTION_INSTANCE_NAME3')
+TEMPLATES = [
+    "Olá {primeiro_nome}, segue seu holerite de {mes_anterior}. Senha: 4 primeiros dígitos do CPF.",
+    "Oi {nome}! Seu holerite de {mes_anterior} está em anexo.",
+]
+
+
+def configure_environment(args, simulator, workdir):
+    """Precisa rodar antes de importar app.* (settings lidos na importação)"""
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['EVOLUTION_SERVER_URL'] = simulator.url
+    os.environ['EVOLUTION_API_KEY'] = API_KEY
+    for index, name in enumerate(INSTANCE_SETTINGS):
+        # Vazio desabilita instâncias extras eventualmente definidas no .env
+        os.environ[name] = f"sim-{index + 1}" if index < args.instances else ''
+    os.environ['SEND_DELAY_SCALE'] = str(args.delay_scale)
+    os.environ.setdefault('METRICS_ENABLED', 'false')
+
+
+def seed_employees(legacy, count):
+    from app.core.database import create_schema
+    from app.models.employee import Employee
+
+    create_schema(legacy.db_engine)
+    db = legacy.SessionLocal()
+    try:
+        employees = []
+        for i in range(count):
+            employee = Employee(
+                unique_id=f"BENCH{i:06d}",
+                name=f"Colaborador Benchmark {i:04d}",
+                cpf=f"{i:011d}",
+                phone=f"5547{900000000 + i}",
+                department='Benchmark',
+                is_active=True
+            )
+            db.add(employee)
+            employees.append(employee)
+        db.commit()
+        return [{'id': e.id, 'full_name': e.name, 'phone_number': e.phone} for e in employees]
+    finally:
+        db.close()
+
+
+@contextlib.contextmanager
+def quiet(verbose):
+    """Silencia os prints do pipeline (a não ser com --verbose)"""
+    if verbose:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def summarize(name, count, successful, failed, wall, paused, nominal, stats, messages_endpoint):
+    calls = stats['calls']
+    attempts = sum(calls.get(messages_endpoint, {}).values())
+    status_total = {}
+    for statuses in calls.values():
+        for status, value in statuses.items():
+            status_total[status] = status_total.get(status, 0) + value
+    working = max(wall - paused, 0.0)
+    # Esperas contadas pelo valor nominal (inclui o cooldown de 30s por instância)
+    projected = working + nominal
+    return {
+        'scenario': name,
+        'messages': count,
+        'successful': successful,
+        'failed': failed,
+        'wall_seconds': round(wall, 3),
+        'paused_seconds': round(paused, 3),
+        'nominal_paused_seconds': round(nominal, 1),
+        'messages_per_minute': round(successful * 60 / wall, 1) if wall else 0,
+        'overhead_ms_per_message': round(working * 1000 / count, 1) if count else 0,
+        'projected_minutes_real_delays': round(projected / 60, 1),
+        'http_calls_per_message': {
+            endpoint: round(sum(statuses.values()) / count, 2) for endpoint, statuses in calls.items()
+        } if count else {},
+        'send_attempts': attempts,
+        'retries': max(attempts - count, 0),
+        'rate_limited': status_total.get(429, 0),
+        'server_errors': sum(v for s, v in status_total.items() if s >= 500),
+        'disconnects': stats['disconnects'],
+        'simulated_latency_ms': stats['avg_latency_ms']
+    }
+
+
+def run_payroll(legacy, pacing, simulator, employees, args, workdir):
+    files_dir = os.path.join(workdir, 'processed')
+    os.makedirs(files_dir, exist_ok=True)
+    run_id = uuid.uuid4().hex[:8]
+    payload = os.urandom(args.pdf_kb * 1024)
+    selected_files = []
+    for i in range(args.messages):
+        employee = employees[i % len(employees)]
+        filename = f"bench_{run_id}_{i:04d}.pdf"
+        path = os.path.join(files_dir, filename)
+        with open(path, 'wb') as handle:
+            handle.write(b'%PDF-1.4\n' + payload)
+        selected_files.append({
+            'filename': filename,
+            'filepath': path,
+            'month_year': 'setembro_2026',
+            'employee': employee
+        })
+
+    job_id = f"bench-{run_id}"
+    with legacy.jobs_lock:
+        legacy.bulk_send_jobs[job_id] = legacy.BulkSendJob(job_id, len(selected_files))
+
+    enviados_dir = os.path.join(BACKEND_DIR, 'enviados')
+    enviados_existed = os.path.isdir(enviados_dir)
+    simulator.reset_stats()
+    paused_before = pacing.paused_seconds()
+    nominal_before = pacing.nominal_seconds()
+    started = time.perf_counter()
+    try:
+        with quiet(args.verbose):
+            legacy.process_bulk_send_in_background(job_id, selected_files, TEMPLATES, None)
+    finally:
+        wall = time.perf_counter() - started
+        # Arquivos enviados são movidos para backend/enviados: remover os do benchmark
+        for item in selected_files:
+            moved = os.path.join(enviados_dir, item['filename'])
+            if os.path.exists(moved):
+                os.remove(moved)
+        if not enviados_existed and os.path.isdir(enviados_dir) and not os.listdir(enviados_dir):
+            os.rmdir(enviados_dir)
+
+    job = legacy.bulk_send_jobs[job_id]
+    result = summarize('payroll', len(selected_files), job.successful_sends, job.failed_sends, wall,
+                       pacing.paused_seconds() - paused_before,
+                       pacing.nominal_seconds() - nominal_before, simulator.stats(), 'sendMedia')
+    result['job_status'] = job.status
+    result['failure_reasons'] = sorted({f['reason'] for f in job.failed_employees})
+    return result
+
+
+def run_communications(legacy, pacing, simulator, employees, args):
+    import http.server
+
+    server = http.server.HTTPServer(('127.0.0.1', 0), legacy.EnviaFolhaHandler)
+    threading.Thread(target=server.serve_forever, name='bench-http', daemon=True).start()
+    ids = [employees[i % len(employees)]['id'] for i in range(args.messages)]
+    body = json.dumps({
+        'selectedEmployees': ids,
+        'message': 'Comunicado de benchmark: reunião geral amanhã às 9h no refeitório.'
+    }).encode('utf-8')
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{server.server_address[1]}/api/v1/communications/send",
+        data=body, method='POST', headers={'Content-Type': 'application/json'}
+    )
+
+    simulator.reset_stats()
+    paused_before = pacing.paused_seconds()
+    nominal_before = pacing.nominal_seconds()
+    started = time.perf_counter()
+    try:
+        with quiet(args.verbose):
+            with urllib.request.urlopen(request, timeout=3600) as response:
+                data = json.loads(response.read())
+    finally:
+        wall = time.perf_counter() - started
+        server.shutdown()
+        server.server_close()
+
+    result = summarize('communications', len(ids), data.get('success_count', 0), data.get('failed_count', 0), wall,
+                       pacing.paused_seconds() - paused_before,
+                       pacing.nominal_seconds() - nominal_before, simulator.stats(), 'sendText')
+    result['failure_reasons'] = sorted({f.get('reason', '') for f in data.get('failed_employees', [])})
+    return result
+
+
+def print_result(result):
+    print(f"\n📨 {result['scenario']}: {result['successful']}/{result['messages']} enviadas "
+          f"({result['failed']} falhas) em {result['wall_seconds']:.2f}s")
+    print(f"   vazão:              {result['messages_per_minute']:.1f} msg/min (delays escalados)")
+    print(f"   overhead/mensagem:  {result['overhead_ms_per_message']:.1f} ms "
+          f"(sem os {result['paused_seconds']:.2f}s de delays)")
+    print(f"   projeção real:      {result['projected_minutes_real_delays']:.1f} min com os delays anti-softban")
+    calls = ', '.join(f"{k} {v:g}" for k, v in sorted(result['http_calls_per_message'].items()))
+    print(f"   chamadas/mensagem:  {calls}")
+    print(f"   retries:            {result['retries']} (429: {result['rate_limited']}, 5xx: {result['server_errors']}, "
+          f"quedas de instância: {result['disconnects']})")
+    if result['failure_reasons']:
+        print(f"   motivos de falha:   {'; '.join(result['failure_reasons'])[:300]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de envio contra o simulador da Evolution API')
+    parser.add_argument('--scenario', choices=['all', 'payroll', 'communications'], default='all')
+    parser.add_argument('--messages', type=int, default=30, help='Mensagens por cenário')
+    parser.add_argument('--instances', type=int, default=2, choices=[1, 2, 3])
+    parser.add_argument('--delay-scale', type=float, default=0.001, help='SEND_DELAY_SCALE dos delays anti-softban')
+    parser.add_argument('--pdf-kb', type=int, default=120, help='Tamanho de cada holerite simulado')
+    parser.add_argument('--latency-ms', type=float, default=80.0)
+    parser.add_argument('--jitter-ms', type=float, default=30.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--disconnect-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', default=None, help='Padrão: SQLite temporário')
+    parser.add_argument('--json', dest='json_path', default=None, help='Gravar resultados em JSON (comparação)')
+    parser.add_argument('--verbose', action='store_true', help='Mostrar os logs do pipeline')
+    args = parser.parse_args()
+
+    simulator = EvolutionSimulator(SimulatorConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        disconnect_rate=args.disconnect_rate,
+        disconnect_seconds=max(1.0, 120 * args.delay_scale * 2),
+        api_key=API_KEY,
+        seed=args.seed
+    )).start()
+    workdir = tempfile.mkdtemp(prefix='send-benchmark-')
+    configure_environment(args, simulator, workdir)
+
+    with quiet(args.verbose):
+        import main_legacy as legacy
+        from app.core import pacing
+        employees = seed_employees(legacy, max(args.messages, 1))
+
+    print(f"📡 Simulador em {simulator.url} | {args.instances} instância(s) | latência "
+          f"{args.latency_ms:g}±{args.jitter_ms:g} ms | delays x{args.delay_scale:g}")
+
+    results = []
+    try:
+        if args.scenario in ('all', 'payroll'):
+            results.append(run_payroll(legacy, pacing, simulator, employees, args, workdir))
+            print_result(results[-1])
+        if args.scenario in ('all', 'communications'):
+            results.append(run_communications(legacy, pacing, simulator, employees, args))
+            print_result(results[-1])
+    finally:
+        from app.services.log_writer import get_log_writer
+        with quiet(args.verbose):
+            get_log_writer(legacy.SessionLocal).stop(flush=True)
+        simulator.stop()
+        legacy.db_engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as handle:
+            json.dump({'args': vars(args), 'results': results}, handle, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultados gravados em {args.json_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
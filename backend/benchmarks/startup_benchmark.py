@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização do backend
+
+Mede, em processos novos (cold start):
+  1. Tempo de `import main_legacy` (o que cada worker/script paga ao subir)
+  2. Dependências pesadas carregadas na importação (devem ser zero)
+  3. Opcional (--serve): tempo até o servidor responder a primeira requisição
+  4. Opcional (--importtime): módulos mais caros segundo `python -X importtime`
+
+Uso (a partir de backend/):
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --runs 10 --importtime
+    python benchmarks/startup_benchmark.py --serve --port 8099
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependências que só devem ser importadas no primeiro uso
+HEAVY_MODULES = ['pandas', 'numpy', 'openpyxl', 'PyPDF2', 'reportlab', 'pygal', 'jinja2', 'fastapi', 'matplotlib']
+
+_IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main_legacy
+elapsed = time.perf_counter() - started
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{'import_seconds': elapsed, 'heavy_loaded': heavy, 'modules': len(sys.modules)}}))
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    # Não iniciar threads de background nem tocar no banco durante a medição de import
+    env.setdefault('INDICATOR_WARMUP_ENABLED', 'false')
+    env.setdefault('CACHE_VERSION_SYNC_ENABLED', 'false')
+    env.setdefault('SYSTEM_LOG_MAINTENANCE_ENABLED', 'false')
+    return env
+
+
+def measure_import(runs):
+    """Importa main_legacy em `runs` processos novos"""
+    results = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, '-c', _IMPORT_PROBE.format(heavy=HEAVY_MODULES)],
+            cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True
+        )
+        wall = time.perf_counter() - started
+        if proc.returncode != 0:
+            print(proc.stderr[-2000:])
+            raise SystemExit("❌ Falha ao importar main_legacy")
+        data = json.loads(proc.stdout.strip().splitlines()[-1])
+        data['process_seconds'] = wall
+        results.append(data)
+    return results
+
+
+def measure_importtime(top):
+    """Módulos com maior tempo cumulativo de import (python -X importtime)"""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main_legacy'],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        # Formato: "import time:   <self us> | <cumulative us> | <módulo>"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            entries.append((int(cumulative_us), int(self_us), name.strip()))
+        except ValueError:
+            continue
+    entries.sort(reverse=True)
+    return entries[:top]
+
+
+def measure_serve(port, timeout):
+    """Sobe main.py e mede o tempo até /api/v1/system/status responder"""
+    env = _env()
+    env['PORT'] = str(port)
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, 'main.py'], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/v1/system/status', timeout=1):
+                    return time.perf_counter() - started
+            except Exception:
+                if proc.poll() is not None:
+                    raise SystemExit("❌ Servidor encerrou antes de responder")
+                time.sleep(0.05)
+        raise SystemExit(f"❌ Servidor não respondeu em {timeout}s")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de inicialização do backend')
+    parser.add_argument('--runs', type=int, default=5, help='Processos novos por medição')
+    parser.add_argument('--importtime', action='store_true', help='Listar módulos mais caros')
+    parser.add_argument('--top', type=int, default=15, help='Quantidade de módulos em --importtime')
+    parser.add_argument('--serve', action='store_true', help='Medir tempo até a primeira resposta HTTP')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args()
+
+    print(f"⏱️  import main_legacy ({args.runs} processos novos)")
+    results = measure_import(args.runs)
+    import_times = [r['import_seconds'] * 1000 for r in results]
+    process_times = [r['process_seconds'] * 1000 for r in results]
+    print(f"   import:   mediana {statistics.median(import_times):.0f} ms | min {min(import_times):.0f} ms | max {max(import_times):.0f} ms")
+    print(f"   processo: mediana {statistics.median(process_times):.0f} ms (interpretador + import)")
+    print(f"   módulos carregados: {results[-1]['modules']}")
+
+    heavy = results[-1]['heavy_loaded']
+    if heavy:
+        print(f"⚠️  Dependências pesadas carregadas na importação: {', '.join(heavy)}")
+    else:
+        print("✅ Nenhuma dependência pesada carregada na importação")
+
+    if args.importtime:
+        print(f"\n📦 Top {args.top} módulos (tempo cumulativo)")
+        for cumulative_us, self_us, name in measure_importtime(args.top):
+            print(f"   {cumulative_us / 1000:8.1f} ms  (próprio {self_us / 1000:6.1f} ms)  {name}")
+
+    if args.serve:
+        print(f"\n🚀 Tempo até a primeira resposta HTTP (porta {args.port})")
+        print(f"   {measure_serve(args.port, args.timeout) * 1000:.0f} ms")
+
+    return 1 if heavy else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -23,14 +23,18 @@ import os
 import sys
 from http.server import HTTPServer
 
+import main_legacy
+
 # Importar RequestHandler do código legado (TEMPORÁRIO - fase 1 da refatoração)
 # Próximas fases: migrar handlers gradualmente para app/handlers/
 from main_legacy import (
     EnviaFolhaHandler,
-    load_employees_data,
     check_database_health,
-    SessionLocal,
-    db_engine
+    initialize_database,
+    start_employee_directory_warmup,
+    start_cache_sync,
+    start_indicator_warmup,
+    start_system_log_maintenance
 )
 
 # Configurações
@@ -40,8 +44,6 @@ PORT = int(os.getenv('PORT', 8002))
 def print_startup_banner():
     """Exibir banner de inicialização"""
     try:
-        employees_data = load_employees_data()
-        employees_count = len(employees_data.get('employees', []))
         db_health = check_database_health()
         db_type = db_health.get("type", "Desconhecido")
         
@@ -50,7 +52,7 @@ def print_startup_banner():
         print("=" * 60)
         print(f"📡 Servidor: http://localhost:{PORT}")
         print(f"🗄️  Banco de dados: {db_type}")
-        print(f"👥 Colaboradores: {employees_count}")
+        print(f"👥 Colaboradores: carregando em background")
         print(f"📁 Estrutura: Modular (app/routes, app/handlers)")
         print("=" * 60)
         print()
@@ -64,8 +66,9 @@ def print_startup_banner():
 def cleanup_connections():
     """Encerrar conexões do banco de dados"""
     try:
-        if SessionLocal and db_engine:
-            db_engine.dispose()
+        # Globais lidos do módulo: initialize_database() pode tê-los desativado (fallback JSON)
+        if main_legacy.SessionLocal and main_legacy.db_engine:
+            main_legacy.db_engine.dispose()
             print("🔌 Conexão com PostgreSQL encerrada")
     except Exception as e:
         print(f"⚠️  Erro ao encerrar conexão: {e}")
@@ -80,9 +83,16 @@ def main():
     Fase 3 (FUTURA): Migrar handlers para app/handlers/
     """
     try:
-        # Exibir informações de inicialização
+        # Conectar/verificar o banco e exibir informações de inicialização
+        initialize_database()
         print_startup_banner()
         
+        # Colaboradores carregam em background; sincronizar caches entre processos, pré-aquecer indicadores e manter system_logs
+        start_employee_directory_warmup()
+        start_cache_sync()
+        start_indicator_warmup()
+        start_system_log_maintenance()
+        
         # Criar servidor HTTP
         server_address = ('', PORT)
         httpd = HTTPServer(server_address, EnviaFolhaHandler)
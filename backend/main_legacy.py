@@ -17,14 +17,19 @@ import re
 import time
 import random
 
-try:
-    import PyPDF2
-    PDF_PROCESSING_AVAILABLE = True
-    print("✅ PyPDF2 disponível - processamento real de PDFs habilitado")
-except ImportError:
-    PDF_PROCESSING_AVAILABLE = False
+import importlib.util
+
+# PyPDF2 é carregado sob demanda (load_pypdf2); aqui só verificamos se está instalado
+PDF_PROCESSING_AVAILABLE = importlib.util.find_spec('PyPDF2') is not None
+if not PDF_PROCESSING_AVAILABLE:
     print("⚠️ PyPDF2 não instalado. Processamento de PDF será simulado.")
 
+
+def load_pypdf2():
+    """Importa PyPDF2 no primeiro uso (evita o custo na inicialização do servidor)"""
+    import PyPDF2
+    return PyPDF2
+
 # Função para carregar variáveis do .env
 def load_env_file():
     """Carrega variáveis do arquivo .env"""
@@ -108,64 +113,61 @@ def check_database_health():
         }
 
 def setup_database():
-    """Configura conexão com PostgreSQL e cria tabelas se necessário"""
+    """
+    Obtém engine e fábrica de sessões compartilhados (sem conectar ao banco)
+    
+    A conexão é aberta no primeiro uso; verificação e criação de schema ficam
+    em initialize_database(), chamada na inicialização do servidor.
+    """
     try:
-        # Importações SQLAlchemy
-        from sqlalchemy import create_engine, text
-        from sqlalchemy.orm import sessionmaker
-        
-        # Construir DATABASE_URL a partir de variáveis individuais ou usar padrão
-        database_url = os.getenv('DATABASE_URL')
-        if not database_url:
-            # Montar URL a partir de variáveis individuais
-            db_user = os.getenv('DB_USER', 'enviafolha_user')
-            db_password = os.getenv('DB_PASSWORD', 'secure_password')
-            db_host = os.getenv('DB_HOST', 'localhost')
-            db_port = os.getenv('DB_PORT', '5432')
-            db_name = os.getenv('DB_NAME', 'enviafolha_db')
-            database_url = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-        
-        print(f"🔌 Conectando ao PostgreSQL: {database_url}")
-        
-        # Criar engine com connection pooling otimizado
-        engine = create_engine(
-            database_url, 
-            echo=False,
-            pool_size=5,           # Número de conexões mantidas no pool
-            max_overflow=10,       # Conexões extras permitidas quando pool está cheio
-            pool_timeout=30,       # Timeout para obter conexão do pool
-            pool_recycle=3600,     # Reciclar conexões a cada 1 hora
-            pool_pre_ping=True     # Verificar conexão antes de usar
-        )
+        # Engine e sessões compartilhados com app.models.base (um único pool por processo)
+        from app.models.base import engine, SessionLocal
+        return engine, SessionLocal
+    except Exception as e:
+        print(f"❌ Erro ao configurar banco de dados: {e}")
+        print("⚠️  Continuando com armazenamento JSON como fallback...")
+        return None, None
+
+def initialize_database(create_schema=None):
+    """
+    Verifica a conexão com o PostgreSQL na inicialização do servidor
+    
+    Args:
+        create_schema: Criar tabelas ausentes (padrão: DB_CREATE_SCHEMA_ON_STARTUP, false).
+            O schema é criado pelo passo explícito `python run_migrations.py`, antes do deploy.
+    
+    Sem banco acessível, o servidor segue com armazenamento JSON (fallback).
+    """
+    global db_engine, SessionLocal
+    if not db_engine:
+        return False
+    
+    try:
+        from sqlalchemy import text
+        from app.core.db_engine import resolve_database_url, pool_stats
         
-        # Testar conexão
-        with engine.connect() as connection:
-            result = connection.execute(text("SELECT version()"))
-            version = result.fetchone()[0]
+        print(f"🔌 Conectando ao PostgreSQL: {resolve_database_url()}")
+        with db_engine.connect() as connection:
+            version = connection.execute(text("SELECT version()")).fetchone()[0]
             print(f"✅ Conectado ao PostgreSQL: {version}")
         
-        # Importar todos os modelos para garantir que estejam registrados
-        from app.models import Base, User, Employee, Role, PayrollPeriod, PayrollData, PayrollTemplate, PayrollProcessingLog
-        from app.models.send_queue import SendQueue, SendQueueItem
+        if create_schema is None:
+            create_schema = os.getenv('DB_CREATE_SCHEMA_ON_STARTUP', 'false').lower() in ('1', 'true', 'yes')
+        if create_schema:
+            from app.core.database import create_schema as create_all_tables
+            create_all_tables(db_engine)
+            print("✅ Tabelas do banco de dados verificadas/criadas")
         
-        # Criar tabelas se não existirem
-        Base.metadata.create_all(bind=engine)
-        print("✅ Tabelas do banco de dados verificadas/criadas")
-        
-        # Criar sessão com configurações otimizadas
-        SessionLocal = sessionmaker(
-            autocommit=False, 
-            autoflush=False, 
-            bind=engine,
-            expire_on_commit=False  # Evita queries extras depois do commit
-        )
-        
-        return engine, SessionLocal
+        stats = pool_stats()
+        if 'max_connections' in stats:
+            print(f"🔗 Pool de conexões: {stats['pool_size']} + {stats['max_connections'] - stats['pool_size']} extras")
+        return True
         
     except Exception as e:
         print(f"❌ Erro ao conectar com PostgreSQL: {e}")
         print("⚠️  Continuando com armazenamento JSON como fallback...")
-        return None, None
+        db_engine, SessionLocal = None, None
+        return False
 
 # Inicializar banco de dados
 db_engine, SessionLocal = setup_database()
@@ -189,69 +191,57 @@ def log_system_event(event_type: str, description: str, details: dict = None,
         return
     
     try:
-        db = SessionLocal()
-        try:
-            from app.models.system_log import SystemLog, LogLevel, LogCategory
-            import json
-            
-            # Mapear severity string para LogLevel enum
-            level_map = {
-                'debug': LogLevel.DEBUG,
-                'info': LogLevel.INFO,
-                'warning': LogLevel.WARNING,
-                'error': LogLevel.ERROR,
-                'critical': LogLevel.CRITICAL
-            }
-            level = level_map.get(severity.lower(), LogLevel.INFO)
-            
-            # Tentar mapear event_type para categoria
-            category = LogCategory.SYSTEM  # Default
-            if 'auth' in event_type.lower() or 'login' in event_type.lower():
-                category = LogCategory.AUTH
-            elif 'employee' in event_type.lower():
-                category = LogCategory.EMPLOYEE
-            elif 'import' in event_type.lower():
-                category = LogCategory.IMPORT
-            elif 'payroll' in event_type.lower() or 'holerite' in event_type.lower():
-                category = LogCategory.PAYROLL
-            elif 'communication' in event_type.lower() or 'comunicado' in event_type.lower():
-                category = LogCategory.COMMUNICATION
-            elif 'whatsapp' in event_type.lower() or 'evolution' in event_type.lower():
-                category = LogCategory.WHATSAPP
-            
-            # Converter details para JSON string se necessário
-            details_json = None
-            if details:
-                try:
-                    details_json = json.dumps(details, ensure_ascii=False, default=str)
-                except:
-                    details_json = str(details)
-            
-            log_entry = SystemLog(
-                level=level,
-                category=category,
-                message=f"[{event_type}] {description}",
-                details=details_json,
-                user_id=user_id,
-                created_at=datetime.now()
-            )
-            
-            db.add(log_entry)
-            db.commit()
-            
-        finally:
-            db.close()
+        from app.models.system_log import LogLevel, LogCategory
+        from app.services.log_writer import get_log_writer
+        import json
+        
+        # Mapear severity string para LogLevel enum
+        level_map = {
+            'debug': LogLevel.DEBUG,
+            'info': LogLevel.INFO,
+            'warning': LogLevel.WARNING,
+            'error': LogLevel.ERROR,
+            'critical': LogLevel.CRITICAL
+        }
+        level = level_map.get(severity.lower(), LogLevel.INFO)
+        
+        # Tentar mapear event_type para categoria
+        category = LogCategory.SYSTEM  # Default
+        if 'auth' in event_type.lower() or 'login' in event_type.lower():
+            category = LogCategory.AUTH
+        elif 'employee' in event_type.lower():
+            category = LogCategory.EMPLOYEE
+        elif 'import' in event_type.lower():
+            category = LogCategory.IMPORT
+        elif 'payroll' in event_type.lower() or 'holerite' in event_type.lower():
+            category = LogCategory.PAYROLL
+        elif 'communication' in event_type.lower() or 'comunicado' in event_type.lower():
+            category = LogCategory.COMMUNICATION
+        elif 'whatsapp' in event_type.lower() or 'evolution' in event_type.lower():
+            category = LogCategory.WHATSAPP
+        
+        # Converter details para JSON string se necessário
+        details_json = None
+        if details:
+            try:
+                details_json = json.dumps(details, ensure_ascii=False, default=str)
+            except:
+                details_json = str(details)
+        
+        # Enfileirado: gravado em lote pela thread de logs (não espera commit)
+        get_log_writer(SessionLocal).log(
+            level,
+            category,
+            f"[{event_type}] {description}",
+            details=details_json,
+            user_id=user_id
+        )
             
     except Exception as e:
         print(f"⚠️ Erro ao registrar log no banco: {e}")
         # Não lançar exceção para não quebrar o fluxo principal
 
-# Cache para employees (atualizado a cada 3 minutos)
-employees_cache = {
-    'data': None,
-    'last_update': 0,
-    'ttl': 180  # Time to live em segundos (3 minutos)
-}
+# Cache de employees: ver get_employees_directory() (diretório indexado, atualização incremental)
 
 # ========================================
 # GERENCIADOR DE JOBS EM BACKGROUND
@@ -298,86 +288,15 @@ class BulkSendJob:
         }
 
 def load_employees_data():
-    """Carrega dados dos funcionários do PostgreSQL ou JSON como fallback com cache"""
-    global employees_cache
-    
-    # Verificar se cache é válido
-    import time
-    current_time = time.time()
-    cache_age = current_time - employees_cache['last_update']
-    
-    if employees_cache['data'] is not None and cache_age < employees_cache['ttl']:
-        # Retornar do cache
-        print(f"💾 Usando cache de employees (idade: {cache_age:.1f}s)")
-        return employees_cache['data']
-    
-    print(f"🔄 Cache expirado ou inválido, carregando do banco...")
-    
+    """Carrega dados dos funcionários do PostgreSQL (diretório indexado) ou JSON como fallback"""
     if SessionLocal:
-        db = None
         try:
-            # Importar models apenas se PostgreSQL disponível
-            sys.path.append(os.path.dirname(__file__))
-            from app.models import Employee
-            
-            print("🔌 Abrindo sessão do banco...")
-            db = SessionLocal()
-            
-            print("📊 Executando query para buscar employees...")
-            employees = db.query(Employee).filter(Employee.is_active == True).all()
-            print(f"✅ Query concluída: {len(employees)} employees encontrados")
-            
-            # Converter para formato compatível incluindo novos campos
-            employees_data = []
-            for emp in employees:
-                emp_dict = {
-                    "id": emp.id,
-                    "unique_id": emp.unique_id,
-                    "full_name": emp.name,
-                    "cpf": emp.cpf or "",
-                    "phone_number": emp.phone or "",
-                    "email": emp.email or "",
-                    "department": emp.department or "",
-                    "position": emp.position or "",
-                    "birth_date": emp.birth_date.isoformat() if emp.birth_date else "",
-                    "sex": emp.sex or "",
-                    "marital_status": emp.marital_status or "",
-                    "admission_date": emp.admission_date.isoformat() if emp.admission_date else "",
-                    "contract_type": emp.contract_type or "",
-                    "employment_status": emp.employment_status or "Ativo",
-                    "termination_date": emp.termination_date.isoformat() if emp.termination_date else "",
-                    "leave_start_date": emp.leave_start_date.isoformat() if emp.leave_start_date else "",
-                    "leave_end_date": emp.leave_end_date.isoformat() if emp.leave_end_date else "",
-                    "status_reason": emp.status_reason or "",
-                    "is_active": emp.is_active
-                }
-                employees_data.append(emp_dict)
-            
-            print(f"✅ Carregados {len(employees_data)} funcionários do PostgreSQL")
-            
-            # Log dos unique_ids para debug
-            if employees_data:
-                unique_ids_sample = [emp['unique_id'] for emp in employees_data[:5]]
-                print(f"📋 Primeiros unique_ids: {unique_ids_sample}")
-            
-            # Atualizar cache
-            result = {"employees": employees_data, "users": []}
-            employees_cache['data'] = result
-            employees_cache['last_update'] = current_time
-            
-            return result
-            
+            return {"employees": get_employees_directory().employees(), "users": []}
         except Exception as e:
             print(f"❌ Erro ao carregar funcionários do PostgreSQL: {e}")
             import traceback
             traceback.print_exc()
             print("⚠️  Tentando carregar do arquivo JSON...")
-            
-        finally:
-            if db:
-                print("🔒 Fechando sessão do banco...")
-                db.close()
-                print("✅ Sessão fechada com sucesso")
     
     # Fallback para JSON
     try:
@@ -395,18 +314,70 @@ def load_employees_data():
         print(f"❌ Erro ao carregar employees.json: {e}")
         return {"employees": [], "users": []}
 
-def invalidate_employees_cache():
-    """Invalida o cache de employees forçando reload no próximo acesso"""
-    global employees_cache
-    employees_cache['data'] = None
-    employees_cache['last_update'] = 0
+def get_employees_directory():
+    """Diretório de colaboradores ativos com índices por id, matrícula, CPF e telefone"""
+    from app.services.employee_directory import get_employee_directory
+    return get_employee_directory(SessionLocal)
+
+def get_payroll_manifest():
+    """Manifesto persistido dos holerites individuais gerados (processed/ e pasta legada)"""
+    from app.services.payroll_manifest import get_payroll_manifest as get_manifest
+    return get_manifest(SessionLocal)
+
+def record_processed_payroll(path, **fields):
+    """Registra no manifesto um holerite individual recém-gerado"""
+    if not SessionLocal:
+        return
+    try:
+        get_payroll_manifest().record(path, **fields)
+    except Exception as e:
+        print(f"⚠️ Erro ao atualizar manifesto de holerites: {e}")
+
+def forget_processed_payroll(path):
+    """Tira do manifesto um holerite movido/excluído (sem esperar a reconciliação por mtime)"""
+    if not SessionLocal:
+        return
+    try:
+        get_payroll_manifest().discard(path)
+    except Exception as e:
+        print(f"⚠️ Erro ao atualizar manifesto de holerites: {e}")
+
+def invalidate_employees_cache(full=False):
+    """Marca o diretório de employees para atualização (incremental) no próximo acesso"""
+    if SessionLocal:
+        get_employees_directory().invalidate(full=full)
+        # Propagar para os demais processos do servidor
+        from app.services.cache_versions import broadcast, EMPLOYEES
+        broadcast(EMPLOYEES, {'full': full})
     print("🔄 Cache de funcionários invalidado")
 
+def notify_indicator_change(source, company=None, indicator_types=None, year=None, month=None):
+    """Propaga alteração de colaboradores/afastamentos/folha apenas para os indicadores afetados"""
+    if not SessionLocal:
+        return
+    db = SessionLocal()
+    try:
+        from app.services.indicator_cube import publish_indicator_change
+        publish_indicator_change(source, company=company, year=year, month=month,
+                                 indicator_types=indicator_types, db=db)
+    except Exception as e:
+        print(f"⚠️ Erro ao invalidar indicadores: {e}")
+    finally:
+        db.close()
+
 def get_employee_by_id(employee_id):
     """Busca um funcionário específico diretamente do banco (sem carregar todos)"""
     print(f"🔍 get_employee_by_id chamado para ID: {employee_id}")
     
     if SessionLocal:
+        # Busca O(1) no diretório em memória; o banco só é consultado se não encontrar
+        try:
+            employee = get_employees_directory().resolve(employee_id)
+            if employee:
+                return employee
+        except Exception as e:
+            print(f"⚠️  Diretório de employees indisponível: {e}")
+        
         db = None
         try:
             from app.models import Employee
@@ -475,10 +446,11 @@ def get_employee_by_id(employee_id):
     current_data = load_employees_data()
     employees = current_data.get('employees', [])
     
-    for emp in employees:
-        if str(emp.get('id')) == str(employee_id) or str(emp.get('unique_id')) == str(employee_id):
-            print(f"✅ Funcionário encontrado no fallback: {emp.get('full_name')}")
-            return emp
+    employee_id = str(employee_id)
+    emp = next((e for e in employees if str(e.get('id')) == employee_id or str(e.get('unique_id')) == employee_id), None)
+    if emp:
+        print(f"✅ Funcionário encontrado no fallback: {emp.get('full_name')}")
+        return emp
     
     print(f"❌ Funcionário {employee_id} não encontrado no fallback")
     return None
@@ -580,6 +552,7 @@ def save_employee_to_db(employee_data, created_by_user_id=3):
             
             # Invalidar cache para forçar reload
             invalidate_employees_cache()
+            notify_indicator_change('employee_save', company=employee_data.get('company_code'))
             
             return True
             
@@ -620,9 +593,6 @@ def save_employee_to_db(employee_data, created_by_user_id=3):
         print(f"❌ Erro ao salvar funcionário no JSON: {e}")
         return False
 
-# Carregar dados iniciais
-employees_data = load_employees_data()
-
 def process_bulk_send_in_background(job_id, selected_files, message_templates, user_id):
     """
     Processa envio em lote em background sem bloquear o servidor HTTP.
@@ -637,7 +607,6 @@ def process_bulk_send_in_background(job_id, selected_files, message_templates, u
     import asyncio
     import sys
     import os
-    import time
     import random
     from datetime import datetime
     
@@ -677,6 +646,7 @@ def process_bulk_send_in_background(job_id, selected_files, message_templates, u
         from app.services.queue_manager import QueueManagerService
         from app.services.instance_manager import InstanceManager
         from app.models.base import get_db
+        from app.core.pacing import cooldown, mark, pause
         
         # Criar sessão do banco de dados para a thread
         db = SessionLocal()
@@ -788,7 +758,7 @@ def process_bulk_send_in_background(job_id, selected_files, message_templates, u
                         # Pausa - aguardar até retomar
                         while queue and queue.status == 'paused':
                             print(f"⏸️  [JOB {job_id[:8]}] Fila pausada. Aguardando retomada...")
-                            time.sleep(5)  # Verificar a cada 5 segundos
+                            pause(5)  # Verificar a cada 5 segundos
                             temp_db.refresh(queue)
                             
                             # Verificar se foi cancelada durante a pausa
@@ -826,7 +796,7 @@ def process_bulk_send_in_background(job_id, selected_files, message_templates, u
                     
                     while total_waited < max_wait_time:
                         print(f"⏳ [JOB {job_id[:8]}] Aguardando {wait_interval}s para verificar reconexão...")
-                        time.sleep(wait_interval)
+                        pause(wait_interval)
                         total_waited += wait_interval
                         
                         all_status = loop.run_until_complete(instance_manager.check_all_instances_status())
@@ -850,14 +820,11 @@ def process_bulk_send_in_background(job_id, selected_files, message_templates, u
                 
                 # Verificar quanto tempo passou desde último envio NESTA instância
                 instance_delay = instance_manager.get_instance_delay(next_instance)
-                min_delay_per_instance = 30  # Mínimo 30s entre envios da mesma instância
                 
-                if instance_delay < min_delay_per_instance:
-                    # Precisa aguardar para esta instância
-                    wait_time = min_delay_per_instance - instance_delay
-                    print(f"⏳ [JOB {job_id[:8]}] Instância {next_instance} precisa aguardar {wait_time:.1f}s (último envio há {instance_delay:.1f}s)")
-                    print(f"⏰ Início do delay: {datetime.now().strftime('%H:%M:%S')}")
-                    time.sleep(wait_time)
+                # Mínimo 30s entre envios da mesma instância (espera nominal, escalada por pacing)
+                wait_time = cooldown(next_instance, instance_delay, 30)
+                if wait_time > 0:
+                    print(f"⏳ [JOB {job_id[:8]}] Instância {next_instance} aguardou {wait_time:.1f}s (último envio há {instance_delay:.1f}s)")
                     print(f"✅ Delay concluído: {datetime.now().strftime('%H:%M:%S')}")
                 else:
                     print(f"⚡ [JOB {job_id[:8]}] Instância {next_instance} pronta (último envio há {instance_delay:.1f}s) - SEM DELAY")
@@ -875,7 +842,7 @@ def process_bulk_send_in_background(job_id, selected_files, message_templates, u
                     remaining = long_delay
                     while remaining > 0:
                         sleep_time = min(60, remaining)
-                        time.sleep(sleep_time)
+                        pause(sleep_time)
                         remaining -= sleep_time
                         if remaining > 0:
                             print(f"   ⏳ Restam {int(remaining)}s da pausa estratégica...")
@@ -999,6 +966,7 @@ def process_bulk_send_in_background(job_id, selected_files, message_templates, u
                 
                 # Registrar envio na instância (para tracking de delays)
                 instance_manager.register_send(next_instance)
+                mark(next_instance)
                 print(f"✅ [JOB {job_id[:8]}] Envio registrado para instância: {next_instance}")
                 
                 # Verificar resultado
@@ -1072,29 +1040,24 @@ def process_bulk_send_in_background(job_id, selected_files, message_templates, u
                         
                         dest_path = os.path.join(enviados_dir, filename)
                         shutil.move(file_path, dest_path)
+                        forget_processed_payroll(file_path)
                         print(f"📦 [JOB {job_id[:8]}] Arquivo movido para enviados/")
                     except Exception as move_error:
                         print(f"⚠️ [JOB {job_id[:8]}] Erro ao mover arquivo: {move_error}")
                     
                     # 📝 REGISTRAR LOG DO SISTEMA - ENVIO SUCESSO
                     try:
-                        from app.models.system_log import SystemLog, LogLevel, LogCategory
-                        log_db = SessionLocal()
-                        try:
-                            log_entry = SystemLog(
-                                level=LogLevel.INFO,
-                                category=LogCategory.PAYROLL,
-                                message=f"Holerite enviado com sucesso: {employee_name} ({month_year})",
-                                details=f"Arquivo: {filename}, Telefone: {phone_number}, Instância: {next_instance}",
-                                user_id=user_id,
-                                entity_type='Employee',
-                                entity_id=str(employee_id)
-                            )
-                            log_db.add(log_entry)
-                            log_db.commit()
-                            print(f"📝 [JOB {job_id[:8]}] Log de sucesso registrado")
-                        finally:
-                            log_db.close()
+                        from app.models.system_log import LogLevel, LogCategory
+                        from app.services.log_writer import get_log_writer
+                        get_log_writer(SessionLocal).log(
+                            LogLevel.INFO,
+                            LogCategory.PAYROLL,
+                            f"Holerite enviado com sucesso: {employee_name} ({month_year})",
+                            details=f"Arquivo: {filename}, Telefone: {phone_number}, Instância: {next_instance}",
+                            user_id=user_id,
+                            entity_type='Employee',
+                            entity_id=str(employee_id)
+                        )
                     except Exception as log_error:
                         print(f"⚠️ [JOB {job_id[:8]}] Erro ao registrar log: {log_error}")
                 
@@ -1122,7 +1085,7 @@ def process_bulk_send_in_background(job_id, selected_files, message_templates, u
                             item_id = queue_item_map.get(filename)
                             print(f"🔍 [JOB {job_id[:8]}] Procurando item (falha) para {filename}: item_id={item_id}")
                             if item_id:
-                                queue_service.update_item_status(item_id, 'failed', last_error)
+                                queue_service.update_item_status(item_id, 'failed', error_msg)
                                 print(f"❌ [JOB {job_id[:8]}] Item {item_id} marcado como 'failed'")
                             else:
                                 print(f"⚠️ [JOB {job_id[:8]}] Item não encontrado no mapa para {filename}")
@@ -1155,7 +1118,7 @@ def process_bulk_send_in_background(job_id, selected_files, message_templates, u
                                 month=month_for_db,
                                 file_path=filename,
                                 status='failed',
-                                error_message=last_error,
+                                error_message=error_msg,
                                 user_id=user_id
                             )
                             db.add(payroll_send)
@@ -1168,23 +1131,17 @@ def process_bulk_send_in_background(job_id, selected_files, message_templates, u
                     
                     # 📝 REGISTRAR LOG DO SISTEMA - ENVIO FALHA
                     try:
-                        from app.models.system_log import SystemLog, LogLevel, LogCategory
-                        log_db = SessionLocal()
-                        try:
-                            log_entry = SystemLog(
-                                level=LogLevel.ERROR,
-                                category=LogCategory.PAYROLL,
-                                message=f"Falha ao enviar holerite: {employee_name} ({month_year})",
-                                details=f"Erro: {error_msg}, Arquivo: {filename}, Telefone: {phone_number}",
-                                user_id=user_id,
-                                entity_type='Employee',
-                                entity_id=str(employee_id)
-                            )
-                            log_db.add(log_entry)
-                            log_db.commit()
-                            print(f"📝 [JOB {job_id[:8]}] Log de falha registrado")
-                        finally:
-                            log_db.close()
+                        from app.models.system_log import LogLevel, LogCategory
+                        from app.services.log_writer import get_log_writer
+                        get_log_writer(SessionLocal).log(
+                            LogLevel.ERROR,
+                            LogCategory.PAYROLL,
+                            f"Falha ao enviar holerite: {employee_name} ({month_year})",
+                            details=f"Erro: {error_msg}, Arquivo: {filename}, Telefone: {phone_number}",
+                            user_id=user_id,
+                            entity_type='Employee',
+                            entity_id=str(employee_id)
+                        )
                     except Exception as log_error:
                         print(f"⚠️ [JOB {job_id[:8]}] Erro ao registrar log: {log_error}")
                     
@@ -1284,8 +1241,160 @@ def process_bulk_send_in_background(job_id, selected_files, message_templates, u
             db.close()
             print(f"🔒 [JOB {job_id[:8]}] Sessão do banco fechada")
 
+def build_route_table():
+    """
+    Tabela de rotas do EnviaFolhaHandler (montada uma vez, na importação)
+    Handlers do próprio servidor são referenciados pelo nome do método;
+    routers modulares (app/routes) são montados com mount() e importados
+    apenas no primeiro uso
+    """
+    from app.core.routing import RouteTable, mount
+
+    routes = RouteTable()
+
+    # ===== GET =====
+    routes.get('/', 'send_status_response')
+    routes.get('/health', 'send_health_check')
+    routes.get('/api/v1/database/health', 'send_database_health')
+    routes.get('/api/v1/users', 'handle_users_list')
+    routes.get('/api/v1/roles', 'handle_roles_list')
+    routes.get('/api/v1/users/permissions', 'handle_available_permissions')
+
+    routes.get('/api/v1/payroll/periods', 'handle_payroll_periods_list')
+    routes.get('/api/v1/payroll/period-comparison', 'handle_period_comparison')
+    routes.get('/api/v1/payroll/templates', 'handle_payroll_templates_list')
+    routes.get('/api/v1/payroll/periods/{period_id:int}', 'handle_payroll_period_summary')
+
+    # Benefícios
+    routes.get('/api/v1/benefits/periods', 'handle_benefits_periods_list')
+    routes.get('/api/v1/benefits/processing-logs', 'handle_benefits_processing_logs')
+    routes.get('/api/v1/benefits/periods/{period_id:int}', 'handle_benefits_period_detail')
+
+    # Cartão ponto
+    routes.get('/api/v1/timecard/periods', 'handle_timecard_periods_list')
+    routes.get('/api/v1/timecard/processing-logs', 'handle_timecard_processing_logs')
+    routes.get('/api/v1/timecard/periods/{period_id:int}', 'handle_timecard_period_detail')
+    routes.get('/api/v1/timecard/stats', 'handle_timecard_stats')
+
+    # Colaboradores (employee_id aceita id numérico ou unique_id)
+    routes.get('/api/v1/employees', 'send_employees_list')
+    routes.get('/api/v1/employees/cache/status', 'handle_cache_status')
+    routes.get('/api/v1/employees/{employee_id}', 'send_employee_detail')
+    routes.get('/api/v1/employees/{employee_id}/leaves', 'handle_get_employee_leaves')
+    routes.get('/api/v1/employees/{employee_id}/leaves/{leave_id:int}', 'handle_get_employee_leave_detail')
+
+    # Routers modulares
+    routes.get('/api/v1/auth/me', mount('app.routes.auth', 'AuthRouter', 'handle_auth_me'))
+    routes.get('/api/v1/dashboard/stats', mount('app.routes.dashboard', 'DashboardRouter', 'handle_dashboard_stats'))
+    routes.get('/api/v1/evolution/status', mount('app.routes.system', 'SystemRouter', 'handle_evolution_status'))
+    routes.get('/api/v1/evolution/instances', mount('app.routes.system', 'SystemRouter', 'handle_evolution_instances_status'))
+    routes.get('/api/v1/system/status', mount('app.routes.system', 'SystemRouter', 'handle_system_status'))
+    routes.get('/api/v1/system/logs', mount('app.routes.system', 'SystemRouter', 'handle_system_logs'))
+    routes.get('/api/v1/system/metrics', mount('app.routes.system', 'SystemRouter', 'handle_metrics'))
+    routes.get('/api/v1/system/metrics/summary', mount('app.routes.system', 'SystemRouter', 'handle_metrics_summary'),
+               query={'top': 25})
+    routes.get('/api/v1/system/query-report', mount('app.routes.system', 'SystemRouter', 'handle_query_report'))
+    routes.get('/api/v1/system/profiles', mount('app.routes.system', 'SystemRouter', 'handle_profiles_list'))
+    routes.post('/api/v1/system/profiles', mount('app.routes.system', 'SystemRouter', 'handle_profiles_create'))
+    routes.get('/api/v1/system/profiles/{name}', mount('app.routes.system', 'SystemRouter', 'handle_profile_download'))
+    routes.delete('/api/v1/system/profiles/{name}', mount('app.routes.system', 'SystemRouter', 'handle_profile_delete'))
+    routes.get('/api/v1/reports/recent', mount('app.routes.reports', 'ReportsRouter', 'handle_recent_activity'))
+    routes.get('/api/v1/reports/statistics', mount('app.routes.reports', 'ReportsRouter', 'handle_statistics'))
+
+    # Indicadores RH
+    routes.get('/api/v1/indicators/overview', 'handle_indicators_overview')
+    routes.get('/api/v1/indicators/headcount', 'handle_indicators_headcount')
+    routes.get('/api/v1/indicators/turnover', 'handle_indicators_turnover')
+    routes.get('/api/v1/indicators/demographics', 'handle_indicators_demographics')
+    routes.get('/api/v1/indicators/tenure', 'handle_indicators_tenure')
+    routes.get('/api/v1/indicators/leaves', 'handle_indicators_leaves')
+    routes.get('/api/v1/reports/generate', 'handle_report_generate')
+
+    # Folha (dados CSV)
+    routes.get('/api/v1/payrolls/processed', 'handle_payrolls_processed')
+    routes.get('/api/v1/payrolls/periods', 'handle_list_payroll_periods')
+    routes.get('/api/v1/payroll/statistics', 'handle_payroll_statistics')
+    routes.get('/api/v1/payroll/employees', 'handle_payroll_employees')
+    routes.get('/api/v1/payroll/divisions', 'handle_payroll_divisions')
+    routes.get('/api/v1/payroll/companies', 'handle_payroll_companies')
+    routes.get('/api/v1/payroll/years', 'handle_payroll_years')
+    routes.get('/api/v1/payroll/months', 'handle_payroll_months')
+    routes.get('/api/v1/payroll/processing-history', 'handle_payroll_processing_history')
+    routes.get('/api/v1/payroll/statistics-debug', 'handle_payroll_statistics_debug')
+    routes.get('/api/v1/payroll/statistics-filtered', 'handle_payroll_statistics_filtered')
+
+    # Jobs em background
+    routes.get('/api/v1/payrolls/bulk-send/{job_id}/status', 'handle_bulk_send_status')
+
+    # Endomarketing
+    routes.get('/api/v1/endomarketing/summary', 'handle_endomarketing_summary')
+    routes.get('/api/v1/endomarketing/birthdays', 'handle_endomarketing_birthdays', query={'period': 'month'})
+    routes.get('/api/v1/endomarketing/work-anniversaries', 'handle_endomarketing_work_anniversaries', query={'period': 'month'})
+    routes.get('/api/v1/endomarketing/probation', 'handle_endomarketing_probation', query={'phase': 1})
+
+    # Filas de envio
+    routes.get('/api/v1/queue/active', 'handle_get_active_queues')
+    routes.get('/api/v1/queue/list', 'handle_get_all_queues')
+    routes.get('/api/v1/queue/statistics', 'handle_get_queue_statistics')
+    routes.get('/api/v1/queue/{queue_id}/details', 'handle_get_queue_details')
+
+    # Scripts úteis
+    routes.get('/api/v1/scripts/{script_id}/preview', 'handle_script_preview')
+
+    # ===== POST =====
+    routes.post('/api/v1/auth/login', mount('app.routes.auth', 'AuthRouter', 'handle_login'))
+    routes.post('/api/v1/employees', 'handle_create_employee')
+    routes.post('/api/v1/employees/{employee_id}/leaves', 'handle_create_employee_leave')
+    routes.post('/api/v1/employees/import', 'handle_import_employees')
+    routes.post('/api/v1/import/employees', 'handle_import_employees')
+    routes.post('/api/v1/employees/cache/invalidate', 'handle_cache_invalidate')
+    routes.post('/api/v1/indicators/cache/invalidate', 'handle_indicators_invalidate_cache')
+    routes.post('/api/v1/users', 'handle_create_user')
+    routes.post('/api/v1/users/permissions', 'handle_update_user_permissions')
+    routes.post('/api/v1/payroll/periods', 'handle_create_payroll_period')
+    routes.post('/api/v1/payroll/templates', 'handle_create_payroll_template')
+    routes.post('/api/v1/payroll/process', 'handle_process_payroll_file')
+    routes.post('/api/v1/payrolls/process', 'handle_process_payroll_file')
+    routes.post('/api/v1/payroll/upload-csv', 'handle_upload_payroll_csv')
+    routes.post('/api/v1/benefits/upload-xlsx', 'handle_upload_benefits_xlsx')
+    routes.post('/api/v1/timecard/upload-xlsx', 'handle_upload_timecard_xlsx')
+    routes.post('/api/v1/uploads/csv', 'handle_csv_file_upload')
+    routes.post('/api/v1/payrolls/periods', 'handle_list_payroll_periods')
+    routes.post('/api/v1/payrolls/export-batch', 'handle_export_payroll_batch')
+    routes.post('/api/v1/payrolls/bulk-send', 'handle_bulk_send_payrolls')
+    routes.post('/api/v1/payrolls/delete-file', 'handle_delete_payroll_file')
+    routes.post('/api/v1/files/upload', 'handle_file_upload')
+    routes.post('/api/v1/communications/send', 'handle_send_communication')
+    routes.post('/api/v1/evolution/test-message', 'handle_test_evolution_message')
+    routes.post('/api/v1/scripts/{script_id}', 'handle_execute_script')
+    routes.post('/api/v1/queue/{queue_id}/cancel', 'handle_cancel_queue')
+    routes.post('/api/v1/queue/{queue_id}/pause', 'handle_pause_queue')
+    routes.post('/api/v1/queue/{queue_id}/resume', 'handle_resume_queue')
+
+    # ===== PUT =====
+    routes.put('/api/v1/employees/{employee_id}', 'handle_update_employee')
+    routes.put('/api/v1/employees/{employee_id}/leaves/{leave_id:int}', 'handle_update_employee_leave')
+    routes.put('/api/v1/users/{user_id:int}', 'handle_update_user')
+
+    # ===== DELETE =====
+    routes.delete('/api/v1/employees/{employee_id}', 'handle_delete_employee')
+    routes.delete('/api/v1/employees/{employee_id}/leaves/{leave_id:int}', 'handle_delete_employee_leave')
+    routes.delete('/api/v1/users/{user_id:int}', 'handle_delete_user')
+    routes.delete('/api/v1/payroll/periods/{period_id:int}', 'handle_delete_payroll_period')
+    routes.delete('/api/v1/benefits/periods/{period_id:int}', 'handle_delete_benefits_period')
+    routes.delete('/api/v1/timecard/periods/{period_id:int}', 'handle_delete_timecard_period')
+
+    # ===== PATCH =====
+    routes.patch('/api/v1/employees/bulk', 'handle_bulk_update_employees')
+
+    return routes
+
+
 class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
     
+    # Tabela de rotas compilada (método + padrão -> handler)
+    ROUTES = build_route_table()
+    
     # Rotas silenciosas (não aparecerão nos logs)
     SILENT_ROUTES = [
         '/api/v1/database/health',      # Healthcheck do banco (a cada 5s)
@@ -1326,16 +1435,6 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization, apikey')
         self.send_header('Access-Control-Max-Age', '86400')
     
-    def send_json_response(self, data, status_code=200):
-        """Enviar resposta JSON"""
-        self.send_response(status_code)
-        self.send_header('Content-Type', 'application/json')
-        self.send_cors_headers()
-        self.end_headers()
-        
-        response = json.dumps(data, ensure_ascii=False)
-        self.wfile.write(response.encode('utf-8'))
-    
     def get_request_data(self):
         """Obter dados da requisição POST/PUT"""
         try:
@@ -1369,355 +1468,198 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
     def send_json_response(self, data, status_code=200):
         """Send JSON response with CORS headers and error handling"""
         try:
-            self.send_response(status_code)
-            self.send_cors_headers()
-            self.send_header('Content-Type', 'application/json; charset=utf-8')
-            self.end_headers()
+            from app.core.json_serializer import get_serializer
             
-            response = json.dumps(data, ensure_ascii=False)
-            self.wfile.write(response.encode('utf-8'))
+            self.send_body(get_serializer().dumps(data), 'application/json; charset=utf-8', status_code)
         except (ConnectionAbortedError, BrokenPipeError):
             # Cliente desconectou antes de receber a resposta
             print("⚠️  Conexão abortada pelo cliente")
         except Exception as e:
             print(f"❌ Erro ao enviar resposta JSON: {e}")
     
-    def do_GET(self):
-        parsed_path = urllib.parse.urlparse(self.path)
-        path = parsed_path.path
-        
-        if path == '/':
-            self.send_status_response()
-        elif path == '/health':
-            self.send_health_check()
-        elif path == '/api/v1/database/health':
-            self.send_database_health()
-        elif path == '/api/v1/users':
-            self.handle_users_list()
-        elif path == '/api/v1/roles':
-            self.handle_roles_list()
-        elif path == '/api/v1/users/permissions':
-            self.handle_available_permissions()
-        
-        elif path == '/api/v1/payroll/periods':
-            self.handle_payroll_periods_list()
-        elif path == '/api/v1/payroll/period-comparison':
-            self.handle_period_comparison()
-        elif path == '/api/v1/payroll/templates':
-            self.handle_payroll_templates_list()
-        elif path.startswith('/api/v1/payroll/periods/'):
-            period_id = path.split('/')[-1]
-            self.handle_payroll_period_summary(period_id)
-        
-        # Rotas de benefícios
-        elif path == '/api/v1/benefits/periods':
-            self.handle_benefits_periods_list()
-        elif path == '/api/v1/benefits/processing-logs':
-            self.handle_benefits_processing_logs()
-        elif path.startswith('/api/v1/benefits/periods/'):
-            period_id = path.split('/')[-1]
-            self.handle_benefits_period_detail(period_id)
-        
-        # Rotas de cartão ponto
-        elif path == '/api/v1/timecard/periods':
-            self.handle_timecard_periods_list()
-        elif path == '/api/v1/timecard/processing-logs':
-            self.handle_timecard_processing_logs()
-        elif path.startswith('/api/v1/timecard/periods/'):
-            period_id = path.split('/')[-1]
-            self.handle_timecard_period_detail(period_id)
-        elif path == '/api/v1/timecard/stats':
-            self.handle_timecard_stats()
-        elif path.startswith('/api/v1/employees/'):
-            # IMPORTANTE: Verificar PRIMEIRO se é rota de leaves
-            parts = path.split('/')
-            print(f"🔍 DEBUG: parts = {parts}, len = {len(parts)}")
-            
-            if len(parts) >= 6 and parts[5] == 'leaves':
-                employee_id = parts[4]
-                print(f"✅ Rota de leaves detectada para employee_id: {employee_id}")
-                if len(parts) == 6:
-                    # GET /api/v1/employees/{id}/leaves - lista todos os afastamentos
-                    self.handle_get_employee_leaves(employee_id)
-                else:
-                    # GET /api/v1/employees/{id}/leaves/{leave_id} - detalhes de um afastamento
-                    leave_id = parts[6]
-                    self.handle_get_employee_leave_detail(employee_id, leave_id)
-                return  # IMPORTANTE: Return aqui para não cair na rota padrão
-            
-            # Rota padrão de detalhes do employee
-            employee_id = path.split('/')[-1]
-            print(f"🔍 Rota de detalhes capturada para employee_id: {employee_id}")
-            self.send_employee_detail(employee_id)
-        elif path == '/api/v1/employees':
-            self.send_employees_list()
-        elif path == '/api/v1/employees/cache/status':
-            self.handle_cache_status()
-        
-        # ===== ROTAS MIGRADAS PARA ESTRUTURA MODULAR =====
-        elif path == '/api/v1/auth/me':
-            from app.routes import AuthRouter
-            AuthRouter(self).handle_auth_me()
-        elif path == '/api/v1/dashboard/stats':
-            from app.routes import DashboardRouter
-            DashboardRouter(self).handle_dashboard_stats()
-        elif path == '/api/v1/evolution/status':
-            from app.routes import SystemRouter
-            SystemRouter(self).handle_evolution_status()
-        elif path == '/api/v1/evolution/instances':
-            from app.routes import SystemRouter
-            SystemRouter(self).handle_evolution_instances_status()
-        elif path == '/api/v1/system/status':
-            from app.routes import SystemRouter
-            SystemRouter(self).handle_system_status()
-        elif path == '/api/v1/database/health':
-            from app.routes import SystemRouter
-            SystemRouter(self).handle_database_health()
-        elif path == '/api/v1/system/logs':
-            from app.routes import SystemRouter
-            SystemRouter(self).handle_system_logs()
-        # ==================================================
-        
-        # ===== ROTAS DE INDICADORES RH =====
-        elif path == '/api/v1/indicators/overview':
-            self.handle_indicators_overview()
-        elif path == '/api/v1/indicators/headcount':
-            self.handle_indicators_headcount()
-        elif path == '/api/v1/indicators/turnover':
-            self.handle_indicators_turnover()
-        elif path == '/api/v1/indicators/demographics':
-            self.handle_indicators_demographics()
-        elif path == '/api/v1/indicators/tenure':
-            self.handle_indicators_tenure()
-        elif path == '/api/v1/indicators/leaves':
-            self.handle_indicators_leaves()
-        elif path == '/api/v1/reports/generate':
-            self.handle_report_generate()
-        # ===================================
-        
-        elif path == '/api/v1/payrolls/processed':
-            self.handle_payrolls_processed()
-        elif path == '/api/v1/payrolls/periods':
-            self.handle_list_payroll_periods()
-        elif path == '/api/v1/payroll/statistics':
-            self.handle_payroll_statistics()  # 🆕 Estatísticas dos dados CSV
-        elif path == '/api/v1/payroll/employees':
-            self.handle_payroll_employees()  # 🆕 Lista colaboradores
-        elif path == '/api/v1/payroll/divisions':
-            self.handle_payroll_divisions()  # 🆕 Lista setores
-        elif path == '/api/v1/payroll/companies':
-            self.handle_payroll_companies()  # 🆕 Lista empresas
-        elif path == '/api/v1/payroll/years':
-            self.handle_payroll_years()  # 🆕 Lista anos disponíveis
-        elif path == '/api/v1/payroll/months':
-            self.handle_payroll_months()  # 🆕 Lista meses disponíveis
-        elif path == '/api/v1/payroll/processing-history':
-            self.handle_payroll_processing_history()  # 🆕 Histórico de processamento
-        elif path.startswith('/api/v1/payroll/statistics-debug'):
-            self.handle_payroll_statistics_debug()  # 🆕 DEBUG - Lista nomes dos colaboradores
-        elif path.startswith('/api/v1/payroll/statistics-filtered'):
-            self.handle_payroll_statistics_filtered()  # 🆕 Estatísticas com filtros
-        
-        # ===== ROTAS DE JOBS EM BACKGROUND =====
-        elif path.startswith('/api/v1/payrolls/bulk-send/') and path.endswith('/status'):
-            self.handle_bulk_send_status()
-        # =======================================
-        
-        # ===== ROTAS DE REPORTS (MODULAR) =====
-        elif path == '/api/v1/reports/recent':
-            from app.routes.reports import ReportsRouter
-            ReportsRouter(self).handle_recent_activity()
-        elif path == '/api/v1/reports/statistics':
-            from app.routes.reports import ReportsRouter
-            ReportsRouter(self).handle_statistics()
-        # ======================================
-        
-        # ===== ROTAS DE ENDOMARKETING =====
-        elif path == '/api/v1/endomarketing/summary':
-            self.handle_endomarketing_summary()
-        elif path.startswith('/api/v1/endomarketing/birthdays'):
-            # Extrair período da query string (week ou month)
-            query_params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
-            period = query_params.get('period', ['month'])[0]
-            self.handle_endomarketing_birthdays(period)
-        elif path.startswith('/api/v1/endomarketing/work-anniversaries'):
-            query_params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
-            period = query_params.get('period', ['month'])[0]
-            self.handle_endomarketing_work_anniversaries(period)
-        elif path.startswith('/api/v1/endomarketing/probation'):
-            query_params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
-            phase = int(query_params.get('phase', ['1'])[0])
-            self.handle_endomarketing_probation(phase)
-        # ===================================
-        
-        # ===== ROTAS DE GERENCIAMENTO DE FILAS =====
-        elif path == '/api/v1/queue/active':
-            self.handle_get_active_queues()
-        elif path == '/api/v1/queue/list':
-            self.handle_get_all_queues()
-        elif path == '/api/v1/queue/statistics':
-            self.handle_get_queue_statistics()
-        elif path.startswith('/api/v1/queue/') and path.endswith('/details'):
-            queue_id = path.split('/')[-2]
-            self.handle_get_queue_details(queue_id)
-        # ===========================================
-        
-        # ===== ROTAS DE SCRIPTS ÚTEIS =====
-        elif path.startswith('/api/v1/scripts/') and path.endswith('/preview'):
-            script_id = path.split('/')[-2]
-            self.handle_script_preview(script_id)
-        # ==================================
+    def send_body(self, body, content_type, status_code=200):
+        """
+        Envia um corpo já serializado aplicando a camada de resposta:
+        - GET 200: ETag (da versão declarada em not_modified ou do próprio corpo)
+          e 304 quando o If-None-Match do cliente confere
+        - compressão gzip/deflate acima de HTTP_COMPRESSION_MIN_BYTES
+        - sem compressão, corpos grandes vão ao socket em blocos de HTTP_WRITE_CHUNK_BYTES
+        """
+        from app.core.http_response import (
+            WRITE_CHUNK_BYTES, choose_encoding, compress_body, should_compress, make_etag,
+            etag_matches, iter_body_chunks
+        )
         
+        etag = None
+        if status_code == 200 and self.command == 'GET':
+            etag = getattr(self, '_response_etag', None) or make_etag(self.path, body)
+            if etag_matches(self.headers.get('If-None-Match'), etag):
+                self.send_not_modified(etag)
+                return
+        
+        encoding = choose_encoding(self.headers.get('Accept-Encoding'))
+        if should_compress(body, encoding):
+            body = compress_body(body, encoding)
+        else:
+            encoding = None
+        
+        self.send_response(status_code)
+        self.send_cors_headers()
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding, Authorization')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'private, no-cache')
+        self.end_headers()
+        if encoding is None and len(body) > WRITE_CHUNK_BYTES:
+            for chunk in iter_body_chunks(body):
+                self.wfile.write(chunk)
         else:
-            self.send_error(404, "Endpoint não encontrado")
+            self.wfile.write(body)
     
-    def do_POST(self):
-        """Handle POST requests"""
-        path = urllib.parse.urlparse(self.path).path
-        print(f"🔥 POST recebido: {path}")
+    def send_body_stream(self, chunks, content_type, status_code=200, headers=None, compress=True):
+        """
+        Envia o corpo em blocos à medida que é gerado (sem Content-Length: a
+        conexão HTTP/1.0 é encerrada ao final). Compressão incremental quando aceita
+        (compress=False para conteúdo já comprimido, como ZIP).
+        """
+        from app.core.http_response import choose_encoding, compressor_for
         
-        # ===== ROTAS MIGRADAS PARA ESTRUTURA MODULAR =====
-        if path == '/api/v1/auth/login':
-            from app.routes import AuthRouter
-            AuthRouter(self).handle_login()
-            return
-        # ==================================================
-        
-        if path == '/api/v1/employees':
-            self.handle_create_employee()
-        elif path.startswith('/api/v1/employees/'):
-            # Verificar se é rota de leaves
-            parts = path.split('/')
-            if len(parts) >= 6 and parts[5] == 'leaves':
-                employee_id = parts[4]
-                print(f"✅ POST para leaves do employee_id: {employee_id}")
-                self.handle_create_employee_leave(employee_id)
-                return
-            # Se não for leaves, continuar verificando outras rotas
-        
-        if path == '/api/v1/employees/import' or path == '/api/v1/import/employees':
-            self.handle_import_employees()
-        elif path == '/api/v1/employees/cache/invalidate':
-            self.handle_cache_invalidate()
-        elif path == '/api/v1/indicators/cache/invalidate':
-            self.handle_indicators_invalidate_cache()
-        elif path == '/api/v1/users':
-            self.handle_create_user()
-        elif path == '/api/v1/users/permissions':
-            self.handle_update_user_permissions()
-        elif path == '/api/v1/payroll/periods':
-            self.handle_create_payroll_period()
-        elif path == '/api/v1/payroll/templates':
-            self.handle_create_payroll_template()
-        elif path == '/api/v1/payroll/process' or path == '/api/v1/payrolls/process':
-            self.handle_process_payroll_file()
-        elif path == '/api/v1/payroll/upload-csv':
-            self.handle_upload_payroll_csv()  # 🆕 Novo endpoint para CSVs da pasta Analiticos
-            return
-        elif path == '/api/v1/benefits/upload-xlsx':
-            self.handle_upload_benefits_xlsx()  # Upload de XLSX de benefícios
-            return
-        elif path == '/api/v1/timecard/upload-xlsx':
-            self.handle_upload_timecard_xlsx()  # Upload de XLSX de cartão ponto
-            return
-        elif path == '/api/v1/uploads/csv':
-            self.handle_csv_file_upload()  # 🆕 Upload de arquivo CSV
+        encoding = choose_encoding(self.headers.get('Accept-Encoding')) if compress else None
+        etag = getattr(self, '_response_etag', None) if status_code == 200 and self.command == 'GET' else None
+        
+        self.send_response(status_code)
+        self.send_cors_headers()
+        self.send_header('Content-Type', content_type)
+        self.send_header('Vary', 'Accept-Encoding, Authorization')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'private, no-cache')
+        self.end_headers()
+        
+        compressor = compressor_for(encoding)
+        for chunk in chunks:
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                self.wfile.write(chunk)
+        if compressor:
+            self.wfile.write(compressor.flush())
+        self.close_connection = True
+    
+    def send_not_modified(self, etag):
+        """Responde 304 (sem corpo)"""
+        self.send_response(304)
+        self.send_cors_headers()
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'private, no-cache')
+        self.send_header('Vary', 'Accept-Encoding, Authorization')
+        self.end_headers()
+    
+    def not_modified(self, *version):
+        """
+        GET condicional a partir de uma versão barata dos dados (contadores de
+        geração dos caches, mtime de pastas...), antes de consultar o banco ou
+        serializar. O ETag considera caminho + query string e o token do usuário.
+        
+        Returns:
+            True se já respondeu 304 (o handler deve apenas retornar)
+        """
+        from app.core.http_response import make_etag, etag_matches
+        
+        etag = make_etag(self.path, self.headers.get('Authorization', ''), *version)
+        self._response_etag = etag
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_not_modified(etag)
+            return True
+        return False
+    
+    def send_response(self, code, message=None):
+        """Registra o status para as métricas da rota"""
+        self._response_status = code
+        super().send_response(code, message)
+
+    def dispatch_route(self, method):
+        """
+        Resolve a requisição pela tabela de rotas (ROUTES), medindo latência,
+        bytes enviados e SQL executado por rota (app.core.metrics), procurando
+        N+1 / consultas lentas se habilitado (app.core.query_detector) e
+        perfilando rotas armadas por um administrador (app.core.profiling)
+        """
+        from app.core.metrics import CountingWriter, get_metrics, metrics_enabled
+        from app.core.profiling import get_profile_manager
+        from app.core.query_detector import get_query_detector
+
+        parsed_path = urllib.parse.urlparse(self.path)
+        match = self.ROUTES.match(method, parsed_path.path)
+        route_pattern = match[0].pattern if match else None
+
+        detector = get_query_detector()
+        if detector.enabled:
+            detector.begin(method, route_pattern)
+        context = get_metrics().begin(method, route_pattern) if metrics_enabled() else None
+        profiler = get_profile_manager().request_started(method, route_pattern)
+        raw_wfile = self.wfile
+        if context is not None:
+            self.wfile = CountingWriter(raw_wfile, context)
+        self._response_status = None
+        try:
+            self._dispatch_match(method, match, parsed_path.query)
+        finally:
+            self.wfile = raw_wfile
+            if context is not None:
+                context.status = self._response_status or 500
+                get_metrics().end(context)
+            if detector.enabled:
+                detector.end()
+            if profiler is not None:
+                get_profile_manager().request_finished(profiler, method, route_pattern, self._response_status)
+
+    def _dispatch_match(self, method, match, query_string):
+        from app.core.routing import RouteParamError
+
+        if match is None:
+            if method == 'GET':
+                self.send_error(404, "Endpoint não encontrado")
+            else:
+                self.send_json_response({"error": "Endpoint não encontrado"}, 404)
             return
-        elif path == '/api/v1/payrolls/periods':
-            self.handle_list_payroll_periods()
-        elif path == '/api/v1/payrolls/export-batch':
-            self.handle_export_payroll_batch()
-        elif path == '/api/v1/payrolls/bulk-send':
-            self.handle_bulk_send_payrolls()
-        elif path == '/api/v1/payrolls/delete-file':
-            self.handle_delete_payroll_file()
-        elif path == '/api/v1/files/upload':
-            self.handle_file_upload()
-        elif path == '/api/v1/communications/send':
-            self.handle_send_communication()
-        elif path == '/api/v1/evolution/test-message':
-            self.handle_test_evolution_message()
-        elif path.startswith('/api/v1/scripts/'):
-            script_id = path.split('/')[-1]
-            self.handle_execute_script(script_id)
-        elif path.startswith('/api/v1/queue/') and path.endswith('/cancel'):
-            queue_id = path.split('/')[-2]
-            self.handle_cancel_queue(queue_id)
-        elif path.startswith('/api/v1/queue/') and path.endswith('/pause'):
-            queue_id = path.split('/')[-2]
-            self.handle_pause_queue(queue_id)
-        elif path.startswith('/api/v1/queue/') and path.endswith('/resume'):
-            queue_id = path.split('/')[-2]
-            self.handle_resume_queue(queue_id)
-        else:
-            self.send_json_response({"error": "Endpoint não encontrado"}, 404)
+
+        route, params = match
+        try:
+            route.invoke(self, params, query_string)
+        except RouteParamError as e:
+            self.send_json_response({"error": str(e)}, 400)
+
+    def do_GET(self):
+        self.dispatch_route('GET')
+    
+    def do_POST(self):
+        """Handle POST requests"""
+        print(f"🔥 POST recebido: {urllib.parse.urlparse(self.path).path}")
+        self.dispatch_route('POST')
     
     def do_PUT(self):
         """Handle PUT requests"""
-        path = urllib.parse.urlparse(self.path).path
-        print(f"🔄 PUT recebido: {path}")
-        
-        if path.startswith('/api/v1/employees/'):
-            # Verificar primeiro se é rota de leaves
-            parts = path.split('/')
-            if len(parts) >= 7 and parts[5] == 'leaves':
-                employee_id = parts[4]
-                leave_id = parts[6]
-                print(f"✅ PUT para leaves/{leave_id} do employee_id: {employee_id}")
-                self.handle_update_employee_leave(employee_id, leave_id)
-                return
-            
-            # Senão, é update de employee
-            employee_id = path.split('/')[-1]
-            self.handle_update_employee(employee_id)
-        elif path.startswith('/api/v1/users/'):
-            user_id = path.split('/')[-1]
-            self.handle_update_user(user_id)
-        else:
-            self.send_json_response({"error": "Endpoint não encontrado"}, 404)
+        print(f"🔄 PUT recebido: {urllib.parse.urlparse(self.path).path}")
+        self.dispatch_route('PUT')
     
     def do_DELETE(self):
         """Handle DELETE requests"""
-        path = urllib.parse.urlparse(self.path).path
-        print(f"🗑️ DELETE recebido: {path}")
-        
-        if path.startswith('/api/v1/employees/'):
-            # Verificar primeiro se é rota de leaves
-            parts = path.split('/')
-            if len(parts) >= 7 and parts[5] == 'leaves':
-                employee_id = parts[4]
-                leave_id = parts[6]
-                print(f"✅ DELETE para leaves/{leave_id} do employee_id: {employee_id}")
-                self.handle_delete_employee_leave(employee_id, leave_id)
-                return
-            
-            # Senão, é delete de employee
-            employee_id = path.split('/')[-1]
-            self.handle_delete_employee(employee_id)
-        elif path.startswith('/api/v1/users/'):
-            user_id = path.split('/')[-1]
-            self.handle_delete_user(user_id)
-        elif path.startswith('/api/v1/payroll/periods/'):
-            period_id = path.split('/')[-1]
-            self.handle_delete_payroll_period(period_id)
-        elif path.startswith('/api/v1/benefits/periods/'):
-            period_id = path.split('/')[-1]
-            self.handle_delete_benefits_period(period_id)
-        elif path.startswith('/api/v1/timecard/periods/'):
-            period_id = path.split('/')[-1]
-            self.handle_delete_timecard_period(period_id)
-        else:
-            self.send_json_response({"error": "Endpoint não encontrado"}, 404)
+        print(f"🗑️ DELETE recebido: {urllib.parse.urlparse(self.path).path}")
+        self.dispatch_route('DELETE')
     
     def do_PATCH(self):
         """Handle PATCH requests"""
-        path = urllib.parse.urlparse(self.path).path
-        print(f"🔄 PATCH recebido: {path}")
-        
-        if path == '/api/v1/employees/bulk':
-            self.handle_bulk_update_employees()
-        else:
-            self.send_json_response({"error": "Endpoint não encontrado"}, 404)
+        print(f"🔄 PATCH recebido: {urllib.parse.urlparse(self.path).path}")
+        self.dispatch_route('PATCH')
     
     def handle_login(self):
         """Handle authentication"""
@@ -1739,7 +1681,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 if user and user.is_active and user.verify_password(password):
                     # Atualizar o último acesso com timezone brasileiro
                     from datetime import datetime, timezone, timedelta
-                    from app.core.auth import create_access_token
+                    from app.core.security import create_access_token
                     
                     brazil_tz = timezone(timedelta(hours=-3))  # GMT-3 (Brasília)
                     user.last_login = datetime.now(brazil_tz)
@@ -1818,7 +1760,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             "database": db_status,
             "docs": "/docs",
             "python_version": sys.version.split()[0],
-            "employees_count": len(employees_data.get('employees', [])),
+            "employees_count": len(load_employees_data().get('employees', [])),
             "note": "Servidor com integração PostgreSQL + JSON fallback"
         }
         
@@ -1874,6 +1816,11 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
     def send_employees_list(self):
         """Lista todos os funcionários"""
         try:
+            from app.core.http_response import BOOT_NONCE
+            # Geração do diretório é um contador do processo: o nonce evita 304 após reinício
+            if SessionLocal and self.not_modified('employees', BOOT_NONCE, get_employees_directory().version()):
+                return
+            
             current_data = load_employees_data()
             employees = current_data.get('employees', [])
             
@@ -1910,9 +1857,13 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             self.send_json_response({"error": f"Erro ao buscar funcionário: {str(e)}"}, 500)
     
     def get_authenticated_user(self, db=None):
-        """Extrai e valida usuário autenticado do token JWT"""
-        from app.core.auth import verify_token
-        from app.models.user import User
+        """
+        Extrai e valida usuário autenticado do token JWT
+        
+        Retorna um snapshot (AuthenticatedUser) mantido em cache por alguns segundos:
+        requisições de polling autenticam sem consultar o banco.
+        """
+        from app.services.auth_cache import get_auth_user_cache
         
         auth_header = self.headers.get('Authorization')
         
@@ -1922,27 +1873,8 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
         # Extrair token
         token = auth_header.replace('Bearer ', '')
         
-        # Validar token
-        payload = verify_token(token)
-        if not payload:
-            return None
-        
-        username = payload.get('sub')
-        if not username:
-            return None
-        
-        # Usar sessão existente ou criar nova
-        close_db = False
-        if db is None:
-            db = SessionLocal()
-            close_db = True
-        
-        try:
-            user = db.query(User).filter(User.username == username).first()
-            return user
-        finally:
-            if close_db:
-                db.close()
+        # Sessão só é usada (ou criada) em cache miss
+        return get_auth_user_cache().resolve(token, SessionLocal, db=db)
     
     def handle_auth_me(self):
         """Endpoint para verificar usuário autenticado"""
@@ -2001,134 +1933,52 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
         self.send_json_response(status)
     
     def handle_payrolls_processed(self):
-        """Lista de holerites processados (NOVO: busca em processed/ e subpastas)"""
+        """
+        Lista de holerites processados (processed/** e pasta legada)
+        
+        Consulta o manifesto persistido (app.services.payroll_manifest), reconciliado
+        apenas nas pastas cujo mtime mudou; sem banco, varre as pastas. Query:
+        month (YYYY-MM), folder, status (ready|orphan|associated), search, limit, offset.
+        """
         try:
-            import os
-            import glob
+            from app.core.http_response import BOOT_NONCE
+            from app.services.payroll_manifest import scan_payroll_files
             
-            # NOVO: Diretório processed/ com subpastas organizadas
-            processed_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'processed')
+            query_params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
             
-            # Fallback: pasta antiga para compatibilidade
-            legacy_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'holerites_formatados_final')
+            def param(name):
+                return (query_params.get(name, [''])[0] or '').strip() or None
             
-            if not os.path.exists(processed_dir) and not os.path.exists(legacy_dir):
-                self.send_json_response({
-                    "files": [],
-                    "statistics": {
-                        "total": 0,
-                        "ready": 0,
-                        "orphan": 0,
-                        "associated": 0
-                    }
-                })
+            try:
+                limit = int(param('limit')) if param('limit') is not None else None
+                offset = int(param('offset') or 0)
+            except ValueError:
+                self.send_json_response({"error": "limit e offset devem ser inteiros"}, 400)
+                return
+            if (limit is not None and limit < 0) or offset < 0:
+                self.send_json_response({"error": "limit e offset não podem ser negativos"}, 400)
                 return
             
-            # Buscar todos os PDFs recursivamente (processed/** e legacy)
-            pdf_files = []
-            if os.path.exists(processed_dir):
-                pdf_files.extend(glob.glob(os.path.join(processed_dir, '**', '*.pdf'), recursive=True))
-            if os.path.exists(legacy_dir):
-                pdf_files.extend(glob.glob(os.path.join(legacy_dir, '*.pdf')))
-            
-            # Carregar dados dos colaboradores
-            employees_data = load_employees_data()
-            employees = employees_data.get('employees', [])
-            
-            # Criar dicionário de colaboradores por unique_id para busca rápida
-            employees_by_id = {emp.get('unique_id'): emp for emp in employees}
+            filters = dict(month=param('month'), folder=param('folder'), status=param('status'),
+                           search=param('search'), limit=limit, offset=offset)
             
-            files_list = []
-            stats = {
-                "total": 0,
-                "ready": 0,  # Com telefone e associado
-                "orphan": 0,  # Sem colaborador cadastrado
-                "associated": 0  # Associado a um colaborador
-            }
-            
-            for pdf_path in pdf_files:
-                filename = os.path.basename(pdf_path)
-                folder_name = os.path.basename(os.path.dirname(pdf_path))
-                
-                # Extrair unique_id e month_year baseado no formato
-                if filename.startswith('EN_'):  # NOVO FORMATO: EN_MATRICULA_TIPO_MES_ANO.pdf
-                    parts = filename.replace('.pdf', '').split('_')
-                    unique_id = parts[1] if len(parts) > 1 else 'unknown'  # Matrícula (sem zeros à esquerda)
-                    
-                    # Adicionar zeros à esquerda para busca (formato completo: 005900169)
-                    if unique_id.isdigit() and len(unique_id) < 9:
-                        unique_id = unique_id.zfill(9)
-                    
-                    # Extrair mês/ano: EN_MATRICULA_TIPO_MES_ANO.pdf
-                    if len(parts) >= 5:
-                        month_num = parts[3].zfill(2)  # Mês
-                        year = parts[4]  # Ano
-                        month_year = f"{year}-{month_num}"  # Formato YYYY-MM
-                    else:
-                        month_year = 'desconhecido'
-                else:  # FORMATO ANTIGO: XXXXXXXXX_holerite_mes_ano.pdf
-                    parts = filename.split('_')
-                    unique_id = parts[0] if parts else 'unknown'
-                    
-                    month_year = 'desconhecido'
-                    if len(parts) >= 4:
-                        month_name = parts[2].lower()
-                        year = parts[3].replace('.pdf', '')
-                        
-                        month_map = {
-                            'janeiro': '01', 'fevereiro': '02', 'marco': '03', 'abril': '04',
-                            'maio': '05', 'junho': '06', 'julho': '07', 'agosto': '08',
-                            'setembro': '09', 'outubro': '10', 'novembro': '11', 'dezembro': '12'
-                        }
-                        month_num = month_map.get(month_name, '00')
-                        month_year = f"{year}-{month_num}"
-                
-                # Buscar colaborador associado
-                employee = employees_by_id.get(unique_id)
-                
-                file_info = {
-                    "filename": filename,
-                    "unique_id": unique_id,
-                    "month_year": month_year,
-                    "folder": folder_name,  # Pasta onde está (ex: Mensal_11_2025)
-                    "filepath": pdf_path,  # Caminho completo para envio
-                    "size": os.path.getsize(pdf_path),
-                    "created_at": datetime.fromtimestamp(os.path.getctime(pdf_path)).isoformat(),
-                    "is_orphan": employee is None,
-                    "can_send": False,
-                    "associated_employee": None
-                }
-                
-                if employee:
-                    stats["associated"] += 1
-                    phone = employee.get('phone_number', '').strip()
-                    
-                    file_info["associated_employee"] = {
-                        "id": employee.get('id'),  # PRIMARY KEY para o banco
-                        "unique_id": employee.get('unique_id'),
-                        "full_name": employee.get('full_name'),
-                        "phone_number": phone
-                    }
-                    
-                    # Pode enviar se tem telefone
-                    if phone and len(phone) >= 10:
-                        file_info["can_send"] = True
-                        stats["ready"] += 1
-                else:
-                    stats["orphan"] += 1
-                
-                files_list.append(file_info)
-                stats["total"] += 1
-            
-            # Ordenar por data de criação (mais recentes primeiro)
-            files_list.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+            if SessionLocal:
+                # Lista muda quando arquivos entram/saem das pastas (mtimes lidos pela
+                # reconciliação, sem segunda varredura) ou quando colaboradores mudam
+                directory = get_employees_directory()
+                manifest = get_payroll_manifest()
+                folders = manifest.reconcile(directory)
+                if self.not_modified(BOOT_NONCE, directory.version(), sorted(folders.items())):
+                    return
+                result = manifest.query(directory=directory, **filters)
+            else:
+                # Modo JSON (sem banco): varredura das pastas, como antes do manifesto
+                result = scan_payroll_files(load_employees_data().get('employees', []), **filters)
             
+            stats = result["statistics"]
             print(f"📊 Holerites processados: {stats['total']} total, {stats['ready']} prontos, {stats['orphan']} órfãos")
             
-            self.send_json_response({
-                "files": files_list,
-                "statistics": stats
-            })
+            self.send_json_response(result)
             
         except Exception as e:
             print(f"❌ Erro ao listar holerites: {e}")
@@ -2150,13 +2000,15 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                     return
             
             # Verificar se unique_id já existe
-            current_data = load_employees_data()
-            existing_employees = current_data.get('employees', [])
+            if SessionLocal:
+                existing = get_employees_directory().by_unique_id(data.get('unique_id'), exact=True)
+            else:
+                existing_employees = load_employees_data().get('employees', [])
+                existing = next((e for e in existing_employees if e.get('unique_id') == data.get('unique_id')), None)
             
-            for emp in existing_employees:
-                if emp.get('unique_id') == data.get('unique_id'):
-                    self.send_json_response({"error": f"ID único {data.get('unique_id')} já existe"}, 400)
-                    return
+            if existing:
+                self.send_json_response({"error": f"ID único {data.get('unique_id')} já existe"}, 400)
+                return
             
             # Preparar dados do funcionário (campos básicos + novos campos RH)
             employee_data = {
@@ -2177,15 +2029,14 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             
             # Salvar no banco
             if save_employee_to_db(employee_data):
-                # Recarregar dados para obter o ID gerado
-                global employees_data
-                employees_data = load_employees_data()
-                
                 # Encontrar o funcionário recém-criado
-                for emp in employees_data.get('employees', []):
-                    if emp.get('unique_id') == employee_data.get('unique_id'):
-                        employee_data = emp
-                        break
+                if SessionLocal:
+                    employee_data = get_employees_directory().by_unique_id(employee_data.get('unique_id'), exact=True) or employee_data
+                else:
+                    for emp in load_employees_data().get('employees', []):
+                        if emp.get('unique_id') == employee_data.get('unique_id'):
+                            employee_data = emp
+                            break
                 
                 self.send_json_response(employee_data, 201)
                 print(f"✅ Funcionário {employee_data.get('full_name')} criado com sucesso!")
@@ -2339,11 +2190,13 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                     "leave_end_date": employee.leave_end_date.isoformat() if employee.leave_end_date else None,
                     "status_reason": employee.status_reason or ""
                 }
+                company_code = employee.company_code
                 
                 db.close()
                 
                 # Invalidar cache para forçar reload
                 invalidate_employees_cache()
+                notify_indicator_change('employee_update', company=company_code)
                 
                 self.send_json_response(updated_employee, 200)
                 print(f"✅ Funcionário {updated_employee.get('full_name')} atualizado com sucesso!")
@@ -2380,10 +2233,13 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 db.commit()
                 
                 employee_name = employee.name
+                company_code = employee.company_code
                 db.close()
                 
                 # Invalidar cache para forçar reload
                 invalidate_employees_cache()
+                # Soft delete só altera is_active (usado em afastamentos e headcount atual)
+                notify_indicator_change('employee_delete', company=company_code, indicator_types=('headcount', 'leaves'))
                 
                 self.send_json_response({"message": f"Funcionário {employee_name} removido com sucesso"}, 200)
                 print(f"✅ Funcionário {employee_name} marcado como inativo!")
@@ -2549,8 +2405,10 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                     'notes': leave.notes
                 }
                 
+                company_code = employee.company_code
                 db.close()
                 
+                notify_indicator_change('leave_create', company=company_code, indicator_types=('leaves',))
                 self.send_json_response(leave_data, 201)
                 print(f"✅ Afastamento criado com sucesso ID {leave.id}")
             else:
@@ -2618,9 +2476,11 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                     'days': leave.days,
                     'notes': leave.notes
                 }
+                company_code = employee.company_code
                 
                 db.close()
                 
+                notify_indicator_change('leave_update', company=company_code, indicator_types=('leaves',))
                 self.send_json_response(leave_data, 200)
                 print(f"✅ Afastamento atualizado com sucesso")
             else:
@@ -2664,8 +2524,10 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 # Deletar
                 db.delete(leave)
                 db.commit()
+                company_code = employee.company_code
                 db.close()
                 
+                notify_indicator_change('leave_delete', company=company_code, indicator_types=('leaves',))
                 self.send_json_response({"message": "Afastamento excluído com sucesso"}, 200)
                 print(f"✅ Afastamento deletado com sucesso")
             else:
@@ -2836,10 +2698,10 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                             errors.append(f"Linha {index + 2}: {str(row_error)}")
                     
                     db.commit()
-                    
-                    # Reload global data
-                    global employees_data
-                    employees_data = load_employees_data()
+                    # INSERT direto não passa pelos eventos do ORM
+                    invalidate_employees_cache()
+                    if imported:
+                        notify_indicator_change('employee_excel_import')
                     
                 finally:
                     db.close()
@@ -2897,10 +2759,10 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                     deleted_count = result.rowcount
                     db.commit()
                     db.close()
-                    
-                    # Recarregar dados globais
-                    global employees_data
-                    employees_data = load_employees_data()
+                    invalidate_employees_cache()
+                    if deleted_count:
+                        # Como o soft delete individual: só is_active muda
+                        notify_indicator_change('employee_bulk_delete', indicator_types=('headcount', 'leaves'))
                     
                     self.send_json_response({
                         "message": f"{deleted_count} funcionários removidos com sucesso",
@@ -2974,10 +2836,10 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                     updated_count = result.rowcount
                     db.commit()
                     db.close()
-                    
-                    # Recarregar dados globais
-                    global employees_data
-                    employees_data = load_employees_data()
+                    invalidate_employees_cache()
+                    if updated_count:
+                        # Setor/cargo entram nos filtros e distribuições de todos os indicadores
+                        notify_indicator_change('employee_bulk_update')
                     
                     self.send_json_response({
                         "message": f"{updated_count} funcionários atualizados com sucesso",
@@ -3169,6 +3031,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 # Garante que o frontend vai buscar dados atualizados
                 print("🔄 Invalidando cache de employees (FORÇADO)...")
                 invalidate_employees_cache()
+                notify_indicator_change('employee_import')
                 print("✅ Cache invalidado com sucesso!")
                 
                 self.send_json_response({
@@ -3285,7 +3148,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 if 'full_name' in data:
                     update_data['full_name'] = data['full_name']
                 if 'password' in data and data['password']:
-                    from app.core.auth import get_password_hash
+                    from app.core.security import get_password_hash
                     update_data['password_hash'] = get_password_hash(data['password'])
                 if 'is_active' in data:
                     update_data['is_active'] = data['is_active']
@@ -3448,7 +3311,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             with db_engine.connect() as conn:
                 # Primeiro, verificar se o período existe e buscar informações
                 result = conn.execute(
-                    text("SELECT period_name, year, month FROM payroll_periods WHERE id = :period_id"),
+                    text("SELECT period_name, year, month, company FROM payroll_periods WHERE id = :period_id"),
                     {"period_id": int(period_id)}
                 )
                 period_info = result.fetchone()
@@ -3492,33 +3355,26 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 conn.commit()
                 
                 print(f"✅ Período '{period_name}' deletado com sucesso ({total_records} registros removidos)")
+                notify_indicator_change('payroll_period_delete', company=period_info[3],
+                                        year=period_info[1], month=period_info[2])
                 
                 # 📝 REGISTRAR LOG DO SISTEMA - PERÍODO DELETADO
                 try:
-                    db = SessionLocal()
-                    try:
-                        from app.models.system_log import SystemLog, LogLevel, LogCategory
-                        
-                        # Obter user_id do usuário autenticado
-                        user_id = None
-                        authenticated_user = self.get_authenticated_user(db)
-                        if authenticated_user:
-                            user_id = authenticated_user.id
-                        
-                        log_entry = SystemLog(
-                            level=LogLevel.WARNING,
-                            category=LogCategory.PAYROLL,
-                            message=f"Período de folha deletado: {period_name}",
-                            details=f"Registros deletados: {total_records}, Logs removidos: {deleted_logs}",
-                            user_id=user_id,
-                            entity_type='PayrollPeriod',
-                            entity_id=str(period_id)
-                        )
-                        db.add(log_entry)
-                        db.commit()
-                        print(f"📝 Log de deleção registrado")
-                    finally:
-                        db.close()
+                    from app.models.system_log import LogLevel, LogCategory
+                    from app.services.log_writer import get_log_writer
+                    
+                    # Obter user_id do usuário autenticado
+                    authenticated_user = self.get_authenticated_user()
+                    
+                    get_log_writer(SessionLocal).log(
+                        LogLevel.WARNING,
+                        LogCategory.PAYROLL,
+                        f"Período de folha deletado: {period_name}",
+                        details=f"Registros deletados: {total_records}, Logs removidos: {deleted_logs}",
+                        user_id=authenticated_user.id if authenticated_user else None,
+                        entity_type='PayrollPeriod',
+                        entity_id=str(period_id)
+                    )
                 except Exception as log_error:
                     print(f"⚠️ Erro ao registrar log: {log_error}")
                 
@@ -5364,9 +5220,34 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
     # INDICADORES DE RH
     # ==========================================
     
+    def indicators_version(self):
+        """
+        Versão dos indicadores para o ETag: versão dos dados no banco (última
+        modificação + contagem de folha, afastamentos e colaboradores, numa query),
+        geração do cubo (invalidações manuais) e dia (métricas relativas à data atual).
+        A parte do banco cobre também os caminhos de escrita que não publicam evento.
+        """
+        from datetime import date
+        from app.core.http_response import BOOT_NONCE
+        from app.services.indicator_cube import get_indicator_cube
+        from app.services.report_cache import compute_data_version
+        
+        data_version = None
+        if SessionLocal:
+            db = SessionLocal()
+            try:
+                data_version = compute_data_version(db)
+            finally:
+                db.close()
+        return data_version, BOOT_NONCE, get_indicator_cube().generation, date.today().isoformat()
+    
     def handle_indicators_overview(self):
         """Retorna visão geral dos indicadores de RH com filtros de mês/ano/empresa/setor"""
+        from app.services.indicator_periods import get_overview_for_period
         try:
+            if self.not_modified(*self.indicators_version()):
+                return
+            
             # Parse query params
             query_params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
             company = query_params.get('company', ['all'])[0]
@@ -5401,181 +5282,12 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                     year = int(year)
                     month = int(month)
                 
-                # Buscar todos os períodos do mês/ano especificado (mensal e 13º)
-                # FILTRAR POR EMPRESA AQUI - usando payroll_periods.company
-                period_query = db.query(PayrollPeriod).filter(
-                    PayrollPeriod.year == year,
-                    PayrollPeriod.month == month
-                )
-                
-                # Filtrar por empresa no período (NÃO no employee, pois company_code pode ser NULL)
-                if company != 'all':
-                    period_query = period_query.filter(PayrollPeriod.company == company)
-                    print(f"🔍 Filtrando períodos por empresa: '{company}'")
-                
-                periods = period_query.all()
-                
-                if not periods:
+                result = get_overview_for_period(db, year, month, company, division)
+                if result is None:
                     db.close()
                     self.send_json_response({"error": f"Nenhum período encontrado para {month:02d}/{year}"}, 404)
                     return
                 
-                period_ids = [p.id for p in periods]
-                print(f"📊 Períodos encontrados: {[(p.id, p.company, p.period_name) for p in periods]}")
-                
-                # Buscar dados de folha dos períodos
-                payroll_query = db.query(PayrollData).filter(
-                    PayrollData.period_id.in_(period_ids)
-                )
-                
-                payroll_records = payroll_query.all()
-                print(f"📊 Payroll records encontrados: {len(payroll_records)}")
-                
-                # Obter employee_ids dos registros de folha
-                unique_employee_ids = set([r.employee_id for r in payroll_records])
-                print(f"📊 Unique employee IDs em payroll: {len(unique_employee_ids)}")
-                
-                # Buscar dados dos employees para filtro por departamento
-                employee_map = {}
-                if unique_employee_ids:
-                    employees = db.query(Employee).filter(
-                        Employee.id.in_(unique_employee_ids)
-                    ).all()
-                    employee_map = {e.id: e for e in employees}
-                    print(f"📊 Employees encontrados: {len(employees)}")
-                
-                # Filtrar por departamento/setor se especificado
-                if division != 'all':
-                    print(f"🔍 Filtrando por departamento: '{division}'")
-                    # Filtrar payroll_records apenas para employees do departamento
-                    dept_employee_ids = [e.id for e in employee_map.values() if e.department == division]
-                    payroll_records = [r for r in payroll_records if r.employee_id in dept_employee_ids]
-                    unique_employee_ids = set([r.employee_id for r in payroll_records])
-                    print(f"📊 Após filtro de departamento: {len(payroll_records)} records, {len(unique_employee_ids)} employees")
-                
-                # Calcular métricas principais
-                total_employees = len(unique_employee_ids)
-                total_cost = sum([Decimal(str(r.net_salary or 0)) for r in payroll_records])
-                
-                # Buscar mês anterior para calcular variação
-                if month == 1:
-                    prev_year = year - 1
-                    prev_month = 12
-                else:
-                    prev_year = year
-                    prev_month = month - 1
-                
-                prev_period_query = db.query(PayrollPeriod).filter(
-                    PayrollPeriod.year == prev_year,
-                    PayrollPeriod.month == prev_month
-                )
-                if company != 'all':
-                    prev_period_query = prev_period_query.filter(PayrollPeriod.company == company)
-                
-                prev_periods = prev_period_query.all()
-                
-                employee_variation = None
-                cost_variation = None
-                
-                if prev_periods:
-                    prev_period_ids = [p.id for p in prev_periods]
-                    prev_records = db.query(PayrollData).filter(
-                        PayrollData.period_id.in_(prev_period_ids)
-                    ).all()
-                    
-                    # Aplicar filtro de departamento se necessário
-                    if division != 'all':
-                        dept_employee_ids = [e.id for e in employee_map.values() if e.department == division]
-                        prev_records = [r for r in prev_records if r.employee_id in dept_employee_ids]
-                    
-                    prev_employees = len(set([r.employee_id for r in prev_records]))
-                    prev_cost = sum([Decimal(str(r.net_salary or 0)) for r in prev_records])
-                    
-                    if prev_employees > 0:
-                        employee_variation = ((total_employees - prev_employees) / prev_employees) * 100
-                    if prev_cost > 0:
-                        cost_variation = ((total_cost - prev_cost) / prev_cost) * 100
-                
-                # Distribuição por empresa (só faz sentido quando company='all')
-                by_company = []
-                if company == 'all':
-                    # Agrupar por company do período
-                    periods_by_company = {}
-                    for p in periods:
-                        if p.company not in periods_by_company:
-                            periods_by_company[p.company] = []
-                        periods_by_company[p.company].append(p.id)
-                    
-                    for comp_code, comp_period_ids in periods_by_company.items():
-                        comp_records = [r for r in payroll_records if r.period_id in comp_period_ids]
-                        comp_count = len(set([r.employee_id for r in comp_records]))
-                        comp_cost = sum([Decimal(str(r.net_salary or 0)) for r in comp_records])
-                        by_company.append({
-                            'company': comp_code,
-                            'count': comp_count,
-                            'total_cost': float(comp_cost)
-                        })
-                
-                # Top 5 setores
-                employees_by_division = {}
-                for emp_id in unique_employee_ids:
-                    emp = employee_map.get(emp_id)
-                    if emp:
-                        div = emp.department or 'Não informado'
-                        if div not in employees_by_division:
-                            employees_by_division[div] = set()
-                        employees_by_division[div].add(emp_id)
-                
-                top_divisions = sorted(
-                    [{'division': k, 'count': len(v)} for k, v in employees_by_division.items()],
-                    key=lambda x: x['count'],
-                    reverse=True
-                )[:5]
-                
-                # Contar admissões e desligamentos no mês
-                period_start = date(year, month, 1)
-                if month == 12:
-                    period_end = date(year + 1, 1, 1)
-                else:
-                    period_end = date(year, month + 1, 1)
-                
-                # Contar admissões e desligamentos - restringir aos employees que estão no payroll
-                admissions_query = db.query(Employee).filter(
-                    Employee.admission_date >= period_start,
-                    Employee.admission_date < period_end,
-                    Employee.id.in_(unique_employee_ids) if unique_employee_ids else False
-                )
-                terminations_query = db.query(Employee).filter(
-                    Employee.termination_date >= period_start,
-                    Employee.termination_date < period_end,
-                    Employee.id.in_(unique_employee_ids) if unique_employee_ids else False
-                )
-                
-                # Filtro por departamento se aplicável
-                if division != 'all':
-                    admissions_query = admissions_query.filter(Employee.department == division)
-                    terminations_query = terminations_query.filter(Employee.department == division)
-                
-                admissions = admissions_query.count()
-                terminations = terminations_query.count()
-                
-                result = {
-                    'filters': {
-                        'year': year,
-                        'month': month,
-                        'company': company,
-                        'division': division
-                    },
-                    'total_employees': total_employees,
-                    'total_payroll_cost': float(total_cost),
-                    'employee_variation': float(employee_variation) if employee_variation is not None else None,
-                    'cost_variation': float(cost_variation) if cost_variation is not None else None,
-                    'admissions': admissions,
-                    'terminations': terminations,
-                    'by_company': by_company,
-                    'top_divisions': top_divisions
-                }
-                
                 db.close()
                 self.send_json_response(result)
                 
@@ -5590,7 +5302,11 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
     
     def handle_indicators_headcount(self):
         """Retorna métricas de headcount com evolução temporal e distribuições"""
+        from app.services.indicator_periods import get_headcount_for_period
         try:
+            if self.not_modified(*self.indicators_version()):
+                return
+            
             # Parse query params
             query_params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
             company = query_params.get('company', ['all'])[0]
@@ -5631,7 +5347,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 current_date = date(year, month, 1)
                 
                 # MÉTRICA ATUAL (mês selecionado)
-                current_metrics = self._get_headcount_for_period(db, year, month, company, division)
+                current_metrics = get_headcount_for_period(db, year, month, company, division)
                 
                 # EVOLUÇÃO TEMPORAL (últimos N meses)
                 evolution_data = []
@@ -5642,7 +5358,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                     p_year = period_date.year
                     p_month = period_date.month
                     
-                    metrics = self._get_headcount_for_period(db, p_year, p_month, company, division)
+                    metrics = get_headcount_for_period(db, p_year, p_month, company, division)
                     evolution_data.append({
                         'year': p_year,
                         'month': p_month,
@@ -5695,118 +5411,6 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             traceback.print_exc()
             self.send_json_response({"error": str(e)}, 500)
     
-    def _get_headcount_for_period(self, db, year, month, company='all', division='all'):
-        """Helper para calcular headcount de um período específico"""
-        from app.models.payroll import PayrollPeriod, PayrollData
-        from app.models.employee import Employee
-        from decimal import Decimal
-        
-        # Buscar períodos do mês/ano filtrado por empresa
-        period_query = db.query(PayrollPeriod).filter(
-            PayrollPeriod.year == year,
-            PayrollPeriod.month == month
-        )
-        
-        if company != 'all':
-            period_query = period_query.filter(PayrollPeriod.company == company)
-        
-        periods = period_query.all()
-        
-        if not periods:
-            return {
-                'headcount': 0,
-                'total_cost': 0.0,
-                'avg_cost_per_employee': 0.0,
-                'variation_vs_previous': None,
-                'by_company': [],
-                'top_divisions': []
-            }
-        
-        period_ids = [p.id for p in periods]
-        
-        # Buscar dados de folha
-        payroll_records = db.query(PayrollData).filter(
-            PayrollData.period_id.in_(period_ids)
-        ).all()
-        
-        unique_employee_ids = set([r.employee_id for r in payroll_records])
-        
-        # Buscar dados dos employees
-        employee_map = {}
-        if unique_employee_ids:
-            employees = db.query(Employee).filter(
-                Employee.id.in_(unique_employee_ids)
-            ).all()
-            employee_map = {e.id: e for e in employees}
-        
-        # Filtrar por departamento se especificado
-        if division != 'all':
-            dept_employee_ids = [e.id for e in employee_map.values() if e.department == division]
-            payroll_records = [r for r in payroll_records if r.employee_id in dept_employee_ids]
-            unique_employee_ids = set([r.employee_id for r in payroll_records])
-        
-        headcount = len(unique_employee_ids)
-        total_cost = sum([Decimal(str(r.net_salary or 0)) for r in payroll_records])
-        avg_cost = float(total_cost / headcount) if headcount > 0 else 0.0
-        
-        # Calcular variação vs mês anterior
-        if month == 1:
-            prev_year = year - 1
-            prev_month = 12
-        else:
-            prev_year = year
-            prev_month = month - 1
-        
-        prev_metrics = self._get_headcount_for_period(db, prev_year, prev_month, company, division)
-        prev_headcount = prev_metrics['headcount']
-        variation = None
-        if prev_headcount > 0:
-            variation = ((headcount - prev_headcount) / prev_headcount) * 100
-        
-        # Distribuição por empresa
-        by_company = []
-        if company == 'all':
-            periods_by_company = {}
-            for p in periods:
-                if p.company not in periods_by_company:
-                    periods_by_company[p.company] = []
-                periods_by_company[p.company].append(p.id)
-            
-            for comp_code, comp_period_ids in periods_by_company.items():
-                comp_records = [r for r in payroll_records if r.period_id in comp_period_ids]
-                comp_count = len(set([r.employee_id for r in comp_records]))
-                comp_cost = sum([Decimal(str(r.net_salary or 0)) for r in comp_records])
-                by_company.append({
-                    'company': comp_code,
-                    'headcount': comp_count,
-                    'total_cost': float(comp_cost)
-                })
-        
-        # Top setores
-        employees_by_division = {}
-        for emp_id in unique_employee_ids:
-            emp = employee_map.get(emp_id)
-            if emp:
-                div = emp.department or 'Não informado'
-                if div not in employees_by_division:
-                    employees_by_division[div] = set()
-                employees_by_division[div].add(emp_id)
-        
-        top_divisions = sorted(
-            [{'division': k, 'count': len(v)} for k, v in employees_by_division.items()],
-            key=lambda x: x['count'],
-            reverse=True
-        )
-        
-        return {
-            'headcount': headcount,
-            'total_cost': float(total_cost),
-            'avg_cost_per_employee': avg_cost,
-            'variation_vs_previous': float(variation) if variation is not None else None,
-            'by_company': by_company,
-            'top_divisions': top_divisions
-        }
-    
     def _get_top_positions(self, db, year, month, company='all', division='all', limit=10):
         """Helper para calcular top cargos"""
         from app.models.payroll import PayrollPeriod, PayrollData
@@ -5887,7 +5491,11 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
     
     def handle_indicators_turnover(self):
         """Retorna métricas de turnover (rotatividade) com evolução temporal"""
+        from app.services.indicator_periods import get_turnover_for_period
         try:
+            if self.not_modified(*self.indicators_version()):
+                return
+            
             # Parse query params
             query_params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
             company = query_params.get('company', ['all'])[0]
@@ -5928,7 +5536,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 current_date = date(year, month, 1)
                 
                 # MÉTRICA ATUAL (mês selecionado)
-                current_metrics = self._get_turnover_for_period(db, year, month, company, division)
+                current_metrics = get_turnover_for_period(db, year, month, company, division)
                 
                 # EVOLUÇÃO TEMPORAL (últimos N meses)
                 evolution_data = []
@@ -5939,7 +5547,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                     p_year = period_date.year
                     p_month = period_date.month
                     
-                    metrics = self._get_turnover_for_period(db, p_year, p_month, company, division)
+                    metrics = get_turnover_for_period(db, p_year, p_month, company, division)
                     evolution_data.append({
                         'year': p_year,
                         'month': p_month,
@@ -5987,231 +5595,13 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             traceback.print_exc()
             self.send_json_response({"error": str(e)}, 500)
     
-    def _get_turnover_for_period(self, db, year, month, company='all', division='all'):
-        """Helper OTIMIZADO para calcular turnover de um período específico"""
-        from app.models.payroll import PayrollPeriod, PayrollData
-        from app.models.employee import Employee
-        from sqlalchemy import func
-        from datetime import date
-        
-        # Calcular datas do período
-        period_start = date(year, month, 1)
-        if month == 12:
-            period_end = date(year + 1, 1, 1)
-        else:
-            period_end = date(year, month + 1, 1)
-        
-        # Mês anterior
-        if month == 1:
-            prev_year, prev_month = year - 1, 12
-        else:
-            prev_year, prev_month = year, month - 1
-        
-        prev_start = date(prev_year, prev_month, 1)
-        
-        # Query única para headcount atual e anterior
-        periods_query = db.query(PayrollPeriod).filter(
-            ((PayrollPeriod.year == year) & (PayrollPeriod.month == month)) |
-            ((PayrollPeriod.year == prev_year) & (PayrollPeriod.month == prev_month))
-        )
-        
-        if company != 'all':
-            periods_query = periods_query.filter(PayrollPeriod.company == company)
-        
-        periods = periods_query.all()
-        
-        current_period_ids = [p.id for p in periods if p.year == year and p.month == month]
-        prev_period_ids = [p.id for p in periods if p.year == prev_year and p.month == prev_month]
-        
-        # Contar headcount de cada período
-        current_headcount = 0
-        prev_headcount = 0
-        employee_ids_current = set()
-        
-        if current_period_ids:
-            hc_query = db.query(func.count(func.distinct(PayrollData.employee_id))).filter(
-                PayrollData.period_id.in_(current_period_ids)
-            )
-            if division != 'all':
-                hc_query = hc_query.join(Employee).filter(Employee.department == division)
-            current_headcount = hc_query.scalar() or 0
-            
-            # IDs dos funcionários no período atual
-            emp_query = db.query(PayrollData.employee_id).filter(
-                PayrollData.period_id.in_(current_period_ids)
-            ).distinct()
-            employee_ids_current = set([r[0] for r in emp_query.all()])
-        
-        if prev_period_ids:
-            hc_query = db.query(func.count(func.distinct(PayrollData.employee_id))).filter(
-                PayrollData.period_id.in_(prev_period_ids)
-            )
-            if division != 'all':
-                hc_query = hc_query.join(Employee).filter(Employee.department == division)
-            prev_headcount = hc_query.scalar() or 0
-        
-        avg_headcount = (current_headcount + prev_headcount) / 2 if (current_headcount + prev_headcount) > 0 else 0
-        
-        # Contar admissões e desligamentos
-        admissions_query = db.query(func.count(Employee.id)).filter(
-            Employee.admission_date >= period_start,
-            Employee.admission_date < period_end
-        )
-        terminations_query = db.query(func.count(Employee.id)).filter(
-            Employee.termination_date >= period_start,
-            Employee.termination_date < period_end
-        )
-        
-        if division != 'all':
-            admissions_query = admissions_query.filter(Employee.department == division)
-            terminations_query = terminations_query.filter(Employee.department == division)
-        
-        if employee_ids_current:
-            admissions_query = admissions_query.filter(Employee.id.in_(employee_ids_current))
-            terminations_query = terminations_query.filter(Employee.id.in_(employee_ids_current))
-        
-        admissions = admissions_query.scalar() or 0
-        terminations = terminations_query.scalar() or 0
-        
-        # Taxa de turnover
-        turnover_rate = 0.0
-        if avg_headcount > 0:
-            turnover_rate = ((admissions + terminations) / 2) / avg_headcount * 100
-        
-        return {
-            'turnover_rate': round(turnover_rate, 2),
-            'admissions': admissions,
-            'terminations': terminations,
-            'avg_headcount': round(avg_headcount, 1),
-            'by_company': [],
-            'top_divisions_turnover': []
-        }
-    
-    def _get_demographics_for_period(self, db, year, month, company='all', division='all'):
-        """Helper para calcular métricas demográficas de um período específico"""
-        from app.models.payroll import PayrollPeriod, PayrollData
-        from app.models.employee import Employee
-        from sqlalchemy import func, case
-        
-        # Buscar períodos do mês especificado
-        periods_query = db.query(PayrollPeriod).filter(
-            PayrollPeriod.year == year,
-            PayrollPeriod.month == month
-        )
-        
-        if company != 'all':
-            periods_query = periods_query.filter(PayrollPeriod.company == company)
-        
-        periods = periods_query.all()
-        if not periods:
-            return {
-                'average_age': 0,
-                'male_count': 0,
-                'female_count': 0,
-                'total_employees': 0,
-                'by_sex': [],
-                'age_ranges': []
-            }
-        
-        period_ids = [p.id for p in periods]
-        
-        # Obter IDs únicos de funcionários do período
-        employee_ids_query = db.query(PayrollData.employee_id).filter(
-            PayrollData.period_id.in_(period_ids)
-        ).distinct()
-        
-        employee_ids = [r[0] for r in employee_ids_query.all()]
-        
-        if not employee_ids:
-            return {
-                'average_age': 0,
-                'male_count': 0,
-                'female_count': 0,
-                'total_employees': 0,
-                'by_sex': [],
-                'age_ranges': []
-            }
-        
-        # Query base de employees do período
-        emp_query = db.query(Employee).filter(Employee.id.in_(employee_ids))
-        
-        if division != 'all':
-            emp_query = emp_query.filter(Employee.department == division)
-        
-        # Distribuição por sexo
-        by_sex_query = db.query(
-            Employee.sex,
-            func.count(Employee.id).label('count')
-        ).filter(
-            Employee.id.in_(employee_ids),
-            Employee.sex.isnot(None)
-        )
-        
-        if division != 'all':
-            by_sex_query = by_sex_query.filter(Employee.department == division)
-        
-        by_sex = by_sex_query.group_by(Employee.sex).all()
-        
-        # Faixas etárias
-        age_ranges_query = db.query(
-            case(
-                (func.extract('year', func.age(Employee.birth_date)) < 25, '18-24'),
-                (func.extract('year', func.age(Employee.birth_date)) < 35, '25-34'),
-                (func.extract('year', func.age(Employee.birth_date)) < 45, '35-44'),
-                (func.extract('year', func.age(Employee.birth_date)) < 55, '45-54'),
-                else_='55+'
-            ).label('age_range'),
-            func.count(Employee.id).label('count')
-        ).filter(
-            Employee.id.in_(employee_ids),
-            Employee.birth_date.isnot(None)
-        )
-        
-        if division != 'all':
-            age_ranges_query = age_ranges_query.filter(Employee.department == division)
-        
-        age_ranges = age_ranges_query.group_by('age_range').all()
-        
-        # Idade média
-        avg_age_query = db.query(
-            func.avg(func.extract('year', func.age(Employee.birth_date)))
-        ).filter(
-            Employee.id.in_(employee_ids),
-            Employee.birth_date.isnot(None)
-        )
-        
-        if division != 'all':
-            avg_age_query = avg_age_query.filter(Employee.department == division)
-        
-        avg_age = avg_age_query.scalar()
-        
-        # Ordenar faixas etárias
-        age_range_order = {'18-24': 1, '25-34': 2, '35-44': 3, '45-54': 4, '55+': 5}
-        sorted_age_ranges = sorted(age_ranges, key=lambda x: age_range_order.get(x[0], 99))
-        
-        # Extrair contagens por sexo
-        male_count = 0
-        female_count = 0
-        for s, c in by_sex:
-            if s == 'M':
-                male_count = c
-            elif s == 'F':
-                female_count = c
-        
-        total_employees = male_count + female_count
-        
-        return {
-            'average_age': int(round(float(avg_age))) if avg_age else 0,
-            'male_count': male_count,
-            'female_count': female_count,
-            'total_employees': total_employees,
-            'by_sex': [{'sex': s or 'Não informado', 'count': c} for s, c in by_sex],
-            'age_ranges': [{'range': r, 'count': c} for r, c in sorted_age_ranges]
-        }
-    
     def handle_indicators_demographics(self):
         """Retorna perfil demográfico com evolução temporal"""
+        from app.services.indicator_periods import get_demographics_for_period
         try:
+            if self.not_modified(*self.indicators_version()):
+                return
+            
             # Parse query params
             query_params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
             company = query_params.get('company', ['all'])[0]
@@ -6251,7 +5641,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 current_date = date(year, month, 1)
                 
                 # MÉTRICA ATUAL (mês selecionado)
-                current_metrics = self._get_demographics_for_period(db, year, month, company, division)
+                current_metrics = get_demographics_for_period(db, year, month, company, division)
                 
                 # EVOLUÇÃO TEMPORAL (últimos N meses)
                 evolution_data = []
@@ -6262,7 +5652,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                     p_year = period_date.year
                     p_month = period_date.month
                     
-                    metrics = self._get_demographics_for_period(db, p_year, p_month, company, division)
+                    metrics = get_demographics_for_period(db, p_year, p_month, company, division)
                     evolution_data.append({
                         'year': p_year,
                         'month': p_month,
@@ -6299,7 +5689,11 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
     
     def handle_indicators_tenure(self):
         """Retorna métricas de tempo de casa com evolução temporal"""
+        from app.services.indicator_periods import get_tenure_for_period
         try:
+            if self.not_modified(*self.indicators_version()):
+                return
+            
             # Parse query params
             query_params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
             company = query_params.get('company', ['all'])[0]
@@ -6339,7 +5733,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 current_date = date(year, month, 1)
                 
                 # MÉTRICA ATUAL (mês selecionado)
-                current_metrics = self._get_tenure_for_period(db, year, month, company, division)
+                current_metrics = get_tenure_for_period(db, year, month, company, division)
                 
                 # EVOLUÇÃO TEMPORAL (últimos N meses)
                 evolution_data = []
@@ -6350,193 +5744,47 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                     p_year = period_date.year
                     p_month = period_date.month
                     
-                    metrics = self._get_tenure_for_period(db, p_year, p_month, company, division)
+                    metrics = get_tenure_for_period(db, p_year, p_month, company, division)
                     evolution_data.append({
                         'year': p_year,
                         'month': p_month,
                         'month_name': f"{month_names_pt[p_month-1]}/{str(p_year)[2:]}",
                         'average_tenure_years': metrics['average_tenure_years'],
-                        'average_tenure_months': metrics['average_tenure_months'],
-                        'total_employees': metrics['total_employees']
-                    })
-                
-                result = {
-                    'filters': {
-                        'year': year,
-                        'month': month,
-                        'company': company,
-                        'division': division,
-                        'months_range': months_range
-                    },
-                    'current': current_metrics,
-                    'evolution': evolution_data
-                }
-                
-                db.close()
-                self.send_json_response(result)
-                
-            else:
-                self.send_json_response({"error": "PostgreSQL não disponível"}, 500)
-                
-        except Exception as e:
-            print(f"❌ Erro ao buscar tenure: {e}")
-            import traceback
-            traceback.print_exc()
-            self.send_json_response({"error": str(e)}, 500)
-    
-    def _get_tenure_for_period(self, db, year, month, company='all', division='all'):
-        """Helper para calcular métricas de tempo de casa de um período específico"""
-        from app.models.payroll import PayrollPeriod, PayrollData
-        from app.models.employee import Employee
-        from sqlalchemy import func, case
-        from datetime import date
-        
-        # Buscar períodos do mês especificado
-        periods_query = db.query(PayrollPeriod).filter(
-            PayrollPeriod.year == year,
-            PayrollPeriod.month == month
-        )
-        
-        if company != 'all':
-            periods_query = periods_query.filter(PayrollPeriod.company == company)
-        
-        periods = periods_query.all()
-        if not periods:
-            return {
-                'average_tenure_years': 0,
-                'average_tenure_months': 0,
-                'total_employees': 0,
-                'tenure_ranges': [],
-                'by_department': []
-            }
-        
-        period_ids = [p.id for p in periods]
-        
-        # Obter IDs únicos de funcionários do período
-        employee_ids_query = db.query(PayrollData.employee_id).filter(
-            PayrollData.period_id.in_(period_ids)
-        ).distinct()
-        
-        employee_ids = [r[0] for r in employee_ids_query.all()]
-        
-        if not employee_ids:
-            return {
-                'average_tenure_years': 0,
-                'average_tenure_months': 0,
-                'total_employees': 0,
-                'tenure_ranges': [],
-                'by_department': []
-            }
-        
-        # Data de referência para o cálculo
-        reference_date = date(year, month, 1)
-        
-        # Filtrar employee_ids por division se necessário
-        filtered_employee_ids = employee_ids
-        if division != 'all':
-            filtered_ids_query = db.query(Employee.id).filter(
-                Employee.id.in_(employee_ids),
-                Employee.department == division
-            )
-            filtered_employee_ids = [r[0] for r in filtered_ids_query.all()]
-            
-            if not filtered_employee_ids:
-                return {
-                    'average_tenure_years': 0,
-                    'average_tenure_months': 0,
-                    'total_employees': 0,
-                    'tenure_ranges': [],
-                    'by_department': []
+                        'average_tenure_months': metrics['average_tenure_months'],
+                        'total_employees': metrics['total_employees']
+                    })
+                
+                result = {
+                    'filters': {
+                        'year': year,
+                        'month': month,
+                        'company': company,
+                        'division': division,
+                        'months_range': months_range
+                    },
+                    'current': current_metrics,
+                    'evolution': evolution_data
                 }
-        
-        # Tempo médio de casa (em dias, depois convertido para anos e meses)
-        # IMPORTANTE: Não usar func.age() com extract('day') pois retorna apenas a parte de dias do interval
-        # Usar subtração direta de datas para obter o total de dias
-        avg_tenure_days_query = db.query(
-            func.avg(
-                reference_date - Employee.admission_date
-            )
-        ).filter(
-            Employee.id.in_(filtered_employee_ids),
-            Employee.admission_date.isnot(None)
-        )
-        
-        avg_tenure_days = avg_tenure_days_query.scalar()
-        
-        # Converter para anos e meses
-        if avg_tenure_days:
-            # avg_tenure_days pode vir como timedelta ou float dependendo do DB
-            if hasattr(avg_tenure_days, 'days'):
-                total_days = avg_tenure_days.days
-            else:
-                total_days = float(avg_tenure_days)
-            
-            avg_tenure_years = total_days / 365.25
-            avg_tenure_months = int(round(total_days / 30.44))
-        else:
-            avg_tenure_years = 0
-            avg_tenure_months = 0
-        
-        # Distribuição por tempo de casa
-        # Calcular anos de tempo de casa corretamente usando subtração de datas
-        tenure_ranges_query = db.query(
-            case(
-                ((reference_date - Employee.admission_date) < 365, '0-1 ano'),
-                ((reference_date - Employee.admission_date) < 1095, '1-3 anos'),  # 365 * 3
-                ((reference_date - Employee.admission_date) < 1825, '3-5 anos'),  # 365 * 5
-                ((reference_date - Employee.admission_date) < 3650, '5-10 anos'), # 365 * 10
-                else_='10+ anos'
-            ).label('tenure_range'),
-            func.count(Employee.id).label('count')
-        ).filter(
-            Employee.id.in_(filtered_employee_ids),
-            Employee.admission_date.isnot(None)
-        )
-        
-        tenure_ranges = tenure_ranges_query.group_by('tenure_range').all()
-        
-        # Ordenar faixas de tenure
-        tenure_order = {'0-1 ano': 1, '1-3 anos': 2, '3-5 anos': 3, '5-10 anos': 4, '10+ anos': 5}
-        sorted_tenure_ranges = sorted(tenure_ranges, key=lambda x: tenure_order.get(x[0], 99))
-        
-        # Tempo médio por departamento
-        avg_tenure_by_dept_query = db.query(
-            Employee.department,
-            func.avg(reference_date - Employee.admission_date).label('avg_days')
-        ).filter(
-            Employee.id.in_(filtered_employee_ids),
-            Employee.admission_date.isnot(None),
-            Employee.department.isnot(None)
-        )
-        
-        avg_tenure_by_dept = avg_tenure_by_dept_query.group_by(Employee.department).order_by(Employee.department).all()
-        
-        # Converter avg_days para meses para cada departamento
-        by_department_results = []
-        for dept_name, avg_days in avg_tenure_by_dept:
-            if avg_days:
-                if hasattr(avg_days, 'days'):
-                    total_days = avg_days.days
-                else:
-                    total_days = float(avg_days)
-                avg_months = int(round(total_days / 30.44))
+                
+                db.close()
+                self.send_json_response(result)
+                
             else:
-                avg_months = 0
-            by_department_results.append({'department': dept_name, 'avg_months': avg_months})
-        
-        total_employees = sum(c for _, c in tenure_ranges)
-        
-        return {
-            'average_tenure_years': int(round(avg_tenure_years)),
-            'average_tenure_months': avg_tenure_months,
-            'total_employees': total_employees,
-            'tenure_ranges': [{'range': r, 'count': int(c)} for r, c in sorted_tenure_ranges],
-            'by_department': by_department_results
-        }
+                self.send_json_response({"error": "PostgreSQL não disponível"}, 500)
+                
+        except Exception as e:
+            print(f"❌ Erro ao buscar tenure: {e}")
+            import traceback
+            traceback.print_exc()
+            self.send_json_response({"error": str(e)}, 500)
     
     def handle_indicators_leaves(self):
         """Retorna métricas de afastamentos com filtros e evolução"""
+        from app.services.indicator_periods import get_leaves_for_period
         try:
+            if self.not_modified(*self.indicators_version()):
+                return
+            
             from sqlalchemy import func, and_
             from app.models.employee import Employee
             from app.models.leave import LeaveRecord
@@ -6569,7 +5817,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 evolution = []
                 for i in range(months_range - 1, -1, -1):
                     period_date = reference_date - relativedelta(months=i)
-                    period_metrics = self._get_leaves_for_period(db, period_date, company, division, leave_type)
+                    period_metrics = get_leaves_for_period(db, period_date, company, division, leave_type)
                     evolution.append(period_metrics)
                 
                 # Métricas do período atual
@@ -6591,179 +5839,6 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             traceback.print_exc()
             self.send_json_response({"error": str(e)}, 500)
     
-    def _get_leaves_for_period(self, db, reference_date, company=None, division=None, leave_type=None):
-        """Calcula métricas de afastamentos para um período específico usando LeaveRecord"""
-        from sqlalchemy import func, and_, or_
-        from app.models.employee import Employee
-        from app.models.leave import LeaveRecord
-        from datetime import date
-        from dateutil.relativedelta import relativedelta
-        
-        # Último dia do mês
-        if reference_date.month == 12:
-            last_day = reference_date.replace(day=31)
-        else:
-            last_day = (reference_date.replace(day=1) + relativedelta(months=1)) - relativedelta(days=1)
-        
-        # Total de colaboradores ativos
-        employees_query = db.query(Employee).filter(Employee.is_active == True)
-        if company:
-            employees_query = employees_query.filter(Employee.company_code == company)
-        if division:
-            employees_query = employees_query.filter(Employee.department == division)
-        
-        total_employees = employees_query.count()
-        
-        # Query base de afastamentos no período
-        # (afastamento começa antes ou durante o mês E termina depois ou durante o mês)
-        leaves_query = db.query(LeaveRecord).join(Employee).filter(
-            and_(
-                Employee.is_active == True,
-                LeaveRecord.start_date <= last_day,
-                LeaveRecord.end_date >= reference_date
-            )
-        )
-        
-        # Aplicar filtros
-        if company:
-            leaves_query = leaves_query.filter(Employee.company_code == company)
-        if division:
-            leaves_query = leaves_query.filter(Employee.department == division)
-        if leave_type:
-            leaves_query = leaves_query.filter(LeaveRecord.leave_type == leave_type)
-        
-        # Contar afastamentos únicos por colaborador no período
-        total_on_leave = db.query(func.count(func.distinct(LeaveRecord.employee_id))).join(Employee).filter(
-            and_(
-                Employee.is_active == True,
-                LeaveRecord.start_date <= last_day,
-                LeaveRecord.end_date >= reference_date
-            )
-        )
-        
-        if company:
-            total_on_leave = total_on_leave.filter(Employee.company_code == company)
-        if division:
-            total_on_leave = total_on_leave.filter(Employee.department == division)
-        if leave_type:
-            total_on_leave = total_on_leave.filter(LeaveRecord.leave_type == leave_type)
-        
-        total_on_leave = total_on_leave.scalar() or 0
-        
-        # Taxa de absenteísmo
-        absenteeism_rate = (total_on_leave / total_employees * 100) if total_employees > 0 else 0
-        
-        # Afastamentos por tipo
-        by_type_query = db.query(
-            LeaveRecord.leave_type,
-            func.count(LeaveRecord.id).label('count')
-        ).join(Employee).filter(
-            and_(
-                Employee.is_active == True,
-                LeaveRecord.start_date <= last_day,
-                LeaveRecord.end_date >= reference_date
-            )
-        )
-        
-        if company:
-            by_type_query = by_type_query.filter(Employee.company_code == company)
-        if division:
-            by_type_query = by_type_query.filter(Employee.department == division)
-        
-        by_type = by_type_query.group_by(LeaveRecord.leave_type).all()
-        
-        total_leaves = sum(count for _, count in by_type)
-        by_type_results = []
-        for type_name, count in by_type:
-            by_type_results.append({
-                'type': type_name if type_name else 'Não especificado',
-                'count': count,
-                'percentage': round((count / total_leaves * 100), 1) if total_leaves > 0 else 0
-            })
-        
-        # Duração média dos afastamentos (em dias) - usando campo days se disponível
-        avg_duration_query = db.query(
-            func.avg(LeaveRecord.days)
-        ).join(Employee).filter(
-            and_(
-                Employee.is_active == True,
-                LeaveRecord.start_date <= last_day,
-                LeaveRecord.end_date >= reference_date,
-                LeaveRecord.days.isnot(None)
-            )
-        )
-        
-        if company:
-            avg_duration_query = avg_duration_query.filter(Employee.company_code == company)
-        if division:
-            avg_duration_query = avg_duration_query.filter(Employee.department == division)
-        if leave_type:
-            avg_duration_query = avg_duration_query.filter(LeaveRecord.leave_type == leave_type)
-        
-        avg_duration = avg_duration_query.scalar()
-        
-        # Se days não estiver preenchido, calcular pela diferença de datas
-        if avg_duration is None:
-            avg_duration_query = db.query(
-                func.avg(LeaveRecord.end_date - LeaveRecord.start_date)
-            ).join(Employee).filter(
-                and_(
-                    Employee.is_active == True,
-                    LeaveRecord.start_date <= last_day,
-                    LeaveRecord.end_date >= reference_date
-                )
-            )
-            
-            if company:
-                avg_duration_query = avg_duration_query.filter(Employee.company_code == company)
-            if division:
-                avg_duration_query = avg_duration_query.filter(Employee.department == division)
-            if leave_type:
-                avg_duration_query = avg_duration_query.filter(LeaveRecord.leave_type == leave_type)
-            
-            avg_duration = avg_duration_query.scalar()
-        
-        # Afastamentos por departamento
-        by_department_query = db.query(
-            Employee.department,
-            func.count(LeaveRecord.id).label('count')
-        ).join(Employee).filter(
-            and_(
-                Employee.is_active == True,
-                LeaveRecord.start_date <= last_day,
-                LeaveRecord.end_date >= reference_date
-            )
-        )
-        
-        if company:
-            by_department_query = by_department_query.filter(Employee.company_code == company)
-        if division:
-            by_department_query = by_department_query.filter(Employee.department == division)
-        if leave_type:
-            by_department_query = by_department_query.filter(LeaveRecord.leave_type == leave_type)
-        
-        by_department = by_department_query.group_by(Employee.department).all()
-        
-        by_department_results = []
-        for dept, count in by_department:
-            by_department_results.append({
-                'department': dept if dept else 'Não especificado',
-                'count': count,
-                'percentage': round((count / total_leaves * 100), 1) if total_leaves > 0 else 0
-            })
-        
-        return {
-            'year': reference_date.year,
-            'month': reference_date.month,
-            'total_employees': total_employees,
-            'total_on_leave': total_on_leave,
-            'total_leave_records': total_leaves,
-            'absenteeism_rate': round(absenteeism_rate, 2),
-            'average_duration_days': round(float(avg_duration), 1) if avg_duration else 0,
-            'by_type': by_type_results,
-            'by_department': by_department_results
-        }
-    
     def handle_report_generate(self):
         """Gera relatório PDF com indicadores de RH"""
         try:
@@ -6801,35 +5876,12 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             
             db = SessionLocal()
             try:
-                # Coletar dados de cada seção necessária
-                data = {}
-                
-                if 'overview' in sections:
-                    # Reutilizar lógica existente
-                    data['overview'] = self._get_overview_data(db, year, month, company, division)
-                
-                if 'headcount' in sections:
-                    data['headcount'] = self._get_headcount_data(db, year, month, months_range, company, division)
-                
-                if 'turnover' in sections:
-                    data['turnover'] = self._get_turnover_data(db, year, month, months_range, company, division)
-                
-                if 'demographics' in sections:
-                    data['demographics'] = self._get_demographics_data(db, year, month, company, division)
-                
-                if 'tenure' in sections:
-                    data['tenure'] = self._get_tenure_data(db, year, month, company, division)
-                
-                if 'leaves' in sections:
-                    data['leaves'] = self._get_leaves_data_for_report(db, year, month, months_range, company, division)
+                from app.services.report_cache import get_report_cache, compute_data_version, stamp_generation
                 
-                if 'payroll' in sections:
-                    data['payroll'] = self._get_payroll_data_for_report(db, year, month, company, division)
-                
-                # Gerar relatório moderno em HTML
-                from app.services.modern_report_generator import ModernReportGenerator
-                modern_service = ModernReportGenerator(db)
-                html_content = modern_service.generate_report(
+                # Relatórios idênticos (mesmos parâmetros + mesmos dados) vêm do cache
+                report_cache = get_report_cache()
+                cache_key = report_cache.make_report_key(
+                    compute_data_version(db),
                     report_type=report_type,
                     sections=sections,
                     year=year,
@@ -6837,9 +5889,22 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                     months_range=months_range,
                     company=company,
                     division=division,
-                    data=data,
                     user_info=user_info
                 )
+                cached_report = report_cache.get_report(cache_key)
+                
+                if cached_report:
+                    print(f"💾 Relatório servido do cache ({cache_key[:8]})")
+                    html_content = cached_report['html']
+                else:
+                    html_content = self._render_report_html(
+                        db, report_cache, report_type, sections, year, month,
+                        months_range, company, division, user_info
+                    )
+                    report_cache.set_report(cache_key, {'html': html_content})
+                
+                # Data/hora de geração fica fora do corpo em cache
+                html_content = stamp_generation(html_content, datetime.now())
                 
                 # Salvar HTML temporário e retornar URL para abrir no navegador
                 import tempfile
@@ -6847,9 +5912,10 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 
                 temp_dir = tempfile.gettempdir()
                 month_names = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-                filename = f"NexoRH_{report_type}_{month_names[month-1]}_{year}.html"
+                filename = f"NexoRH_{report_type}_{month_names[month-1]}_{year}_{cache_key[:8]}.html"
                 temp_path = os.path.join(temp_dir, filename)
                 
+                # Reescrito a cada pedido (data/hora de geração atualizada)
                 with open(temp_path, 'w', encoding='utf-8') as f:
                     f.write(html_content)
                 
@@ -6884,15 +5950,60 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             traceback.print_exc()
             self.send_json_response({"error": str(e)}, 500)
     
+    def _render_report_html(self, db, report_cache, report_type, sections, year, month,
+                            months_range, company, division, user_info):
+        """Coleta os dados das seções e renderiza o HTML do relatório"""
+        data = {}
+        
+        if 'overview' in sections:
+            # Reutilizar lógica existente
+            data['overview'] = self._get_overview_data(db, year, month, company, division)
+        
+        if 'headcount' in sections:
+            data['headcount'] = self._get_headcount_data(db, year, month, months_range, company, division)
+        
+        if 'turnover' in sections:
+            data['turnover'] = self._get_turnover_data(db, year, month, months_range, company, division)
+        
+        if 'demographics' in sections:
+            data['demographics'] = self._get_demographics_data(db, year, month, company, division)
+        
+        if 'tenure' in sections:
+            data['tenure'] = self._get_tenure_data(db, year, month, company, division)
+        
+        if 'leaves' in sections:
+            data['leaves'] = self._get_leaves_data_for_report(db, year, month, months_range, company, division)
+        
+        if 'payroll' in sections:
+            data['payroll'] = self._get_payroll_data_for_report(db, year, month, company, division)
+        
+        # Gerar relatório moderno em HTML (gráficos reaproveitados via cache)
+        from app.services.modern_report_generator import ModernReportGenerator
+        from app.services.report_cache import GENERATION_STAMP
+        modern_service = ModernReportGenerator(db, cache=report_cache)
+        return modern_service.generate_report(
+            report_type=report_type,
+            sections=sections,
+            year=year,
+            month=month,
+            months_range=months_range,
+            company=company,
+            division=division,
+            data=data,
+            user_info=user_info,
+            generation_stamp=GENERATION_STAMP
+        )
+    
     def _get_overview_data(self, db, year, month, company, division):
         """Coleta dados de overview para o relatório - usa headcount existente"""
+        from app.services.indicator_periods import get_headcount_for_period
         from datetime import date
         from sqlalchemy import func
         from app.models.leave import LeaveRecord
         from app.models.employee import Employee
         
-        # Usar o método _get_headcount_for_period que já funciona
-        headcount_data = self._get_headcount_for_period(db, year, month, company or 'all', division or 'all')
+        # Usar get_headcount_for_period que já funciona
+        headcount_data = get_headcount_for_period(db, year, month, company or 'all', division or 'all')
         
         # Período de referência para afastamentos
         reference_date = date(year, month, 1)
@@ -6935,7 +6046,8 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
     
     def _get_headcount_data(self, db, year, month, months_range, company, division):
         """Coleta dados de headcount para o relatório"""
-        current = self._get_headcount_for_period(db, year, month, company or 'all', division or 'all')
+        from app.services.indicator_periods import get_headcount_for_period
+        current = get_headcount_for_period(db, year, month, company or 'all', division or 'all')
         
         # Formatar dados para o PDF com by_department
         by_department = []
@@ -7051,148 +6163,52 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
     
     def _get_demographics_data(self, db, year, month, company, division):
         """Coleta dados demográficos para o relatório"""
-        from sqlalchemy import func, case
-        from app.models.payroll import PayrollPeriod, PayrollData
-        from app.models.employee import Employee
-        
-        # Buscar período usando PayrollPeriod (mesmo padrão do _get_headcount_for_period)
-        period_query = db.query(PayrollPeriod).filter(
-            PayrollPeriod.year == year,
-            PayrollPeriod.month == month
-        )
-        if company and company != 'all':
-            period_query = period_query.filter(PayrollPeriod.company == company)
-        
-        periods = period_query.all()
-        if not periods:
-            return {'current': {'by_gender': [], 'by_age_range': [], 'by_education': []}}
-        
-        period_ids = [p.id for p in periods]
-        
-        # Funcionários no período
-        payroll_records = db.query(PayrollData.employee_id).filter(
-            PayrollData.period_id.in_(period_ids)
-        ).distinct().all()
-        employee_ids = [r[0] for r in payroll_records]
-        
-        if not employee_ids:
-            return {'current': {'by_gender': [], 'by_age_range': [], 'by_education': []}}
-        
-        # Buscar employees com filtro de divisão
-        emp_query = db.query(Employee).filter(Employee.id.in_(employee_ids))
-        if division and division != 'all':
-            emp_query = emp_query.filter(Employee.department == division)
-        employees = emp_query.all()
+        from datetime import date
+        from app.services.workforce_metrics import load_workforce_profile, bucket_counts, AGE_EDGES, AGE_LABELS
         
-        if not employees:
+        profile = load_workforce_profile(db, year, month, company, division)
+        if not profile.size:
             return {'current': {'by_gender': [], 'by_age_range': [], 'by_education': []}}
         
-        # Calcular distribuições manualmente (sem funções SQL complexas)
-        from datetime import date
-        today = date.today()
-        
         # Gênero
         gender_counts = {}
-        for emp in employees:
-            gender = 'Masculino' if emp.sex == 'M' else 'Feminino' if emp.sex == 'F' else 'Não informado'
+        for sex in profile.sex:
+            gender = 'Masculino' if sex == 'M' else 'Feminino' if sex == 'F' else 'Não informado'
             gender_counts[gender] = gender_counts.get(gender, 0) + 1
         by_gender = [{'gender': k, 'count': v} for k, v in gender_counts.items()]
         
         # Faixa etária
-        age_counts = {'18-24': 0, '25-34': 0, '35-44': 0, '45-54': 0, '55+': 0}
-        for emp in employees:
-            if emp.birth_date:
-                age = (today - emp.birth_date).days // 365
-                if age < 25:
-                    age_counts['18-24'] += 1
-                elif age < 35:
-                    age_counts['25-34'] += 1
-                elif age < 45:
-                    age_counts['35-44'] += 1
-                elif age < 55:
-                    age_counts['45-54'] += 1
-                else:
-                    age_counts['55+'] += 1
-        by_age = [{'age_range': k, 'count': v} for k, v in age_counts.items() if v > 0]
+        ages = profile.ages(date.today())
+        by_age = [{'age_range': r, 'count': c} for r, c in bucket_counts(ages, AGE_EDGES, AGE_LABELS)]
         
         return {
             'current': {
                 'by_gender': by_gender,
                 'by_age_range': by_age,
-                'total_employees': len(employees)
+                'total_employees': profile.size
             }
         }
     
     def _get_tenure_data(self, db, year, month, company, division):
         """Coleta dados de tempo de casa para o relatório"""
         from datetime import date
-        from app.models.payroll import PayrollPeriod, PayrollData
-        from app.models.employee import Employee
-        
-        reference_date = date(year, month, 1)
-        
-        # Buscar período usando PayrollPeriod
-        period_query = db.query(PayrollPeriod).filter(
-            PayrollPeriod.year == year,
-            PayrollPeriod.month == month
-        )
-        if company and company != 'all':
-            period_query = period_query.filter(PayrollPeriod.company == company)
-        
-        periods = period_query.all()
-        if not periods:
-            return {'current': {'average_tenure_months': 0, 'by_tenure_range': []}}
-        
-        period_ids = [p.id for p in periods]
-        
-        # Funcionários no período
-        payroll_records = db.query(PayrollData.employee_id).filter(
-            PayrollData.period_id.in_(period_ids)
-        ).distinct().all()
-        employee_ids = [r[0] for r in payroll_records]
-        
-        if not employee_ids:
-            return {'current': {'average_tenure_months': 0, 'by_tenure_range': []}}
-        
-        # Buscar employees com filtro de divisão
-        emp_query = db.query(Employee).filter(Employee.id.in_(employee_ids))
-        if division and division != 'all':
-            emp_query = emp_query.filter(Employee.department == division)
-        employees = emp_query.all()
+        from app.services.workforce_metrics import load_workforce_profile, bucket_counts
         
-        if not employees:
+        profile = load_workforce_profile(db, year, month, company, division)
+        if not profile.size:
             return {'current': {'average_tenure_months': 0, 'by_tenure_range': []}}
         
-        # Calcular tempo de casa manualmente
-        tenure_counts = {
-            'Até 6 meses': 0,
-            '6 meses - 1 ano': 0,
-            '1 - 2 anos': 0,
-            '2 - 5 anos': 0,
-            'Mais de 5 anos': 0
-        }
-        total_months = 0
-        count_with_admission = 0
-        
-        for emp in employees:
-            if emp.admission_date:
-                months_tenure = (reference_date - emp.admission_date).days / 30
-                total_months += months_tenure
-                count_with_admission += 1
-                
-                if months_tenure < 6:
-                    tenure_counts['Até 6 meses'] += 1
-                elif months_tenure < 12:
-                    tenure_counts['6 meses - 1 ano'] += 1
-                elif months_tenure < 24:
-                    tenure_counts['1 - 2 anos'] += 1
-                elif months_tenure < 60:
-                    tenure_counts['2 - 5 anos'] += 1
-                else:
-                    tenure_counts['Mais de 5 anos'] += 1
-        
-        avg_tenure = total_months / count_with_admission if count_with_admission > 0 else 0
-        by_range = [{'range': k, 'count': v} for k, v in tenure_counts.items() if v > 0]
+        # Tempo de casa em meses (30 dias) na data de referência
+        months_tenure = profile.tenure_days(date(year, month, 1)) / 30
+        avg_tenure = float(months_tenure.mean()) if len(months_tenure) else 0
+        by_range = [
+            {'range': r, 'count': c}
+            for r, c in bucket_counts(
+                months_tenure,
+                [6, 12, 24, 60],
+                ['Até 6 meses', '6 meses - 1 ano', '1 - 2 anos', '2 - 5 anos', 'Mais de 5 anos']
+            )
+        ]
         
         return {
             'current': {
@@ -7361,30 +6377,54 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
         }
     
     def handle_indicators_invalidate_cache(self):
-        """Invalida cache de indicadores e employees"""
+        """Invalida cache de indicadores (seletivo por empresa/ano/mês/tipo) e employees"""
         try:
             from app.services.hr_indicators import HRIndicatorsService
+            from app.services.indicator_cube import get_indicator_cube, publish_indicator_change
             
             print("🔄 Invalidando cache de indicadores...")
             
             # Tentar obter dados do request (pode ser vazio para POST sem body)
             try:
-                data = self.get_request_data()
-                indicator_type = data.get('indicator_type') if data else None
+                data = self.get_request_data() or {}
             except:
-                indicator_type = None
-            
-            # Invalidar cache de employees primeiro
-            print("🗑️  Invalidando cache de employees...")
-            invalidate_employees_cache()
+                data = {}
+            indicator_type = data.get('indicator_type')
+            company = data.get('company')
+            year = int(data['year']) if data.get('year') else None
+            month = int(data['month']) if data.get('month') else None
             
             db = SessionLocal()
             try:
-                service = HRIndicatorsService(db)
-                print(f"🗑️  Invalidando cache de indicadores (type: {indicator_type})...")
-                service.invalidate_cache(indicator_type=indicator_type)
-                
-                message = f"Cache invalidado: {indicator_type} + employees" if indicator_type else "Todo cache invalidado (indicators + employees)"
+                if company or year:
+                    # Invalidação seletiva: apenas o escopo informado
+                    removed = publish_indicator_change(
+                        'manual',
+                        company=company,
+                        year=year,
+                        month=month,
+                        indicator_types=[indicator_type] if indicator_type else None,
+                        db=db
+                    )
+                    message = f"Cache de indicadores invalidado seletivamente ({removed} células)"
+                else:
+                    # Invalidar cache de employees primeiro
+                    print("🗑️  Invalidando cache de employees...")
+                    invalidate_employees_cache(full=True)
+                    
+                    service = HRIndicatorsService(db)
+                    print(f"🗑️  Invalidando cache de indicadores (type: {indicator_type})...")
+                    service.invalidate_cache(indicator_type=indicator_type)
+                    if indicator_type:
+                        get_indicator_cube().invalidate(indicator_types=[indicator_type])
+                    else:
+                        get_indicator_cube().clear()
+                    
+                    # Demais processos: payload com tipo, ou None (invalidação completa)
+                    from app.services.cache_versions import broadcast, INDICATORS
+                    broadcast(INDICATORS, {'source': 'manual', 'indicator_types': [indicator_type]} if indicator_type else None)
+                    
+                    message = f"Cache invalidado: {indicator_type} + employees" if indicator_type else "Todo cache invalidado (indicators + employees)"
                 print(f"✅ {message}")
                 self.send_json_response({"success": True, "message": message})
             finally:
@@ -7399,11 +6439,18 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
     # ==========================================
     
     def handle_export_payroll_batch(self):
-        """Exportar lote de holerites como ZIP"""
+        """
+        Exportar lote de holerites como ZIP
+        
+        O ZIP é enviado em streaming enquanto é montado (PDFs armazenados sem
+        recompressão), com memória constante para qualquer tamanho de lote.
+        Filtro opcional: uniqueIds (matrículas) e/ou employeeIds.
+        """
+        streaming = False
         try:
             import os
-            import zipfile
-            from io import BytesIO
+            from app.core.zip_stream import iter_zip
+            from app.services.employee_directory import strip_leading_zeros
             
             data = self.get_request_data()
             payroll_type = data.get('payrollType', '11')
@@ -7422,7 +6469,19 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 return
             
             # Listar PDFs
-            pdf_files = [f for f in os.listdir(source_dir) if f.endswith('.pdf') and f.startswith('EN_')]
+            pdf_files = sorted(f for f in os.listdir(source_dir) if f.endswith('.pdf') and f.startswith('EN_'))
+            
+            # Filtro por colaboradores (matrícula no nome: EN_MATRICULA_TIPO_MES_ANO.pdf)
+            wanted = {strip_leading_zeros(uid) for uid in data.get('uniqueIds') or []}
+            employee_ids = data.get('employeeIds') or []
+            if employee_ids and SessionLocal:
+                directory = get_employees_directory()
+                for employee_id in employee_ids:
+                    employee = directory.get(employee_id)
+                    if employee:
+                        wanted.add(strip_leading_zeros(employee.get('unique_id')))
+            if wanted or employee_ids:
+                pdf_files = [f for f in pdf_files if f.split('_')[1] in wanted]
             
             if not pdf_files:
                 self.send_json_response({"error": "Nenhum arquivo PDF encontrado"}, 404)
@@ -7430,36 +6489,31 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             
             print(f"📄 {len(pdf_files)} arquivos encontrados")
             
-            # Criar ZIP em memória
-            zip_buffer = BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                for pdf_file in pdf_files:
-                    file_path = os.path.join(source_dir, pdf_file)
-                    zip_file.write(file_path, pdf_file)
-            
-            zip_buffer.seek(0)
-            zip_data = zip_buffer.getvalue()
-            
             # Nome do arquivo ZIP
             type_name = formatter.PAYROLL_TYPES[payroll_type]
             zip_filename = f"Holerites_{type_name}_{month:02d}_{year}.zip"
             
-            print(f"✅ ZIP criado: {zip_filename} ({len(zip_data)} bytes)")
+            streaming = True
+            self.send_body_stream(
+                iter_zip((os.path.join(source_dir, pdf_file), pdf_file) for pdf_file in pdf_files),
+                'application/zip',
+                headers={
+                    'Content-Disposition': f'attachment; filename="{zip_filename}"',
+                    'Access-Control-Expose-Headers': 'Content-Disposition'
+                },
+                compress=False
+            )
             
-            # Enviar ZIP com headers CORS
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/zip')
-            self.send_header('Content-Disposition', f'attachment; filename="{zip_filename}"')
-            self.send_header('Content-Length', str(len(zip_data)))
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Expose-Headers', 'Content-Disposition')
-            self.end_headers()
-            self.wfile.write(zip_data)
+            print(f"✅ ZIP enviado: {zip_filename} ({len(pdf_files)} arquivos)")
             
         except Exception as e:
             print(f"❌ Erro ao exportar lote: {e}")
             import traceback
             traceback.print_exc()
+            if streaming:
+                # Cabeçalhos já enviados: encerrar a conexão deixa o ZIP incompleto (erro no cliente)
+                self.close_connection = True
+                return
             self.send_json_response({"error": f"Erro ao exportar: {str(e)}"}, 500)
     
     def split_pdf_by_employee(self, input_pdf_path, output_dir):
@@ -7481,6 +6535,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             unprotected_pdfs = []
             
             with open(input_pdf_path, 'rb') as infile:
+                PyPDF2 = load_pypdf2()
                 reader = PyPDF2.PdfReader(infile)
                 num_pages = len(reader.pages)
                 
@@ -7625,6 +6680,12 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                     with open(output_pdf_path, 'wb') as outfile:
                         writer.write(outfile)
                     
+                    record_processed_payroll(
+                        output_pdf_path,
+                        unique_id=identifier,
+                        month_year=f"{year}-{month_num}" if month_year != "UNKNOWN_DATE" else None
+                    )
+                    
                     files_created.append({
                         'identifier': identifier,
                         'filename': os.path.basename(output_pdf_path),
@@ -7688,11 +6749,8 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             print(f"📋 Enviando para {len(selected_employees)} colaborador(es)")
             
             # Carregar dados dos colaboradores
-            employees_data = load_employees_data()
-            employees = employees_data.get('employees', [])
-            
-            # Criar dicionário para busca rápida por ID
-            employees_by_id = {emp.get('id'): emp for emp in employees}
+            # Diretório indexado por ID para busca rápida
+            directory = get_employees_directory()
             
             # Pegar user_id do token JWT (se disponível)
             user_id = None
@@ -7701,7 +6759,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 print(f"🔑 Authorization header: {auth_header[:50] if auth_header else 'VAZIO'}...")
                 if auth_header.startswith('Bearer '):
                     token = auth_header.replace('Bearer ', '')
-                    from app.core.auth import decode_token
+                    from app.core.security import decode_token
                     payload = decode_token(token)
                     print(f"📦 Payload completo do JWT: {payload}")
                     user_id = payload.get('user_id')
@@ -7761,8 +6819,8 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 # ===== DELAY ANTI-STRIKE DO WHATSAPP =====
                 if idx > 0:
                     import random
-                    import time
                     from datetime import datetime
+                    from app.core.pacing import pause
                     # Delay entre 47 e 73 segundos (47s a 1m13s) para evitar softban
                     delay = round(random.uniform(47.00, 73.00), 2)
                     minutes = int(delay // 60)
@@ -7770,12 +6828,12 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                     time_str = f"{minutes}m{seconds}s" if minutes > 0 else f"{seconds}s"
                     print(f"\n⏳⏳⏳ AGUARDANDO {delay:.2f} SEGUNDOS ({time_str}) antes do envio #{idx+1}...")
                     print(f"⏰ Início do delay: {datetime.now().strftime('%H:%M:%S')}")
-                    time.sleep(delay)
+                    pause(delay)
                     print(f"✅ Delay concluído: {datetime.now().strftime('%H:%M:%S')}\n")
                 else:
                     print(f"⚡ Primeiro envio - SEM DELAY (instantâneo)")
                 
-                employee = employees_by_id.get(emp_id)
+                employee = directory.get(emp_id)
                 
                 if not employee:
                     failed_employees.append({
@@ -7861,19 +6919,18 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                         # Registrar recipient no banco (se temos comm_send_id)
                         if comm_send_id:
                             try:
-                                from app.models.base import get_db
                                 from app.models.communication_recipient import CommunicationRecipient
                                 from datetime import datetime
                                 
-                                db = next(get_db())
+                                # Registro de entrega: gravação síncrona (não passa pela fila de logs)
+                                db = SessionLocal()
                                 try:
-                                    recipient = CommunicationRecipient(
+                                    db.add(CommunicationRecipient(
                                         communication_send_id=comm_send_id,
                                         employee_id=emp_id,
                                         status='sent',
                                         sent_at=datetime.now()
-                                    )
-                                    db.add(recipient)
+                                    ))
                                     db.commit()
                                 finally:
                                     db.close()
@@ -7882,23 +6939,17 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                         
                         # 📝 REGISTRAR LOG DO SISTEMA - COMUNICADO SUCESSO
                         try:
-                            from app.models.system_log import SystemLog, LogLevel, LogCategory
-                            log_db = SessionLocal()
-                            try:
-                                log_entry = SystemLog(
-                                    level=LogLevel.INFO,
-                                    category=LogCategory.COMMUNICATION,
-                                    message=f"Comunicado enviado: {employee.get('full_name')}",
-                                    details=f"Mensagem: {message[:100] if message else '[Arquivo]'}, Telefone: {phone}, Instância: {next_instance}",
-                                    user_id=user_id,
-                                    entity_type='Employee',
-                                    entity_id=str(emp_id)
-                                )
-                                log_db.add(log_entry)
-                                log_db.commit()
-                                print(f"📝 Log de sucesso registrado")
-                            finally:
-                                log_db.close()
+                            from app.models.system_log import LogLevel, LogCategory
+                            from app.services.log_writer import get_log_writer
+                            get_log_writer(SessionLocal).log(
+                                LogLevel.INFO,
+                                LogCategory.COMMUNICATION,
+                                f"Comunicado enviado: {employee.get('full_name')}",
+                                details=f"Mensagem: {message[:100] if message else '[Arquivo]'}, Telefone: {phone}, Instância: {next_instance}",
+                                user_id=user_id,
+                                entity_type='Employee',
+                                entity_id=str(emp_id)
+                            )
                         except Exception as log_error:
                             print(f"⚠️ Erro ao registrar log: {log_error}")
                         
@@ -7931,20 +6982,18 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                         # Registrar falha no banco (se temos comm_send_id)
                         if comm_send_id:
                             try:
-                                from app.models.base import get_db
                                 from app.models.communication_recipient import CommunicationRecipient
                                 from datetime import datetime
                                 
-                                db = next(get_db())
+                                db = SessionLocal()
                                 try:
-                                    recipient = CommunicationRecipient(
+                                    db.add(CommunicationRecipient(
                                         communication_send_id=comm_send_id,
                                         employee_id=emp_id,
                                         status='failed',
                                         error_message=result['message'],
                                         sent_at=datetime.now()
-                                    )
-                                    db.add(recipient)
+                                    ))
                                     db.commit()
                                 finally:
                                     db.close()
@@ -7953,23 +7002,17 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                         
                         # 📝 REGISTRAR LOG DO SISTEMA - COMUNICADO FALHA  
                         try:
-                            from app.models.system_log import SystemLog, LogLevel, LogCategory
-                            log_db = SessionLocal()
-                            try:
-                                log_entry = SystemLog(
-                                    level=LogLevel.ERROR,
-                                    category=LogCategory.COMMUNICATION,
-                                    message=f"Falha ao enviar comunicado: {employee.get('full_name')}",
-                                    details=f"Erro: {result.get('message', 'Erro desconhecido')}, Telefone: {phone}",
-                                    user_id=user_id,
-                                    entity_type='Employee',
-                                    entity_id=str(emp_id)
-                                )
-                                log_db.add(log_entry)
-                                log_db.commit()
-                                print(f"📝 Log de falha registrado")
-                            finally:
-                                log_db.close()
+                            from app.models.system_log import LogLevel, LogCategory
+                            from app.services.log_writer import get_log_writer
+                            get_log_writer(SessionLocal).log(
+                                LogLevel.ERROR,
+                                LogCategory.COMMUNICATION,
+                                f"Falha ao enviar comunicado: {employee.get('full_name')}",
+                                details=f"Erro: {result.get('message', 'Erro desconhecido')}, Telefone: {phone}",
+                                user_id=user_id,
+                                entity_type='Employee',
+                                entity_id=str(emp_id)
+                            )
                         except Exception as log_error:
                             print(f"⚠️ Erro ao registrar log: {log_error}")
                 
@@ -8172,6 +7215,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             # Excluir o arquivo
             try:
                 os.remove(file_path)
+                forget_processed_payroll(file_path)
                 print(f"✅ Arquivo removido: {filename}")
                 
                 # Registrar no log do sistema
@@ -8231,7 +7275,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 auth_header = self.headers.get('Authorization', '')
                 if auth_header.startswith('Bearer '):
                     token = auth_header.replace('Bearer ', '')
-                    from app.core.auth import decode_token
+                    from app.core.security import decode_token
                     payload = decode_token(token)
                     user_id = payload.get('user_id')
                     print(f"👤 user_id extraído: {user_id}")
@@ -8252,6 +7296,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             thread = threading.Thread(
                 target=process_bulk_send_in_background,
                 args=(job_id, selected_files, message_templates, user_id),
+                name=f'bulk-send-{job_id}',
                 daemon=True
             )
             thread.start()
@@ -8273,17 +7318,9 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             traceback.print_exc()
             self.send_json_response({"error": f"Erro interno: {str(e)}"}, 500)
     
-    def handle_bulk_send_status(self):
+    def handle_bulk_send_status(self, job_id: str):
         """Verificar status de um job de envio em background"""
         try:
-            # Extrair job_id da URL: /api/v1/payrolls/bulk-send/{job_id}/status
-            path_parts = self.path.split('/')
-            if len(path_parts) < 7:
-                self.send_json_response({"error": "job_id não informado"}, 400)
-                return
-            
-            job_id = path_parts[5]  # /api/v1/payrolls/bulk-send/{job_id}/status
-            
             # Buscar job no dicionário
             with jobs_lock:
                 job = bulk_send_jobs.get(job_id)
@@ -9031,25 +8068,29 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             level = query_params.get('level', [None])[0]
             category = query_params.get('category', [None])[0]
             user_id = query_params.get('user_id', [None])[0]
-            limit = int(query_params.get('limit', [100])[0])
-            offset = int(query_params.get('offset', [0])[0])
+            limit = min(int(query_params.get('limit', [100])[0]), 500)
+            cursor = query_params.get('cursor', [None])[0]
             
-            # Buscar logs usando a mesma sessão
+            # Buscar logs usando a mesma sessão (paginação keyset por cursor)
             logger = LoggingService(db)
-            logs_data = logger.get_logs(
-                level=level,
-                category=category,
-                user_id=int(user_id) if user_id else None,
-                limit=limit,
-                offset=offset
-            )
+            try:
+                page = logger.get_logs_page(
+                    level=level,
+                    category=category,
+                    user_id=int(user_id) if user_id else None,
+                    limit=limit,
+                    cursor=cursor
+                )
+            except ValueError as cursor_error:
+                self.send_json_response({"error": str(cursor_error)}, 400)
+                return
             
-            # get_logs já retorna lista de dicionários
             self.send_json_response({
-                "logs": logs_data,
-                "total": len(logs_data),
+                "logs": page['logs'],
+                "total": len(page['logs']),
                 "limit": limit,
-                "offset": offset
+                "next_cursor": page['next_cursor'],
+                "has_more": page['has_more']
             })
         except Exception as e:
             print(f"❌ Erro ao buscar logs: {e}")
@@ -9165,22 +8206,25 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
             })
     
     def handle_cache_status(self):
-        """Endpoint para verificar status do cache de employees"""
+        """Endpoint para verificar status do cache (diretório) de employees"""
         try:
             import time
-            global employees_cache
             
-            current_time = time.time()
-            cache_age = current_time - employees_cache['last_update']
-            is_valid = employees_cache['data'] is not None and cache_age < employees_cache['ttl']
+            if not SessionLocal:
+                self.send_json_response({"cache_valid": False, "has_data": False, "employee_count": 0})
+                return
+            
+            stats = get_employees_directory().stats()
+            cache_age = time.time() - stats['last_refresh'] if stats['last_refresh'] else None
             
             self.send_json_response({
-                "cache_valid": is_valid,
-                "cache_age_seconds": round(cache_age, 2),
-                "cache_ttl_seconds": employees_cache['ttl'],
-                "has_data": employees_cache['data'] is not None,
-                "employee_count": len(employees_cache['data']['employees']) if employees_cache['data'] else 0,
-                "last_update": employees_cache['last_update']
+                "cache_valid": stats['loaded'] and not stats['stale'],
+                "cache_age_seconds": round(cache_age, 2) if cache_age is not None else None,
+                "cache_ttl_seconds": stats['refresh_seconds'],
+                "has_data": stats['loaded'],
+                "employee_count": stats['employee_count'],
+                "last_update": stats['last_refresh'],
+                "directory": stats
             })
         except Exception as e:
             print(f"❌ Erro ao verificar cache: {e}")
@@ -9195,7 +8239,7 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 return
             
             print(f"🔄 Cache invalidado manualmente por: {authenticated_user.username}")
-            invalidate_employees_cache()
+            invalidate_employees_cache(full=True)
             
             self.send_json_response({
                 "success": True,
@@ -10124,6 +9168,72 @@ class EnviaFolhaHandler(http.server.SimpleHTTPRequestHandler):
                 "error": f"Erro interno: {str(e)}"
             }, 500)
 
+def start_cache_sync():
+    """Inscreve os caches em memória no barramento de versões entre processos"""
+    if not SessionLocal:
+        return None
+    try:
+        from app.services.cache_versions import start_cache_version_bus, EMPLOYEES, INDICATORS, AUTH
+        from app.services.auth_cache import apply_remote_auth_change
+        from app.services.indicator_cube import apply_remote_change
+        from app.services.report_cache import get_report_cache
+        
+        bus = start_cache_version_bus(SessionLocal)
+        if bus is None:
+            return None
+        
+        # Payload None = versões perdidas entre consultas: recarga completa
+        bus.subscribe(EMPLOYEES, lambda payload: get_employees_directory().invalidate(
+            full=payload is None or bool(payload.get('full'))
+        ))
+        bus.subscribe(INDICATORS, apply_remote_change)
+        bus.subscribe(INDICATORS, get_report_cache().invalidate_reports)
+        bus.subscribe(EMPLOYEES, get_report_cache().invalidate_reports)
+        bus.subscribe(AUTH, apply_remote_auth_change)
+        return bus
+    except Exception as e:
+        print(f"⚠️ Sincronização de caches entre processos não iniciada: {e}")
+        return None
+
+def start_indicator_warmup():
+    """Inicia o pré-aquecimento dos indicadores em background (após imports e agendado)"""
+    if not SessionLocal:
+        return None
+    try:
+        from app.services.indicator_periods import warm_indicator_period
+        from app.services.indicator_warmer import start_indicator_warmer
+        return start_indicator_warmer(SessionLocal, warm_indicator_period)
+    except Exception as e:
+        print(f"⚠️ Pré-aquecimento de indicadores não iniciado: {e}")
+        return None
+
+def start_employee_directory_warmup():
+    """Carrega o diretório de colaboradores em background (o servidor já aceita conexões)"""
+    if not SessionLocal:
+        return None
+    
+    def _warm():
+        try:
+            count = len(get_employees_directory().employees())
+            print(f"👥 Funcionários carregados: {count}")
+        except Exception as e:
+            print(f"⚠️ Falha ao pré-carregar colaboradores: {e}")
+    
+    thread = threading.Thread(target=_warm, name='employee-directory-warmup', daemon=True)
+    thread.start()
+    return thread
+
+def start_system_log_maintenance():
+    """Inicia a manutenção de system_logs (partições mensais e retenção)"""
+    if not SessionLocal:
+        return None
+    try:
+        from app.services.log_retention import start_log_maintenance
+        return start_log_maintenance(SessionLocal)
+    except Exception as e:
+        print(f"⚠️ Manutenção de logs não iniciada: {e}")
+        return None
+
 if __name__ == "__main__":
     import time
     start_time = time.time()  # Para calcular uptime
@@ -10141,11 +9251,17 @@ if __name__ == "__main__":
     print("🚀 Sistema de Envio RH v2.0 - PostgreSQL Edition (Corrigido)")
     print("=" * 60)
     print(f"📡 Servidor iniciando na porta {PORT}")
-    print(f"🗄️  Banco de dados: {'PostgreSQL' if SessionLocal else 'JSON (fallback)'}")
-    print(f"👥 Funcionários carregados: {len(employees_data.get('employees', []))}")
     print(f"🔗 Acesse: http://localhost:{PORT}")
     print("=" * 60)
     
+    initialize_database()
+    print(f"🗄️  Banco de dados: {'PostgreSQL' if SessionLocal else 'JSON (fallback)'}")
+    
+    start_employee_directory_warmup()
+    start_cache_sync()
+    start_indicator_warmup()
+    start_system_log_maintenance()
+    
     with socketserver.TCPServer(("", PORT), EnviaFolhaHandler) as httpd:
         print(f"✅ Servidor rodando em http://localhost:{PORT}")
         try:
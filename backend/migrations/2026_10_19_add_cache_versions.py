@@ -0,0 +1,35 @@
+"""Migration: add cache_versions table
+
+Shared cache version counters used to invalidate in-memory caches across
+server processes. This migration is idempotent: it checks for table existence
+before creating.
+"""
+from sqlalchemy import create_engine, inspect, text
+import os
+
+
+def run_migration(database_url=None):
+    database_url = database_url or os.environ.get('DATABASE_URL') or os.environ.get('DATABASE_URI')
+    if not database_url:
+        print('DATABASE_URL not provided; skipping migration')
+        return
+
+    engine = create_engine(database_url)
+    inspector = inspect(engine)
+
+    with engine.begin() as conn:
+        if 'cache_versions' not in inspector.get_table_names():
+            json_type = 'JSONB' if engine.dialect.name == 'postgresql' else 'JSON'
+            conn.execute(text(f'''
+            CREATE TABLE cache_versions (
+                namespace VARCHAR(50) PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 0,
+                payload {json_type},
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            );
+            '''))
+            print('Created cache_versions')
+
+
+if __name__ == '__main__':
+    run_migration()
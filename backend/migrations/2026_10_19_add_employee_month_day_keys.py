@@ -0,0 +1,59 @@
+"""Migration: month-day keys for birthday and work-anniversary lookups
+
+Adds employees.birth_month_day and employees.admission_month_day (MMDD as
+an integer, e.g. 315 for March 15th), backfills them and indexes them
+together with is_active. The endomarketing lookups become index range scans
+instead of extract(month/day) over every employee. The ORM keeps the keys
+in sync on every employee insert/update.
+
+This migration is idempotent: columns and indexes are created only if
+missing and only rows with a missing key are backfilled.
+"""
+from sqlalchemy import create_engine, inspect, text
+import os
+
+KEYS = {
+    'birth_month_day': 'birth_date',
+    'admission_month_day': 'admission_date',
+}
+
+
+def month_day_expression(dialect, column):
+    if dialect == 'sqlite':
+        return f"CAST(strftime('%m', {column}) AS INTEGER) * 100 + CAST(strftime('%d', {column}) AS INTEGER)"
+    return f'CAST(EXTRACT(MONTH FROM {column}) AS INTEGER) * 100 + CAST(EXTRACT(DAY FROM {column}) AS INTEGER)'
+
+
+def run_migration(database_url=None):
+    database_url = database_url or os.environ.get('DATABASE_URL') or os.environ.get('DATABASE_URI')
+    if not database_url:
+        print('DATABASE_URL not provided; skipping migration')
+        return
+
+    engine = create_engine(database_url)
+    inspector = inspect(engine)
+    if 'employees' not in inspector.get_table_names():
+        print('employees not found; skipping month-day keys')
+        return
+    columns = {c['name'] for c in inspector.get_columns('employees')}
+
+    with engine.begin() as conn:
+        for key, source in KEYS.items():
+            if key not in columns:
+                conn.execute(text(f'ALTER TABLE employees ADD COLUMN {key} SMALLINT'))
+                print(f'Added column {key} to employees')
+
+            result = conn.execute(text(f'''
+                UPDATE employees
+                SET {key} = {month_day_expression(engine.dialect.name, source)}
+                WHERE {key} IS NULL AND {source} IS NOT NULL
+            '''))
+            if result.rowcount:
+                print(f'Backfilled {key} for {result.rowcount} employees')
+
+            conn.execute(text(f'CREATE INDEX IF NOT EXISTS ix_employees_active_{key} ON employees (is_active, {key})'))
+    print('Employee month-day keys verified')
+
+
+if __name__ == '__main__':
+    run_migration()
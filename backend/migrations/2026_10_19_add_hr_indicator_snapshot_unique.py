@@ -0,0 +1,62 @@
+"""Migration: one hr_indicator_snapshots row per indicator type and period
+
+Removes duplicate snapshots (keeping the most recent row of each
+indicator_type/period_start/period_end) and adds the unique constraint
+uq_hr_indicator_snapshots_type_period, which HRIndicatorsService uses as the
+INSERT ... ON CONFLICT target. On PostgreSQL the constraint is NULLS NOT
+DISTINCT, so snapshots without a period are unique per type as well.
+
+This migration is idempotent: duplicates are only deleted when present and
+the constraint is created only if missing.
+"""
+from sqlalchemy import create_engine, inspect, text
+import os
+
+TABLE = 'hr_indicator_snapshots'
+CONSTRAINT = 'uq_hr_indicator_snapshots_type_period'
+
+
+def run_migration(database_url=None):
+    database_url = database_url or os.environ.get('DATABASE_URL') or os.environ.get('DATABASE_URI')
+    if not database_url:
+        print('DATABASE_URL not provided; skipping migration')
+        return
+
+    engine = create_engine(database_url)
+    inspector = inspect(engine)
+    if TABLE not in inspector.get_table_names():
+        print(f'{TABLE} not found; skipping unique constraint')
+        return
+    postgres = engine.dialect.name == 'postgresql'
+    same = 'IS NOT DISTINCT FROM' if postgres else 'IS'
+
+    with engine.begin() as conn:
+        result = conn.execute(text(f'''
+            DELETE FROM {TABLE}
+            WHERE EXISTS (
+                SELECT 1 FROM {TABLE} newer
+                WHERE newer.indicator_type = {TABLE}.indicator_type
+                  AND newer.period_start {same} {TABLE}.period_start
+                  AND newer.period_end {same} {TABLE}.period_end
+                  AND newer.id > {TABLE}.id
+            )
+        '''))
+        if result.rowcount:
+            print(f'Removed {result.rowcount} duplicate snapshots from {TABLE}')
+
+        if postgres:
+            existing = {c['name'] for c in inspector.get_unique_constraints(TABLE)}
+            if CONSTRAINT not in existing:
+                conn.execute(text(f'''
+                    ALTER TABLE {TABLE} ADD CONSTRAINT {CONSTRAINT}
+                    UNIQUE NULLS NOT DISTINCT (indicator_type, period_start, period_end)
+                '''))
+                print(f'Added constraint {CONSTRAINT}')
+        else:
+            # SQLite cannot add constraints to an existing table: equivalent unique index
+            conn.execute(text(f'CREATE UNIQUE INDEX IF NOT EXISTS {CONSTRAINT} ON {TABLE} (indicator_type, period_start, period_end)'))
+    print('HR indicator snapshot uniqueness verified')
+
+
+if __name__ == '__main__':
+    run_migration()
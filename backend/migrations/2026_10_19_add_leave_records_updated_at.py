@@ -0,0 +1,34 @@
+"""Migration: add leave_records.updated_at
+
+Leave edits did not change any column the report cache version looks at
+(max(created_at) and the row count), so cached reports kept showing the old
+leave. updated_at is set by the ORM on every update and is part of the
+report data version.
+
+This migration is idempotent: it checks for column existence before creating.
+"""
+from sqlalchemy import create_engine, inspect, text
+import os
+
+
+def run_migration(database_url=None):
+    database_url = database_url or os.environ.get('DATABASE_URL') or os.environ.get('DATABASE_URI')
+    if not database_url:
+        print('DATABASE_URL not provided; skipping migration')
+        return
+
+    engine = create_engine(database_url)
+    inspector = inspect(engine)
+    if 'leave_records' not in inspector.get_table_names():
+        print('leave_records not found; skipping migration')
+        return
+
+    columns = {c['name'] for c in inspector.get_columns('leave_records')}
+    with engine.begin() as conn:
+        if 'updated_at' not in columns:
+            conn.execute(text('ALTER TABLE leave_records ADD COLUMN updated_at TIMESTAMP'))
+            print('Added column updated_at to leave_records')
+
+
+if __name__ == '__main__':
+    run_migration()
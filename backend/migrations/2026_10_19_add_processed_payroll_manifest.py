@@ -0,0 +1,65 @@
+"""Migration: add the processed payroll manifest tables
+
+processed_payroll_files lists every individual payslip PDF under processed/
+(and the legacy holerites_formatados_final/ folder), written by the payroll
+generators. processed_payroll_folders keeps the mtime of each folder already
+reconciled, so only folders that changed are rescanned.
+
+This migration is idempotent: tables and indexes are created only if missing.
+"""
+from sqlalchemy import create_engine, inspect, text
+import os
+
+
+def run_migration(database_url=None):
+    database_url = database_url or os.environ.get('DATABASE_URL') or os.environ.get('DATABASE_URI')
+    if not database_url:
+        print('DATABASE_URL not provided; skipping migration')
+        return
+
+    engine = create_engine(database_url)
+    tables = set(inspect(engine).get_table_names())
+    id_column = 'SERIAL PRIMARY KEY' if engine.dialect.name == 'postgresql' else 'INTEGER PRIMARY KEY'
+
+    with engine.begin() as conn:
+        if 'processed_payroll_files' not in tables:
+            conn.execute(text(f'''
+            CREATE TABLE processed_payroll_files (
+                id {id_column},
+                path VARCHAR(500) NOT NULL UNIQUE,
+                filename VARCHAR(255) NOT NULL,
+                folder VARCHAR(255) NOT NULL,
+                unique_id VARCHAR(20) NOT NULL,
+                month_year VARCHAR(20) NOT NULL,
+                payroll_type VARCHAR(10),
+                size BIGINT NOT NULL DEFAULT 0,
+                created_at TIMESTAMP NOT NULL,
+                employee_id INTEGER
+            );
+            '''))
+            print('Created processed_payroll_files')
+
+        if 'processed_payroll_folders' not in tables:
+            conn.execute(text('''
+            CREATE TABLE processed_payroll_folders (
+                path VARCHAR(500) PRIMARY KEY,
+                mtime_ns BIGINT NOT NULL,
+                scanned_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            );
+            '''))
+            print('Created processed_payroll_folders')
+
+        for name, columns in {
+            'ix_processed_payroll_files_id': '(id)',
+            'ix_processed_payroll_files_folder': '(folder)',
+            'ix_processed_payroll_files_unique_id': '(unique_id)',
+            'ix_processed_payroll_files_employee_id': '(employee_id)',
+            'ix_processed_payroll_files_created': '(created_at, id)',
+            'ix_processed_payroll_files_month_created': '(month_year, created_at)',
+        }.items():
+            conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON processed_payroll_files {columns}'))
+    print('Processed payroll manifest tables verified')
+
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,45 @@
+"""Migration: keyset indexes for the recent send activity feed
+
+The reports activity feed merges payroll_sends and communication_recipients
+with UNION ALL ordered by (sent_at DESC, id DESC). These composite indexes let
+each branch read only the rows of the requested page, with or without the
+status filter.
+
+This migration is idempotent: indexes are created with IF NOT EXISTS.
+"""
+from sqlalchemy import create_engine, inspect, text
+import os
+
+INDEXES = {
+    'payroll_sends': {
+        'ix_payroll_sends_sent_at_id': '(sent_at DESC, id DESC)',
+        'ix_payroll_sends_status_sent_at': '(status, sent_at DESC, id DESC)',
+    },
+    'communication_recipients': {
+        'ix_communication_recipients_sent_at_id': '(sent_at DESC, id DESC)',
+        'ix_communication_recipients_status_sent_at': '(status, sent_at DESC, id DESC)',
+    },
+}
+
+
+def run_migration(database_url=None):
+    database_url = database_url or os.environ.get('DATABASE_URL') or os.environ.get('DATABASE_URI')
+    if not database_url:
+        print('DATABASE_URL not provided; skipping migration')
+        return
+
+    engine = create_engine(database_url)
+    tables = set(inspect(engine).get_table_names())
+
+    with engine.begin() as conn:
+        for table, indexes in INDEXES.items():
+            if table not in tables:
+                print(f'{table} not found; skipping its indexes')
+                continue
+            for name, columns in indexes.items():
+                conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} {columns}'))
+    print('Send activity keyset indexes verified')
+
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,112 @@
+"""Migration: monthly partitioning and keyset indexes for system_logs
+
+PostgreSQL: converts system_logs into a table partitioned by month on
+created_at (primary key becomes (id, created_at)), copies existing rows,
+creates partitions for the data range plus the next months and a default
+partition. Legacy rows with a NULL created_at are backfilled with the oldest
+timestamp first. Composite indexes back keyset pagination ((created_at, id)) and the
+level/category/user filters.
+
+Other databases: only the composite indexes are created.
+
+This migration is idempotent: it checks whether the table is already
+partitioned and creates indexes with IF NOT EXISTS.
+"""
+from datetime import date
+from sqlalchemy import create_engine, inspect, text
+import os
+
+INDEXES = {
+    'ix_system_logs_created_id': '(created_at DESC, id DESC)',
+    'ix_system_logs_level_created': '(level, created_at DESC, id DESC)',
+    'ix_system_logs_category_created': '(category, created_at DESC, id DESC)',
+    'ix_system_logs_user_created': '(user_id, created_at DESC, id DESC)',
+}
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(d, months):
+    month_index = d.year * 12 + (d.month - 1) + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _is_partitioned(conn):
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'system_logs'"
+    )).scalar())
+
+
+def _partition_to_postgres(conn):
+    print('Partitioning system_logs by month...')
+    conn.execute(text('ALTER TABLE system_logs RENAME TO system_logs_legacy'))
+    conn.execute(text('ALTER TABLE system_logs_legacy RENAME CONSTRAINT system_logs_pkey TO system_logs_legacy_pkey'))
+
+    # The partition key must be NOT NULL: rows without created_at get the oldest
+    # known timestamp (or now), so they are kept and are the first to be pruned
+    backfilled = conn.execute(text(
+        'UPDATE system_logs_legacy SET created_at = '
+        '(SELECT COALESCE(MIN(created_at), NOW()) FROM system_logs_legacy) '
+        'WHERE created_at IS NULL'
+    )).rowcount
+    if backfilled:
+        print(f'Backfilled created_at for {backfilled} system_logs rows')
+
+    conn.execute(text(
+        'CREATE TABLE system_logs (LIKE system_logs_legacy INCLUDING DEFAULTS) '
+        'PARTITION BY RANGE (created_at)'
+    ))
+    conn.execute(text('ALTER TABLE system_logs ALTER COLUMN created_at SET NOT NULL'))
+    conn.execute(text('ALTER TABLE system_logs ADD PRIMARY KEY (id, created_at)'))
+
+    # Sequência do id passa a pertencer à nova tabela (senão seria removida junto com a antiga)
+    conn.execute(text('ALTER SEQUENCE IF EXISTS system_logs_id_seq OWNED BY system_logs.id'))
+
+    first, last = conn.execute(text(
+        'SELECT MIN(created_at), MAX(created_at) FROM system_logs_legacy'
+    )).fetchone()
+    today = date.today()
+    newest = max(last.date(), today) if last else today
+    start = date(first.year, first.month, 1) if first else date(today.year, today.month, 1)
+    end = _add_months(date(newest.year, newest.month, 1), MONTHS_AHEAD)
+
+    current = start
+    while current <= end:
+        upper = _add_months(current, 1)
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS system_logs_y{current.year}m{current.month:02d} "
+            f"PARTITION OF system_logs FOR VALUES FROM ('{current.isoformat()}') TO ('{upper.isoformat()}')"
+        ))
+        current = upper
+    conn.execute(text('CREATE TABLE IF NOT EXISTS system_logs_default PARTITION OF system_logs DEFAULT'))
+
+    copied = conn.execute(text('INSERT INTO system_logs SELECT * FROM system_logs_legacy')).rowcount
+    conn.execute(text('DROP TABLE system_logs_legacy'))
+    print(f'Partitioned system_logs ({copied} rows copied)')
+
+
+def run_migration(database_url=None):
+    database_url = database_url or os.environ.get('DATABASE_URL') or os.environ.get('DATABASE_URI')
+    if not database_url:
+        print('DATABASE_URL not provided; skipping migration')
+        return
+
+    engine = create_engine(database_url)
+    inspector = inspect(engine)
+    if 'system_logs' not in inspector.get_table_names():
+        print('system_logs not found; skipping migration')
+        return
+
+    with engine.begin() as conn:
+        if engine.dialect.name == 'postgresql' and not _is_partitioned(conn):
+            _partition_to_postgres(conn)
+
+    with engine.begin() as conn:
+        for name, columns in INDEXES.items():
+            conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON system_logs {columns}'))
+    print('system_logs keyset indexes verified')
+
+
+if __name__ == '__main__':
+    run_migration()
@@ -29,6 +29,14 @@ def run_all_migrations():
     print("🔄 Executando migrations...")
     print()
     
+    # Schema base: tabelas ausentes dos modelos (antes feito na importação do servidor)
+    try:
+        from app.core.database import create_schema
+        create_schema()
+        print("✅ Tabelas do banco de dados verificadas/criadas")
+    except Exception as e:
+        print(f"⚠️  Erro ao criar schema base: {e}")
+    
     for migration_file in migration_files:
         try:
             # Importar o módulo dinamicamente
@@ -157,7 +157,7 @@ const Dashboard = () => {
       const dashboardData = dashboardResponse.data;
       
       // Buscar dados de holerites processados
-      const payrollsResponse = await api.get('/payrolls/processed', { signal });
+      const payrollsResponse = await api.get('/payrolls/processed?limit=0', { signal });
       const payrollsData = payrollsResponse.data;
       
       // Buscar estatísticas de envios REAIS do banco de dados
@@ -281,7 +281,7 @@ const Dashboard = () => {
       }
       
       // Verificar holerites processados mas não enviados
-      const payrollsResponse = await api.get('/payrolls/processed', { signal });
+      const payrollsResponse = await api.get('/payrolls/processed?limit=0', { signal });
       const readyToSend = payrollsResponse.data.statistics?.ready || 0;
       if (readyToSend > 0) {
         newAlerts.push({
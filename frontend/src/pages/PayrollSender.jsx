@@ -185,7 +185,9 @@ const PayrollSender = () => {
       setStatistics(response.data.statistics || {});
       
       // Extrair meses disponíveis para o filtro
-      if (!monthFilter) {
+      if (response.data.available_months) {
+        setAvailableMonths(response.data.available_months);
+      } else if (!monthFilter) {
         const months = [...new Set(response.data.files?.map(f => f.month_year) || [])];
         setAvailableMonths(months.filter(m => m !== 'desconhecido').sort());
       }
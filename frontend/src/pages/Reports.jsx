@@ -37,9 +37,13 @@ const Reports = () => {
     total: 0,
     totalPages: 0,
     hasPrev: false,
-    hasNext: false
+    hasNext: false,
+    totalIsEstimate: false
   });
 
+  // Paginação keyset: cursors[i] carrega a página i + 1 (null = primeira página)
+  const [cursors, setCursors] = useState([null]);
+
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
@@ -60,6 +64,7 @@ const Reports = () => {
         api.get('/reports/recent', { 
           params: { 
             page: pagination.page,
+            cursor: cursors[pagination.page - 1] || undefined,
             limit: pagination.limit,
             date_from: filters.dateFrom || undefined,
             date_to: filters.dateTo || undefined,
@@ -84,13 +89,7 @@ const Reports = () => {
       
       // Atualizar informações de paginação
       if (activityData.pagination) {
-        setPagination(prev => ({
-          ...prev,
-          total: activityData.pagination.total,
-          totalPages: activityData.pagination.total_pages,
-          hasPrev: activityData.pagination.has_prev,
-          hasNext: activityData.pagination.has_next
-        }));
+        updatePagination(activityData.pagination);
       }
       
     } catch (error) {
@@ -101,13 +100,14 @@ const Reports = () => {
     }
   };
 
-  const loadActivities = async () => {
+  const loadActivities = async (page = pagination.page) => {
     try {
       setLoading(true);
       
       const response = await api.get('/reports/recent', { 
         params: { 
-          page: pagination.page,
+          page,
+          cursor: page > 1 ? cursors[page - 1] || undefined : undefined,
           limit: pagination.limit,
           date_from: filters.dateFrom || undefined,
           date_to: filters.dateTo || undefined,
@@ -125,13 +125,7 @@ const Reports = () => {
       
       // Atualizar informações de paginação
       if (activityData.pagination) {
-        setPagination(prev => ({
-          ...prev,
-          total: activityData.pagination.total,
-          totalPages: activityData.pagination.total_pages,
-          hasPrev: activityData.pagination.has_prev,
-          hasNext: activityData.pagination.has_next
-        }));
+        updatePagination(activityData.pagination);
       }
       
     } catch (error) {
@@ -142,6 +136,19 @@ const Reports = () => {
     }
   };
 
+  const updatePagination = (data) => {
+    setPagination(prev => ({
+      ...prev,
+      total: data.total,
+      totalPages: data.total_pages,
+      hasPrev: data.has_prev,
+      hasNext: data.has_next,
+      totalIsEstimate: data.total_is_estimate || false
+    }));
+    // Guardar o cursor da próxima página (descarta os de páginas posteriores)
+    setCursors(prev => [...prev.slice(0, data.page), data.next_cursor || null]);
+  };
+
   const handleFilterChange = (field, value) => {
     setFilters(prev => ({
       ...prev,
@@ -151,8 +158,9 @@ const Reports = () => {
 
   const applyFilters = () => {
     // Resetar para a primeira página ao aplicar filtros
+    setCursors([null]);
     setPagination(prev => ({ ...prev, page: 1 }));
-    loadActivities();
+    loadActivities(1);
   };
 
   const handlePageChange = (newPage) => {
@@ -348,7 +356,7 @@ const Reports = () => {
             <h3 className={`text-lg font-medium ${config.classes.text}`}>Atividade Recente</h3>
             {pagination.total > 0 && (
               <span className={`text-sm ${config.classes.textSecondary}`}>
-                {pagination.total} {pagination.total === 1 ? 'registro' : 'registros'}
+                {pagination.totalIsEstimate ? '~' : ''}{pagination.total} {pagination.total === 1 ? 'registro' : 'registros'}
               </span>
             )}
           </div>
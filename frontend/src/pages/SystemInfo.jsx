@@ -7,6 +7,7 @@ const SystemInfo = () => {
     evolution: { instances: [], total: 0, connected: 0, has_multiple: false },
     server: { uptime: '', version: '' }
   });
+  const [routeMetrics, setRouteMetrics] = useState(null);
 
   const checkSystemStatus = async () => {
     try {
@@ -22,6 +23,14 @@ const SystemInfo = () => {
       const serverResponse = await fetch('/api/v1/system/status');
       const serverData = await serverResponse.json();
 
+      // Métricas por rota (latência, SQL por requisição)
+      const metricsResponse = await fetch('/api/v1/system/metrics/summary?top=15', {
+        headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
+      });
+      if (metricsResponse.ok) {
+        setRouteMetrics(await metricsResponse.json());
+      }
+
       setSystemStatus({
         database: {
           status: dbData.connected ? 'online' : 'offline',
@@ -224,6 +233,54 @@ const SystemInfo = () => {
         </div>
       )}
 
+      {/* Desempenho por rota */}
+      {routeMetrics && routeMetrics.routes.length > 0 && (
+        <div className="bg-white p-6 rounded-lg shadow-sm border">
+          <div className="flex items-center justify-between mb-4">
+            <h3 className="text-lg font-semibold">Desempenho por Rota</h3>
+            <span className="text-xs text-gray-500">
+              {routeMetrics.total_requests} requisições desde o início do servidor · SQL em background: {routeMetrics.background.sql_statements}
+            </span>
+          </div>
+          <div className="overflow-x-auto">
+            <table className="min-w-full text-sm">
+              <thead>
+                <tr className="text-left text-gray-500 border-b">
+                  <th className="py-2 pr-4">Rota</th>
+                  <th className="py-2 pr-4 text-right">Req.</th>
+                  <th className="py-2 pr-4 text-right">Erros</th>
+                  <th className="py-2 pr-4 text-right">p50 (ms)</th>
+                  <th className="py-2 pr-4 text-right">p95 (ms)</th>
+                  <th className="py-2 pr-4 text-right">Máx (ms)</th>
+                  <th className="py-2 pr-4 text-right">SQL/req</th>
+                  <th className="py-2 pr-4 text-right">SQL ms/req</th>
+                  <th className="py-2 text-right">KB médio</th>
+                </tr>
+              </thead>
+              <tbody>
+                {routeMetrics.routes.map((route) => (
+                  <tr key={`${route.method} ${route.route}`} className="border-b last:border-0">
+                    <td className="py-2 pr-4 font-mono text-xs">
+                      <span className="text-gray-500 mr-2">{route.method}</span>{route.route}
+                    </td>
+                    <td className="py-2 pr-4 text-right">{route.requests}</td>
+                    <td className={`py-2 pr-4 text-right ${route.errors > 0 ? 'text-red-600 font-medium' : ''}`}>{route.errors}</td>
+                    <td className="py-2 pr-4 text-right">{route.p50_ms}</td>
+                    <td className="py-2 pr-4 text-right">{route.p95_ms}</td>
+                    <td className="py-2 pr-4 text-right">{route.max_ms}</td>
+                    <td className={`py-2 pr-4 text-right ${route.sql_max_per_request > 20 ? 'text-orange-600 font-medium' : ''}`}>
+                      {route.sql_per_request}
+                    </td>
+                    <td className="py-2 pr-4 text-right">{route.sql_ms_per_request}</td>
+                    <td className="py-2 text-right">{(route.avg_bytes / 1024).toFixed(1)}</td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+        </div>
+      )}
+
       {/* Informações Adicionais */}
       <div className="bg-white p-6 rounded-lg shadow-sm border">
         <h3 className="text-lg font-semibold mb-4">Informações do Sistema</h3>
@@ -8,9 +8,12 @@ const SystemLogs = () => {
   const [filters, setFilters] = useState({
     level: '',
     category: '',
-    limit: 100,
-    offset: 0
+    limit: 100
   });
+  // Paginação keyset: pilha de cursores das páginas visitadas (null = primeira página)
+  const [cursorStack, setCursorStack] = useState([null]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const currentCursor = cursorStack[cursorStack.length - 1];
 
   const LOG_LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'];
   const LOG_CATEGORIES = [
@@ -40,7 +43,7 @@ const SystemLogs = () => {
 
   useEffect(() => {
     fetchLogs();
-  }, [filters]);
+  }, [filters, currentCursor]);
 
   const fetchLogs = async () => {
     setLoading(true);
@@ -49,10 +52,11 @@ const SystemLogs = () => {
       if (filters.level) params.append('level', filters.level);
       if (filters.category) params.append('category', filters.category);
       params.append('limit', filters.limit);
-      params.append('offset', filters.offset);
+      if (currentCursor) params.append('cursor', currentCursor);
 
       const response = await api.get(`/system/logs?${params.toString()}`);
       setLogs(response.data.logs || []);
+      setNextCursor(response.data.next_cursor || null);
     } catch (error) {
       console.error('Erro ao buscar logs:', error);
       toast.error('Erro ao carregar logs do sistema');
@@ -64,20 +68,30 @@ const SystemLogs = () => {
   const handleFilterChange = (field, value) => {
     setFilters(prev => ({
       ...prev,
-      [field]: value,
-      offset: 0 // Reset pagination when filter changes
+      [field]: value
     }));
+    setCursorStack([null]); // Reset pagination when filter changes
   };
 
   const clearFilters = () => {
     setFilters({
       level: '',
       category: '',
-      limit: 100,
-      offset: 0
+      limit: 100
     });
+    setCursorStack([null]);
   };
 
+  const goToNextPage = () => {
+    if (nextCursor) setCursorStack(prev => [...prev, nextCursor]);
+  };
+
+  const goToPreviousPage = () => {
+    setCursorStack(prev => (prev.length > 1 ? prev.slice(0, -1) : prev));
+  };
+
+  const pageOffset = (cursorStack.length - 1) * filters.limit;
+
   const formatDate = (dateString) => {
     const date = new Date(dateString);
     return date.toLocaleString('pt-BR', {
@@ -255,19 +269,19 @@ const SystemLogs = () => {
         <div className="bg-white rounded-lg shadow-md p-4">
           <div className="flex justify-between items-center">
             <p className="text-sm text-gray-600">
-              Mostrando {filters.offset + 1} a {filters.offset + logs.length} de muitos registros
+              Mostrando {pageOffset + 1} a {pageOffset + logs.length} de muitos registros
             </p>
             <div className="flex gap-2">
               <button
-                onClick={() => handleFilterChange('offset', Math.max(0, filters.offset - filters.limit))}
-                disabled={filters.offset === 0}
+                onClick={goToPreviousPage}
+                disabled={cursorStack.length === 1}
                 className="px-4 py-2 border border-gray-300 text-gray-700 rounded-lg hover:bg-gray-50 transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
               >
                 ← Anterior
               </button>
               <button
-                onClick={() => handleFilterChange('offset', filters.offset + filters.limit)}
-                disabled={logs.length < filters.limit}
+                onClick={goToNextPage}
+                disabled={!nextCursor}
                 className="px-4 py-2 border border-gray-300 text-gray-700 rounded-lg hover:bg-gray-50 transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
               >
                 Próxima →